@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la búsqueda de clientes: LIKE '%q%' sobre cuatro columnas (la
+implementación original) contra el índice FTS5 trigram de BusquedaService
+
+Uso: python benchmarks/bench_busqueda_clientes.py [cantidad_clientes]
+"""
+
+import sys
+import random
+
+from comun import crear_app_benchmark, medir
+
+CANTIDAD = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+
+NOMBRES = ['José', 'María', 'Lucía', 'Martín', 'Sofía', 'Julián', 'Ana', 'Tomás', 'Valentina', 'Ramón',
+           'Agustina', 'Nicolás', 'Camila', 'Sebastián', 'Florencia', 'Matías', 'Belén', 'Joaquín']
+APELLIDOS = ['García', 'Fernández', 'González', 'Rodríguez', 'López', 'Martínez', 'Pérez', 'Gómez',
+             'Sánchez', 'Núñez', 'Ibáñez', 'Domínguez', 'Álvarez', 'Romero', 'Sosa', 'Benítez', 'Acuña',
+             'Castaño', 'Peña', 'Muñoz', 'Ortiz', 'Giménez', 'Quiroga', 'Villalba', 'Cabrera']
+
+# Búsquedas típicas del autocompletado: prefijos, sin tildes, infijos, teléfono, email
+BUSQUEDAS = ['gar', 'garci', 'nunez', 'ibañ', 'ernan', 'lucia rom', 'sofia', 'quirog', '5512', '4455',
+             'cliente1234', 'example', 'pe', 'mu', 'xyz', 'zzzz']
+
+
+def sembrar_clientes(db, cantidad, seed=42):
+    from src.models import Cliente
+
+    rnd = random.Random(seed)
+    lote = []
+    for i in range(cantidad):
+        lote.append({
+            'nombre': rnd.choice(NOMBRES),
+            'apellido': f'{rnd.choice(APELLIDOS)} {rnd.choice(APELLIDOS)}' if i % 5 == 0 else rnd.choice(APELLIDOS),
+            'telefono': f'11{rnd.randrange(10 ** 8):08d}',
+            'email': f'cliente{i}@example.com',
+            'activo': True,
+        })
+        if len(lote) == 20000:
+            db.session.execute(Cliente.__table__.insert(), lote)
+            lote = []
+    if lote:
+        db.session.execute(Cliente.__table__.insert(), lote)
+    db.session.commit()
+
+
+def main():
+    app = crear_app_benchmark()
+
+    with app.app_context():
+        from src.database import db
+        from src.models import Cliente
+        from src.services.cliente_service import ClienteService
+
+        print(f"🌱 Sembrando {CANTIDAD} clientes...")
+        sembrar_clientes(db, CANTIDAD)
+
+        def like(termino, limite=10):
+            return Cliente.query.filter(
+                Cliente.activo == True,
+                db.or_(
+                    Cliente.nombre.contains(termino),
+                    Cliente.apellido.contains(termino),
+                    Cliente.email.contains(termino)
+                )
+            ).limit(limite).all()
+
+        print(f"⏱️  Autocompletado ({len(BUSQUEDAS)} búsquedas, promedio / p95 por búsqueda)")
+        for nombre, funcion in [('🐢 LIKE', like), ('🚀 FTS5', ClienteService.buscar_clientes)]:
+            tiempos = [medir(lambda termino=termino: funcion(termino), repeticiones=10) for termino in BUSQUEDAS]
+            promedio = sum(t[0] for t in tiempos) / len(tiempos)
+            p95 = sorted(t[1] for t in tiempos)[int(len(tiempos) * 0.95) - 1]
+            print(f"{nombre}: {promedio:7.2f} ms | p95 {p95:7.2f} ms | peor {max(t[1] for t in tiempos):7.2f} ms")
+
+        print("⏱️  Listado paginado con búsqueda (página 1, 10 por página)")
+        for termino in ['garci', 'nunez', '4455']:
+            promedio, p95 = medir(lambda: ClienteService.get_paginated_clientes(1, 10, termino).items, repeticiones=5)
+            print(f"   '{termino}': {promedio:7.2f} ms | p95 {p95:7.2f} ms")
+
+        db.session.remove()
+
+
+if __name__ == '__main__':
+    main()
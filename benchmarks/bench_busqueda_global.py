@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la búsqueda global: una consulta LIKE por entidad (cinco idas a
+la base) contra BusquedaService.busqueda_global (clientes_fts + busqueda_fts
+en una sola consulta con ranking)
+
+Uso: python benchmarks/bench_busqueda_global.py [cantidad_clientes]
+"""
+
+import sys
+import random
+
+from comun import crear_app_benchmark, medir
+from bench_busqueda_clientes import APELLIDOS, NOMBRES, sembrar_clientes
+
+CANTIDAD = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+ESPECIALIDADES = ['Cardiología', 'Clínica médica', 'Dermatología', 'Pediatría', 'Traumatología', 'Ginecología']
+SERVICIOS = ['Consulta', 'Electrocardiograma', 'Ecografía', 'Control', 'Radiografía', 'Análisis']
+
+BUSQUEDAS = ['card', 'garci', 'nunez', 'pediat', 'ecograf', 'aut-0012', 'salud', 'lucia rom', 'xyz']
+
+
+def sembrar_entidades(db, clientes, seed=42):
+    from src.models import Autorizacion, ObraSocial, Profesional, Servicio
+
+    rnd = random.Random(seed)
+    db.session.execute(Profesional.__table__.insert(), [
+        {'nombre': rnd.choice(NOMBRES), 'apellido': rnd.choice(APELLIDOS),
+         'especialidad': rnd.choice(ESPECIALIDADES), 'activo': True}
+        for _ in range(2000)
+    ])
+    db.session.execute(Servicio.__table__.insert(), [
+        {'nombre': f'{rnd.choice(SERVICIOS)} {i}', 'descripcion': f'{rnd.choice(ESPECIALIDADES)} ambulatoria',
+         'precio': 1000, 'duracion': 30, 'activo': True}
+        for i in range(1000)
+    ])
+    db.session.execute(ObraSocial.__table__.insert(), [
+        {'nombre': f'{rnd.choice(["Salud", "Medicina", "Prevención"])} {rnd.choice(APELLIDOS)} {i}',
+         'codigo': f'OS{i:04d}', 'tipo': 'prepaga', 'activo': True}
+        for i in range(300)
+    ])
+    db.session.execute(Autorizacion.__table__.insert(), [
+        {'numero_autorizacion': f'AUT-{i:06d}', 'cliente_id': rnd.randrange(1, clientes + 1),
+         'obra_social_id': rnd.randrange(1, 301), 'estado': 'pendiente', 'activo': True}
+        for i in range(50000)
+    ])
+    db.session.commit()
+
+
+def main():
+    app = crear_app_benchmark()
+
+    with app.app_context():
+        from src.database import db
+        from src.models import Autorizacion, Cliente, ObraSocial, Profesional, Servicio
+        from src.services.busqueda_service import BusquedaService
+
+        print(f"🌱 Sembrando {CANTIDAD} clientes y el resto de las entidades...")
+        sembrar_clientes(db, CANTIDAD)
+        sembrar_entidades(db, CANTIDAD)
+
+        def like(termino, limite=20):
+            resultados = []
+            for modelo, columnas in [
+                (Cliente, ('nombre', 'apellido', 'email')),
+                (Profesional, ('nombre', 'apellido', 'especialidad')),
+                (Servicio, ('nombre', 'descripcion')),
+                (ObraSocial, ('nombre', 'codigo')),
+                (Autorizacion, ('numero_autorizacion',)),
+            ]:
+                resultados.extend(modelo.query.filter(
+                    modelo.activo == True,
+                    db.or_(*[getattr(modelo, columna).contains(termino) for columna in columnas])
+                ).limit(limite).all())
+            return resultados
+
+        print(f"⏱️  Búsqueda global ({len(BUSQUEDAS)} búsquedas, promedio / p95 por búsqueda)")
+        for nombre, funcion in [('🐢 LIKE x5', like), ('🚀 FTS5', BusquedaService.busqueda_global)]:
+            tiempos = [medir(lambda termino=termino: funcion(termino), repeticiones=10) for termino in BUSQUEDAS]
+            promedio = sum(t[0] for t in tiempos) / len(tiempos)
+            p95 = sorted(t[1] for t in tiempos)[int(len(tiempos) * 0.95) - 1]
+            print(f"{nombre}: {promedio:7.2f} ms | p95 {p95:7.2f} ms | peor {max(t[1] for t in tiempos):7.2f} ms")
+
+        db.session.remove()
+
+
+if __name__ == '__main__':
+    main()
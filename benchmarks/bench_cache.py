@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la caché de resultados: datos del calendario mensual y
+estadísticas de clientes sin caché, con el LRU en memoria y con el archivo
+SQLite compartido entre workers
+
+Uso: python benchmarks/bench_cache.py [cantidad_turnos]
+"""
+
+import os
+import sys
+import tempfile
+from datetime import date
+
+from comun import crear_app_benchmark, medir, sembrar_catalogo, sembrar_turnos
+
+CANTIDAD_TURNOS = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+
+def main():
+    directorio = tempfile.mkdtemp(prefix='bench_cache_')
+    app = crear_app_benchmark(CACHE_SQLITE_PATH=os.path.join(directorio, 'cache.sqlite'))
+
+    with app.app_context():
+        from src.database import db
+        from src.services.cliente_service import ClienteService
+        from src.services.turno_service import TurnoService
+        from src.utils.cache import CacheMemoria, CacheSQLite
+
+        print(f"🌱 Sembrando {CANTIDAD_TURNOS} turnos...")
+        sembrar_catalogo(db, clientes=2000)
+        sembrar_turnos(db, CANTIDAD_TURNOS, fecha_inicio=date.today().replace(day=1), dias=60)
+
+        def pantalla():
+            TurnoService.get_calendario_data('mes', date.today())
+            ClienteService.get_estadisticas_clientes()
+            db.session.remove()
+
+        backends = [
+            ('🐢 Sin caché', None),
+            ('🧠 Memoria', CacheMemoria()),
+            ('💾 SQLite', CacheSQLite(app.config['CACHE_SQLITE_PATH'])),
+        ]
+
+        print("⏱️  Calendario mensual + estadísticas de clientes (promedio / p95)")
+        for nombre, backend in backends:
+            app.extensions['cache'] = backend
+            pantalla()  # La primera llamada llena la caché
+            promedio, p95 = medir(pantalla, repeticiones=50)
+            print(f"{nombre}: {promedio:8.2f} ms | p95 {p95:8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark del calendario: objetos ORM completos (con relaciones precargadas)
+contra la proyección de columnas de TurnoService.get_filas_calendario
+"""
+
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from comun import crear_app_benchmark, sembrar_catalogo, sembrar_turnos
+
+CANTIDAD_TURNOS = 5000
+DIAS = 30
+
+
+def organizar_orm(turnos):
+    """Armado original del calendario a partir de objetos Turno"""
+    turnos_por_fecha = {}
+    for turno in turnos:
+        turnos_por_fecha.setdefault(turno.fecha.isoformat(), []).append({
+            'id': turno.id,
+            'hora': turno.hora.strftime('%H:%M'),
+            'cliente': turno.cliente.nombre_completo,
+            'profesional': turno.profesional.nombre_completo,
+            'servicio': turno.servicio.nombre,
+            'estado': turno.estado,
+            'duracion': turno.servicio.duracion,
+            'precio': float(turno.precio_final or turno.servicio.precio or 0)
+        })
+    return turnos_por_fecha
+
+
+def perfilar(funcion, repeticiones=5):
+    """Devolver (tiempo promedio en ms, pico de memoria en KB)"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+
+    # La memoria se mide aparte: tracemalloc distorsiona los tiempos
+    tracemalloc.start()
+    funcion()
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return sum(tiempos) / len(tiempos), pico / 1024
+
+
+def main():
+    print(f"⏱️  Benchmark del calendario ({CANTIDAD_TURNOS} turnos en {DIAS} días)")
+    app = crear_app_benchmark()
+
+    with app.app_context():
+        from src.database import db
+        from src.models import Turno
+        from src.services.turno_service import TurnoService
+
+        sembrar_catalogo(db, profesionales=8, servicios=4, clientes=2000)
+        fecha_inicio = date.today()
+        fecha_fin = fecha_inicio + timedelta(days=DIAS - 1)
+        sembrar_turnos(db, CANTIDAD_TURNOS, fecha_inicio=fecha_inicio, dias=DIAS)
+
+        def ruta_orm():
+            db.session.expunge_all()
+            turnos = TurnoService.query_con_relaciones('calendario').filter(
+                Turno.fecha >= fecha_inicio,
+                Turno.fecha <= fecha_fin
+            ).order_by(Turno.fecha, Turno.hora).all()
+            return organizar_orm(turnos)
+
+        def ruta_proyeccion():
+            db.session.expunge_all()
+            filas = TurnoService.get_filas_calendario(fecha_inicio, fecha_fin)
+            return TurnoService.organizar_filas_por_fecha(filas)
+
+        assert ruta_orm() == ruta_proyeccion(), "Los resultados no coinciden"
+
+        tiempo_orm, memoria_orm = perfilar(ruta_orm)
+        tiempo_proy, memoria_proy = perfilar(ruta_proyeccion)
+
+        print(f"🐢 ORM:        {tiempo_orm:8.1f} ms | pico {memoria_orm:8.0f} KB")
+        print(f"🚀 Proyección: {tiempo_proy:8.1f} ms | pico {memoria_proy:8.0f} KB")
+        print(f"📈 Tiempo x{tiempo_orm / tiempo_proy:.1f} | Memoria x{memoria_orm / memoria_proy:.1f}")
+
+
+if __name__ == '__main__':
+    main()
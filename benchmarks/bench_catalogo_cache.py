@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la caché de catálogos: las consultas que hacía cada formulario
+(profesionales, servicios, obras sociales y planes) contra CatalogoCache
+
+Uso: python benchmarks/bench_catalogo_cache.py
+"""
+
+from comun import crear_app_benchmark, medir
+
+
+def sembrar_catalogos(db):
+    from src.models import ObraSocial, PlanObraSocial, Profesional, Servicio
+
+    db.session.execute(Profesional.__table__.insert(), [
+        {'nombre': f'Nombre{i}', 'apellido': f'Apellido{i}', 'especialidad': 'Clínica', 'activo': True}
+        for i in range(60)
+    ])
+    db.session.execute(Servicio.__table__.insert(), [
+        {'nombre': f'Servicio {i}', 'precio': 1000, 'duracion': 30, 'activo': True} for i in range(80)
+    ])
+    db.session.execute(ObraSocial.__table__.insert(), [
+        {'nombre': f'Obra social {i}', 'codigo': f'OS{i}', 'tipo': 'obra_social', 'activo': True} for i in range(150)
+    ])
+    db.session.execute(PlanObraSocial.__table__.insert(), [
+        {'nombre': f'Plan {i}', 'codigo': f'P{i}', 'obra_social_id': i % 150 + 1, 'activo': True} for i in range(600)
+    ])
+    db.session.commit()
+
+
+def main():
+    app = crear_app_benchmark()
+
+    with app.app_context():
+        from src.database import db
+        from src.models import ObraSocial, PlanObraSocial, Profesional, Servicio
+        from src.services.catalogo_cache import CatalogoCache
+
+        print("🌱 Sembrando catálogos...")
+        sembrar_catalogos(db)
+
+        def sin_cache():
+            Profesional.query.filter_by(activo=True).order_by(Profesional.apellido, Profesional.nombre).all()
+            Servicio.query.filter_by(activo=True).order_by(Servicio.nombre).all()
+            ObraSocial.query.filter_by(activo=True).order_by(ObraSocial.nombre).all()
+            PlanObraSocial.query.filter_by(obra_social_id=7, activo=True).order_by(PlanObraSocial.nombre).all()
+            db.session.get(Servicio, 5)
+            db.session.remove()
+
+        def con_cache():
+            CatalogoCache.obtener('profesionales')
+            CatalogoCache.obtener('servicios')
+            CatalogoCache.obtener('obras_sociales')
+            [plan for plan in CatalogoCache.obtener('planes') if plan.obra_social_id == 7]
+            CatalogoCache.por_id('servicios', 5)
+            db.session.remove()
+
+        print("⏱️  Catálogos de un formulario (promedio / p95)")
+        for nombre, funcion in [('🐢 Consultas', sin_cache), ('🚀 Caché', con_cache)]:
+            promedio, p95 = medir(funcion, repeticiones=200)
+            print(f"{nombre}: {promedio:7.3f} ms | p95 {p95:7.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
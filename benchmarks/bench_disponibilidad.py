@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark de búsqueda de horarios libres: recorrido original (horarios × turnos
+con carga perezosa de servicio) contra el motor de intervalos de DisponibilidadService
+"""
+
+from datetime import date, datetime, time, timedelta
+
+from comun import crear_app_benchmark, sembrar_catalogo, medir
+
+
+def horarios_legacy(profesional_id, fecha, duracion):
+    """Implementación original de ProfesionalService.get_horarios_disponibles"""
+    from src.models import Turno
+
+    hora_inicio = time(8, 0)
+    hora_fin = time(18, 0)
+    turnos_ocupados = Turno.query.filter(
+        Turno.profesional_id == profesional_id,
+        Turno.fecha == fecha,
+        Turno.estado.in_(['pendiente', 'confirmado'])
+    ).all()
+
+    horarios = []
+    hora_actual = datetime.combine(fecha, hora_inicio)
+    hora_limite = datetime.combine(fecha, hora_fin)
+    while hora_actual < hora_limite:
+        libre = True
+        for turno in turnos_ocupados:
+            hora_turno = datetime.combine(fecha, turno.hora)
+            duracion_turno = turno.servicio.duracion if turno.servicio else 60
+            if (hora_actual < hora_turno + timedelta(minutes=duracion_turno) and
+                    hora_actual + timedelta(minutes=duracion) > hora_turno):
+                libre = False
+                break
+        if libre:
+            horarios.append(hora_actual.time().strftime('%H:%M'))
+        hora_actual += timedelta(minutes=5)
+    return horarios
+
+
+def main():
+    print("⏱️  Benchmark de disponibilidad de profesionales")
+    app = crear_app_benchmark()
+
+    with app.app_context():
+        from src.database import db
+        from src.models import Turno, Cliente, Profesional, Servicio
+        from src.services.disponibilidad_service import DisponibilidadService
+
+        sembrar_catalogo(db, profesionales=1, servicios=1, clientes=50)
+        profesional = Profesional.query.first()
+        cliente = Cliente.query.first()
+        # Servicio corto para poder cargar muchos turnos en una jornada
+        servicio = Servicio.query.first()
+        servicio.duracion = 10
+        db.session.commit()
+
+        fecha = date.today() + timedelta(days=1)
+        # 48 turnos de 10 minutos cada 12 minutos entre 8:00 y 17:36
+        filas = [{
+            'fecha': fecha,
+            'hora': time(8 + (i * 12) // 60, (i * 12) % 60),
+            'estado': 'confirmado',
+            'cliente_id': cliente.id,
+            'profesional_id': profesional.id,
+            'servicio_id': servicio.id,
+        } for i in range(48)]
+        db.session.execute(Turno.__table__.insert(), filas)
+        db.session.commit()
+        print(f"📋 Turnos en la jornada: {len(filas)}")
+
+        def motor():
+            db.session.expire_all()
+            return DisponibilidadService.get_horarios_libres(
+                profesional.id, fecha, time(8, 0), time(18, 0), 10,
+                intervalo=5, ajustar_a_fin=False
+            )
+
+        def legacy():
+            db.session.expire_all()
+            return horarios_legacy(profesional.id, fecha, 10)
+
+        assert motor() == legacy(), "Los resultados no coinciden"
+
+        prom_legacy, p95_legacy = medir(legacy)
+        prom_motor, p95_motor = medir(motor)
+
+        print(f"🐢 Original: promedio {prom_legacy:.2f} ms | p95 {p95_legacy:.2f} ms")
+        print(f"🚀 Motor:    promedio {prom_motor:.2f} ms | p95 {p95_motor:.2f} ms")
+        print(f"📈 Mejora: x{prom_legacy / prom_motor:.1f}")
+
+
+if __name__ == '__main__':
+    main()
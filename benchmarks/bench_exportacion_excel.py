@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark de exportación de turnos a Excel: DataFrame + pd.ExcelWriter en
+memoria contra el escritor write-only de src/utils/exports
+
+Uso: python benchmarks/bench_exportacion_excel.py [cantidad_turnos]
+"""
+
+import sys
+import time
+import tracemalloc
+from io import BytesIO
+from tempfile import TemporaryFile
+
+import pandas as pd
+
+from comun import crear_app_benchmark, sembrar_catalogo, sembrar_turnos
+
+CANTIDAD_TURNOS = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+
+def exportar_legacy(query, columnas):
+    """Implementación original: lista de dicts, DataFrame y BytesIO"""
+    data = [dict(zip(columnas, fila)) for fila in query]
+    df = pd.DataFrame(data)
+
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        df.to_excel(writer, sheet_name='Turnos', index=False)
+        worksheet = writer.sheets['Turnos']
+        for i, column in enumerate(df, 1):
+            column_length = max(df[column].astype(str).map(len).max(), len(column))
+            worksheet.column_dimensions[worksheet.cell(1, i).column_letter].width = min(column_length + 2, 50)
+    return len(output.getvalue())
+
+
+def exportar_write_only(query, columnas):
+    """Escritor write-only sobre un archivo temporal"""
+    from src.utils.exports import escribir_excel
+
+    with TemporaryFile() as archivo:
+        escribir_excel(archivo, columnas, query, 'Turnos')
+        return archivo.tell()
+
+
+def perfilar(funcion):
+    """Devolver (tiempo en s, pico de memoria en MB)"""
+    inicio = time.perf_counter()
+    funcion()
+    duracion = time.perf_counter() - inicio
+
+    # La memoria se mide aparte: tracemalloc distorsiona los tiempos
+    tracemalloc.start()
+    funcion()
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return duracion, pico / (1024 * 1024)
+
+
+def main():
+    print(f"⏱️  Benchmark de exportación Excel ({CANTIDAD_TURNOS} turnos)")
+    app = crear_app_benchmark()
+
+    with app.app_context():
+        from src.database import db
+        from src.services.turno_service import TurnoService
+
+        sembrar_catalogo(db, profesionales=8, servicios=4, clientes=2000)
+        sembrar_turnos(db, CANTIDAD_TURNOS, dias=365 * 3)
+        columnas = TurnoService.COLUMNAS_EXPORTACION
+
+        def legacy():
+            db.session.expunge_all()
+            consulta = TurnoService.consulta_exportacion()
+            return exportar_legacy(TurnoService.iterar_filas_exportacion(consulta), columnas)
+
+        def write_only():
+            db.session.expunge_all()
+            consulta = TurnoService.consulta_exportacion()
+            return exportar_write_only(TurnoService.iterar_filas_exportacion(consulta), columnas)
+
+        tiempo_legacy, memoria_legacy = perfilar(legacy)
+        tiempo_nuevo, memoria_nuevo = perfilar(write_only)
+
+        print(f"🐢 pandas:     {tiempo_legacy:6.1f} s | pico {memoria_legacy:8.1f} MB")
+        print(f"🚀 write-only: {tiempo_nuevo:6.1f} s | pico {memoria_nuevo:8.1f} MB")
+        print(f"📈 Memoria x{memoria_legacy / memoria_nuevo:.1f}")
+
+
+if __name__ == '__main__':
+    main()
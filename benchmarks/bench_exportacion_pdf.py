@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark del reporte PDF de turnos: una única Table de reportlab con todas
+las filas (exportar_a_pdf original) contra las tablas por página de
+src/utils/exports.escribir_pdf
+
+Uso: python benchmarks/bench_exportacion_pdf.py [cantidad_turnos ...]
+"""
+
+import sys
+import time
+import tracemalloc
+from io import BytesIO
+
+from comun import crear_app_benchmark, sembrar_catalogo, sembrar_turnos
+
+CANTIDADES = [int(valor) for valor in sys.argv[1:]] or [1000, 2000, 4000]
+
+
+def pdf_legacy(columnas, filas):
+    """Implementación original: una sola Table con todas las filas"""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
+
+    output = BytesIO()
+    doc = SimpleDocTemplate(output, pagesize=A4)
+    table = Table([columnas] + [[str(valor) for valor in fila] for fila in filas])
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 14),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    doc.build([Paragraph('Reporte de Turnos', getSampleStyleSheet()['Title']), table])
+    return len(output.getvalue())
+
+
+def pdf_paginado(columnas, filas):
+    """Motor nuevo: tabla de tamaño fijo por página"""
+    from src.utils.exports import escribir_pdf
+
+    output = BytesIO()
+    escribir_pdf(output, columnas, filas, 'Reporte de Turnos')
+    return len(output.getvalue())
+
+
+def perfilar(funcion):
+    """Devolver (tiempo en s, pico de memoria en MB)"""
+    inicio = time.perf_counter()
+    funcion()
+    duracion = time.perf_counter() - inicio
+
+    # La memoria se mide aparte: tracemalloc distorsiona los tiempos
+    tracemalloc.start()
+    funcion()
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return duracion, pico / (1024 * 1024)
+
+
+def main():
+    for cantidad in CANTIDADES:
+        print(f"⏱️  Benchmark de reporte PDF ({cantidad} turnos)")
+        app = crear_app_benchmark()
+
+        with app.app_context():
+            from src.database import db
+            from src.services.turno_service import TurnoService
+
+            sembrar_catalogo(db, profesionales=8, servicios=4, clientes=2000)
+            sembrar_turnos(db, cantidad, dias=365)
+            columnas = TurnoService.COLUMNAS_EXPORTACION
+
+            def filas():
+                consulta = TurnoService.consulta_exportacion()
+                return TurnoService.iterar_filas_exportacion(consulta, precio_como_moneda=True)
+
+            tiempo_legacy, memoria_legacy = perfilar(lambda: pdf_legacy(columnas, filas()))
+            tiempo_nuevo, memoria_nuevo = perfilar(lambda: pdf_paginado(columnas, filas()))
+
+            print(f"🐢 Tabla única: {tiempo_legacy:6.2f} s | pico {memoria_legacy:7.1f} MB")
+            print(f"🚀 Paginado:    {tiempo_nuevo:6.2f} s | pico {memoria_nuevo:7.1f} MB")
+            print(f"📈 Por cada 1000 filas: {tiempo_legacy / cantidad * 1000:.2f} s -> {tiempo_nuevo / cantidad * 1000:.2f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark de exportación de turnos a CSV: formato fila por fila sobre objetos
+ORM contra el armado por columnas con pandas de TurnoService
+
+Uso: python benchmarks/bench_exportacion_turnos.py [cantidad_turnos ...]
+"""
+
+import sys
+import time
+
+from comun import crear_app_benchmark, sembrar_catalogo, sembrar_turnos
+
+CANTIDADES = [int(valor) for valor in sys.argv[1:]] or [10000, 100000]
+
+
+def filas_legacy(fecha_desde=None, fecha_hasta=None):
+    """Recorrido anterior: objetos Turno con relaciones y formato por fila"""
+    from src.models import Turno
+    from src.services.turno_service import TurnoService
+    from src.utils.exports import TAMANIO_LOTE_EXPORTACION
+
+    query = TurnoService.query_con_relaciones('exportacion').order_by(Turno.fecha, Turno.hora, Turno.id)
+    for turno in query.yield_per(TAMANIO_LOTE_EXPORTACION):
+        yield [
+            turno.id,
+            turno.fecha.strftime('%d/%m/%Y'),
+            turno.hora.strftime('%H:%M'),
+            turno.cliente.nombre_completo,
+            turno.profesional.nombre_completo,
+            turno.servicio.nombre,
+            turno.estado.title(),
+            float(turno.precio_final or turno.servicio.precio),
+            turno.observaciones or ''
+        ]
+
+
+def medir_una_vez(funcion):
+    """Devolver (resultado, tiempo en s)"""
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return resultado, time.perf_counter() - inicio
+
+
+def main():
+    for cantidad in CANTIDADES:
+        print(f"⏱️  Benchmark de exportación CSV de turnos ({cantidad} turnos)")
+        app = crear_app_benchmark()
+
+        with app.app_context():
+            from src.database import db
+            from src.services.turno_service import TurnoService
+            from src.utils.exports import iterar_csv, iterar_csv_bloques
+
+            sembrar_catalogo(db, profesionales=8, servicios=4, clientes=2000)
+            sembrar_turnos(db, cantidad, dias=365 * 3)
+            columnas = TurnoService.COLUMNAS_EXPORTACION
+
+            def legacy():
+                db.session.expunge_all()
+                return ''.join(iterar_csv(columnas, filas_legacy()))
+
+            def vectorizado():
+                db.session.expunge_all()
+                consulta = TurnoService.consulta_exportacion()
+                return ''.join(iterar_csv_bloques(columnas, TurnoService.iterar_bloques_exportacion(consulta)))
+
+            csv_legacy, tiempo_legacy = medir_una_vez(legacy)
+            csv_vectorizado, tiempo_vectorizado = medir_una_vez(vectorizado)
+            assert csv_legacy == csv_vectorizado, "Los resultados no coinciden"
+
+            print(f"🐢 Fila por fila: {tiempo_legacy:6.2f} s")
+            print(f"🚀 Vectorizado:   {tiempo_vectorizado:6.2f} s")
+            print(f"📈 Mejora: x{tiempo_legacy / tiempo_vectorizado:.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la importación masiva de clientes: ClienteService.crear_cliente
+fila por fila (consulta de duplicado y commit por cliente) contra
+ClienteImportService.importar por lotes
+
+Uso: python benchmarks/bench_importacion_clientes.py [cantidad_clientes] [cantidad_legacy]
+"""
+
+import io
+import sys
+import time
+
+from comun import crear_app_benchmark
+
+CANTIDAD = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+# El camino fila por fila se mide con menos filas y se extrapola
+CANTIDAD_LEGACY = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+
+def generar_csv(cantidad, desde=0):
+    lineas = ['nombre,apellido,telefono,email,numero_afiliado']
+    for i in range(desde, desde + cantidad):
+        lineas.append(f'Nombre{i},Apellido{i},11{i:08d},cliente{i}@example.com,{i}')
+    return ('\n'.join(lineas) + '\n').encode('utf-8')
+
+
+def main():
+    app = crear_app_benchmark()
+
+    with app.app_context():
+        from src.database import db
+        from src.models import Cliente
+        from src.services.cliente_service import ClienteService
+        from src.services.cliente_import_service import ClienteImportService
+
+        print(f"⏱️  Importación fila por fila ({CANTIDAD_LEGACY} clientes)")
+        inicio = time.perf_counter()
+        for i in range(CANTIDAD_LEGACY):
+            ClienteService.crear_cliente({
+                'nombre': f'Legacy{i}', 'apellido': 'Test', 'telefono': f'11{i:08d}',
+                'email': f'legacy{i}@example.com', 'numero_afiliado': str(i)
+            })
+        legacy = time.perf_counter() - inicio
+        print(f"🐢 {legacy:6.2f} s ({legacy / CANTIDAD_LEGACY * CANTIDAD:.0f} s estimados para {CANTIDAD})")
+
+        print(f"⏱️  Importación por lotes ({CANTIDAD} clientes nuevos)")
+        datos = generar_csv(CANTIDAD)
+        inicio = time.perf_counter()
+        resultado = ClienteImportService.importar(io.BytesIO(datos), 'csv')
+        nuevo = time.perf_counter() - inicio
+        print(f"🚀 {nuevo:6.2f} s | {resultado.insertados} nuevos, {resultado.rechazados} rechazados")
+
+        print(f"⏱️  Reimportación del mismo archivo ({CANTIDAD} clientes existentes)")
+        inicio = time.perf_counter()
+        resultado = ClienteImportService.importar(io.BytesIO(datos), 'csv')
+        upsert = time.perf_counter() - inicio
+        print(f"🔁 {upsert:6.2f} s | {resultado.actualizados} actualizados")
+
+        print(f"📈 Total de clientes: {Cliente.query.count()}")
+        db.session.remove()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Costo de la instrumentación de src/utils/metrics: registro directo en el
+RegistroMetricas con varios hilos escribiendo a la vez, y requests completos
+con y sin METRICS_ENABLED
+
+Uso: python benchmarks/bench_metricas.py [hilos]
+"""
+
+import sys
+import threading
+import time
+
+from comun import crear_app_benchmark
+
+HILOS = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+OPERACIONES = 100000
+REQUESTS = 500
+
+
+def bench_registro():
+    """Microsegundos por request registrado (1 contador + 1 histograma)"""
+    from src.utils.metrics import RegistroMetricas, BUCKETS_LATENCIA
+
+    registro = RegistroMetricas()
+    registro.contador('requests_total', 'Requests', ('endpoint', 'status'))
+    registro.histograma('latencia_seconds', 'Latencia', BUCKETS_LATENCIA, ('endpoint',))
+
+    def trabajar(indice):
+        endpoint = f'bp.endpoint{indice % 9}'
+        for i in range(OPERACIONES):
+            registro.incrementar('requests_total', (endpoint, '200'))
+            registro.observar('latencia_seconds', (i % 100) / 1000, (endpoint,))
+
+    hilos = [threading.Thread(target=trabajar, args=(i,)) for i in range(HILOS)]
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    duracion = time.perf_counter() - inicio
+
+    inicio_lectura = time.perf_counter()
+    registro.exponer()
+    lectura = time.perf_counter() - inicio_lectura
+
+    return duracion / (HILOS * OPERACIONES) * 1e6, lectura * 1000
+
+
+def bench_requests():
+    """Milisegundos por request a una ruta liviana, sin y con métricas (mejor de 5 rondas alternadas)"""
+    clientes = {}
+    for metricas in (False, True):
+        app = crear_app_benchmark(LOGIN_DISABLED=True, METRICS_ENABLED=metricas)
+        clientes[metricas] = app.test_client()
+        clientes[metricas].get('/clientes/')
+
+    mejores = {False: float('inf'), True: float('inf')}
+    for _ in range(5):
+        for metricas, client in clientes.items():
+            inicio = time.perf_counter()
+            for _ in range(REQUESTS):
+                client.get('/clientes/')
+            mejores[metricas] = min(mejores[metricas], (time.perf_counter() - inicio) / REQUESTS * 1000)
+    return mejores[False], mejores[True]
+
+
+def main():
+    print(f"⏱️  Benchmark de métricas ({HILOS} hilos)")
+    por_operacion, lectura = bench_registro()
+    print(f"🚀 Registro: {por_operacion:.2f} µs por request | lectura de /metrics: {lectura:.1f} ms")
+
+    sin_metricas, con_metricas = bench_requests()
+    print(f"🐢 Request sin métricas: {sin_metricas:.2f} ms")
+    print(f"📊 Request con métricas: {con_metricas:.2f} ms (+{(con_metricas - sin_metricas) * 1000:.0f} µs)")
+
+
+if __name__ == '__main__':
+    main()
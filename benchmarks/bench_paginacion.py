@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la paginación de listados: `.paginate()` (COUNT + OFFSET) contra
+la paginación por cursor (keyset) a distintas profundidades
+
+Uso: python benchmarks/bench_paginacion.py [cantidad_clientes] [cantidad_turnos]
+"""
+
+import sys
+
+from comun import crear_app_benchmark, medir, sembrar_catalogo, sembrar_turnos
+from bench_busqueda_clientes import sembrar_clientes
+
+CANTIDAD_CLIENTES = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+CANTIDAD_TURNOS = int(sys.argv[2]) if len(sys.argv) > 2 else 300000
+
+POR_PAGINA = 20
+PAGINAS = [1, 100, 1000, 5000]
+
+
+def main():
+    app = crear_app_benchmark()
+
+    with app.app_context():
+        from src.database import db
+        from src.services.cliente_service import ClienteService
+        from src.services.turno_service import TurnoService
+        from src.utils.paginacion import codificar_cursor
+
+        print(f"🌱 Sembrando {CANTIDAD_CLIENTES} clientes y {CANTIDAD_TURNOS} turnos...")
+        sembrar_clientes(db, CANTIDAD_CLIENTES)
+        sembrar_catalogo(db, clientes=0)
+        sembrar_turnos(db, CANTIDAD_TURNOS, dias=365)
+
+        listados = [
+            ('clientes', ClienteService.ORDEN_LISTADO, ClienteService.query_listado,
+             ClienteService.get_paginated_clientes, ClienteService.get_clientes_por_cursor),
+            ('turnos', TurnoService.ORDEN_LISTADO, TurnoService.query_listado,
+             TurnoService.get_paginated_turnos, TurnoService.get_turnos_por_cursor),
+        ]
+
+        for nombre, orden, query_listado, offset, keyset in listados:
+            print(f"⏱️  Listado de {nombre} ({POR_PAGINA} por página, promedio / p95)")
+            for pagina in PAGINAS:
+                # Cursor equivalente a la página: valores de orden de la última fila de la anterior
+                cursor = None
+                if pagina > 1:
+                    fila = query_listado().order_by(*orden).offset((pagina - 1) * POR_PAGINA - 1).first()
+                    valores = [getattr(fila, criterio.element.key if hasattr(criterio, 'element') else criterio.key)
+                               for criterio in orden]
+                    cursor = codificar_cursor(nombre, valores, 'sig')
+
+                lento = medir(lambda: offset(page=pagina, per_page=POR_PAGINA).items, repeticiones=5)
+                rapido = medir(lambda: keyset(cursor, per_page=POR_PAGINA).items, repeticiones=5)
+                print(f"   página {pagina:5d}: 🐢 OFFSET {lento[0]:8.2f} ms | p95 {lento[1]:8.2f} ms"
+                      f"   🚀 cursor {rapido[0]:6.2f} ms | p95 {rapido[1]:6.2f} ms")
+
+        db.session.remove()
+
+
+if __name__ == '__main__':
+    main()
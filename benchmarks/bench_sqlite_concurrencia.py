@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark de escrituras concurrentes sobre SQLite: journal por defecto
+(rollback) contra el perfil de src/config_db.SQLITE_PRAGMAS (WAL,
+synchronous=NORMAL, busy_timeout...). Varios hilos dan de alta turnos con un
+commit por turno mientras otros leen la agenda, como varios puestos de
+recepción trabajando a la vez
+
+Uso: python benchmarks/bench_sqlite_concurrencia.py [escritores] [lectores] [altas_por_escritor]
+"""
+
+import sys
+import threading
+import time
+from datetime import date, time as dtime, timedelta
+
+from sqlalchemy.exc import OperationalError
+
+from comun import crear_app_benchmark, sembrar_catalogo, sembrar_turnos
+
+ESCRITORES = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+LECTORES = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+ALTAS_POR_ESCRITOR = int(sys.argv[3]) if len(sys.argv) > 3 else 150
+
+
+def correr(perfil):
+    """Devolver (altas por segundo, lecturas por segundo, errores de base bloqueada)"""
+    app = crear_app_benchmark(SQLITE_TUNING_ENABLED=perfil)
+
+    with app.app_context():
+        from src.database import db
+        from src.models import Cliente, Profesional, Servicio
+
+        sembrar_catalogo(db, profesionales=8, servicios=4, clientes=500)
+        sembrar_turnos(db, 5000, dias=60)
+        cliente_ids = [c.id for c in Cliente.query.all()]
+        profesional_ids = [p.id for p in Profesional.query.all()]
+        servicio_ids = [s.id for s in Servicio.query.all()]
+
+    errores = []
+    lecturas = []
+    terminado = threading.Event()
+
+    def escribir(indice):
+        from src.database import db
+        from src.models import Turno
+
+        with app.app_context():
+            for i in range(ALTAS_POR_ESCRITOR):
+                db.session.add(Turno(
+                    fecha=date.today() + timedelta(days=(indice * ALTAS_POR_ESCRITOR + i) % 60),
+                    hora=dtime(8 + i % 10, (i * 15) % 60),
+                    estado='pendiente',
+                    cliente_id=cliente_ids[i % len(cliente_ids)],
+                    profesional_id=profesional_ids[indice % len(profesional_ids)],
+                    servicio_id=servicio_ids[i % len(servicio_ids)]
+                ))
+                try:
+                    db.session.commit()
+                except OperationalError as e:
+                    db.session.rollback()
+                    errores.append(str(e.orig))
+            db.session.remove()
+
+    def leer():
+        from src.services.turno_service import TurnoService
+
+        with app.app_context():
+            cantidad = 0
+            while not terminado.is_set():
+                try:
+                    TurnoService.get_turnos_by_fecha_range(date.today(), date.today() + timedelta(days=6))
+                    cantidad += 1
+                except OperationalError as e:
+                    errores.append(str(e.orig))
+            lecturas.append(cantidad)
+
+    escritores = [threading.Thread(target=escribir, args=(i,)) for i in range(ESCRITORES)]
+    lectores = [threading.Thread(target=leer) for _ in range(LECTORES)]
+
+    inicio = time.perf_counter()
+    for hilo in lectores + escritores:
+        hilo.start()
+    for hilo in escritores:
+        hilo.join()
+    duracion = time.perf_counter() - inicio
+    terminado.set()
+    for hilo in lectores:
+        hilo.join()
+
+    altas = ESCRITORES * ALTAS_POR_ESCRITOR - len([e for e in errores if 'locked' in e])
+    return altas / duracion, sum(lecturas) / duracion, len(errores)
+
+
+def main():
+    print(f"⏱️  Benchmark de concurrencia SQLite ({ESCRITORES} escritores, {LECTORES} lectores, "
+          f"{ALTAS_POR_ESCRITOR} altas por escritor)")
+
+    for perfil, titulo in [(False, '🐢 Journal por defecto'), (True, '🚀 Perfil WAL        ')]:
+        altas, lecturas, errores = correr(perfil)
+        print(f"{titulo}: {altas:7.1f} altas/s | {lecturas:7.1f} lecturas/s | {errores} errores 'database is locked'")
+
+
+if __name__ == '__main__':
+    main()
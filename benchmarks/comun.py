@@ -0,0 +1,88 @@
+"""
+Utilidades compartidas por los scripts de benchmark
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+from datetime import date, time as dtime, timedelta
+
+# Agregar la raíz del proyecto al path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def crear_app_benchmark(db_uri=None, **extra):
+    """Crear una aplicación sobre una base SQLite y una caché temporales"""
+    from src.app import create_app
+
+    directorio = tempfile.mkdtemp(prefix='bench_consultorio_')
+    if db_uri is None:
+        db_uri = f"sqlite:///{os.path.join(directorio, 'bench.db')}"
+
+    config = {
+        'SECRET_KEY': 'benchmark',
+        'SQLALCHEMY_DATABASE_URI': db_uri,
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+        'TESTING': True,
+        'CACHE_SQLITE_PATH': os.path.join(directorio, 'cache.sqlite'),
+    }
+    config.update(extra)
+    return create_app(config)
+
+
+def sembrar_catalogo(db, profesionales=3, servicios=4, clientes=200):
+    """Crear profesionales, servicios y clientes de prueba"""
+    from src.models import Cliente, Profesional, Servicio
+
+    for i in range(profesionales):
+        db.session.add(Profesional(nombre=f'Prof{i}', apellido=f'Apellido{i}', activo=True))
+    for i, duracion in enumerate([30, 45, 60, 90][:servicios]):
+        db.session.add(Servicio(nombre=f'Servicio {i}', precio=1000 + i * 500,
+                                duracion=duracion, activo=True))
+    for i in range(clientes):
+        db.session.add(Cliente(nombre=f'Nombre{i}', apellido=f'Apellido{i}',
+                               email=f'cliente{i}@example.com', activo=True))
+    db.session.commit()
+
+
+def sembrar_turnos(db, cantidad, fecha_inicio=None, dias=30, seed=42):
+    """Insertar turnos aleatorios distribuidos en un rango de días"""
+    from src.models import Cliente, Profesional, Servicio, Turno
+
+    rnd = random.Random(seed)
+    fecha_inicio = fecha_inicio or date.today()
+    cliente_ids = [c.id for c in Cliente.query.all()]
+    profesional_ids = [p.id for p in Profesional.query.all()]
+    servicio_ids = [s.id for s in Servicio.query.all()]
+    estados = ['pendiente', 'confirmado', 'completado', 'cancelado']
+
+    filas = []
+    for _ in range(cantidad):
+        filas.append({
+            'fecha': fecha_inicio + timedelta(days=rnd.randrange(dias)),
+            'hora': dtime(rnd.randrange(8, 18), rnd.choice([0, 15, 30, 45])),
+            'estado': rnd.choice(estados),
+            'cliente_id': rnd.choice(cliente_ids),
+            'profesional_id': rnd.choice(profesional_ids),
+            'servicio_id': rnd.choice(servicio_ids),
+        })
+    db.session.execute(Turno.__table__.insert(), filas)
+    db.session.commit()
+
+    # Los inserts con Core no disparan los eventos del ORM: recalcular el rollup
+    from src.services.turno_diario_service import TurnoDiarioService
+    TurnoDiarioService.reconstruir()
+
+
+def medir(funcion, repeticiones=20):
+    """Ejecutar una función varias veces y devolver (promedio_ms, p95_ms)"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    tiempos.sort()
+    p95 = tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))]
+    return sum(tiempos) / len(tiempos), p95
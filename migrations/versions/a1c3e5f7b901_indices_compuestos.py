@@ -0,0 +1,38 @@
+"""Índices compuestos para turnos, autorizaciones y clientes
+
+Revision ID: a1c3e5f7b901
+Revises: 
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c3e5f7b901'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+# (nombre, tabla, columnas)
+INDICES = [
+    ('ix_turnos_profesional_fecha_estado', 'turnos', ['profesional_id', 'fecha', 'estado']),
+    ('ix_turnos_fecha_hora', 'turnos', ['fecha', 'hora']),
+    ('ix_autorizaciones_activo_estado_os_fecha', 'autorizaciones',
+     ['activo', 'estado', 'obra_social_id', 'fecha_solicitud']),
+    ('ix_autorizaciones_activo_fecha', 'autorizaciones', ['activo', 'fecha_solicitud']),
+    ('ix_clientes_activo_apellido_nombre', 'clientes', ['activo', 'apellido', 'nombre']),
+]
+
+
+def upgrade():
+    # if_not_exists: las bases creadas con db.create_all() ya tienen los índices
+    for nombre, tabla, columnas in INDICES:
+        op.create_index(nombre, tabla, columnas, unique=False, if_not_exists=True)
+
+
+def downgrade():
+    for nombre, tabla, _ in reversed(INDICES):
+        op.drop_index(nombre, table_name=tabla, if_exists=True)
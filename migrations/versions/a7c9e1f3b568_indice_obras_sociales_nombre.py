@@ -0,0 +1,24 @@
+"""Índice de obras sociales activas por nombre (paginación por cursor)
+
+Revision ID: a7c9e1f3b568
+Revises: f6b8d0e2a457
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c9e1f3b568'
+down_revision = 'f6b8d0e2a457'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_obras_sociales_activo_nombre', 'obras_sociales', ['activo', 'nombre'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_obras_sociales_activo_nombre', table_name='obras_sociales', if_exists=True)
@@ -0,0 +1,60 @@
+"""Resumen diario de turnos (turnos_diarios)
+
+Revision ID: b2d4f6a8c013
+Revises: a1c3e5f7b901
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2d4f6a8c013'
+down_revision = 'a1c3e5f7b901'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'turnos_diarios',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('fecha', sa.Date(), nullable=False),
+        sa.Column('profesional_id', sa.Integer(), nullable=False),
+        sa.Column('servicio_id', sa.Integer(), nullable=False),
+        sa.Column('pendientes', sa.Integer(), nullable=False),
+        sa.Column('confirmados', sa.Integer(), nullable=False),
+        sa.Column('completados', sa.Integer(), nullable=False),
+        sa.Column('cancelados', sa.Integer(), nullable=False),
+        sa.Column('ingresos', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.ForeignKeyConstraint(['profesional_id'], ['profesionales.id']),
+        sa.ForeignKeyConstraint(['servicio_id'], ['servicios.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('fecha', 'profesional_id', 'servicio_id', name='uq_turnos_diarios_clave'),
+        if_not_exists=True
+    )
+    op.create_index('ix_turnos_diarios_profesional_fecha', 'turnos_diarios',
+                    ['profesional_id', 'fecha'], unique=False, if_not_exists=True)
+
+    # Backfill completo desde turnos (equivalente a `flask rebuild-rollups`)
+    op.execute('DELETE FROM turnos_diarios')
+    op.execute("""
+        INSERT INTO turnos_diarios (fecha, profesional_id, servicio_id, pendientes,
+                                    confirmados, completados, cancelados, ingresos)
+        SELECT t.fecha, t.profesional_id, t.servicio_id,
+               SUM(CASE WHEN t.estado = 'pendiente' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN t.estado = 'confirmado' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN t.estado = 'completado' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN t.estado = 'cancelado' THEN 1 ELSE 0 END),
+               COALESCE(SUM(CASE WHEN t.estado = 'completado'
+                                 THEN COALESCE(t.precio_final, s.precio) ELSE 0 END), 0)
+        FROM turnos t
+        JOIN servicios s ON s.id = t.servicio_id
+        GROUP BY t.fecha, t.profesional_id, t.servicio_id
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_turnos_diarios_profesional_fecha', table_name='turnos_diarios', if_exists=True)
+    op.drop_table('turnos_diarios')
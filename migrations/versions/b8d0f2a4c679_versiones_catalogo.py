@@ -0,0 +1,31 @@
+"""Versiones de los catálogos cacheados en memoria
+
+Revision ID: b8d0f2a4c679
+Revises: a7c9e1f3b568
+Create Date: 2026-10-18 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8d0f2a4c679'
+down_revision = 'a7c9e1f3b568'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'versiones_catalogo',
+        sa.Column('nombre', sa.String(length=50), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('fecha_modificacion', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('nombre'),
+        if_not_exists=True
+    )
+
+
+def downgrade():
+    op.drop_table('versiones_catalogo')
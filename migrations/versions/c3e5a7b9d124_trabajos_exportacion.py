@@ -0,0 +1,45 @@
+"""Cola de exportaciones en segundo plano (trabajos_exportacion)
+
+Revision ID: c3e5a7b9d124
+Revises: b2d4f6a8c013
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3e5a7b9d124'
+down_revision = 'b2d4f6a8c013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'trabajos_exportacion',
+        sa.Column('id', sa.String(length=32), nullable=False),
+        sa.Column('tipo', sa.String(length=50), nullable=False),
+        sa.Column('formato', sa.String(length=10), nullable=False),
+        sa.Column('parametros', sa.Text(), nullable=True),
+        sa.Column('estado', sa.String(length=20), nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('filas', sa.Integer(), nullable=True),
+        sa.Column('archivo', sa.String(length=255), nullable=True),
+        sa.Column('nombre_descarga', sa.String(length=255), nullable=True),
+        sa.Column('usuario_id', sa.Integer(), nullable=True),
+        sa.Column('fecha_creacion', sa.DateTime(), nullable=False),
+        sa.Column('fecha_inicio', sa.DateTime(), nullable=True),
+        sa.Column('fecha_fin', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id']),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+    op.create_index('ix_trabajos_exportacion_estado_fecha', 'trabajos_exportacion',
+                    ['estado', 'fecha_creacion'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_trabajos_exportacion_estado_fecha', table_name='trabajos_exportacion', if_exists=True)
+    op.drop_table('trabajos_exportacion')
@@ -0,0 +1,139 @@
+"""Triggers de los índices de búsqueda con funciones integradas (sin fold_es)
+
+Revision ID: c9e1a3b5d780
+Revises: b8d0f2a4c679
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9e1a3b5d780'
+down_revision = 'b8d0f2a4c679'
+branch_labels = None
+depends_on = None
+
+
+# Copia de plegar_sql (src/utils/helpers.py) al momento de la migración
+CON_TILDE = 'áàäâéèëêíìïîóòöôúùüûñç'
+SIN_TILDE = 'aaaaeeeeiiiioooouuuunc'
+REEMPLAZOS_POR_TRAMO = 15
+
+
+def _plegar_integrado(expresion):
+    pares = list(zip(CON_TILDE + CON_TILDE.upper(), SIN_TILDE * 2))
+    tramos = [pares[i:i + REEMPLAZOS_POR_TRAMO] for i in range(0, len(pares), REEMPLAZOS_POR_TRAMO)]
+
+    def encadenar(base, tramo):
+        for con_tilde, sin_tilde in tramo:
+            base = f"replace({base}, '{con_tilde}', '{sin_tilde}')"
+        return base
+
+    consulta = f'SELECT {encadenar(f"lower({expresion})", tramos[0])} AS t'
+    for tramo in tramos[1:]:
+        consulta = f'SELECT {encadenar("t", tramo)} AS t FROM ({consulta})'
+    return f'({consulta})'
+
+
+def _plegar_fold_es(expresion):
+    return f'fold_es({expresion})'
+
+
+FACTOR_ROWID = 8
+COLUMNAS_INDICE = 'busqueda_fts(rowid, titulo, detalle, tipo, etiqueta, descripcion)'
+
+# tipo -> (tabla, código, columnas, título y detalle sin plegar, etiqueta, descripción)
+ENTIDADES = {
+    'profesional': (
+        'profesionales', 1, 'nombre, apellido, especialidad',
+        "{f}.nombre || ' ' || {f}.apellido", "coalesce({f}.especialidad, '')",
+        "{f}.apellido || ', ' || {f}.nombre", "coalesce({f}.especialidad, '')",
+    ),
+    'servicio': (
+        'servicios', 2, 'nombre, descripcion',
+        "{f}.nombre", "coalesce({f}.descripcion, '')",
+        "{f}.nombre", "substr(coalesce({f}.descripcion, ''), 1, 120)",
+    ),
+    'obra_social': (
+        'obras_sociales', 3, 'nombre, codigo',
+        "{f}.nombre", "{f}.codigo",
+        "{f}.nombre", "{f}.codigo",
+    ),
+    'autorizacion': (
+        'autorizaciones', 4, 'numero_autorizacion, estado',
+        "{f}.numero_autorizacion", None,
+        "{f}.numero_autorizacion", "'Estado: ' || coalesce({f}.estado, '')",
+    ),
+}
+
+
+def _valores(tipo, fila, plegar):
+    tabla, codigo, columnas, titulo, detalle, etiqueta, descripcion = ENTIDADES[tipo]
+    return ', '.join([
+        f'{fila}.id * {FACTOR_ROWID} + {codigo}',
+        plegar(titulo.format(f=fila)),
+        plegar(detalle.format(f=fila)) if detalle else "''",
+        f"'{tipo}'",
+        etiqueta.format(f=fila),
+        descripcion.format(f=fila),
+    ])
+
+
+def _valores_cliente(fila, plegar):
+    return ', '.join([
+        f'{fila}.id', plegar(f'{fila}.nombre'), plegar(f'{fila}.apellido'), plegar(f'{fila}.email'), f'{fila}.telefono'
+    ])
+
+
+def _existe(conexion, nombre):
+    return conexion.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (nombre,)
+    ).first() is not None
+
+
+def _recrear_triggers(plegar):
+    """Reemplazar los triggers de inserción y modificación (los de borrado no pliegan texto)"""
+    conexion = op.get_bind()
+    if conexion.dialect.name != 'sqlite':
+        return
+
+    if _existe(conexion, 'clientes_fts'):
+        op.execute("DROP TRIGGER IF EXISTS clientes_fts_ai")
+        op.execute("DROP TRIGGER IF EXISTS clientes_fts_au")
+        op.execute(
+            "CREATE TRIGGER clientes_fts_ai AFTER INSERT ON clientes WHEN new.activo BEGIN "
+            "INSERT INTO clientes_fts(rowid, nombre, apellido, email, telefono) VALUES "
+            f"({_valores_cliente('new', plegar)}); END"
+        )
+        op.execute(
+            "CREATE TRIGGER clientes_fts_au AFTER UPDATE OF nombre, apellido, email, telefono, activo "
+            "ON clientes BEGIN "
+            "DELETE FROM clientes_fts WHERE rowid = old.id; "
+            "INSERT INTO clientes_fts(rowid, nombre, apellido, email, telefono) "
+            f"SELECT {_valores_cliente('new', plegar)} WHERE new.activo; END"
+        )
+
+    if _existe(conexion, 'busqueda_fts'):
+        for tipo, (tabla, codigo, columnas, *_expresiones) in ENTIDADES.items():
+            op.execute(f"DROP TRIGGER IF EXISTS {tabla}_busqueda_ai")
+            op.execute(f"DROP TRIGGER IF EXISTS {tabla}_busqueda_au")
+            op.execute(
+                f"CREATE TRIGGER {tabla}_busqueda_ai AFTER INSERT ON {tabla} WHEN new.activo BEGIN "
+                f"INSERT INTO {COLUMNAS_INDICE} VALUES ({_valores(tipo, 'new', plegar)}); END"
+            )
+            op.execute(
+                f"CREATE TRIGGER {tabla}_busqueda_au AFTER UPDATE OF {columnas}, activo ON {tabla} BEGIN "
+                f"DELETE FROM busqueda_fts WHERE rowid = old.id * {FACTOR_ROWID} + {codigo}; "
+                f"INSERT INTO {COLUMNAS_INDICE} SELECT {_valores(tipo, 'new', plegar)} WHERE new.activo; END"
+            )
+
+
+def upgrade():
+    # El plegado es el mismo: el contenido de los índices no cambia
+    _recrear_triggers(_plegar_integrado)
+
+
+def downgrade():
+    _recrear_triggers(_plegar_fold_es)
@@ -0,0 +1,29 @@
+"""Índice por lower(email) de clientes (duplicados sin distinguir mayúsculas)
+
+Revision ID: d0f2b4c6e891
+Revises: c9e1a3b5d780
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd0f2b4c6e891'
+down_revision = 'c9e1a3b5d780'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.drop_index('ix_clientes_email_activo', table_name='clientes', if_exists=True)
+    op.create_index(
+        'ix_clientes_email_lower_activo', 'clientes', [sa.text('lower(email)'), 'activo'],
+        unique=False, if_not_exists=True
+    )
+
+
+def downgrade():
+    op.drop_index('ix_clientes_email_lower_activo', table_name='clientes', if_exists=True)
+    op.create_index('ix_clientes_email_activo', 'clientes', ['email', 'activo'], unique=False, if_not_exists=True)
@@ -0,0 +1,24 @@
+"""Índice por email de clientes (detección de duplicados en la importación)
+
+Revision ID: d4f6b8c0e235
+Revises: c3e5a7b9d124
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4f6b8c0e235'
+down_revision = 'c3e5a7b9d124'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_clientes_email_activo', 'clientes', ['email', 'activo'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_clientes_email_activo', table_name='clientes', if_exists=True)
@@ -0,0 +1,65 @@
+"""Índice de búsqueda de clientes (FTS5 trigram) y triggers de sincronización
+
+Revision ID: e5a7c9d1f346
+Revises: d4f6b8c0e235
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a7c9d1f346'
+down_revision = 'd4f6b8c0e235'
+branch_labels = None
+depends_on = None
+
+
+# Mismas sentencias que models/cliente.py (fold_es la registra configure_sqlite)
+SENTENCIAS = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS clientes_fts USING fts5("
+    "nombre, apellido, email, telefono, tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS clientes_fts_ai AFTER INSERT ON clientes WHEN new.activo BEGIN "
+    "INSERT INTO clientes_fts(rowid, nombre, apellido, email, telefono) VALUES "
+    "(new.id, fold_es(new.nombre), fold_es(new.apellido), fold_es(new.email), new.telefono); END",
+    "CREATE TRIGGER IF NOT EXISTS clientes_fts_ad AFTER DELETE ON clientes BEGIN "
+    "DELETE FROM clientes_fts WHERE rowid = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS clientes_fts_au AFTER UPDATE OF nombre, apellido, email, telefono, activo "
+    "ON clientes BEGIN "
+    "DELETE FROM clientes_fts WHERE rowid = old.id; "
+    "INSERT INTO clientes_fts(rowid, nombre, apellido, email, telefono) "
+    "SELECT new.id, fold_es(new.nombre), fold_es(new.apellido), fold_es(new.email), new.telefono "
+    "WHERE new.activo; END",
+]
+
+
+def _fts5_disponible(conexion):
+    if conexion.dialect.name != 'sqlite':
+        return False
+    return bool(conexion.exec_driver_sql("SELECT sqlite_compileoption_used('ENABLE_FTS5')").scalar())
+
+
+def upgrade():
+    conexion = op.get_bind()
+    # En otros motores la búsqueda sigue usando LIKE
+    if not _fts5_disponible(conexion):
+        return
+
+    for sentencia in SENTENCIAS:
+        op.execute(sentencia)
+
+    op.execute("DELETE FROM clientes_fts")
+    op.execute(
+        "INSERT INTO clientes_fts(rowid, nombre, apellido, email, telefono) "
+        "SELECT id, fold_es(nombre), fold_es(apellido), fold_es(email), telefono FROM clientes WHERE activo"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    for trigger in ('clientes_fts_au', 'clientes_fts_ad', 'clientes_fts_ai'):
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.execute("DROP TABLE IF EXISTS clientes_fts")
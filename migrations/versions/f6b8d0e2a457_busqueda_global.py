@@ -0,0 +1,110 @@
+"""Índice de búsqueda global (FTS5 trigram) para profesionales, servicios, obras sociales y autorizaciones
+
+Revision ID: f6b8d0e2a457
+Revises: e5a7c9d1f346
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f6b8d0e2a457'
+down_revision = 'e5a7c9d1f346'
+branch_labels = None
+depends_on = None
+
+
+# Copia de models/indice_busqueda.py al momento de la migración (fold_es la registra configure_sqlite)
+FACTOR_ROWID = 8
+
+ENTIDADES = {
+    'profesional': (
+        'profesionales', 1, 'nombre, apellido, especialidad',
+        "fold_es({f}.nombre || ' ' || {f}.apellido)",
+        "fold_es(coalesce({f}.especialidad, ''))",
+        "{f}.apellido || ', ' || {f}.nombre",
+        "coalesce({f}.especialidad, '')",
+    ),
+    'servicio': (
+        'servicios', 2, 'nombre, descripcion',
+        "fold_es({f}.nombre)",
+        "fold_es(coalesce({f}.descripcion, ''))",
+        "{f}.nombre",
+        "substr(coalesce({f}.descripcion, ''), 1, 120)",
+    ),
+    'obra_social': (
+        'obras_sociales', 3, 'nombre, codigo',
+        "fold_es({f}.nombre)",
+        "fold_es({f}.codigo)",
+        "{f}.nombre",
+        "{f}.codigo",
+    ),
+    'autorizacion': (
+        'autorizaciones', 4, 'numero_autorizacion, estado',
+        "fold_es({f}.numero_autorizacion)",
+        "''",
+        "{f}.numero_autorizacion",
+        "'Estado: ' || coalesce({f}.estado, '')",
+    ),
+}
+
+COLUMNAS_INDICE = 'busqueda_fts(rowid, titulo, detalle, tipo, etiqueta, descripcion)'
+
+
+def _valores(tipo, fila):
+    tabla, codigo, columnas, titulo, detalle, etiqueta, descripcion = ENTIDADES[tipo]
+    return ', '.join([
+        f'{fila}.id * {FACTOR_ROWID} + {codigo}',
+        titulo.format(f=fila),
+        detalle.format(f=fila),
+        f"'{tipo}'",
+        etiqueta.format(f=fila),
+        descripcion.format(f=fila),
+    ])
+
+
+def _fts5_disponible(conexion):
+    if conexion.dialect.name != 'sqlite':
+        return False
+    return bool(conexion.exec_driver_sql("SELECT sqlite_compileoption_used('ENABLE_FTS5')").scalar())
+
+
+def upgrade():
+    conexion = op.get_bind()
+    # En otros motores la búsqueda global usa LIKE
+    if not _fts5_disponible(conexion):
+        return
+
+    op.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS busqueda_fts USING fts5("
+        "titulo, detalle, tipo UNINDEXED, etiqueta UNINDEXED, descripcion UNINDEXED, tokenize='trigram')"
+    )
+    op.execute("DELETE FROM busqueda_fts")
+
+    for tipo, (tabla, codigo, columnas, *_expresiones) in ENTIDADES.items():
+        op.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {tabla}_busqueda_ai AFTER INSERT ON {tabla} WHEN new.activo BEGIN "
+            f"INSERT INTO {COLUMNAS_INDICE} VALUES ({_valores(tipo, 'new')}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {tabla}_busqueda_ad AFTER DELETE ON {tabla} BEGIN "
+            f"DELETE FROM busqueda_fts WHERE rowid = old.id * {FACTOR_ROWID} + {codigo}; END"
+        )
+        op.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {tabla}_busqueda_au AFTER UPDATE OF {columnas}, activo ON {tabla} BEGIN "
+            f"DELETE FROM busqueda_fts WHERE rowid = old.id * {FACTOR_ROWID} + {codigo}; "
+            f"INSERT INTO {COLUMNAS_INDICE} SELECT {_valores(tipo, 'new')} WHERE new.activo; END"
+        )
+        op.execute(f"INSERT INTO {COLUMNAS_INDICE} SELECT {_valores(tipo, tabla)} FROM {tabla} WHERE activo")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    for tabla, *_resto in ENTIDADES.values():
+        for sufijo in ('au', 'ad', 'ai'):
+            op.execute(f"DROP TRIGGER IF EXISTS {tabla}_busqueda_{sufijo}")
+    op.execute("DROP TABLE IF EXISTS busqueda_fts")
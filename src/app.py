@@ -6,6 +6,7 @@ from src.auth import init_auth
 from config import Config
 from datetime import datetime, date
 import click
+import re
 from dotenv import load_dotenv
 
 # Cargar variables de entorno desde .flaskenv
@@ -34,9 +35,25 @@ def create_app(config=None):
     except Exception as e:
         print(f"⚠️  Advertencia al inicializar modelos: {e}")
     
+    # Mantener el resumen diario de turnos (rollup) con eventos de sesión
+    from src.services.turno_diario_service import TurnoDiarioService
+    TurnoDiarioService.registrar_eventos()
+    
     # Inicializar autenticación
     init_auth(app)
     
+    # Perfilado de SQL por request (Server-Timing y log de consultas lentas)
+    from src.utils.sql_profiler import init_sql_profiler
+    init_sql_profiler(app)
+    
+    # Caché de resultados (CACHE_BACKEND), invalidada al confirmar cambios en las tablas
+    from src.utils.cache import init_cache
+    init_cache(app)
+    
+    # Métricas en formato Prometheus (opcional, METRICS_ENABLED)
+    from src.utils.metrics import init_metrics
+    init_metrics(app)
+    
     # SOLUCIÓN: Hacer current_user disponible globalmente en plantillas
     @app.context_processor
     def inject_user():
@@ -115,6 +132,11 @@ def register_template_filters(app):
             
             return str(fecha)
         
+        @app.template_test('match')
+        def match_test(valor, patron):
+            """Test 'match' por expresión regular (usado en la vista día del calendario)"""
+            return re.match(patron, str(valor or '')) is not None
+        
         print("✅ Filtros de plantillas registrados correctamente")
         
     except ImportError as e:
@@ -200,6 +222,101 @@ def register_cli_commands(app):
             
             click.echo("✅ Base de datos reseteada exitosamente")
     
+    @app.cli.command('rebuild-rollups')
+    @click.option('--desde', default=None, help='Fecha inicial (YYYY-MM-DD), por defecto todo el historial')
+    @click.option('--hasta', default=None, help='Fecha final (YYYY-MM-DD)')
+    def rebuild_rollups_command(desde, hasta):
+        """Reconstruir el resumen diario de turnos (turnos_diarios) desde la tabla turnos"""
+        with app.app_context():
+            from src.services.turno_diario_service import TurnoDiarioService
+            
+            try:
+                fecha_desde = datetime.strptime(desde, '%Y-%m-%d').date() if desde else None
+                fecha_hasta = datetime.strptime(hasta, '%Y-%m-%d').date() if hasta else None
+            except ValueError:
+                click.echo("❌ Formato de fecha inválido, usar YYYY-MM-DD")
+                return
+            
+            click.echo("🔨 Reconstruyendo resumen diario de turnos...")
+            try:
+                filas = TurnoDiarioService.reconstruir(fecha_desde, fecha_hasta)
+            except ValueError as e:
+                click.echo(f"❌ {e}")
+                return
+            
+            click.echo(f"✅ Resumen diario reconstruido: {filas} filas")
+    
+    @app.cli.command('rebuild-search')
+    def rebuild_search_command():
+        """Reconstruir los índices de búsqueda (clientes_fts y busqueda_fts)"""
+        with app.app_context():
+            from src.services.busqueda_service import BusquedaService
+            
+            click.echo("🔨 Reconstruyendo índices de búsqueda...")
+            try:
+                clientes = BusquedaService.reconstruir_indice_clientes()
+                otros = BusquedaService.reconstruir_indice_global()
+            except ValueError as e:
+                click.echo(f"❌ {e}")
+                return
+            
+            click.echo(f"✅ Índices de búsqueda reconstruidos: {clientes} clientes, {otros} registros del índice global")
+    
+    @app.cli.command('purge-exports')
+    @click.option('--horas', default=None, type=int, help='Antigüedad máxima en horas (por defecto EXPORT_RETENTION_HOURS)')
+    def purge_exports_command(horas):
+        """Eliminar exportaciones en segundo plano vencidas y sus archivos"""
+        with app.app_context():
+            from src.services.exportacion_service import ExportacionService
+            
+            eliminados = ExportacionService.purgar(horas)
+            click.echo(f"🧹 Exportaciones eliminadas: {eliminados}")
+    
+    @app.cli.command('import-clientes')
+    @click.argument('archivo', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--lote', default=None, type=int, help='Filas por transacción (por defecto 5000)')
+    @click.option('--no-actualizar', is_flag=True, help='Rechazar los emails ya registrados en lugar de actualizarlos')
+    @click.option('--rechazos', default=None, type=click.Path(dir_okay=False), help='Archivo CSV donde guardar las filas rechazadas')
+    @click.option('--encoding', default='utf-8-sig', help='Codificación de los archivos CSV')
+    def import_clientes_command(archivo, lote, no_actualizar, rechazos, encoding):
+        """Importar clientes desde un archivo CSV o XLSX"""
+        with app.app_context():
+            from src.services.cliente_import_service import ClienteImportService, TAMANIO_LOTE_IMPORTACION
+            
+            def progreso(resultado):
+                click.echo(f"   ... {resultado.leidas} filas procesadas")
+            
+            click.echo(f"📥 Importando clientes desde {archivo}...")
+            try:
+                formato = ClienteImportService.detectar_formato(archivo)
+                with open(archivo, 'rb') as entrada:
+                    resultado = ClienteImportService.importar(
+                        entrada, formato,
+                        actualizar=not no_actualizar,
+                        tamanio_lote=lote or TAMANIO_LOTE_IMPORTACION,
+                        encoding=encoding,
+                        progreso=progreso
+                    )
+            except (ValueError, UnicodeDecodeError) as e:
+                click.echo(f"❌ {e}")
+                return
+            
+            click.echo(
+                f"✅ Importación terminada: {resultado.insertados} nuevos, "
+                f"{resultado.actualizados} actualizados, {resultado.rechazados} rechazados"
+            )
+            
+            if resultado.rechazos:
+                if rechazos:
+                    with open(rechazos, 'w', newline='', encoding='utf-8') as salida:
+                        resultado.escribir_rechazos(salida)
+                    click.echo(f"📄 Filas rechazadas guardadas en {rechazos}")
+                else:
+                    for rechazo in resultado.rechazos[:20]:
+                        click.echo(f"   Fila {rechazo['fila']}: {rechazo['motivo']}")
+                    if resultado.rechazados > 20:
+                        click.echo("   ... usar --rechazos para guardar el informe completo")
+    
     @app.cli.command('create-admin')
     @click.option('--username', default='admin', help='Nombre de usuario del administrador')
     @click.option('--email', default='admin@consultorio.com', help='Email del administrador')
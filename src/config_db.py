@@ -2,28 +2,48 @@
 import os
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from src.replica import SesionEnrutada, REPLICA_BIND
+from src.utils.helpers import plegar_texto
 
 # Configuración global para evitar conflictos de tablas
 SQLALCHEMY_CONFIG = {
     'SQLALCHEMY_TRACK_MODIFICATIONS': False,
-    'SQLALCHEMY_ENGINE_OPTIONS': {
-        'pool_pre_ping': True,
-        'pool_recycle': 300,
-        'connect_args': {
-            'check_same_thread': False
-        }
-    }
 }
 
-# Crear instancia única de SQLAlchemy con configuración específica
+# Pool de conexiones para bases de datos de servidor (PostgreSQL).
+# Cada valor se puede reemplazar desde Config con la clave DB_<NOMBRE>
+DB_POOL_SIZE = 10
+DB_MAX_OVERFLOW = 20
+DB_POOL_TIMEOUT = 30  # Segundos de espera por una conexión libre
+DB_POOL_RECYCLE = 1800  # Segundos antes de renovar una conexión
+DB_CONNECT_TIMEOUT = 10
+DB_STATEMENT_TIMEOUT_MS = 30000
+
+# Crear instancia única de SQLAlchemy con configuración específica.
+# La sesión envía las lecturas marcadas con @solo_lectura a la réplica (si hay)
 db = SQLAlchemy(
     engine_options={
         'pool_pre_ping': True,
         'pool_recycle': 300,
-    }
+    },
+    session_options={'class_': SesionEnrutada}
 )
 migrate = Migrate()
 
+# Perfil de rendimiento de SQLite (se aplica en cada conexión nueva).
+# Cada valor se puede reemplazar desde Config con la clave SQLITE_<NOMBRE>
+SQLITE_PRAGMAS = {
+    'JOURNAL_MODE': 'WAL',  # Lectores y un escritor en paralelo
+    'SYNCHRONOUS': 'NORMAL',  # Seguro con WAL; fsync solo en los checkpoints
+    'MMAP_SIZE': 256 * 1024 * 1024,  # Lecturas por memoria mapeada (bytes)
+    'CACHE_SIZE': -64000,  # Negativo = KiB de caché de páginas por conexión
+    'TEMP_STORE': 'MEMORY',  # Tablas temporales y ordenamientos en memoria
+    'BUSY_TIMEOUT': 5000,  # Milisegundos de espera ante una base bloqueada
+    'FOREIGN_KEYS': 'ON',
+}
+
 def configure_db(app):
     """Configurar la base de datos con la aplicación Flask"""
     # Aplicar configuración específica
@@ -34,12 +54,105 @@ def configure_db(app):
     app.config.setdefault('SQLALCHEMY_DATABASE_URI', 'sqlite:///instance/consultorio.db')
     app.config.setdefault('SQLALCHEMY_BINDS', {})
     
+    # Opciones del motor según el esquema de la URI (las de la configuración tienen prioridad)
+    uri = normalize_database_uri(app.config['SQLALCHEMY_DATABASE_URI'])
+    app.config['SQLALCHEMY_DATABASE_URI'] = uri
+    opciones = get_engine_options(uri, app.config)
+    opciones.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = opciones
+    
+    binds = {}
+    for clave, bind in app.config['SQLALCHEMY_BINDS'].items():
+        bind = dict(bind) if isinstance(bind, dict) else {'url': bind}
+        bind['url'] = normalize_database_uri(str(bind['url']))
+        binds[clave] = {**get_engine_options(bind['url'], app.config), **bind}
+    app.config['SQLALCHEMY_BINDS'] = binds
+    
     # Inicializar extensiones
     db.init_app(app)
     migrate.init_app(app, db)
     
+    # La réplica replica las tablas de la primaria: no tiene metadata propia
+    # y create_all/drop_all nunca deben ejecutarse sobre ella
+    db.metadatas.pop(REPLICA_BIND, None)
+    
+    configure_sqlite(app)
+    
     return db, migrate
 
+def normalize_database_uri(uri):
+    """Usar el driver psycopg (v3) en las URIs de PostgreSQL, incluido el alias postgres://"""
+    if uri.startswith('postgres://'):
+        uri = 'postgresql://' + uri[len('postgres://'):]
+    if uri.startswith('postgresql://'):
+        uri = 'postgresql+psycopg://' + uri[len('postgresql://'):]
+    return uri
+
+def get_engine_options(uri, config):
+    """Opciones de create_engine para el motor de la URI"""
+    motor = make_url(uri).get_backend_name()
+    
+    if motor == 'sqlite':
+        # Flask-SQLAlchemy elige el pool de SQLite; solo se permite compartir
+        # la conexión entre hilos (el pool garantiza un hilo a la vez)
+        return {'connect_args': {'check_same_thread': False}}
+    
+    opciones = {
+        'pool_pre_ping': True,
+        'pool_size': config.get('DB_POOL_SIZE', DB_POOL_SIZE),
+        'max_overflow': config.get('DB_MAX_OVERFLOW', DB_MAX_OVERFLOW),
+        'pool_timeout': config.get('DB_POOL_TIMEOUT', DB_POOL_TIMEOUT),
+        'pool_recycle': config.get('DB_POOL_RECYCLE', DB_POOL_RECYCLE),
+        'pool_use_lifo': True,  # Reutilizar las conexiones recientes y dejar vencer las ociosas
+    }
+    
+    if motor == 'postgresql':
+        connect_args = {
+            'connect_timeout': config.get('DB_CONNECT_TIMEOUT', DB_CONNECT_TIMEOUT),
+            'application_name': 'consultorio',
+        }
+        statement_timeout = config.get('DB_STATEMENT_TIMEOUT_MS', DB_STATEMENT_TIMEOUT_MS)
+        if statement_timeout:
+            connect_args['options'] = f'-c statement_timeout={int(statement_timeout)}'
+        opciones['connect_args'] = connect_args
+    
+    return opciones
+
+def get_sqlite_pragmas(config):
+    """Lista de (pragma, valor) del perfil de SQLite según la configuración"""
+    if not config.get('SQLITE_TUNING_ENABLED', True):
+        return []
+    
+    pragmas = []
+    for nombre, defecto in SQLITE_PRAGMAS.items():
+        valor = config.get(f'SQLITE_{nombre}', defecto)
+        if valor is None:
+            continue
+        if isinstance(valor, bool):
+            valor = 'ON' if valor else 'OFF'
+        pragmas.append((nombre.lower(), valor))
+    return pragmas
+
+def configure_sqlite(app):
+    """Registrar las funciones SQL y aplicar el perfil de PRAGMAs en cada conexión nueva a los motores SQLite"""
+    sentencias = [f'PRAGMA {nombre}={valor}' for nombre, valor in get_sqlite_pragmas(app.config)]
+    
+    def aplicar_pragmas(dbapi_connection, connection_record):
+        # Solo para bases cuyos triggers de búsqueda todavía usan fold_es (anteriores a la migración c9e1a3b5d780)
+        dbapi_connection.create_function('fold_es', 1, plegar_texto, deterministic=True)
+        
+        cursor = dbapi_connection.cursor()
+        try:
+            for sentencia in sentencias:
+                cursor.execute(sentencia)
+        finally:
+            cursor.close()
+    
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == 'sqlite':
+                event.listen(engine, 'connect', aplicar_pragmas)
+
 def init_db_tables(app):
     """Inicializar las tablas de la base de datos"""
     with app.app_context():
@@ -59,4 +172,7 @@ def get_db():
     """Obtener la instancia de la base de datos"""
     return db
 
-__all__ = ['db', 'migrate', 'configure_db', 'init_db_tables', 'get_db']
+__all__ = [
+    'db', 'migrate', 'configure_db', 'configure_sqlite', 'normalize_database_uri',
+    'get_engine_options', 'init_db_tables', 'get_db'
+]
@@ -7,5 +7,11 @@ from .usuario import Usuario
 from .obra_social import ObraSocial
 from .plan_obra_social import PlanObraSocial
 from .autorizacion import Autorizacion
+from .turno_diario import TurnoDiario
+from .trabajo_exportacion import TrabajoExportacion
+from .version_catalogo import VersionCatalogo
 
-__all__ = ['Cliente', 'Categoria', 'Profesional', 'Servicio', 'Turno', 'Usuario', 'ObraSocial', 'PlanObraSocial', 'Autorizacion']
\ No newline at end of file
+# Triggers del índice de búsqueda global (se registran al importar)
+from . import indice_busqueda
+
+__all__ = ['Cliente', 'Categoria', 'Profesional', 'Servicio', 'Turno', 'Usuario', 'ObraSocial', 'PlanObraSocial', 'Autorizacion', 'TurnoDiario', 'TrabajoExportacion', 'VersionCatalogo']
\ No newline at end of file
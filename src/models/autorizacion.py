@@ -3,7 +3,12 @@ from src.database import db
 
 class Autorizacion(db.Model):
     __tablename__ = 'autorizaciones'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Listado filtrado por estado/obra social y ordenado por fecha de solicitud
+        db.Index('ix_autorizaciones_activo_estado_os_fecha', 'activo', 'estado', 'obra_social_id', 'fecha_solicitud'),
+        db.Index('ix_autorizaciones_activo_fecha', 'activo', 'fecha_solicitud'),
+        {'extend_existing': True}
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     numero_autorizacion = db.Column(db.String(100), unique=True, nullable=False)
@@ -1,9 +1,19 @@
 from datetime import datetime
+from sqlalchemy import event
 from src.database import db
+from src.utils.helpers import plegar_sql
+from .fts import fts5_disponible
 
 class Cliente(db.Model):
     __tablename__ = 'clientes'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Listado de clientes activos ordenado por apellido y nombre
+        db.Index('ix_clientes_activo_apellido_nombre', 'activo', 'apellido', 'nombre'),
+        # Búsqueda de duplicados por email sin distinguir mayúsculas (alta de
+        # clientes e importación masiva)
+        db.Index('ix_clientes_email_lower_activo', db.func.lower(db.text('email')), 'activo'),
+        {'extend_existing': True}
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     nombre = db.Column(db.String(100), nullable=False)
@@ -52,4 +62,40 @@ class Cliente(db.Model):
     
     @property
     def nombre_completo(self):
-        return f"{self.nombre} {self.apellido}"
\ No newline at end of file
+        return f"{self.nombre} {self.apellido}"
+
+
+# Índice de búsqueda de texto completo (SQLite FTS5 con tokenizer trigram): una
+# fila por cliente activo, en minúsculas y sin tildes. Los triggers lo mantienen
+# sincronizado también con los INSERT/UPDATE hechos con Core (importación masiva)
+# o desde fuera de la aplicación: solo usan funciones integradas de SQLite.
+def valores_busqueda_cliente(fila):
+    """Expresiones SQL (rowid, nombre, apellido, email, telefono) del índice para una fila de clientes"""
+    return ', '.join([
+        f'{fila}.id',
+        plegar_sql(f'{fila}.nombre'),
+        plegar_sql(f'{fila}.apellido'),
+        plegar_sql(f'{fila}.email'),
+        f'{fila}.telefono',
+    ])
+
+
+DDL_BUSQUEDA_CLIENTES = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS clientes_fts USING fts5("
+    "nombre, apellido, email, telefono, tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS clientes_fts_ai AFTER INSERT ON clientes WHEN new.activo BEGIN "
+    "INSERT INTO clientes_fts(rowid, nombre, apellido, email, telefono) VALUES "
+    f"({valores_busqueda_cliente('new')}); END",
+    "CREATE TRIGGER IF NOT EXISTS clientes_fts_ad AFTER DELETE ON clientes BEGIN "
+    "DELETE FROM clientes_fts WHERE rowid = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS clientes_fts_au AFTER UPDATE OF nombre, apellido, email, telefono, activo "
+    "ON clientes BEGIN "
+    "DELETE FROM clientes_fts WHERE rowid = old.id; "
+    "INSERT INTO clientes_fts(rowid, nombre, apellido, email, telefono) "
+    f"SELECT {valores_busqueda_cliente('new')} WHERE new.activo; END",
+]
+
+
+for _sentencia in DDL_BUSQUEDA_CLIENTES:
+    event.listen(Cliente.__table__, 'after_create', db.DDL(_sentencia).execute_if(callable_=fts5_disponible))
+event.listen(Cliente.__table__, 'after_drop', db.DDL('DROP TABLE IF EXISTS clientes_fts').execute_if(dialect='sqlite'))
@@ -0,0 +1,8 @@
+# Condición compartida por los índices de búsqueda FTS5 (clientes_fts y busqueda_fts)
+
+
+def fts5_disponible(ddl, target, bind, **kwargs):
+    """Crear el índice y sus triggers solo en SQLite compilado con FTS5"""
+    if bind.dialect.name != 'sqlite':
+        return False
+    return bool(bind.exec_driver_sql("SELECT sqlite_compileoption_used('ENABLE_FTS5')").scalar())
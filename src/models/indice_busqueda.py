@@ -0,0 +1,94 @@
+from sqlalchemy import event
+from src.database import db
+from src.utils.helpers import plegar_sql
+from .fts import fts5_disponible
+from .profesional import Profesional
+from .servicio import Servicio
+from .obra_social import ObraSocial
+from .autorizacion import Autorizacion
+
+# Índice de búsqueda compartido (SQLite FTS5 con tokenizer trigram) para la
+# búsqueda global: profesionales, servicios, obras sociales y números de
+# autorización activos. Los clientes tienen su propio índice (clientes_fts).
+#
+# titulo y detalle tienen el texto en minúsculas y sin tildes (plegar_sql, con
+# funciones integradas: los triggers funcionan desde cualquier cliente); tipo,
+# etiqueta y descripcion son el tipo de entidad y el texto a mostrar. El rowid
+# codifica la entidad (id * FACTOR_ROWID + código del tipo) para que los
+# triggers puedan borrar la fila de una entidad sin recorrer el índice.
+FACTOR_ROWID = 8
+
+# tipo -> (tabla, código, columnas, título, detalle, etiqueta, descripción); {f} es
+# new/old. Solo las columnas listadas (y activo) actualizan el índice
+ENTIDADES_BUSQUEDA = {
+    'profesional': (
+        'profesionales', 1, 'nombre, apellido, especialidad',
+        plegar_sql("{f}.nombre || ' ' || {f}.apellido"),
+        plegar_sql("coalesce({f}.especialidad, '')"),
+        "{f}.apellido || ', ' || {f}.nombre",
+        "coalesce({f}.especialidad, '')",
+    ),
+    'servicio': (
+        'servicios', 2, 'nombre, descripcion',
+        plegar_sql("{f}.nombre"),
+        plegar_sql("coalesce({f}.descripcion, '')"),
+        "{f}.nombre",
+        "substr(coalesce({f}.descripcion, ''), 1, 120)",
+    ),
+    'obra_social': (
+        'obras_sociales', 3, 'nombre, codigo',
+        plegar_sql("{f}.nombre"),
+        plegar_sql("{f}.codigo"),
+        "{f}.nombre",
+        "{f}.codigo",
+    ),
+    'autorizacion': (
+        'autorizaciones', 4, 'numero_autorizacion, estado',
+        plegar_sql("{f}.numero_autorizacion"),
+        "''",
+        "{f}.numero_autorizacion",
+        "'Estado: ' || coalesce({f}.estado, '')",
+    ),
+}
+
+CREAR_INDICE_BUSQUEDA = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS busqueda_fts USING fts5("
+    "titulo, detalle, tipo UNINDEXED, etiqueta UNINDEXED, descripcion UNINDEXED, tokenize='trigram')"
+)
+
+
+def valores_indice_busqueda(tipo, fila):
+    """Expresiones SQL (rowid, titulo, detalle, tipo, etiqueta, descripcion) de una fila"""
+    tabla, codigo, columnas, titulo, detalle, etiqueta, descripcion = ENTIDADES_BUSQUEDA[tipo]
+    return ', '.join([
+        f'{fila}.id * {FACTOR_ROWID} + {codigo}',
+        titulo.format(f=fila),
+        detalle.format(f=fila),
+        f"'{tipo}'",
+        etiqueta.format(f=fila),
+        descripcion.format(f=fila),
+    ])
+
+
+def sentencias_indice_busqueda(tipo):
+    """CREATE del índice y de los triggers que lo sincronizan con la tabla de la entidad"""
+    tabla, codigo, columnas_entidad = ENTIDADES_BUSQUEDA[tipo][:3]
+    columnas = 'busqueda_fts(rowid, titulo, detalle, tipo, etiqueta, descripcion)'
+    return [
+        CREAR_INDICE_BUSQUEDA,
+        f"CREATE TRIGGER IF NOT EXISTS {tabla}_busqueda_ai AFTER INSERT ON {tabla} WHEN new.activo BEGIN "
+        f"INSERT INTO {columnas} VALUES ({valores_indice_busqueda(tipo, 'new')}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {tabla}_busqueda_ad AFTER DELETE ON {tabla} BEGIN "
+        f"DELETE FROM busqueda_fts WHERE rowid = old.id * {FACTOR_ROWID} + {codigo}; END",
+        f"CREATE TRIGGER IF NOT EXISTS {tabla}_busqueda_au AFTER UPDATE OF {columnas_entidad}, activo ON {tabla} BEGIN "
+        f"DELETE FROM busqueda_fts WHERE rowid = old.id * {FACTOR_ROWID} + {codigo}; "
+        f"INSERT INTO {columnas} SELECT {valores_indice_busqueda(tipo, 'new')} WHERE new.activo; END",
+    ]
+
+
+for _tipo, _modelo in [
+    ('profesional', Profesional), ('servicio', Servicio), ('obra_social', ObraSocial), ('autorizacion', Autorizacion)
+]:
+    for _sentencia in sentencias_indice_busqueda(_tipo):
+        event.listen(_modelo.__table__, 'after_create', db.DDL(_sentencia).execute_if(callable_=fts5_disponible))
+    event.listen(_modelo.__table__, 'after_drop', db.DDL('DROP TABLE IF EXISTS busqueda_fts').execute_if(dialect='sqlite'))
@@ -3,7 +3,11 @@ from src.database import db
 
 class ObraSocial(db.Model):
     __tablename__ = 'obras_sociales'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Listado de obras sociales activas por nombre (paginación por cursor)
+        db.Index('ix_obras_sociales_activo_nombre', 'activo', 'nombre'),
+        {'extend_existing': True}
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     nombre = db.Column(db.String(200), nullable=False)
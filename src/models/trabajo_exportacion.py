@@ -0,0 +1,59 @@
+import json
+from datetime import datetime
+from src.database import db
+
+# Exportación generada en segundo plano (cola de trabajos)
+class TrabajoExportacion(db.Model):
+    __tablename__ = 'trabajos_exportacion'
+    __table_args__ = (
+        # Conteo de trabajos en curso y purga por antigüedad
+        db.Index('ix_trabajos_exportacion_estado_fecha', 'estado', 'fecha_creacion'),
+        {'extend_existing': True}
+    )
+    
+    id = db.Column(db.String(32), primary_key=True)
+    tipo = db.Column(db.String(50), nullable=False)  # turnos, clientes, autorizaciones, obras_sociales, planes
+    formato = db.Column(db.String(10), nullable=False)  # csv, excel
+    parametros = db.Column(db.Text, nullable=True)  # JSON con los filtros de la exportación
+    
+    # Estado del trabajo
+    estado = db.Column(db.String(20), nullable=False, default='pendiente')  # pendiente, procesando, completado, error
+    error = db.Column(db.Text, nullable=True)
+    filas = db.Column(db.Integer, nullable=True)
+    
+    # Archivo generado (relativo al directorio de exportaciones)
+    archivo = db.Column(db.String(255), nullable=True)
+    nombre_descarga = db.Column(db.String(255), nullable=True)
+    
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'), nullable=True)
+    
+    # Fechas
+    fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    fecha_inicio = db.Column(db.DateTime, nullable=True)
+    fecha_fin = db.Column(db.DateTime, nullable=True)
+    
+    def __repr__(self):
+        return f'<TrabajoExportacion {self.id} {self.tipo}/{self.formato} {self.estado}>'
+    
+    @property
+    def parametros_dict(self):
+        return json.loads(self.parametros) if self.parametros else {}
+    
+    @property
+    def terminado(self):
+        return self.estado in ('completado', 'error')
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'tipo': self.tipo,
+            'formato': self.formato,
+            'parametros': self.parametros_dict,
+            'estado': self.estado,
+            'error': self.error,
+            'filas': self.filas,
+            'nombre_descarga': self.nombre_descarga,
+            'fecha_creacion': self.fecha_creacion.isoformat() if self.fecha_creacion else None,
+            'fecha_inicio': self.fecha_inicio.isoformat() if self.fecha_inicio else None,
+            'fecha_fin': self.fecha_fin.isoformat() if self.fecha_fin else None
+        }
@@ -3,20 +3,32 @@ from src.database import db
 
 class Turno(db.Model):
     __tablename__ = 'turnos'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Disponibilidad, calendario por profesional y resúmenes diarios
+        db.Index('ix_turnos_profesional_fecha_estado', 'profesional_id', 'fecha', 'estado'),
+        # Calendario general ordenado por fecha y hora
+        db.Index('ix_turnos_fecha_hora', 'fecha', 'hora'),
+        {'extend_existing': True}
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    fecha = db.Column(db.Date, nullable=False)
+    # active_history: el rollup diario (turnos_diarios) necesita el valor anterior
+    # aunque el turno esté expirado, así que se carga antes de modificarlo
+    fecha = db.column_property(db.Column(db.Date, nullable=False), active_history=True)
     hora = db.Column(db.Time, nullable=False)
-    estado = db.Column(db.String(20), default='pendiente')  # pendiente, confirmado, completado, cancelado
+    estado = db.column_property(db.Column(db.String(20), default='pendiente'), active_history=True)  # pendiente, confirmado, completado, cancelado
     observaciones = db.Column(db.Text, nullable=True)
-    precio_final = db.Column(db.Numeric(10, 2), nullable=True)
+    precio_final = db.column_property(db.Column(db.Numeric(10, 2), nullable=True), active_history=True)
     fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Foreign Keys
     cliente_id = db.Column(db.Integer, db.ForeignKey('clientes.id'), nullable=False)
-    profesional_id = db.Column(db.Integer, db.ForeignKey('profesionales.id'), nullable=False)
-    servicio_id = db.Column(db.Integer, db.ForeignKey('servicios.id'), nullable=False)
+    profesional_id = db.column_property(
+        db.Column(db.Integer, db.ForeignKey('profesionales.id'), nullable=False), active_history=True
+    )
+    servicio_id = db.column_property(
+        db.Column(db.Integer, db.ForeignKey('servicios.id'), nullable=False), active_history=True
+    )
     
     def __repr__(self):
         return f'<Turno {self.fecha} {self.hora} - {self.cliente.nombre_completo}>'
@@ -0,0 +1,31 @@
+from src.database import db
+
+# Resumen diario de turnos por profesional y servicio (tabla de rollup)
+class TurnoDiario(db.Model):
+    __tablename__ = 'turnos_diarios'
+    __table_args__ = (
+        db.UniqueConstraint('fecha', 'profesional_id', 'servicio_id', name='uq_turnos_diarios_clave'),
+        db.Index('ix_turnos_diarios_profesional_fecha', 'profesional_id', 'fecha'),
+        {'extend_existing': True}
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    fecha = db.Column(db.Date, nullable=False)
+    profesional_id = db.Column(db.Integer, db.ForeignKey('profesionales.id'), nullable=False)
+    servicio_id = db.Column(db.Integer, db.ForeignKey('servicios.id'), nullable=False)
+    
+    # Cantidad de turnos por estado
+    pendientes = db.Column(db.Integer, nullable=False, default=0)
+    confirmados = db.Column(db.Integer, nullable=False, default=0)
+    completados = db.Column(db.Integer, nullable=False, default=0)
+    cancelados = db.Column(db.Integer, nullable=False, default=0)
+    
+    # Ingresos de los turnos completados (precio_final o precio del servicio)
+    ingresos = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<TurnoDiario {self.fecha} prof={self.profesional_id} serv={self.servicio_id}>'
+    
+    @property
+    def total_turnos(self):
+        return self.pendientes + self.confirmados + self.completados + self.cancelados
@@ -0,0 +1,16 @@
+from datetime import datetime
+from src.database import db
+
+# Versión de cada catálogo cacheado en memoria (profesionales, servicios...).
+# Cada alta, cambio o baja incrementa la versión; los procesos la comparan con
+# la de su caché para saber si tienen que recargar el catálogo.
+class VersionCatalogo(db.Model):
+    __tablename__ = 'versiones_catalogo'
+    __table_args__ = {'extend_existing': True}
+    
+    nombre = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    fecha_modificacion = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<VersionCatalogo {self.nombre} v{self.version}>'
@@ -14,6 +14,8 @@ def init_models():
         from .models.autorizacion import Autorizacion
         from .models.categoria import Categoria
         from .models.usuario import Usuario
+        from .models.turno_diario import TurnoDiario
+        from .models.trabajo_exportacion import TrabajoExportacion
         
         print("✅ Modelos importados correctamente")
         return True
@@ -37,6 +39,8 @@ def get_model_classes():
         from .models.autorizacion import Autorizacion
         from .models.categoria import Categoria
         from .models.usuario import Usuario
+        from .models.turno_diario import TurnoDiario
+        from .models.trabajo_exportacion import TrabajoExportacion
         
         return {
             'Cliente': Cliente,
@@ -47,7 +51,9 @@ def get_model_classes():
             'Turno': Turno,
             'Autorizacion': Autorizacion,
             'Categoria': Categoria,
-            'Usuario': Usuario
+            'Usuario': Usuario,
+            'TurnoDiario': TurnoDiario,
+            'TrabajoExportacion': TrabajoExportacion
         }
         
     except Exception as e:
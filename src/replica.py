@@ -0,0 +1,232 @@
+# src/replica.py - Enrutamiento de lecturas a una réplica de la base de datos
+"""
+Si SQLALCHEMY_BINDS define el bind 'replica', las consultas ejecutadas dentro
+de un método marcado con @solo_lectura (listados, estadísticas, exportaciones,
+vistas previas de disponibilidad) se envían a la réplica. Todo lo demás va a
+la base primaria, y también las lecturas:
+
+- dentro de un flujo marcado con @en_primaria (por ejemplo crear_turno), que
+  necesita leer lo que acaba de escribir;
+- de una sesión con cambios pendientes o que ya escribió en la transacción;
+- de un usuario que escribió hace menos de REPLICA_MAX_LAG_SECONDS, para que
+  vea sus propios cambios aunque la réplica esté atrasada;
+- mientras la réplica tenga más atraso que REPLICA_MAX_LAG_SECONDS o no responda.
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from inspect import isgeneratorfunction
+
+from flask import current_app, has_app_context, has_request_context, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+
+REPLICA_BIND = 'replica'
+
+# Valores por defecto si la configuración no los define
+REPLICA_MAX_LAG_SECONDS = 5
+REPLICA_LAG_CHECK_SECONDS = 5
+
+# Clave en la sesión de Flask con la hora de la última escritura del usuario
+CLAVE_ULTIMA_ESCRITURA = '_ultima_escritura_db'
+
+# None = sin indicar, 'replica' = lectura tolerante a atraso, 'primaria' = forzar primaria
+_modo = ContextVar('modo_replica', default=None)
+
+# Registro de las consultas enviadas a la réplica dentro de lecturas_en_replica()
+_lecturas_replica = ContextVar('lecturas_replica', default=None)
+
+
+@contextmanager
+def _en_modo(modo):
+    # Un flujo marcado como primaria no se puede relajar desde adentro
+    token = _modo.set(modo if _modo.get() != 'primaria' else 'primaria')
+    try:
+        yield
+    finally:
+        _modo.reset(token)
+
+
+def _decorador(modo):
+    def decorador(funcion):
+        if isgeneratorfunction(funcion):
+            # Los generadores (exportaciones en streaming) se consumen después
+            # de que la función retorna: el modo se aplica en cada iteración
+            @wraps(funcion)
+            def envoltura_generador(*args, **kwargs):
+                with _en_modo(modo):
+                    generador = funcion(*args, **kwargs)
+                while True:
+                    with _en_modo(modo):
+                        try:
+                            valor = next(generador)
+                        except StopIteration:
+                            return
+                    yield valor
+            return envoltura_generador
+        
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with _en_modo(modo):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+
+# Lecturas que toleran el atraso de la réplica
+solo_lectura = _decorador('replica')
+
+# Escrituras y lecturas que deben ver lo recién escrito
+en_primaria = _decorador('primaria')
+
+
+@contextmanager
+def lectura_replica():
+    """Bloque de solo lectura (equivalente a @solo_lectura)"""
+    with _en_modo('replica'):
+        yield
+
+
+@contextmanager
+def lecturas_en_replica():
+    """Bloque que registra si alguna de sus consultas se envió a la réplica.
+    
+    Produce una lista que queda con elementos si se usó la réplica (por ejemplo,
+    para no cachear un resultado que puede estar atrasado). Los bloques anidados
+    también se registran en el de afuera.
+    """
+    registro = []
+    token = _lecturas_replica.set(registro)
+    try:
+        yield registro
+    finally:
+        _lecturas_replica.reset(token)
+        externo = _lecturas_replica.get()
+        if registro and externo is not None:
+            externo.extend(registro)
+
+
+class EstadoReplica:
+    """Disponibilidad de la réplica según su atraso, consultado cada REPLICA_LAG_CHECK_SECONDS"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.proximo_chequeo = 0.0
+        self.disponible = False
+        self.atraso = None
+    
+    @staticmethod
+    def medir_atraso(engine):
+        """Segundos de atraso de la réplica (0 si el motor no lo informa)"""
+        with engine.connect() as conexion:
+            if engine.dialect.name == 'postgresql':
+                atraso = conexion.execute(text(
+                    "SELECT CASE WHEN pg_is_in_recovery() "
+                    "THEN COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+                    "ELSE 0 END"
+                )).scalar()
+                return float(atraso or 0)
+            conexion.execute(text('SELECT 1'))
+            return 0.0
+    
+    def verificar(self, app, engine):
+        """True si la réplica responde y su atraso está dentro de la tolerancia"""
+        ahora = time.monotonic()
+        if ahora < self.proximo_chequeo:
+            return self.disponible
+        
+        with self.lock:
+            if ahora < self.proximo_chequeo:
+                return self.disponible
+            
+            maximo = app.config.get('REPLICA_MAX_LAG_SECONDS', REPLICA_MAX_LAG_SECONDS)
+            try:
+                self.atraso = self.medir_atraso(engine)
+                self.disponible = self.atraso <= maximo
+                if not self.disponible:
+                    print(f"⚠️ Réplica atrasada {self.atraso:.1f} s: las lecturas van a la primaria")
+            except Exception as e:
+                self.atraso = None
+                self.disponible = False
+                print(f"⚠️ Réplica no disponible, las lecturas van a la primaria: {e}")
+            
+            self.proximo_chequeo = time.monotonic() + app.config.get('REPLICA_LAG_CHECK_SECONDS', REPLICA_LAG_CHECK_SECONDS)
+            return self.disponible
+
+
+def get_estado_replica(app):
+    """Estado de la réplica de la aplicación (se crea la primera vez)"""
+    estado = app.extensions.get('replica')
+    if estado is None:
+        estado = app.extensions.setdefault('replica', EstadoReplica())
+    return estado
+
+
+def _escritura_reciente(app):
+    """True si el usuario escribió hace menos de REPLICA_MAX_LAG_SECONDS"""
+    if not has_request_context():
+        return False
+    
+    ultima = session.get(CLAVE_ULTIMA_ESCRITURA)
+    maximo = app.config.get('REPLICA_MAX_LAG_SECONDS', REPLICA_MAX_LAG_SECONDS)
+    return ultima is not None and time.time() - ultima < maximo
+
+
+class SesionEnrutada(Session):
+    """Sesión que envía las lecturas marcadas con @solo_lectura a la réplica"""
+    
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._usar_replica(clause):
+            registro = _lecturas_replica.get()
+            if registro is not None:
+                registro.append(REPLICA_BIND)
+            return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+    
+    def _usar_replica(self, clause):
+        if _modo.get() != 'replica' or self._flushing or not has_app_context():
+            return False
+        if getattr(clause, 'is_dml', False):
+            return False
+        
+        # Lo escrito en esta transacción todavía no llegó a la réplica
+        if self.info.get('escribio') or not self._is_clean():
+            return False
+        
+        engine = self._db.engines.get(REPLICA_BIND)
+        if engine is None:
+            return False
+        
+        app = current_app._get_current_object()
+        if _escritura_reciente(app):
+            return False
+        return get_estado_replica(app).verificar(app, engine)
+
+
+@event.listens_for(SesionEnrutada, 'after_flush')
+def _registrar_escritura(sesion, contexto):
+    sesion.info['escribio'] = True
+
+
+@event.listens_for(SesionEnrutada, 'do_orm_execute')
+def _registrar_escritura_directa(estado):
+    # INSERT/UPDATE/DELETE ejecutados con session.execute (sin flush)
+    if estado.is_insert or estado.is_update or estado.is_delete:
+        estado.session.info['escribio'] = True
+
+
+@event.listens_for(SesionEnrutada, 'after_commit')
+def _recordar_escritura(sesion):
+    if not sesion.info.pop('escribio', False) or not has_request_context():
+        return
+    
+    # Las próximas lecturas del usuario van a la primaria hasta que la réplica se ponga al día
+    session[CLAVE_ULTIMA_ESCRITURA] = time.time()
+
+
+@event.listens_for(SesionEnrutada, 'after_rollback')
+def _descartar_escritura(sesion):
+    sesion.info.pop('escribio', None)
@@ -124,6 +124,19 @@ def register_blueprints(app):
     except Exception as e:
         print(f"❌ Error inesperado con blueprint 'autorizaciones': {e}")
     
+    # ========================================
+    # BLUEPRINT DE EXPORTACIONES EN SEGUNDO PLANO
+    # ========================================
+    try:
+        from .exportaciones import exportaciones_bp
+        app.register_blueprint(exportaciones_bp, url_prefix='/exportaciones')
+        print("✅ Blueprint 'exportaciones' registrado correctamente")
+    except ImportError as e:
+        print(f"⚠️ Error al registrar blueprint 'exportaciones': {e}")
+        print("   Asegúrate de que existe el archivo: src/routes/exportaciones.py")
+    except Exception as e:
+        print(f"❌ Error inesperado con blueprint 'exportaciones': {e}")
+    
     print("🎯 Registro de blueprints completado")
 
 
@@ -1,6 +1,7 @@
 from flask import Blueprint, render_template, request, jsonify, redirect, url_for, flash
 from flask_login import login_required, current_user
 from datetime import datetime
+from .exportaciones import encolar_exportacion
 
 # Crear el blueprint
 autorizaciones_bp = Blueprint('autorizaciones', __name__)
@@ -78,6 +79,28 @@ def listar():
                              obras_sociales=[],
                              today=datetime.now())
 
+@autorizaciones_bp.route('/api/listado')
+@login_required
+def listado_cursor():
+    """API de listado por cursor (keyset) para scroll infinito"""
+    if not AutorizacionService:
+        return jsonify({'error': 'Servicio no disponible'}), 500
+    
+    try:
+        pagina = AutorizacionService.get_autorizaciones_por_cursor(
+            cursor=request.args.get('cursor') or None,
+            per_page=request.args.get('per_page', 10, type=int),
+            search=request.args.get('search', '', type=str),
+            estado=request.args.get('estado', '', type=str),
+            obra_social_id=request.args.get('obra_social_id', '', type=str),
+            contar=request.args.get('total') or None
+        )
+        return jsonify(pagina.to_dict())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @autorizaciones_bp.route('/nuevo')
 @login_required
 def nuevo():
@@ -348,7 +371,7 @@ def eliminar(id):
 @autorizaciones_bp.route('/exportar/<formato>')
 @login_required
 def exportar(formato):
-    """Exportar autorizaciones a Excel/CSV"""
+    """Exportar autorizaciones a Excel/CSV/PDF"""
     try:
         search = request.args.get('search', '')
         estado = request.args.get('estado', '')
@@ -358,10 +381,17 @@ def exportar(formato):
             flash('Servicio no disponible', 'error')
             return redirect(url_for('autorizaciones.listar'))
         
+        if request.args.get('modo') == 'background':
+            return encolar_exportacion('autorizaciones', formato, {
+                'search': search, 'estado': estado, 'obra_social_id': obra_social_id
+            })
+        
         if formato == 'excel':
             return AutorizacionService.exportar_excel(search, estado, obra_social_id)
         elif formato == 'csv':
             return AutorizacionService.exportar_csv(search, estado, obra_social_id)
+        elif formato == 'pdf':
+            return AutorizacionService.exportar_pdf(search, estado, obra_social_id)
         else:
             flash('Formato de exportación no válido', 'error')
             return redirect(url_for('autorizaciones.listar'))
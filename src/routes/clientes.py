@@ -1,5 +1,6 @@
 from flask import Blueprint, render_template, request, jsonify, redirect, url_for, flash
 from flask_login import login_required
+from .exportaciones import encolar_exportacion
 
 # Crear el blueprint
 clientes_bp = Blueprint('clientes', __name__)
@@ -17,6 +18,12 @@ except ImportError:
     ClienteService = None
     print("⚠️ No se pudo importar ClienteService")
 
+try:
+    from src.services.cliente_import_service import ClienteImportService
+except ImportError:
+    ClienteImportService = None
+    print("⚠️ No se pudo importar ClienteImportService")
+
 try:
     from src.database import db
 except ImportError:
@@ -46,6 +53,26 @@ def listar():
         flash(f'Error al cargar clientes: {str(e)}', 'error')
         return render_template('clientes/listar.html', clientes=None, search='')
 
+@clientes_bp.route('/api/listado')
+@login_required
+def listado_cursor():
+    """API de listado por cursor (keyset) para scroll infinito"""
+    if not ClienteService:
+        return jsonify({'error': 'Servicio no disponible'}), 500
+    
+    try:
+        pagina = ClienteService.get_clientes_por_cursor(
+            cursor=request.args.get('cursor') or None,
+            per_page=request.args.get('per_page', 10, type=int),
+            search=request.args.get('search', '', type=str),
+            contar=request.args.get('total') or None
+        )
+        return jsonify(pagina.to_dict())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @clientes_bp.route('/nuevo')
 @login_required
 def nuevo():
@@ -194,7 +221,7 @@ def buscar():
 @clientes_bp.route('/exportar')
 @login_required
 def exportar():
-    """Exportar clientes a Excel/CSV"""
+    """Exportar clientes a Excel/CSV/PDF"""
     try:
         formato = request.args.get('formato', 'excel')
         search = request.args.get('search', '')
@@ -203,10 +230,15 @@ def exportar():
             flash('Servicio no disponible', 'error')
             return redirect(url_for('clientes.listar'))
         
+        if request.args.get('modo') == 'background':
+            return encolar_exportacion('clientes', formato, {'search': search})
+        
         if formato == 'excel':
             return ClienteService.exportar_excel(search)
         elif formato == 'csv':
             return ClienteService.exportar_csv(search)
+        elif formato == 'pdf':
+            return ClienteService.exportar_pdf(search)
         else:
             flash('Formato de exportación no válido', 'error')
             return redirect(url_for('clientes.listar'))
@@ -216,6 +248,56 @@ def exportar():
         flash(f'Error al exportar: {str(e)}', 'error')
         return redirect(url_for('clientes.listar'))
 
+@clientes_bp.route('/importar', methods=['GET', 'POST'])
+@login_required
+def importar():
+    """Importar clientes desde un archivo CSV o XLSX"""
+    if request.method == 'GET':
+        return render_template('clientes/importar.html', resultado=None)
+    
+    quiere_json = request.accept_mimetypes.best == 'application/json'
+    try:
+        if not ClienteImportService:
+            raise Exception("Servicio no disponible")
+        
+        archivo = request.files.get('archivo')
+        if not archivo or not archivo.filename:
+            raise ValueError('Seleccione un archivo CSV o XLSX')
+        
+        # El formulario envía 'off' oculto y 'on' si la casilla está marcada; sin el campo se actualiza
+        valores_actualizar = request.form.getlist('actualizar') or ['on']
+        
+        formato = ClienteImportService.detectar_formato(archivo.filename)
+        resultado = ClienteImportService.importar(
+            archivo.stream, formato,
+            actualizar=any(valor in ('on', 'true', '1') for valor in valores_actualizar)
+        )
+        
+        if quiere_json:
+            return jsonify({'success': True, **resultado.to_dict()})
+        
+        flash(
+            f'Importación terminada: {resultado.insertados} nuevos, '
+            f'{resultado.actualizados} actualizados, {resultado.rechazados} rechazados',
+            'success' if not resultado.rechazados else 'warning'
+        )
+        return render_template('clientes/importar.html', resultado=resultado.to_dict())
+        
+    except (ValueError, UnicodeDecodeError) as e:
+        if quiere_json:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        flash(f'Error al importar: {str(e)}', 'error')
+        return redirect(url_for('clientes.importar'))
+    
+    except Exception as e:
+        print(f"Error en importación de clientes: {e}")
+        if quiere_json:
+            return jsonify({'success': False, 'error': str(e)}), 500
+        
+        flash(f'Error al importar: {str(e)}', 'error')
+        return redirect(url_for('clientes.importar'))
+
 # Ruta de prueba para verificar que el blueprint funciona
 @clientes_bp.route('/test')
 def test():
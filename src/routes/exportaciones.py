@@ -0,0 +1,102 @@
+from flask import Blueprint, jsonify, url_for, send_file
+from flask_login import login_required, current_user
+
+# Crear el blueprint
+exportaciones_bp = Blueprint('exportaciones', __name__)
+
+# Importaciones que pueden fallar, las manejamos con try/except
+try:
+    from src.services.exportacion_service import ExportacionService, ColaExportacionLlena
+except ImportError:
+    ExportacionService = None
+    ColaExportacionLlena = None
+    print("⚠️ No se pudo importar ExportacionService")
+
+# ===== FUNCIONES AUXILIARES =====
+
+def _usuario_id():
+    """ID del usuario logueado (None con login deshabilitado)"""
+    return current_user.id if current_user.is_authenticated else None
+
+def _trabajo_visible(trabajo_id):
+    """Trabajo del usuario actual, o None si no existe o pertenece a otro usuario"""
+    trabajo = ExportacionService.get_trabajo(trabajo_id)
+    if trabajo is None:
+        return None
+    # Estricto: un trabajo sin usuario (login deshabilitado) no es visible para usuarios logueados
+    if trabajo.usuario_id != _usuario_id():
+        return None
+    return trabajo
+
+def _trabajo_a_dict(trabajo):
+    """Estado del trabajo con las URLs de consulta y descarga"""
+    data = trabajo.to_dict()
+    data['url_estado'] = url_for('exportaciones.estado', trabajo_id=trabajo.id)
+    data['url_descarga'] = (
+        url_for('exportaciones.descargar', trabajo_id=trabajo.id)
+        if trabajo.estado == 'completado' else None
+    )
+    return data
+
+def encolar_exportacion(tipo, formato, parametros):
+    """Encolar una exportación y responder 202 con el trabajo (429 si la cola está llena)"""
+    if not ExportacionService:
+        return jsonify({'success': False, 'error': 'Servicio no disponible'}), 503
+
+    try:
+        trabajo = ExportacionService.encolar(tipo, formato, parametros, usuario_id=_usuario_id())
+    except ColaExportacionLlena as e:
+        response = jsonify({'success': False, 'error': str(e)})
+        response.headers['Retry-After'] = '30'
+        return response, 429
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    response = jsonify({'success': True, 'trabajo': _trabajo_a_dict(trabajo)})
+    response.headers['Location'] = url_for('exportaciones.estado', trabajo_id=trabajo.id)
+    return response, 202
+
+# ===== RUTAS =====
+
+@exportaciones_bp.route('/')
+@login_required
+def listar():
+    """Últimas exportaciones del usuario"""
+    if not ExportacionService:
+        return jsonify({'error': 'Servicio no disponible'}), 503
+
+    trabajos = ExportacionService.get_trabajos_recientes(_usuario_id())
+    return jsonify([_trabajo_a_dict(trabajo) for trabajo in trabajos])
+
+@exportaciones_bp.route('/<trabajo_id>')
+@login_required
+def estado(trabajo_id):
+    """Estado de una exportación"""
+    if not ExportacionService:
+        return jsonify({'error': 'Servicio no disponible'}), 503
+
+    trabajo = _trabajo_visible(trabajo_id)
+    if not trabajo:
+        return jsonify({'error': 'Exportación no encontrada'}), 404
+
+    return jsonify(_trabajo_a_dict(trabajo))
+
+@exportaciones_bp.route('/<trabajo_id>/descargar')
+@login_required
+def descargar(trabajo_id):
+    """Descargar el archivo de una exportación completada"""
+    if not ExportacionService:
+        return jsonify({'error': 'Servicio no disponible'}), 503
+
+    trabajo = _trabajo_visible(trabajo_id)
+    if not trabajo:
+        return jsonify({'error': 'Exportación no encontrada'}), 404
+
+    if not trabajo.terminado:
+        return jsonify({'error': 'La exportación todavía está en proceso', 'estado': trabajo.estado}), 409
+
+    ruta = ExportacionService.get_ruta_archivo(trabajo)
+    if not ruta:
+        return jsonify({'error': trabajo.error or 'El archivo ya no está disponible'}), 410
+
+    return send_file(ruta, as_attachment=True, download_name=trabajo.nombre_descarga)
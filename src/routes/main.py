@@ -1,11 +1,22 @@
-from flask import Blueprint, render_template
+from flask import Blueprint, render_template, request, jsonify, url_for
 from flask_login import login_required, current_user
 from datetime import date
+from src.replica import solo_lectura
 
 main_bp = Blueprint('main', __name__)
 
+# Página de detalle de cada tipo de resultado de la búsqueda global
+DETALLE_POR_TIPO = {
+    'cliente': 'clientes.detalle',
+    'profesional': 'profesionales.detalle',
+    'servicio': 'servicios.detalle',
+    'obra_social': 'obras_sociales.detalle',
+    'autorizacion': 'autorizaciones.detalle',
+}
+
 @main_bp.route('/dashboard')
 @login_required
+@solo_lectura
 def index():
     """Página principal con dashboard"""
     try:
@@ -18,13 +29,13 @@ def index():
         
         # Turnos de hoy
         hoy = date.today()
-        turnos_hoy = Turno.query.filter_by(fecha=hoy).count()
+        from src.services.turno_diario_service import TurnoDiarioService
+        resumen_hoy = TurnoDiarioService.get_estadisticas(hoy, hoy)
+        turnos_hoy = resumen_hoy['total_turnos']
         
-        # Próximos turnos (próximos 5)
-        proximos_turnos = Turno.query.filter(
-            Turno.fecha >= hoy,
-            Turno.estado.in_(['pendiente', 'confirmado'])
-        ).order_by(Turno.fecha, Turno.hora).limit(5).all()
+        # Próximos turnos (próximos 5) con sus relaciones precargadas
+        from src.services.turno_service import TurnoService
+        proximos_turnos = TurnoService.get_proximos_turnos(5)
         
     except Exception as e:
         print(f"Error cargando datos del dashboard: {e}")
@@ -33,6 +44,7 @@ def index():
         total_profesionales = 0
         total_servicios = 0
         turnos_hoy = 0
+        resumen_hoy = {}
         proximos_turnos = []
     
     return render_template('dashboard.html',
@@ -40,5 +52,26 @@ def index():
                          total_profesionales=total_profesionales,
                          total_servicios=total_servicios,
                          turnos_hoy=turnos_hoy,
+                         resumen_hoy=resumen_hoy,
                          proximos_turnos=proximos_turnos,
-                         usuario=current_user)
\ No newline at end of file
+                         usuario=current_user)
+
+@main_bp.route('/api/buscar')
+@login_required
+@solo_lectura
+def buscar():
+    """API de búsqueda global: clientes, profesionales, servicios, obras sociales y autorizaciones"""
+    try:
+        from src.services.busqueda_service import BusquedaService
+        
+        query = request.args.get('q', '')
+        limite = request.args.get('limite', 20, type=int)
+        tipos = [tipo for tipo in request.args.get('tipos', '').split(',') if tipo]
+        
+        resultados = BusquedaService.busqueda_global(query, limite, tipos)
+        for resultado in resultados:
+            resultado['url'] = url_for(DETALLE_POR_TIPO[resultado['tipo']], id=resultado['id'])
+        
+        return jsonify({'resultados': resultados, 'total': len(resultados)})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -1,5 +1,6 @@
 from flask import Blueprint, render_template, request, jsonify, redirect, url_for, flash
 from flask_login import login_required, current_user
+from .exportaciones import encolar_exportacion
 
 # Crear el blueprint
 obras_sociales_bp = Blueprint('obras_sociales', __name__)
@@ -51,6 +52,27 @@ def listar():
         flash(f'Error al cargar obras sociales: {str(e)}', 'error')
         return render_template('obras_sociales/listar.html', obras_sociales=None, search='', tipo='')
 
+@obras_sociales_bp.route('/api/listado')
+@login_required
+def listado_cursor():
+    """API de listado por cursor (keyset) para scroll infinito"""
+    if not ObraSocialService:
+        return jsonify({'error': 'Servicio no disponible'}), 500
+    
+    try:
+        pagina = ObraSocialService.get_obras_sociales_por_cursor(
+            cursor=request.args.get('cursor') or None,
+            per_page=request.args.get('per_page', 10, type=int),
+            search=request.args.get('search', '', type=str),
+            tipo=request.args.get('tipo', '', type=str),
+            contar=request.args.get('total') or None
+        )
+        return jsonify(pagina.to_dict())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @obras_sociales_bp.route('/nuevo')
 @login_required
 def nuevo():
@@ -230,6 +252,9 @@ def exportar():
             flash('Servicio no disponible', 'error')
             return redirect(url_for('obras_sociales.listar'))
         
+        if request.args.get('modo') == 'background':
+            return encolar_exportacion('obras_sociales', formato, {'search': search, 'tipo': tipo})
+        
         if formato == 'excel':
             return ObraSocialService.exportar_excel(search, tipo)
         else:
@@ -2,7 +2,9 @@ from flask import Blueprint, render_template, request, jsonify, redirect, url_fo
 from flask_login import login_required
 from src.models import Profesional
 from src.services.profesional_service import ProfesionalService
+from src.services.turno_stats_service import TurnoStatsService
 from src.database import db
+from datetime import date
 
 profesionales_bp = Blueprint('profesionales', __name__)
 
@@ -56,7 +58,15 @@ def detalle(id):
         flash('Profesional no encontrado', 'error')
         return redirect(url_for('profesionales.listar'))
     
-    return render_template('profesionales/detalle.html', profesional=profesional)
+    # Estadísticas calculadas en la base (una consulta agrupada por estado)
+    estadisticas = TurnoStatsService.get_estadisticas(profesional_id=id)
+    hoy = date.today()
+    estadisticas_hoy = TurnoStatsService.get_estadisticas(hoy, hoy, profesional_id=id)
+    
+    return render_template('profesionales/detalle.html', 
+                         profesional=profesional,
+                         estadisticas=estadisticas,
+                         estadisticas_hoy=estadisticas_hoy)
 
 @profesionales_bp.route('/<int:id>/editar')
 @login_required
@@ -5,8 +5,12 @@ from src.services.turno_service import TurnoService
 from src.services.cliente_service import ClienteService
 from src.services.profesional_service import ProfesionalService
 from src.services.servicio_service import ServicioService
-from datetime import date, datetime, timedelta
+from src.services.disponibilidad_service import DisponibilidadService, ReservaEnConflicto
+from src.services.turno_stats_service import TurnoStatsService
+from src.services.catalogo_cache import CatalogoCache
+from datetime import date, datetime, time, timedelta
 from src.database import db
+from .exportaciones import encolar_exportacion
 import calendar
 
 # Configuración de localización en español
@@ -115,12 +119,8 @@ def generar_datos_calendario(vista, fecha_base, turnos_por_fecha):
         
         # Generar todas las semanas del mes
         primer_dia = fecha_base.replace(day=1)
-        
-        # Calcular último día del mes
-        if primer_dia.month == 12:
-            ultimo_dia = primer_dia.replace(year=primer_dia.year + 1, month=1) - timedelta(days=1)
-        else:
-            ultimo_dia = primer_dia.replace(month=primer_dia.month + 1) - timedelta(days=1)
+        ultimo_dia = (primer_dia.replace(month=primer_dia.month + 1) if primer_dia.month < 12 
+                     else primer_dia.replace(year=primer_dia.year + 1, month=1)) - timedelta(days=1)
         
         # Encontrar el primer lunes antes o igual al primer día del mes
         dias_desde_lunes = primer_dia.weekday()
@@ -128,7 +128,7 @@ def generar_datos_calendario(vista, fecha_base, turnos_por_fecha):
         
         # Generar semanas
         fecha_actual = inicio_calendario
-        while fecha_actual <= ultimo_dia or len(calendario_data['semanas']) == 0:
+        while fecha_actual <= ultimo_dia:
             semana = []
             for i in range(7):
                 dia_actual = fecha_actual + timedelta(days=i)
@@ -140,69 +140,12 @@ def generar_datos_calendario(vista, fecha_base, turnos_por_fecha):
             calendario_data['semanas'].append(semana)
             fecha_actual += timedelta(days=7)
             
-            # Límite de seguridad - máximo 6 semanas
-            if len(calendario_data['semanas']) >= 6:
+            # Evitar bucle infinito
+            if fecha_actual > ultimo_dia + timedelta(days=7):
                 break
     
     return calendario_data
 
-def calcular_estadisticas_calendario(turnos, vista):
-    """Calcular estadísticas para el período del calendario"""
-    if not turnos:
-        return {
-            'total_turnos': 0,
-            'pendientes': 0,
-            'confirmados': 0,
-            'completados': 0,
-            'cancelados': 0,
-            'ingresos_total': 0
-        }
-    
-    estadisticas = {
-        'total_turnos': len(turnos),
-        'pendientes': sum(1 for t in turnos if t.estado == 'pendiente'),
-        'confirmados': sum(1 for t in turnos if t.estado == 'confirmado'),
-        'completados': sum(1 for t in turnos if t.estado == 'completado'),
-        'cancelados': sum(1 for t in turnos if t.estado == 'cancelado'),
-        'ingresos_total': sum(
-            float(t.precio_final or t.servicio.precio or 0) 
-            for t in turnos if t.estado == 'completado'
-        )
-    }
-    
-    return estadisticas
-
-def organizar_turnos_por_fecha(turnos):
-    """Organizar turnos por fecha"""
-    turnos_por_fecha = {}
-    for turno in turnos:
-        fecha_str = turno.fecha.isoformat()
-        if fecha_str not in turnos_por_fecha:
-            turnos_por_fecha[fecha_str] = []
-        turnos_por_fecha[fecha_str].append({
-            'id': turno.id,
-            'hora': turno.hora.strftime('%H:%M'),
-            'cliente': turno.cliente.nombre_completo,
-            'profesional': turno.profesional.nombre_completo,
-            'servicio': turno.servicio.nombre,
-            'estado': turno.estado,
-            'duracion': turno.servicio.duracion,
-            'precio': float(turno.precio_final or turno.servicio.precio or 0)
-        })
-    return turnos_por_fecha
-
-def get_color_by_estado(estado):
-    """Obtener color por estado del turno"""
-    colores = {
-        'pendiente': '#ffc107',
-        'confirmado': '#17a2b8',
-        'completado': '#28a745',
-        'cancelado': '#dc3545'
-    }
-    return colores.get(estado, '#6c757d')
-
-turnos_bp = Blueprint('turnos', __name__)
-
 @turnos_bp.route('/')
 @login_required
 def listar():
@@ -241,6 +184,26 @@ def listar():
         flash(f'Error al cargar turnos: {str(e)}', 'error')
         return render_template('turnos/listar.html', turnos=None, profesionales=[], estados=[])
 
+@turnos_bp.route('/api/listado')
+@login_required
+def listado_cursor():
+    """API de listado por cursor (keyset) para scroll infinito"""
+    try:
+        pagina = TurnoService.get_turnos_por_cursor(
+            cursor=request.args.get('cursor') or None,
+            per_page=request.args.get('per_page', 15, type=int),
+            fecha_desde=request.args.get('fecha_desde', type=str),
+            fecha_hasta=request.args.get('fecha_hasta', type=str),
+            estado=request.args.get('estado', type=str),
+            profesional_id=request.args.get('profesional_id', type=int),
+            contar=request.args.get('total') or None
+        )
+        return jsonify(pagina.to_dict())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @turnos_bp.route('/calendario')
 @login_required
 def calendario():
@@ -271,35 +234,11 @@ def calendario():
             siguiente_mes = fecha_inicio.replace(month=fecha_inicio.month + 1) if fecha_inicio.month < 12 else fecha_inicio.replace(year=fecha_inicio.year + 1, month=1)
             fecha_fin = siguiente_mes - timedelta(days=1)
         
-        # Obtener turnos en el rango de fechas
-        turnos_query = Turno.query.filter(
-            Turno.fecha >= fecha_inicio,
-            Turno.fecha <= fecha_fin
-        )
-        
-        # Filtrar por profesional si se especifica
-        if profesional_id:
-            turnos_query = turnos_query.filter(Turno.profesional_id == profesional_id)
-        
-        # Obtener turnos ordenados
-        turnos = turnos_query.order_by(Turno.fecha, Turno.hora).all()
+        # Obtener solo las columnas que necesita el calendario
+        turnos = TurnoService.get_filas_calendario(fecha_inicio, fecha_fin, profesional_id)
         
         # Organizar turnos por fecha para facilitar el renderizado
-        turnos_por_fecha = {}
-        for turno in turnos:
-            fecha_str = turno.fecha.isoformat()
-            if fecha_str not in turnos_por_fecha:
-                turnos_por_fecha[fecha_str] = []
-            turnos_por_fecha[fecha_str].append({
-                'id': turno.id,
-                'hora': turno.hora.strftime('%H:%M'),
-                'cliente': turno.cliente.nombre_completo,
-                'profesional': turno.profesional.nombre_completo,
-                'servicio': turno.servicio.nombre,
-                'estado': turno.estado,
-                'duracion': turno.servicio.duracion,
-                'precio': float(turno.precio_final or turno.servicio.precio or 0)
-            })
+        turnos_por_fecha = TurnoService.organizar_filas_por_fecha(turnos)
         
         # Obtener lista de profesionales para el filtro
         profesionales = ProfesionalService.get_all_profesionales()
@@ -307,8 +246,8 @@ def calendario():
         # Generar datos del calendario según la vista
         calendario_data = generar_datos_calendario(vista, fecha_base, turnos_por_fecha)
         
-        # Calcular estadísticas del período
-        estadisticas = calcular_estadisticas_calendario(turnos, vista)
+        # Calcular estadísticas del período (una consulta agrupada)
+        estadisticas = TurnoStatsService.get_estadisticas(fecha_inicio, fecha_fin, profesional_id)
         
         return render_template('turnos/calendario.html',
                              vista=vista,
@@ -332,86 +271,6 @@ def calendario():
                              calendario_data={},
                              estadisticas={})
 
-def generar_datos_calendario(vista, fecha_base, turnos_por_fecha):
-    """Generar estructura de datos para el calendario"""
-    calendario_data = {
-        'vista': vista,
-        'titulo': '',
-        'fechas': [],
-        'semanas': [],
-        'horarios': list(range(8, 20))  # 8:00 a 19:00
-    }
-    
-    if vista == 'dia':
-        calendario_data['titulo'] = formatear_fecha_es(fecha_base, 'completo')
-        calendario_data['fechas'] = [fecha_base]
-        
-    elif vista == 'semana':
-        # Encontrar el lunes de la semana
-        dias_desde_lunes = fecha_base.weekday()
-        lunes = fecha_base - timedelta(days=dias_desde_lunes)
-        
-        calendario_data['titulo'] = f"Semana del {lunes.strftime('%d/%m')} al {(lunes + timedelta(days=6)).strftime('%d/%m/%Y')}"
-        calendario_data['fechas'] = [lunes + timedelta(days=i) for i in range(7)]
-        
-    else:  # mes
-        calendario_data['titulo'] = formatear_fecha_es(fecha_base, 'mes_ano')
-        
-        # Generar todas las semanas del mes
-        primer_dia = fecha_base.replace(day=1)
-        ultimo_dia = (primer_dia.replace(month=primer_dia.month + 1) if primer_dia.month < 12 
-                     else primer_dia.replace(year=primer_dia.year + 1, month=1)) - timedelta(days=1)
-        
-        # Encontrar el primer lunes antes o igual al primer día del mes
-        dias_desde_lunes = primer_dia.weekday()
-        inicio_calendario = primer_dia - timedelta(days=dias_desde_lunes)
-        
-        # Generar semanas
-        fecha_actual = inicio_calendario
-        while fecha_actual <= ultimo_dia:
-            semana = []
-            for i in range(7):
-                dia_actual = fecha_actual + timedelta(days=i)
-                semana.append({
-                    'fecha': dia_actual,
-                    'es_mes_actual': dia_actual.month == fecha_base.month,
-                    'turnos': turnos_por_fecha.get(dia_actual.isoformat(), [])
-                })
-            calendario_data['semanas'].append(semana)
-            fecha_actual += timedelta(days=7)
-            
-            # Evitar bucle infinito
-            if fecha_actual > ultimo_dia + timedelta(days=7):
-                break
-    
-    return calendario_data
-
-def calcular_estadisticas_calendario(turnos, vista):
-    """Calcular estadísticas para el período del calendario"""
-    if not turnos:
-        return {
-            'total_turnos': 0,
-            'pendientes': 0,
-            'confirmados': 0,
-            'completados': 0,
-            'cancelados': 0,
-            'ingresos_total': 0
-        }
-    
-    estadisticas = {
-        'total_turnos': len(turnos),
-        'pendientes': sum(1 for t in turnos if t.estado == 'pendiente'),
-        'confirmados': sum(1 for t in turnos if t.estado == 'confirmado'),
-        'completados': sum(1 for t in turnos if t.estado == 'completado'),
-        'cancelados': sum(1 for t in turnos if t.estado == 'cancelado'),
-        'ingresos_total': sum(
-            float(t.precio_final or t.servicio.precio or 0) 
-            for t in turnos if t.estado == 'completado'
-        )
-    }
-    
-    return estadisticas
-
 @turnos_bp.route('/nuevo')
 @login_required
 def nuevo():
@@ -443,6 +302,14 @@ def crear():
         flash('Turno creado exitosamente', 'success')
         return redirect(url_for('turnos.listar'))
         
+    except ReservaEnConflicto as e:
+        # Otro puesto está reservando en la misma agenda: se puede reintentar
+        if request.is_json:
+            return jsonify({'success': False, 'error': str(e)}), 409
+        
+        flash(str(e), 'warning')
+        return redirect(url_for('turnos.nuevo'))
+    
     except Exception as e:
         if request.is_json:
             return jsonify({'success': False, 'error': str(e)}), 400
@@ -450,6 +317,42 @@ def crear():
         flash(f'Error al crear turno: {str(e)}', 'error')
         return redirect(url_for('turnos.nuevo'))
 
+@turnos_bp.route('/crear-recurrente', methods=['POST'])
+@login_required
+def crear_recurrente():
+    """Crear una serie de turnos semanales (por ejemplo, todos los martes durante 12 semanas)"""
+    try:
+        data = request.get_json() if request.is_json else request.form
+        creados, conflictos = TurnoService.crear_turnos_recurrentes(data)
+
+        if request.is_json:
+            return jsonify({
+                'success': bool(creados),
+                'creados': creados,
+                'conflictos': conflictos
+            }), 201 if creados else 409
+
+        if creados:
+            flash(f'Se crearon {len(creados)} turnos', 'success')
+        if conflictos:
+            fechas = ', '.join(conflicto['fecha'] for conflicto in conflictos)
+            flash(f'Fechas no disponibles ({len(conflictos)}): {fechas}', 'warning')
+        return redirect(url_for('turnos.listar'))
+
+    except ReservaEnConflicto as e:
+        if request.is_json:
+            return jsonify({'success': False, 'error': str(e)}), 409
+
+        flash(str(e), 'warning')
+        return redirect(url_for('turnos.nuevo'))
+
+    except Exception as e:
+        if request.is_json:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        flash(f'Error al crear los turnos: {str(e)}', 'error')
+        return redirect(url_for('turnos.nuevo'))
+
 @turnos_bp.route('/<int:id>')
 @login_required
 def detalle(id):
@@ -508,6 +411,13 @@ def actualizar(id):
         flash('Turno actualizado exitosamente', 'success')
         return redirect(url_for('turnos.detalle', id=id))
         
+    except ReservaEnConflicto as e:
+        if request.is_json:
+            return jsonify({'success': False, 'error': str(e)}), 409
+        
+        flash(str(e), 'warning')
+        return redirect(url_for('turnos.editar', id=id))
+    
     except Exception as e:
         if request.is_json:
             return jsonify({'success': False, 'error': str(e)}), 400
@@ -594,62 +504,23 @@ def horarios_disponibles():
         # Obtener duración del servicio
         duracion = 60  # Por defecto 60 minutos
         if servicio_id:
-            servicio = Servicio.query.get(servicio_id)
+            servicio = CatalogoCache.por_id('servicios', servicio_id)
             if servicio:
                 duracion = servicio.duracion
         
         # Verificar si el profesional existe
-        profesional = Profesional.query.get(profesional_id)
+        profesional = CatalogoCache.por_id('profesionales', profesional_id)
         if not profesional:
             return jsonify({'error': 'Profesional no encontrado'}), 404
         
         # Horario de trabajo (esto podría venir de configuración del profesional)
-        horarios_base = []
-        hora_inicio = 8  # 8:00 AM
-        hora_fin = 19    # 7:00 PM
-        intervalo = 30   # Intervalos de 30 minutos
-        
-        # Generar horarios base
-        hora_actual = hora_inicio * 60  # Convertir a minutos
-        hora_limite = hora_fin * 60
-        
-        while hora_actual < hora_limite:
-            horas = hora_actual // 60
-            minutos = hora_actual % 60
-            horario = f"{horas:02d}:{minutos:02d}"
-            horarios_base.append(horario)
-            hora_actual += intervalo
-        
-        # Obtener turnos ocupados para esa fecha y profesional
-        turnos_ocupados = Turno.query.filter(
-            Turno.profesional_id == profesional_id,
-            Turno.fecha == fecha_obj,
-            Turno.estado.in_(['pendiente', 'confirmado'])
-        ).all()
-        
-        # Filtrar horarios ocupados considerando la duración
-        horarios_disponibles = []
-        
-        for horario in horarios_base:
-            hora_partes = horario.split(':')
-            hora_inicio_minutos = int(hora_partes[0]) * 60 + int(hora_partes[1])
-            hora_fin_minutos = hora_inicio_minutos + duracion
-            
-            # Verificar si hay conflicto con algún turno existente
-            conflicto = False
-            
-            for turno in turnos_ocupados:
-                turno_inicio_minutos = turno.hora.hour * 60 + turno.hora.minute
-                turno_fin_minutos = turno_inicio_minutos + turno.servicio.duracion
-                
-                # Verificar solapamiento
-                if (hora_inicio_minutos < turno_fin_minutos and 
-                    hora_fin_minutos > turno_inicio_minutos):
-                    conflicto = True
-                    break
-            
-            if not conflicto:
-                horarios_disponibles.append(horario)
+        hora_inicio = time(8, 0)   # 8:00 AM
+        hora_fin = time(19, 0)     # 7:00 PM
+        
+        horarios_disponibles = DisponibilidadService.get_horarios_libres(
+            profesional_id, fecha_obj, hora_inicio, hora_fin, duracion,
+            ajustar_a_fin=False
+        )
         
         return jsonify({'horarios': horarios_disponibles})
         
@@ -658,6 +529,41 @@ def horarios_disponibles():
     except Exception as e:
         return jsonify({'error': f'Error interno: {str(e)}'}), 500
 
+@turnos_bp.route('/primeros-disponibles')
+@login_required
+def primeros_disponibles():
+    """API para buscar los primeros horarios libres entre varios profesionales y días"""
+    servicio_id = request.args.get('servicio_id', type=int)
+    fecha_desde = request.args.get('fecha_desde')
+    dias = min(request.args.get('dias', 30, type=int), 90)
+    cantidad = min(request.args.get('cantidad', 5, type=int), 50)
+    
+    # Acepta profesional_id repetido o una lista separada por comas
+    profesional_ids = []
+    for valor in request.args.getlist('profesional_id'):
+        profesional_ids.extend(int(v) for v in valor.split(',') if v.strip().isdigit())
+    
+    if not servicio_id:
+        return jsonify({'error': 'El servicio es requerido'}), 400
+    
+    try:
+        fecha_obj = datetime.strptime(fecha_desde, '%Y-%m-%d').date() if fecha_desde else None
+        
+        horarios = TurnoService.buscar_primeros_horarios(
+            servicio_id,
+            profesional_ids=profesional_ids or None,
+            fecha_desde=fecha_obj,
+            dias=dias,
+            cantidad=cantidad
+        )
+        
+        return jsonify({'horarios': horarios})
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Error interno: {str(e)}'}), 500
+
 @turnos_bp.route('/resumen-dia')
 @login_required
 def resumen_dia():
@@ -692,6 +598,9 @@ def reporte():
     fecha_hasta = request.args.get('fecha_hasta')
     formato = request.args.get('formato', 'excel')
     
+    if request.args.get('modo') == 'background':
+        return encolar_exportacion('turnos', formato, {'fecha_desde': fecha_desde, 'fecha_hasta': fecha_hasta})
+    
     try:
         if formato == 'excel':
             return TurnoService.exportar_excel(fecha_desde, fecha_hasta)
@@ -721,32 +630,17 @@ def api_turnos_calendario():
         fecha_inicio_obj = datetime.strptime(fecha_inicio, '%Y-%m-%d').date()
         fecha_fin_obj = datetime.strptime(fecha_fin, '%Y-%m-%d').date()
         
-        # Construir query
-        query = Turno.query.filter(
-            Turno.fecha >= fecha_inicio_obj,
-            Turno.fecha <= fecha_fin_obj
+        filas = TurnoService.get_filas_calendario(
+            fecha_inicio_obj, fecha_fin_obj, profesional_id
         )
         
-        if profesional_id:
-            query = query.filter(Turno.profesional_id == profesional_id)
-        
-        turnos = query.order_by(Turno.fecha, Turno.hora).all()
-        
         # Formatear respuesta
         turnos_data = []
-        for turno in turnos:
-            turnos_data.append({
-                'id': turno.id,
-                'fecha': turno.fecha.isoformat(),
-                'hora': turno.hora.strftime('%H:%M'),
-                'cliente': turno.cliente.nombre_completo,
-                'profesional': turno.profesional.nombre_completo,
-                'servicio': turno.servicio.nombre,
-                'estado': turno.estado,
-                'duracion': turno.servicio.duracion,
-                'precio': float(turno.precio_final or turno.servicio.precio or 0),
-                'color': get_color_by_estado(turno.estado)
-            })
+        for fila in filas:
+            turno_data = TurnoService.fila_a_dict(fila)
+            turno_data['fecha'] = fila.fecha.isoformat()
+            turno_data['color'] = get_color_by_estado(fila.estado)
+            turnos_data.append(turno_data)
         
         return jsonify({'turnos': turnos_data})
         
@@ -797,5 +691,8 @@ def crear_rapido():
             'message': 'Turno creado exitosamente'
         })
         
+    except ReservaEnConflicto as e:
+        return jsonify({'success': False, 'error': str(e)}), 409
+    
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 400
\ No newline at end of file
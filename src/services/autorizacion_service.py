@@ -1,22 +1,52 @@
-from flask import make_response
 from src.models import Autorizacion, Cliente, ObraSocial, PlanObraSocial, Servicio, Profesional
 from src.database import db
-import pandas as pd
-from io import BytesIO
+from sqlalchemy.orm import joinedload
+from src.utils.exports import generar_excel_streaming, generar_csv_streaming, generar_pdf_streaming, TAMANIO_LOTE_EXPORTACION
 from datetime import datetime, date, timedelta
 import uuid
+from src.replica import solo_lectura
+from src.utils.paginacion import paginar_keyset
 
 class AutorizacionService:
     
+    # Relaciones que necesita precargadas cada caso de uso (evita consultas N+1)
+    RELACIONES_POR_CASO = {
+        'listado': ('cliente', 'obra_social', 'servicio', 'profesional'),
+        'detalle': ('cliente', 'obra_social', 'plan', 'servicio', 'profesional'),
+        'exportacion': ('cliente', 'obra_social', 'plan'),
+        'api': ('cliente', 'obra_social', 'plan', 'servicio', 'profesional')
+    }
+    
+    # Encabezados de las exportaciones de autorizaciones (CSV, Excel)
+    COLUMNAS_EXPORTACION = [
+        'Número', 'Cliente', 'Obra Social', 'Plan', 'Estado', 'Fecha Solicitud',
+        'Fecha Autorización', 'Fecha Vencimiento', 'Cobertura', 'Copago', 'Coseguro',
+        'Cantidad', 'Días Restantes'
+    ]
+    
+    # Orden de los listados (el id desempata para la paginación por cursor)
+    ORDEN_LISTADO = (Autorizacion.fecha_solicitud.desc(), Autorizacion.id.desc())
+    
+    @staticmethod
+    def query_con_relaciones(caso='listado'):
+        """Query de autorizaciones con las relaciones del caso de uso precargadas"""
+        relaciones = AutorizacionService.RELACIONES_POR_CASO.get(caso)
+        if relaciones is None:
+            raise ValueError(f'Caso de uso no soportado: {caso}')
+        
+        return Autorizacion.query.options(
+            *[joinedload(getattr(Autorizacion, relacion)) for relacion in relaciones]
+        )
+    
     @staticmethod
     def get_all_autorizaciones():
         """Obtener todas las autorizaciones activas"""
-        return Autorizacion.query.filter_by(activo=True).order_by(Autorizacion.fecha_solicitud.desc()).all()
+        return AutorizacionService.query_con_relaciones('api').filter_by(activo=True).order_by(Autorizacion.fecha_solicitud.desc()).all()
     
     @staticmethod
     def get_autorizacion_by_id(id):
         """Obtener autorización por ID"""
-        return Autorizacion.query.filter_by(id=id, activo=True).first()
+        return AutorizacionService.query_con_relaciones('detalle').filter_by(id=id, activo=True).first()
     
     @staticmethod
     def get_autorizacion_by_numero(numero_autorizacion):
@@ -28,21 +58,39 @@ class AutorizacionService:
     @staticmethod
     def get_autorizaciones_by_cliente(cliente_id):
         """Obtener autorizaciones por cliente"""
-        return Autorizacion.query.filter_by(
+        return AutorizacionService.query_con_relaciones('listado').filter_by(
             cliente_id=cliente_id, activo=True
         ).order_by(Autorizacion.fecha_solicitud.desc()).all()
     
     @staticmethod
     def get_autorizaciones_by_obra_social(obra_social_id):
         """Obtener autorizaciones por obra social"""
-        return Autorizacion.query.filter_by(
+        return AutorizacionService.query_con_relaciones('listado').filter_by(
             obra_social_id=obra_social_id, activo=True
         ).order_by(Autorizacion.fecha_solicitud.desc()).all()
     
     @staticmethod
+    @solo_lectura
     def get_paginated_autorizaciones(page=1, per_page=10, search='', estado=None, obra_social_id=None):
         """Obtener autorizaciones con paginación y búsqueda"""
-        query = Autorizacion.query.filter_by(activo=True)
+        query = AutorizacionService.query_listado(search, estado, obra_social_id)
+        return query.order_by(*AutorizacionService.ORDEN_LISTADO).paginate(
+            page=page, per_page=per_page, error_out=False
+        )
+    
+    @staticmethod
+    @solo_lectura
+    def get_autorizaciones_por_cursor(cursor=None, per_page=10, search='', estado=None, obra_social_id=None, contar=None):
+        """Obtener una página de autorizaciones por cursor (keyset), sin OFFSET ni COUNT por página"""
+        return paginar_keyset(
+            AutorizacionService.query_listado(search, estado, obra_social_id), 'autorizaciones',
+            AutorizacionService.ORDEN_LISTADO, cursor=cursor, per_page=per_page, contar=contar
+        )
+    
+    @staticmethod
+    def query_listado(search='', estado=None, obra_social_id=None):
+        """Query de autorizaciones activas del listado, con búsqueda y filtros (sin orden)"""
+        query = AutorizacionService.query_con_relaciones('listado').filter_by(activo=True)
         
         if search:
             query = query.filter(
@@ -59,9 +107,7 @@ class AutorizacionService:
         if obra_social_id:
             query = query.filter(Autorizacion.obra_social_id == obra_social_id)
         
-        return query.order_by(Autorizacion.fecha_solicitud.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        return query
     
     @staticmethod
     def crear_autorizacion(data):
@@ -198,6 +244,7 @@ class AutorizacionService:
         return True
     
     @staticmethod
+    @solo_lectura
     def get_estadisticas_autorizaciones():
         """Obtener estadísticas generales de autorizaciones"""
         total_autorizaciones = Autorizacion.query.filter_by(activo=True).count()
@@ -225,9 +272,11 @@ class AutorizacionService:
         return estadisticas
     
     @staticmethod
-    def exportar_excel(search='', estado=None, obra_social_id=None):
-        """Exportar autorizaciones a Excel"""
-        query = Autorizacion.query.filter_by(activo=True)
+    def query_exportacion(search='', estado=None, obra_social_id=None):
+        """Query ordenada de autorizaciones activas a exportar"""
+        query = AutorizacionService.query_con_relaciones('exportacion').filter_by(
+            activo=True
+        ).join(Autorizacion.cliente).join(Autorizacion.obra_social)
         
         if search:
             query = query.filter(
@@ -236,7 +285,7 @@ class AutorizacionService:
                     Cliente.nombre.contains(search),
                     Cliente.apellido.contains(search)
                 )
-            ).join(Cliente)
+            )
         
         if estado:
             query = query.filter(Autorizacion.estado == estado)
@@ -244,43 +293,71 @@ class AutorizacionService:
         if obra_social_id:
             query = query.filter(Autorizacion.obra_social_id == obra_social_id)
         
-        autorizaciones = query.join(Cliente).join(ObraSocial).order_by(
-            Autorizacion.fecha_solicitud.desc()
-        ).all()
-        
-        # Crear DataFrame
-        data = []
-        for auth in autorizaciones:
-            data.append({
-                'Número': auth.numero_autorizacion,
-                'Cliente': auth.cliente.nombre_completo,
-                'Obra Social': auth.obra_social.nombre,
-                'Plan': auth.plan.nombre if auth.plan else 'Sin plan',
-                'Estado': auth.estado_display,
-                'Fecha Solicitud': auth.fecha_solicitud.strftime('%Y-%m-%d %H:%M:%S'),
-                'Fecha Autorización': auth.fecha_autorizacion.strftime('%Y-%m-%d %H:%M:%S') if auth.fecha_autorizacion else '',
-                'Fecha Vencimiento': auth.fecha_vencimiento.strftime('%Y-%m-%d') if auth.fecha_vencimiento else '',
-                'Cobertura': f'{auth.porcentaje_cobertura:.0f}%' if auth.porcentaje_cobertura else 'Sin especificar',
-                'Copago': f'${auth.copago:.2f}' if auth.copago else 'Sin copago',
-                'Coseguro': f'{auth.coseguro:.0f}%' if auth.coseguro else 'Sin coseguro',
-                'Cantidad': auth.cantidad_autorizada,
-                'Días Restantes': auth.dias_restantes if auth.dias_restantes is not None else 'N/A'
-            })
-        
-        df = pd.DataFrame(data)
-        
-        # Crear archivo Excel
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Autorizaciones', index=False)
-        
-        output.seek(0)
-        
-        response = make_response(output.read())
-        response.headers['Content-Type'] = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        response.headers['Content-Disposition'] = 'attachment; filename=autorizaciones.xlsx'
-        
-        return response
+        return query.order_by(Autorizacion.fecha_solicitud.desc(), Autorizacion.id.desc())
+    
+    @staticmethod
+    def fila_exportacion(auth):
+        """Valores de una autorización en el orden de COLUMNAS_EXPORTACION"""
+        return [
+            auth.numero_autorizacion,
+            auth.cliente.nombre_completo,
+            auth.obra_social.nombre,
+            auth.plan.nombre if auth.plan else 'Sin plan',
+            auth.estado_display,
+            auth.fecha_solicitud.strftime('%Y-%m-%d %H:%M:%S'),
+            auth.fecha_autorizacion.strftime('%Y-%m-%d %H:%M:%S') if auth.fecha_autorizacion else '',
+            auth.fecha_vencimiento.strftime('%Y-%m-%d') if auth.fecha_vencimiento else '',
+            f'{auth.porcentaje_cobertura:.0f}%' if auth.porcentaje_cobertura else 'Sin especificar',
+            f'${auth.copago:.2f}' if auth.copago else 'Sin copago',
+            f'{auth.coseguro:.0f}%' if auth.coseguro else 'Sin coseguro',
+            auth.cantidad_autorizada,
+            auth.dias_restantes if auth.dias_restantes is not None else 'N/A'
+        ]
+    
+    @staticmethod
+    @solo_lectura
+    def iterar_filas_exportacion(query):
+        """Recorrer la query por lotes devolviendo una fila (lista) por autorización"""
+        for auth in query.yield_per(TAMANIO_LOTE_EXPORTACION):
+            yield AutorizacionService.fila_exportacion(auth)
+    
+    @staticmethod
+    @solo_lectura
+    def exportar_excel(search='', estado=None, obra_social_id=None):
+        """Exportar autorizaciones a Excel con memoria acotada"""
+        query = AutorizacionService.query_exportacion(search, estado, obra_social_id)
+        
+        return generar_excel_streaming(
+            AutorizacionService.COLUMNAS_EXPORTACION,
+            AutorizacionService.iterar_filas_exportacion(query),
+            'autorizaciones',
+            'Autorizaciones'
+        )
+    
+    @staticmethod
+    @solo_lectura
+    def exportar_csv(search='', estado=None, obra_social_id=None):
+        """Exportar autorizaciones a CSV en streaming"""
+        query = AutorizacionService.query_exportacion(search, estado, obra_social_id)
+        
+        return generar_csv_streaming(
+            AutorizacionService.COLUMNAS_EXPORTACION,
+            AutorizacionService.iterar_filas_exportacion(query),
+            'autorizaciones'
+        )
+    
+    @staticmethod
+    @solo_lectura
+    def exportar_pdf(search='', estado=None, obra_social_id=None):
+        """Exportar autorizaciones a un reporte PDF paginado"""
+        query = AutorizacionService.query_exportacion(search, estado, obra_social_id)
+        
+        return generar_pdf_streaming(
+            AutorizacionService.COLUMNAS_EXPORTACION,
+            AutorizacionService.iterar_filas_exportacion(query),
+            'autorizaciones',
+            'Reporte de Autorizaciones'
+        )
     
     @staticmethod
     def _generar_numero_autorizacion():
@@ -0,0 +1,305 @@
+"""
+Búsqueda de clientes sobre el índice FTS5 clientes_fts (ver models/cliente.py)
+y búsqueda global sobre clientes_fts y el índice compartido busqueda_fts
+(profesionales, servicios, obras sociales y autorizaciones, ver
+models/indice_busqueda.py).
+
+El tokenizer trigram encuentra coincidencias parciales en cualquier parte del
+nombre, apellido, email o teléfono usando el índice, en lugar del LIKE '%q%'
+que recorre toda la tabla. Los términos de menos de 3 caracteres no alcanzan
+para un trigrama: si la búsqueda tiene solo términos cortos se busca por
+prefijo del apellido sobre ix_clientes_activo_apellido_nombre. En motores sin
+FTS5 (PostgreSQL) se usa la búsqueda con LIKE de siempre.
+"""
+
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import Column, Integer, MetaData, Table, Text, and_, or_, select, text, union_all
+
+from src.database import db
+from src.models import Cliente, Profesional, Servicio, ObraSocial, Autorizacion
+from src.models.cliente import valores_busqueda_cliente
+from src.models.indice_busqueda import ENTIDADES_BUSQUEDA, FACTOR_ROWID, valores_indice_busqueda
+from src.utils.helpers import plegar_texto
+
+# Largo mínimo de un término para buscarlo en el índice trigram
+LARGO_MINIMO_TRIGRAMA = 3
+
+# Tabla virtual mantenida por los triggers (fuera de db.metadata: no la crea create_all).
+# La columna oculta con el nombre de la tabla es la que recibe el MATCH
+clientes_fts = Table(
+    'clientes_fts', MetaData(),
+    Column('rowid', Integer, primary_key=True),
+    Column('clientes_fts', Text)
+)
+
+busqueda_fts = Table(
+    'busqueda_fts', MetaData(),
+    Column('rowid', Integer, primary_key=True),
+    Column('busqueda_fts', Text),
+    Column('tipo', Text)
+)
+
+# Tipos de la búsqueda global (a igual relevancia se muestran en este orden)
+TIPOS_BUSQUEDA = ('cliente', 'profesional', 'servicio', 'obra_social', 'autorizacion')
+
+# Resultados máximos de la búsqueda global
+MAX_RESULTADOS_BUSQUEDA = 50
+
+# Peso de cada columna en el ranking bm25 (el nombre pesa más que el resto)
+PESOS_CLIENTES = '10.0, 10.0, 2.0, 2.0'
+PESOS_GLOBAL = '10.0, 1.0'
+
+# Búsqueda sin índice (otros motores): tipo -> (modelo, columnas, título, detalle)
+BUSQUEDA_LIKE = {
+    'profesional': (
+        Profesional, ('nombre', 'apellido', 'especialidad'),
+        lambda p: f'{p.apellido}, {p.nombre}', lambda p: p.especialidad or ''
+    ),
+    'servicio': (Servicio, ('nombre', 'descripcion'), lambda s: s.nombre, lambda s: (s.descripcion or '')[:120]),
+    'obra_social': (ObraSocial, ('nombre', 'codigo'), lambda o: o.nombre, lambda o: o.codigo),
+    'autorizacion': (
+        Autorizacion, ('numero_autorizacion',),
+        lambda a: a.numero_autorizacion, lambda a: f'Estado: {a.estado or ""}'
+    ),
+}
+
+# Motor -> nombres de los índices FTS presentes en la base
+_indices_por_motor = WeakKeyDictionary()
+
+
+class BusquedaService:
+    
+    @staticmethod
+    def indice_disponible(nombre='clientes_fts'):
+        """True si la base actual tiene el índice de búsqueda `nombre` (clientes_fts o busqueda_fts)"""
+        engine = db.engine
+        indices = _indices_por_motor.get(engine)
+        if indices is None:
+            indices = set()
+            if engine.dialect.name == 'sqlite':
+                indices = set(db.session.execute(text(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' "
+                    "AND name IN ('clientes_fts', 'busqueda_fts')"
+                )).scalars())
+            _indices_por_motor[engine] = indices
+        return nombre in indices
+    
+    @staticmethod
+    def expresion_match(termino):
+        """Consulta FTS5 para la búsqueda (None si no tiene términos de 3 caracteres o más)"""
+        palabras = [
+            palabra for palabra in plegar_texto(termino or '').split()
+            if len(palabra) >= LARGO_MINIMO_TRIGRAMA
+        ]
+        if not palabras:
+            return None
+        
+        # Cada palabra como frase entre comillas: todas deben aparecer
+        return ' '.join('"' + palabra.replace('"', '""') + '"' for palabra in palabras)
+    
+    @staticmethod
+    def _variantes_prefijo(termino):
+        """Variantes de mayúsculas del prefijo (la comparación por rango distingue mayúsculas)"""
+        prefijo = termino.strip()
+        return sorted({prefijo, prefijo.lower(), prefijo.capitalize(), prefijo.upper()})
+    
+    @staticmethod
+    def _rango_apellido(variante):
+        """Clientes activos con apellido que empieza con `variante` (rango sobre ix_clientes_activo_apellido_nombre)"""
+        return and_(Cliente.activo == True, Cliente.apellido >= variante, Cliente.apellido < variante + '\uffff')
+    
+    @staticmethod
+    def ids_coincidentes(termino):
+        """Subconsulta con los ids de los clientes activos que coinciden (requiere el índice)"""
+        expresion = BusquedaService.expresion_match(termino)
+        return select(clientes_fts.c.rowid).where(clientes_fts.c.clientes_fts.op('MATCH')(expresion))
+    
+    @staticmethod
+    def filtro_clientes(termino, columnas_like=None):
+        """Condición para Cliente.query con los clientes activos que coinciden con la búsqueda"""
+        termino = (termino or '').strip()
+        if not BusquedaService.indice_disponible():
+            columnas = columnas_like or (Cliente.nombre, Cliente.apellido, Cliente.email, Cliente.telefono)
+            return and_(Cliente.activo == True, or_(*[columna.contains(termino) for columna in columnas]))
+        
+        # Sin condición sobre activo: el índice solo tiene clientes activos y filtrar
+        # por activo haría que SQLite recorra ix_clientes_activo_apellido_nombre
+        if BusquedaService.expresion_match(termino) is not None:
+            return Cliente.id.in_(BusquedaService.ids_coincidentes(termino))
+        
+        rangos = [
+            select(Cliente.id).where(BusquedaService._rango_apellido(variante))
+            for variante in BusquedaService._variantes_prefijo(termino)
+        ]
+        return Cliente.id.in_(union_all(*rangos))
+    
+    @staticmethod
+    def buscar_clientes(termino, limite=10, columnas_like=None):
+        """Hasta `limite` clientes activos que coinciden, ordenados por apellido y nombre"""
+        termino = (termino or '').strip()
+        if not termino:
+            return []
+        
+        if not BusquedaService.indice_disponible():
+            return Cliente.query.filter(BusquedaService.filtro_clientes(termino, columnas_like)).limit(limite).all()
+        
+        if BusquedaService.expresion_match(termino) is not None:
+            # El índice devuelve los primeros `limite` ids sin recorrer todas las coincidencias
+            ids = db.session.execute(BusquedaService.ids_coincidentes(termino).limit(limite)).scalars().all()
+            clientes = Cliente.query.filter(Cliente.id.in_(ids)).all() if ids else []
+        else:
+            # Prefijo corto: los primeros `limite` de cada rango, en el orden del índice
+            clientes = []
+            for variante in BusquedaService._variantes_prefijo(termino):
+                clientes.extend(
+                    Cliente.query.filter(BusquedaService._rango_apellido(variante))
+                    .order_by(Cliente.apellido, Cliente.nombre).limit(limite).all()
+                )
+        
+        return sorted(clientes, key=lambda cliente: (cliente.apellido, cliente.nombre))[:limite]
+    
+    @staticmethod
+    def filtro_entidad(tipo, termino):
+        """Condición sobre el id de la entidad con el índice compartido (None si no se puede usar)"""
+        expresion = BusquedaService.expresion_match(termino)
+        if expresion is None or not BusquedaService.indice_disponible('busqueda_fts'):
+            return None
+        
+        modelo = BUSQUEDA_LIKE[tipo][0]
+        ids = select(busqueda_fts.c.rowid.op('/')(FACTOR_ROWID)).where(
+            busqueda_fts.c.busqueda_fts.op('MATCH')(expresion),
+            busqueda_fts.c.tipo == tipo
+        )
+        return modelo.id.in_(ids)
+    
+    @staticmethod
+    def busqueda_global(termino, limite=20, tipos=None):
+        """Resultados de todas las entidades ordenados por relevancia, en una sola consulta.
+        
+        Devuelve una lista de dicts con tipo, id, titulo y detalle.
+        """
+        termino = (termino or '').strip()
+        limite = max(1, min(int(limite), MAX_RESULTADOS_BUSQUEDA))
+        tipos = [tipo for tipo in TIPOS_BUSQUEDA if not tipos or tipo in tipos]
+        if not termino or not tipos:
+            return []
+        
+        expresion = BusquedaService.expresion_match(termino)
+        if expresion is None:
+            # Sin trigramas: solo clientes por prefijo de apellido
+            if 'cliente' not in tipos:
+                return []
+            return [
+                BusquedaService._resultado_cliente(cliente)
+                for cliente in BusquedaService.buscar_clientes(termino, limite)
+            ]
+        
+        if not (BusquedaService.indice_disponible() and BusquedaService.indice_disponible('busqueda_fts')):
+            return BusquedaService._busqueda_global_like(termino, limite, tipos)
+        
+        consultas = []
+        parametros = {'expresion': expresion, 'limite': limite}
+        if 'cliente' in tipos:
+            consultas.append(
+                "SELECT * FROM (SELECT 'cliente' AS tipo, c.id AS id, c.apellido || ', ' || c.nombre AS titulo, "
+                "coalesce(c.email, c.telefono, '') AS detalle, "
+                f"bm25(clientes_fts, {PESOS_CLIENTES}) AS relevancia "
+                "FROM clientes_fts CROSS JOIN clientes c ON c.id = clientes_fts.rowid "
+                "WHERE clientes_fts MATCH :expresion ORDER BY relevancia LIMIT :limite)"
+            )
+        
+        otros = [tipo for tipo in tipos if tipo != 'cliente']
+        if otros:
+            marcadores = ', '.join(f':tipo_{i}' for i in range(len(otros)))
+            parametros.update({f'tipo_{i}': tipo for i, tipo in enumerate(otros)})
+            consultas.append(
+                f"SELECT * FROM (SELECT tipo, rowid / {FACTOR_ROWID} AS id, etiqueta AS titulo, "
+                f"descripcion AS detalle, bm25(busqueda_fts, {PESOS_GLOBAL}) AS relevancia "
+                f"FROM busqueda_fts WHERE busqueda_fts MATCH :expresion AND tipo IN ({marcadores}) "
+                "ORDER BY relevancia LIMIT :limite)"
+            )
+        
+        sql = ' UNION ALL '.join(consultas) + ' ORDER BY relevancia LIMIT :limite'
+        filas = db.session.execute(text(sql), parametros).mappings().all()
+        
+        orden = {tipo: i for i, tipo in enumerate(TIPOS_BUSQUEDA)}
+        resultados = sorted(filas, key=lambda fila: (fila['relevancia'], orden[fila['tipo']]))
+        return [
+            {'tipo': fila['tipo'], 'id': fila['id'], 'titulo': fila['titulo'], 'detalle': fila['detalle']}
+            for fila in resultados
+        ]
+    
+    @staticmethod
+    def _resultado_cliente(cliente):
+        return {
+            'tipo': 'cliente',
+            'id': cliente.id,
+            'titulo': f'{cliente.apellido}, {cliente.nombre}',
+            'detalle': cliente.email or cliente.telefono or ''
+        }
+    
+    @staticmethod
+    def _busqueda_global_like(termino, limite, tipos):
+        """Búsqueda global sin índice: LIKE en cada entidad, en el orden de TIPOS_BUSQUEDA"""
+        resultados = []
+        if 'cliente' in tipos:
+            resultados.extend(
+                BusquedaService._resultado_cliente(cliente)
+                for cliente in BusquedaService.buscar_clientes(termino, limite)
+            )
+        
+        for tipo in tipos:
+            if tipo == 'cliente' or len(resultados) >= limite:
+                continue
+            modelo, columnas, titulo, detalle = BUSQUEDA_LIKE[tipo]
+            filas = modelo.query.filter(
+                modelo.activo == True,
+                or_(*[getattr(modelo, columna).contains(termino) for columna in columnas])
+            ).limit(limite - len(resultados)).all()
+            resultados.extend({'tipo': tipo, 'id': fila.id, 'titulo': titulo(fila), 'detalle': detalle(fila)} for fila in filas)
+        
+        return resultados[:limite]
+    
+    @staticmethod
+    def reconstruir_indice_clientes():
+        """Regenerar clientes_fts desde la tabla clientes; devuelve la cantidad de filas indexadas"""
+        if not BusquedaService.indice_disponible():
+            raise ValueError('La base actual no tiene el índice de búsqueda (requiere SQLite con FTS5)')
+        
+        try:
+            db.session.execute(text("DELETE FROM clientes_fts"))
+            db.session.execute(text(
+                "INSERT INTO clientes_fts(rowid, nombre, apellido, email, telefono) "
+                f"SELECT {valores_busqueda_cliente('clientes')} FROM clientes WHERE activo"
+            ))
+            db.session.execute(text("INSERT INTO clientes_fts(clientes_fts) VALUES ('optimize')"))
+            cantidad = db.session.execute(text("SELECT count(*) FROM clientes_fts")).scalar()
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        
+        return cantidad
+    
+    @staticmethod
+    def reconstruir_indice_global():
+        """Regenerar busqueda_fts desde las tablas de cada entidad; devuelve la cantidad de filas indexadas"""
+        if not BusquedaService.indice_disponible('busqueda_fts'):
+            raise ValueError('La base actual no tiene el índice de búsqueda global (requiere SQLite con FTS5)')
+        
+        try:
+            db.session.execute(text("DELETE FROM busqueda_fts"))
+            for tipo, (tabla, *_resto) in ENTIDADES_BUSQUEDA.items():
+                db.session.execute(text(
+                    "INSERT INTO busqueda_fts(rowid, titulo, detalle, tipo, etiqueta, descripcion) "
+                    f"SELECT {valores_indice_busqueda(tipo, tabla)} FROM {tabla} WHERE activo"
+                ))
+            db.session.execute(text("INSERT INTO busqueda_fts(busqueda_fts) VALUES ('optimize')"))
+            cantidad = db.session.execute(text("SELECT count(*) FROM busqueda_fts")).scalar()
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        
+        return cantidad
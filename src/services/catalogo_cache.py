@@ -0,0 +1,148 @@
+"""
+Caché en memoria de los catálogos (profesionales, servicios, obras sociales y
+planes), que cambian pocas veces al mes y se consultan en cada formulario,
+calendario y búsqueda de horarios.
+
+Cada proceso guarda el catálogo completo junto con su versión. La versión vive
+en la tabla versiones_catalogo: los servicios la incrementan en cada alta,
+cambio o baja (CatalogoCache.invalidar) y vacían la caché del proceso. Los
+demás procesos comparan su versión con la de la base cuando vence el TTL
+(CATALOG_CACHE_TTL segundos): si cambió, recargan. Así un cambio se ve al
+instante en el proceso que lo hizo y en a lo sumo TTL segundos en el resto.
+
+Los objetos cacheados están desconectados de la sesión: son de solo lectura y
+solo tienen cargadas sus columnas y las relaciones que usa su to_dict().
+"""
+
+import time
+from weakref import WeakKeyDictionary
+
+from flask import current_app
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload
+
+from src.database import db
+from src.models import ObraSocial, PlanObraSocial, Profesional, Servicio, VersionCatalogo
+
+# Segundos que un proceso usa su copia sin verificar la versión en la base
+CATALOG_CACHE_TTL = 30
+
+# Catálogo -> consulta con todas sus filas (activas e inactivas) en el orden de los listados
+CONSULTAS_CATALOGO = {
+    'profesionales': lambda: select(Profesional).order_by(Profesional.apellido, Profesional.nombre),
+    'servicios': lambda: select(Servicio).options(joinedload(Servicio.categoria)).order_by(Servicio.nombre),
+    'obras_sociales': lambda: select(ObraSocial).order_by(ObraSocial.nombre),
+    'planes': lambda: select(PlanObraSocial).options(joinedload(PlanObraSocial.obra_social)).order_by(
+        PlanObraSocial.nombre
+    ),
+}
+
+# Motor -> {catálogo: EntradaCatalogo}
+_cache_por_motor = WeakKeyDictionary()
+
+
+class EntradaCatalogo:
+    """Copia en memoria de un catálogo"""
+    
+    def __init__(self, version, filas):
+        self.version = version
+        self.filas = filas
+        self.por_id = {fila.id: fila for fila in filas}
+        self.verificada = time.monotonic()
+
+
+class CatalogoCache:
+    
+    @staticmethod
+    def _entradas():
+        return _cache_por_motor.setdefault(db.engine, {})
+    
+    @staticmethod
+    def _conexion():
+        """Conexión de la sesión actual a la base principal (la réplica puede tener una versión atrasada)"""
+        return db.session.connection(bind_arguments={'bind': db.engine})
+    
+    @staticmethod
+    def _version(conexion, nombre):
+        version = conexion.execute(
+            select(VersionCatalogo.version).where(VersionCatalogo.nombre == nombre)
+        ).scalar()
+        return version or 0
+    
+    @staticmethod
+    def _cargar(nombre):
+        conexion = CatalogoCache._conexion()
+        version = CatalogoCache._version(conexion, nombre)
+        
+        # Sesión aparte sobre la misma transacción: los objetos quedan desconectados
+        # al cerrarla, sin tocar el mapa de identidad de la sesión del request
+        with Session(bind=conexion) as sesion:
+            filas = sesion.scalars(CONSULTAS_CATALOGO[nombre]()).unique().all()
+        
+        return EntradaCatalogo(version, filas)
+    
+    @staticmethod
+    def _entrada(nombre):
+        if nombre not in CONSULTAS_CATALOGO:
+            raise ValueError(f'Catálogo desconocido: {nombre}')
+        
+        entradas = CatalogoCache._entradas()
+        entrada = entradas.get(nombre)
+        ttl = current_app.config.get('CATALOG_CACHE_TTL', CATALOG_CACHE_TTL)
+        
+        if entrada is not None and time.monotonic() - entrada.verificada < ttl:
+            return entrada
+        
+        if entrada is not None and CatalogoCache._version(CatalogoCache._conexion(), nombre) == entrada.version:
+            entrada.verificada = time.monotonic()
+            return entrada
+        
+        entrada = CatalogoCache._cargar(nombre)
+        entradas[nombre] = entrada
+        return entrada
+    
+    @staticmethod
+    def obtener(nombre, solo_activos=True):
+        """Filas del catálogo en el orden de los listados"""
+        filas = CatalogoCache._entrada(nombre).filas
+        if solo_activos:
+            return [fila for fila in filas if fila.activo]
+        return list(filas)
+    
+    @staticmethod
+    def por_id(nombre, id):
+        """Fila del catálogo con ese id (activa o no); None si no existe"""
+        if id is None:
+            return None
+        return CatalogoCache._entrada(nombre).por_id.get(int(id))
+    
+    @staticmethod
+    def invalidar(*nombres):
+        """Incrementar la versión de los catálogos (después de un cambio ya confirmado) y vaciar la caché local"""
+        tabla = VersionCatalogo.__table__
+        try:
+            for nombre in nombres:
+                resultado = db.session.execute(
+                    update(tabla).where(tabla.c.nombre == nombre).values(version=tabla.c.version + 1)
+                )
+                if resultado.rowcount == 0:
+                    db.session.execute(insert(tabla).values(nombre=nombre, version=1))
+            db.session.commit()
+        except IntegrityError:
+            # Otro proceso creó la fila al mismo tiempo: incrementarla
+            db.session.rollback()
+            for nombre in nombres:
+                db.session.execute(
+                    update(tabla).where(tabla.c.nombre == nombre).values(version=tabla.c.version + 1)
+                )
+            db.session.commit()
+        finally:
+            entradas = CatalogoCache._entradas()
+            for nombre in nombres:
+                entradas.pop(nombre, None)
+    
+    @staticmethod
+    def limpiar():
+        """Vaciar la caché de este proceso (la próxima lectura recarga desde la base)"""
+        CatalogoCache._entradas().clear()
@@ -1,6 +1,7 @@
 from src.models import Categoria
 from src.database import db
 from src.utils.validators import validar_nombre, validar_longitud_texto
+from src.services.catalogo_cache import CatalogoCache
 
 class CategoriaService:
     
@@ -105,6 +106,7 @@ class CategoriaService:
                 categoria.color = color
         
         db.session.commit()
+        CatalogoCache.invalidar('servicios')
         return categoria
     
     @staticmethod
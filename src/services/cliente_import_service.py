@@ -0,0 +1,371 @@
+"""
+Importación masiva de clientes desde CSV o XLSX.
+
+El archivo se lee en streaming y se procesa en lotes: cada lote se valida en
+memoria, resuelve los emails ya registrados con una sola consulta IN y se
+guarda en una transacción (un executemany para las altas y otro para las
+actualizaciones). Los códigos de obra social y plan se resuelven con un
+diccionario cargado una vez al comienzo.
+"""
+
+import csv
+import io
+import os
+import unicodedata
+from itertools import islice
+
+from sqlalchemy import bindparam, func, select
+
+from src.database import db
+from src.models import Cliente, ObraSocial, PlanObraSocial
+from src.utils.validators import validar_email, validar_telefono, validar_longitud_texto
+
+# Filas por transacción
+TAMANIO_LOTE_IMPORTACION = 5000
+
+# Rechazos que se devuelven en las respuestas JSON y se muestran en pantalla
+MAX_RECHAZOS_RESPUESTA = 100
+
+FORMATOS_IMPORTACION = ('csv', 'xlsx')
+
+# Encabezado normalizado -> campo
+COLUMNAS_IMPORTACION = {
+    'nombre': 'nombre',
+    'nombres': 'nombre',
+    'apellido': 'apellido',
+    'apellidos': 'apellido',
+    'telefono': 'telefono',
+    'tel': 'telefono',
+    'celular': 'telefono',
+    'email': 'email',
+    'e_mail': 'email',
+    'mail': 'email',
+    'correo': 'email',
+    'obra_social': 'obra_social',
+    'codigo_obra_social': 'obra_social',
+    'plan': 'plan',
+    'codigo_plan': 'plan',
+    'numero_afiliado': 'numero_afiliado',
+    'nro_afiliado': 'numero_afiliado',
+    'afiliado': 'numero_afiliado',
+    'grupo_familiar': 'grupo_familiar',
+}
+
+# Largo máximo de cada campo (según el modelo Cliente)
+LARGOS_MAXIMOS = {
+    'nombre': 100,
+    'apellido': 100,
+    'telefono': 20,
+    'email': 120,
+    'numero_afiliado': 100,
+    'grupo_familiar': 100,
+}
+
+# Campos que se guardan en cada alta
+CAMPOS_CLIENTE = (
+    'nombre', 'apellido', 'telefono', 'email', 'obra_social_id', 'plan_id', 'numero_afiliado', 'grupo_familiar'
+)
+
+# Columna del archivo -> campos del cliente que actualiza
+CAMPOS_POR_COLUMNA = {
+    'nombre': ('nombre',),
+    'apellido': ('apellido',),
+    'telefono': ('telefono',),
+    'obra_social': ('obra_social_id', 'plan_id'),
+    'plan': ('plan_id',),
+    'numero_afiliado': ('numero_afiliado',),
+    'grupo_familiar': ('grupo_familiar',),
+}
+
+
+class ResultadoImportacion:
+    """Totales de una importación y filas rechazadas"""
+    
+    def __init__(self):
+        self.leidas = 0
+        self.insertados = 0
+        self.actualizados = 0
+        self.rechazos = []  # dicts con fila, motivo y datos originales
+    
+    @property
+    def rechazados(self):
+        return len(self.rechazos)
+    
+    def rechazar(self, numero_fila, motivo, datos):
+        self.rechazos.append({'fila': numero_fila, 'motivo': motivo, 'datos': datos})
+    
+    def to_dict(self, max_rechazos=MAX_RECHAZOS_RESPUESTA):
+        return {
+            'leidas': self.leidas,
+            'insertados': self.insertados,
+            'actualizados': self.actualizados,
+            'rechazados': self.rechazados,
+            'rechazos': self.rechazos[:max_rechazos]
+        }
+    
+    def escribir_rechazos(self, destino):
+        """Escribir el informe de filas rechazadas como CSV en un archivo de texto"""
+        columnas = sorted({campo for rechazo in self.rechazos for campo in rechazo['datos']})
+        writer = csv.writer(destino)
+        writer.writerow(['Fila', 'Motivo'] + columnas)
+        for rechazo in self.rechazos:
+            writer.writerow(
+                [rechazo['fila'], rechazo['motivo']] + [rechazo['datos'].get(columna, '') for columna in columnas]
+            )
+
+
+def _normalizar_encabezado(valor):
+    texto = unicodedata.normalize('NFKD', str(valor or '').strip().lower())
+    texto = ''.join(caracter for caracter in texto if not unicodedata.combining(caracter))
+    return texto.replace(' ', '_').replace('-', '_').replace('.', '')
+
+
+def _texto(valor):
+    """Valor de una celda como texto (los números enteros de Excel sin decimales)"""
+    if valor is None:
+        return ''
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return str(valor).strip()
+
+
+class ClienteImportService:
+    
+    @staticmethod
+    def detectar_formato(nombre_archivo):
+        """Formato de importación según la extensión del archivo"""
+        extension = os.path.splitext(nombre_archivo or '')[1].lower().lstrip('.')
+        if extension in ('xlsx', 'xlsm'):
+            return 'xlsx'
+        if extension in ('csv', 'txt'):
+            return 'csv'
+        raise ValueError('Formato no soportado: use un archivo CSV o XLSX')
+    
+    @staticmethod
+    def _mapear_encabezados(encabezados):
+        """Lista con el campo de cada columna (None para las columnas ignoradas)"""
+        campos = [COLUMNAS_IMPORTACION.get(_normalizar_encabezado(encabezado)) for encabezado in encabezados]
+        if 'nombre' not in campos or 'apellido' not in campos:
+            raise ValueError('El archivo debe tener las columnas nombre y apellido')
+        return campos
+    
+    @staticmethod
+    def _filas_csv(archivo, encoding):
+        texto = io.TextIOWrapper(archivo, encoding=encoding, newline='')
+        try:
+            primera = texto.readline()
+            if not primera.strip():
+                raise ValueError('El archivo está vacío')
+            
+            try:
+                dialecto = csv.Sniffer().sniff(primera, delimiters=',;\t')
+            except csv.Error:
+                dialecto = csv.excel
+            
+            encabezados = next(csv.reader([primera], dialecto))
+            yield ClienteImportService._mapear_encabezados(encabezados)
+            yield from csv.reader(texto, dialecto)
+        finally:
+            # No cerrar el archivo del llamador junto con el wrapper
+            texto.detach()
+    
+    @staticmethod
+    def _filas_xlsx(archivo):
+        from openpyxl import load_workbook
+        
+        libro = load_workbook(archivo, read_only=True, data_only=True)
+        try:
+            filas = libro.active.iter_rows(values_only=True)
+            encabezados = next(filas, None)
+            if not encabezados:
+                raise ValueError('El archivo está vacío')
+            
+            yield ClienteImportService._mapear_encabezados(encabezados)
+            for fila in filas:
+                yield [_texto(valor) for valor in fila]
+        finally:
+            libro.close()
+    
+    @staticmethod
+    def leer_filas(archivo, formato, encoding='utf-8-sig'):
+        """Generador de (numero_fila, datos) de un archivo binario CSV o XLSX.
+        
+        El primer valor generado es la lista de columnas reconocidas en el encabezado.
+        """
+        if formato not in FORMATOS_IMPORTACION:
+            raise ValueError('Formato no soportado: use un archivo CSV o XLSX')
+        
+        filas = ClienteImportService._filas_csv(archivo, encoding) if formato == 'csv' else ClienteImportService._filas_xlsx(archivo)
+        campos = next(filas)
+        yield [campo for campo in dict.fromkeys(campos) if campo]
+        
+        # La fila 1 es el encabezado
+        for numero_fila, fila in enumerate(filas, start=2):
+            if not any(valor.strip() for valor in fila if valor):
+                continue
+            datos = {}
+            for campo, valor in zip(campos, fila):
+                if campo and valor and not datos.get(campo):
+                    datos[campo] = valor.strip()
+            yield numero_fila, datos
+    
+    @staticmethod
+    def cargar_catalogos():
+        """Diccionarios de códigos de obra social y plan (en minúsculas) -> id"""
+        obras_sociales = {
+            codigo.strip().lower(): id
+            for id, codigo in db.session.execute(
+                select(ObraSocial.id, ObraSocial.codigo).where(ObraSocial.activo == True)
+            )
+        }
+        planes = {
+            (obra_social_id, codigo.strip().lower()): id
+            for id, obra_social_id, codigo in db.session.execute(
+                select(PlanObraSocial.id, PlanObraSocial.obra_social_id, PlanObraSocial.codigo)
+                .where(PlanObraSocial.activo == True)
+            )
+        }
+        return obras_sociales, planes
+    
+    @staticmethod
+    def validar_fila(datos, obras_sociales, planes):
+        """Valores del cliente de una fila del archivo; ValueError con el motivo si no es válida"""
+        if not datos.get('nombre') or not datos.get('apellido'):
+            raise ValueError('Nombre y apellido son obligatorios')
+        
+        for campo, maximo in LARGOS_MAXIMOS.items():
+            if not validar_longitud_texto(datos.get(campo), max_length=maximo):
+                raise ValueError(f'{campo} supera los {maximo} caracteres')
+        
+        if datos.get('email') and not validar_email(datos['email']):
+            raise ValueError('Email no válido')
+        
+        if datos.get('telefono') and not validar_telefono(datos['telefono']):
+            raise ValueError('Teléfono no válido')
+        
+        obra_social_id = None
+        codigo_obra_social = (datos.get('obra_social') or '').lower()
+        if codigo_obra_social and codigo_obra_social != 'particular':
+            obra_social_id = obras_sociales.get(codigo_obra_social)
+            if obra_social_id is None:
+                raise ValueError(f"Obra social desconocida: {datos['obra_social']}")
+        
+        plan_id = None
+        if datos.get('plan'):
+            if obra_social_id is None:
+                raise ValueError('El plan requiere una obra social')
+            plan_id = planes.get((obra_social_id, datos['plan'].lower()))
+            if plan_id is None:
+                raise ValueError(f"Plan desconocido para la obra social: {datos['plan']}")
+        
+        return {
+            'nombre': datos['nombre'],
+            'apellido': datos['apellido'],
+            'telefono': datos.get('telefono') or None,
+            'email': datos.get('email') or None,
+            'obra_social_id': obra_social_id,
+            'plan_id': plan_id,
+            'numero_afiliado': datos.get('numero_afiliado') or None,
+            'grupo_familiar': datos.get('grupo_familiar') or None,
+        }
+    
+    @staticmethod
+    def _clientes_por_email(emails):
+        """Id del cliente activo de cada email (en minúsculas), con una consulta IN"""
+        if not emails:
+            return {}
+        
+        # lower(email) usa el índice funcional ix_clientes_email_lower_activo
+        existentes = {}
+        for id, email in db.session.execute(
+            select(Cliente.id, Cliente.email)
+            .where(func.lower(Cliente.email).in_({email.lower() for email in emails}), Cliente.activo == True)
+        ):
+            # Con emails repetidos en la base se actualiza el cliente más antiguo
+            clave = email.lower()
+            existentes[clave] = min(id, existentes.get(clave, id))
+        return existentes
+    
+    @staticmethod
+    def _guardar_lote(lote, columnas, actualizar, resultado, emails_vistos, obras_sociales, planes):
+        """Validar y guardar un lote de filas en una transacción"""
+        validas = []
+        for numero_fila, datos in lote:
+            try:
+                valores = ClienteImportService.validar_fila(datos, obras_sociales, planes)
+            except ValueError as e:
+                resultado.rechazar(numero_fila, str(e), datos)
+                continue
+            
+            if valores['email']:
+                clave = valores['email'].lower()
+                if clave in emails_vistos:
+                    resultado.rechazar(numero_fila, f'Email repetido en el archivo (fila {emails_vistos[clave]})', datos)
+                    continue
+                emails_vistos[clave] = numero_fila
+            validas.append((numero_fila, datos, valores))
+        
+        existentes = ClienteImportService._clientes_por_email(
+            [valores['email'] for _, _, valores in validas if valores['email']]
+        )
+        
+        # Las columnas ausentes del archivo no se pisan al actualizar
+        campos_actualizables = [
+            campo for columna in columnas for campo in CAMPOS_POR_COLUMNA.get(columna, ())
+        ]
+        campos_actualizables = list(dict.fromkeys(campos_actualizables))
+        
+        altas = []
+        cambios = []
+        for numero_fila, datos, valores in validas:
+            cliente_id = existentes.get(valores['email'].lower()) if valores['email'] else None
+            if cliente_id is None:
+                altas.append({campo: valores[campo] for campo in CAMPOS_CLIENTE})
+            elif actualizar:
+                cambio = {campo: valores[campo] for campo in campos_actualizables}
+                cambio['cliente_id'] = cliente_id
+                cambios.append(cambio)
+            else:
+                resultado.rechazar(numero_fila, 'Ya existe un cliente con este email', datos)
+        
+        try:
+            if altas:
+                db.session.execute(Cliente.__table__.insert(), altas)
+            if cambios:
+                tabla = Cliente.__table__
+                db.session.execute(tabla.update().where(tabla.c.id == bindparam('cliente_id')), cambios)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        
+        resultado.insertados += len(altas)
+        resultado.actualizados += len(cambios)
+    
+    @staticmethod
+    def importar(archivo, formato, actualizar=True, tamanio_lote=TAMANIO_LOTE_IMPORTACION, encoding='utf-8-sig', progreso=None):
+        """Importar clientes desde un archivo binario CSV o XLSX.
+        
+        Los emails ya registrados actualizan al cliente existente (o se rechazan
+        con actualizar=False). Cada lote se guarda en su propia transacción;
+        progreso(resultado) se llama después de cada lote.
+        """
+        filas = ClienteImportService.leer_filas(archivo, formato, encoding)
+        columnas = next(filas)
+        obras_sociales, planes = ClienteImportService.cargar_catalogos()
+        
+        resultado = ResultadoImportacion()
+        emails_vistos = {}
+        while True:
+            lote = list(islice(filas, tamanio_lote))
+            if not lote:
+                break
+            
+            resultado.leidas += len(lote)
+            ClienteImportService._guardar_lote(
+                lote, columnas, actualizar, resultado, emails_vistos, obras_sociales, planes
+            )
+            if progreso:
+                progreso(resultado)
+        
+        return resultado
@@ -1,13 +1,26 @@
-from flask import make_response
 from src.models import Cliente
 from src.database import db
 from src.utils.validators import validar_email, validar_telefono
+from src.utils.exports import generar_excel_streaming, generar_csv_streaming, generar_pdf_streaming, TAMANIO_LOTE_EXPORTACION
+from sqlalchemy.orm import joinedload
+from src.replica import solo_lectura
+from src.services.busqueda_service import BusquedaService
+from src.utils.paginacion import paginar_keyset
+from src.utils.cache import memoizar, invalidar_al_modificar
 
-import pandas as pd
-from io import BytesIO
+invalidar_al_modificar('clientes', Cliente)
 
 class ClienteService:
     
+    # Encabezados de las exportaciones de clientes (CSV, Excel)
+    COLUMNAS_EXPORTACION = [
+        'ID', 'Nombre', 'Apellido', 'Teléfono', 'Email',
+        'Obra Social', 'Plan', 'Número Afiliado', 'Grupo Familiar', 'Fecha Creación'
+    ]
+    
+    # Orden de los listados (el id desempata para la paginación por cursor)
+    ORDEN_LISTADO = (Cliente.apellido, Cliente.nombre, Cliente.id)
+    
     @staticmethod
     def get_all_clientes():
         """Obtener todos los clientes activos"""
@@ -19,38 +32,39 @@ class ClienteService:
         return Cliente.query.filter_by(id=id, activo=True).first()
     
     @staticmethod
+    @solo_lectura
     def get_paginated_clientes(page=1, per_page=10, search=''):
         """Obtener clientes con paginación y búsqueda"""
-        query = Cliente.query.filter_by(activo=True)
-        
-        if search:
-            query = query.filter(
-                db.or_(
-                    Cliente.nombre.contains(search),
-                    Cliente.apellido.contains(search),
-                    Cliente.email.contains(search),
-                    Cliente.telefono.contains(search)
-                )
-            )
-        
-        return query.order_by(Cliente.apellido, Cliente.nombre).paginate(
+        return ClienteService.query_listado(search).order_by(*ClienteService.ORDEN_LISTADO).paginate(
             page=page, per_page=per_page, error_out=False
         )
     
     @staticmethod
+    @solo_lectura
+    def get_clientes_por_cursor(cursor=None, per_page=10, search='', contar=None):
+        """Obtener una página de clientes por cursor (keyset), sin OFFSET ni COUNT por página"""
+        return paginar_keyset(
+            ClienteService.query_listado(search), 'clientes', ClienteService.ORDEN_LISTADO,
+            cursor=cursor, per_page=per_page, contar=contar
+        )
+    
+    @staticmethod
+    def query_listado(search=''):
+        """Query de clientes activos del listado, con la búsqueda aplicada (sin orden)"""
+        if search and search.strip():
+            return Cliente.query.filter(BusquedaService.filtro_clientes(search))
+        return Cliente.query.filter_by(activo=True)
+    
+    @staticmethod
+    @solo_lectura
     def buscar_clientes(query, limit=10):
         """Buscar clientes para autocompletado"""
         if not query:
             return []
         
-        return Cliente.query.filter(
-            Cliente.activo == True,
-            db.or_(
-                Cliente.nombre.contains(query),
-                Cliente.apellido.contains(query),
-                Cliente.email.contains(query)
-            )
-        ).limit(limit).all()
+        return BusquedaService.buscar_clientes(
+            query, limit, columnas_like=(Cliente.nombre, Cliente.apellido, Cliente.email)
+        )
     
     @staticmethod
     def crear_cliente(data):
@@ -67,8 +81,9 @@ class ClienteService:
         
         # Verificar email único
         if data.get('email'):
-            cliente_existente = Cliente.query.filter_by(
-                email=data['email'], activo=True
+            cliente_existente = Cliente.query.filter(
+                db.func.lower(Cliente.email) == data['email'].lower(),
+                Cliente.activo == True
             ).first()
             if cliente_existente:
                 raise ValueError('Ya existe un cliente con este email')
@@ -108,7 +123,7 @@ class ClienteService:
         # Verificar email único (excepto el cliente actual)
         if data.get('email') and data['email'] != cliente.email:
             cliente_existente = Cliente.query.filter(
-                Cliente.email == data['email'],
+                db.func.lower(Cliente.email) == data['email'].lower(),
                 Cliente.activo == True,
                 Cliente.id != id
             ).first()
@@ -150,83 +165,65 @@ class ClienteService:
         return True
     
     @staticmethod
+    def query_exportacion(search=''):
+        """Query ordenada de clientes activos a exportar, con obra social y plan precargados"""
+        query = Cliente.query.options(
+            joinedload(Cliente.obra_social),
+            joinedload(Cliente.plan)
+        )
+        
+        # El filtro de búsqueda ya se limita a los clientes activos
+        if search and search.strip():
+            query = query.filter(BusquedaService.filtro_clientes(search))
+        else:
+            query = query.filter_by(activo=True)
+        
+        return query.order_by(Cliente.apellido, Cliente.nombre, Cliente.id)
+    
+    @staticmethod
+    @solo_lectura
+    def iterar_filas_exportacion(query):
+        """Recorrer la query por lotes devolviendo una fila (lista) por cliente"""
+        for cliente in query.yield_per(TAMANIO_LOTE_EXPORTACION):
+            try:
+                yield [
+                    cliente.id,
+                    cliente.nombre,
+                    cliente.apellido,
+                    cliente.telefono or '',
+                    cliente.email or '',
+                    cliente.obra_social.nombre if cliente.obra_social else 'Particular',
+                    cliente.plan.nombre if cliente.plan else '',
+                    cliente.numero_afiliado or '',
+                    cliente.grupo_familiar or '',
+                    cliente.fecha_creacion.strftime('%Y-%m-%d %H:%M:%S') if cliente.fecha_creacion else ''
+                ]
+            except Exception as e:
+                # Si hay un error con un cliente específico, lo saltamos y continuamos
+                print(f"Error procesando cliente {cliente.id}: {e}")
+                continue
+    
+    @staticmethod
+    @solo_lectura
     def exportar_excel(search=''):
-        """Exportar clientes a Excel"""
+        """Exportar clientes a Excel con memoria acotada"""
         try:
-            query = Cliente.query.filter_by(activo=True)
-            
-            if search:
-                query = query.filter(
-                    db.or_(
-                        Cliente.nombre.contains(search),
-                        Cliente.apellido.contains(search),
-                        Cliente.email.contains(search),
-                        Cliente.telefono.contains(search)
-                    )
-                )
-            
-            clientes = query.order_by(Cliente.apellido, Cliente.nombre).all()
-            
-            # Crear DataFrame
-            data = []
-            for cliente in clientes:
-                try:
-                    # Obtener información de obra social y plan de forma segura
-                    obra_social_nombre = 'Particular'
-                    plan_nombre = ''
-                    
-                    try:
-                        if cliente.obra_social:
-                            obra_social_nombre = cliente.obra_social.nombre
-                        if cliente.plan:
-                            plan_nombre = cliente.plan.nombre
-                    except Exception as e:
-                        print(f"Error accediendo a relaciones del cliente {cliente.id}: {e}")
-                    
-                    data.append({
-                        'ID': cliente.id,
-                        'Nombre': cliente.nombre,
-                        'Apellido': cliente.apellido,
-                        'Teléfono': cliente.telefono or '',
-                        'Email': cliente.email or '',
-                        'Obra Social': obra_social_nombre,
-                        'Plan': plan_nombre,
-                        'Número Afiliado': cliente.numero_afiliado or '',
-                        'Grupo Familiar': cliente.grupo_familiar or '',
-                        'Fecha Creación': cliente.fecha_creacion.strftime('%Y-%m-%d %H:%M:%S') if cliente.fecha_creacion else ''
-                    })
-                except Exception as e:
-                    # Si hay un error con un cliente específico, lo saltamos y continuamos
-                    print(f"Error procesando cliente {cliente.id}: {e}")
-                    continue
+            query = ClienteService.query_exportacion(search)
             
-            if not data:
-                # Si no hay datos, crear un Excel vacío con headers
-                df = pd.DataFrame(columns=[
-                    'ID', 'Nombre', 'Apellido', 'Teléfono', 'Email', 
-                    'Obra Social', 'Plan', 'Número Afiliado', 'Grupo Familiar', 'Fecha Creación'
-                ])
-            else:
-                df = pd.DataFrame(data)
-            
-            # Crear archivo Excel
-            output = BytesIO()
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='Clientes', index=False)
-            
-            output.seek(0)
-            
-            response = make_response(output.read())
-            response.headers['Content-Type'] = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            response.headers['Content-Disposition'] = 'attachment; filename=clientes.xlsx'
-            
-            return response
+            return generar_excel_streaming(
+                ClienteService.COLUMNAS_EXPORTACION,
+                ClienteService.iterar_filas_exportacion(query),
+                'clientes',
+                'Clientes'
+            )
             
         except Exception as e:
             print(f"Error general en exportar_excel: {e}")
             raise e
     
     @staticmethod
+    @memoizar('clientes')
+    @solo_lectura
     def get_estadisticas_clientes():
         """Obtener estadísticas generales de clientes"""
         total_clientes = Cliente.query.filter_by(activo=True).count()
@@ -250,6 +247,7 @@ class ClienteService:
         }
     
     @staticmethod
+    @solo_lectura
     def clientes_recientes(limite=5):
         """Obtener clientes más recientes"""
         return Cliente.query.filter_by(activo=True).order_by(
@@ -274,7 +272,9 @@ class ClienteService:
                 errores.append('El formato del email no es válido')
             else:
                 # Verificar unicidad del email
-                query = Cliente.query.filter_by(email=data['email'], activo=True)
+                query = Cliente.query.filter(
+                    db.func.lower(Cliente.email) == data['email'].lower(), Cliente.activo == True
+                )
                 if cliente_id:
                     query = query.filter(Cliente.id != cliente_id)
                 
@@ -288,77 +288,27 @@ class ClienteService:
         return errores
     
     @staticmethod
+    @solo_lectura
     def exportar_csv(search=''):
-        """Exportar clientes a CSV"""
-        try:
-            query = Cliente.query.filter_by(activo=True)
-            
-            if search:
-                query = query.filter(
-                    db.or_(
-                        Cliente.nombre.contains(search),
-                        Cliente.apellido.contains(search),
-                        Cliente.email.contains(search),
-                        Cliente.telefono.contains(search)
-                    )
-                )
-            
-            clientes = query.order_by(Cliente.apellido, Cliente.nombre).all()
-            
-            # Crear CSV
-            data = []
-            
-            for cliente in clientes:
-                try:
-                    # Obtener información de obra social y plan de forma segura
-                    obra_social_nombre = 'Particular'
-                    plan_nombre = ''
-                    
-                    try:
-                        if cliente.obra_social:
-                            obra_social_nombre = cliente.obra_social.nombre
-                        if cliente.plan:
-                            plan_nombre = cliente.plan.nombre
-                    except Exception as e:
-                        print(f"Error accediendo a relaciones del cliente {cliente.id}: {e}")
-                    
-                    data.append({
-                        'ID': cliente.id,
-                        'Nombre': cliente.nombre,
-                        'Apellido': cliente.apellido,
-                        'Teléfono': cliente.telefono or '',
-                        'Email': cliente.email or '',
-                        'Obra Social': obra_social_nombre,
-                        'Plan': plan_nombre,
-                        'Número Afiliado': cliente.numero_afiliado or '',
-                        'Grupo Familiar': cliente.grupo_familiar or '',
-                        'Fecha Creación': cliente.fecha_creacion.strftime('%Y-%m-%d %H:%M:%S') if cliente.fecha_creacion else ''
-                    })
-                except Exception as e:
-                    # Si hay un error con un cliente específico, lo saltamos y continuamos
-                    print(f"Error procesando cliente {cliente.id}: {e}")
-                    continue
-            
-            if not data:
-                # Si no hay datos, crear un CSV vacío con headers
-                df = pd.DataFrame(columns=[
-                    'ID', 'Nombre', 'Apellido', 'Teléfono', 'Email', 
-                    'Obra Social', 'Plan', 'Número Afiliado', 'Grupo Familiar', 'Fecha Creación'
-                ])
-            else:
-                df = pd.DataFrame(data)
-            
-            # Crear archivo CSV
-            output = BytesIO()
-            df.to_csv(output, index=False, encoding='utf-8-sig')  # UTF-8 con BOM para Excel
-            output.seek(0)
-            
-            response = make_response(output.read())
-            response.headers['Content-Type'] = 'text/csv; charset=utf-8'
-            response.headers['Content-Disposition'] = 'attachment; filename=clientes.csv'
-            
-            return response
-            
-        except Exception as e:
-            print(f"Error general en exportar_csv: {e}")
-            raise e
\ No newline at end of file
+        """Exportar clientes a CSV en streaming (UTF-8 con BOM para Excel)"""
+        query = ClienteService.query_exportacion(search)
+        
+        return generar_csv_streaming(
+            ClienteService.COLUMNAS_EXPORTACION,
+            ClienteService.iterar_filas_exportacion(query),
+            'clientes',
+            bom=True
+        )
+    
+    @staticmethod
+    @solo_lectura
+    def exportar_pdf(search=''):
+        """Exportar clientes a un reporte PDF paginado"""
+        query = ClienteService.query_exportacion(search)
+        
+        return generar_pdf_streaming(
+            ClienteService.COLUMNAS_EXPORTACION,
+            ClienteService.iterar_filas_exportacion(query),
+            'clientes',
+            'Reporte de Clientes'
+        )
@@ -0,0 +1,241 @@
+from bisect import bisect_right
+from contextlib import contextmanager
+from datetime import datetime, time
+from flask import current_app
+from sqlalchemy import select, text
+from sqlalchemy.exc import OperationalError
+from src.models import Turno, Servicio, Profesional
+from src.database import db
+
+# Estados que bloquean la agenda del profesional
+ESTADOS_OCUPADOS = ('pendiente', 'confirmado')
+
+# Horarios típicos de consultorio por día de la semana (0 = lunes)
+HORARIOS_TRABAJO = {
+    0: (time(8, 0), time(18, 0)),
+    1: (time(8, 0), time(18, 0)),
+    2: (time(8, 0), time(18, 0)),
+    3: (time(8, 0), time(18, 0)),
+    4: (time(8, 0), time(18, 0)),
+    5: (time(9, 0), time(13, 0)),
+    6: None  # No se trabaja los domingos
+}
+
+INTERVALO_TURNOS = 30  # minutos
+
+# Espera máxima por la agenda de un profesional que otro usuario está reservando
+TURNO_LOCK_TIMEOUT_MS = 3000
+
+
+class ReservaEnConflicto(ValueError):
+    """Otro usuario está reservando en la misma agenda"""
+
+
+def a_minutos(hora):
+    """Convertir un objeto time (o 'HH:MM') a minutos desde medianoche"""
+    if isinstance(hora, str):
+        hora = datetime.strptime(hora, '%H:%M').time()
+    return hora.hour * 60 + hora.minute
+
+
+def minutos_a_texto(minutos):
+    """Convertir minutos desde medianoche a 'HH:MM'"""
+    return f"{minutos // 60:02d}:{minutos % 60:02d}"
+
+
+class AgendaOcupada:
+    """Intervalos ocupados de un profesional en un día.
+
+    Los intervalos se guardan fusionados y ordenados en dos listas paralelas
+    (inicios y fines, en minutos), de modo que una consulta de solapamiento es
+    una búsqueda binaria y un barrido de candidatos es lineal.
+    """
+
+    __slots__ = ('inicios', 'fines')
+
+    def __init__(self, intervalos=()):
+        self.inicios = []
+        self.fines = []
+
+        for inicio, fin in sorted(intervalos):
+            if self.fines and inicio <= self.fines[-1]:
+                # Se solapa (o toca) con el anterior: fusionar
+                if fin > self.fines[-1]:
+                    self.fines[-1] = fin
+            else:
+                self.inicios.append(inicio)
+                self.fines.append(fin)
+
+    def __len__(self):
+        return len(self.inicios)
+
+    def esta_libre(self, inicio, fin):
+        """Verificar que [inicio, fin) no se solape con ningún intervalo ocupado"""
+        # Primer intervalo que termina después del inicio pedido
+        i = bisect_right(self.fines, inicio)
+        return i == len(self.inicios) or self.inicios[i] >= fin
+
+    def agregar(self, inicio, fin):
+        """Marcar [inicio, fin) como ocupado manteniendo la estructura fusionada"""
+        intervalos = list(zip(self.inicios, self.fines))
+        intervalos.append((inicio, fin))
+        self.__init__(intervalos)
+
+    def filtrar_libres(self, candidatos, duracion):
+        """Barrido conjunto de candidatos (ordenados) contra los intervalos ocupados"""
+        libres = []
+        i = 0
+        total = len(self.inicios)
+
+        for inicio in candidatos:
+            # Descartar intervalos que terminan antes del candidato
+            while i < total and self.fines[i] <= inicio:
+                i += 1
+
+            if i == total or self.inicios[i] >= inicio + duracion:
+                libres.append(inicio)
+
+        return libres
+
+
+class DisponibilidadService:
+
+    @staticmethod
+    def cargar_agendas(profesional_ids, fecha_inicio, fecha_fin=None, excluir_turno_id=None):
+        """Cargar en una sola consulta los intervalos ocupados por profesional y fecha.
+
+        Devuelve un diccionario {(profesional_id, fecha): AgendaOcupada}. Las
+        combinaciones sin turnos no aparecen en el resultado.
+        """
+        if fecha_fin is None:
+            fecha_fin = fecha_inicio
+
+        query = db.session.query(
+            Turno.profesional_id,
+            Turno.fecha,
+            Turno.hora,
+            Servicio.duracion
+        ).join(
+            Servicio, Turno.servicio_id == Servicio.id
+        ).filter(
+            Turno.profesional_id.in_(list(profesional_ids)),
+            Turno.fecha >= fecha_inicio,
+            Turno.fecha <= fecha_fin,
+            Turno.estado.in_(ESTADOS_OCUPADOS)
+        )
+
+        if excluir_turno_id:
+            query = query.filter(Turno.id != excluir_turno_id)
+
+        intervalos = {}
+        for profesional_id, fecha, hora, duracion in query:
+            inicio = a_minutos(hora)
+            intervalos.setdefault((profesional_id, fecha), []).append(
+                (inicio, inicio + (duracion or 60))
+            )
+
+        return {clave: AgendaOcupada(valores) for clave, valores in intervalos.items()}
+
+    @staticmethod
+    def get_agenda(profesional_id, fecha, excluir_turno_id=None):
+        """Obtener la agenda ocupada de un profesional para un día"""
+        agendas = DisponibilidadService.cargar_agendas(
+            [profesional_id], fecha, fecha, excluir_turno_id
+        )
+        return agendas.get((int(profesional_id), fecha), AgendaOcupada())
+
+    @staticmethod
+    def generar_candidatos(hora_inicio, hora_fin, duracion=None, intervalo=INTERVALO_TURNOS):
+        """Generar horarios candidatos (en minutos) dentro de la jornada.
+
+        Si se indica duración, el turno completo debe terminar antes del fin de la
+        jornada; si no, alcanza con que comience antes.
+        """
+        inicio = a_minutos(hora_inicio)
+        limite = a_minutos(hora_fin)
+
+        if duracion:
+            return list(range(inicio, limite - duracion + 1, intervalo))
+        return list(range(inicio, limite, intervalo))
+
+    @staticmethod
+    def get_horarios_libres(profesional_id, fecha, hora_inicio, hora_fin, duracion,
+                            intervalo=INTERVALO_TURNOS, ajustar_a_fin=True, agenda=None):
+        """Obtener horarios libres ('HH:MM') de un profesional en una fecha"""
+        if agenda is None:
+            agenda = DisponibilidadService.get_agenda(profesional_id, fecha)
+
+        candidatos = DisponibilidadService.generar_candidatos(
+            hora_inicio, hora_fin, duracion if ajustar_a_fin else None, intervalo
+        )
+
+        return [minutos_a_texto(m) for m in agenda.filtrar_libres(candidatos, duracion)]
+
+    @staticmethod
+    def esta_disponible(profesional_id, fecha, hora, duracion, excluir_turno_id=None):
+        """Verificar si un profesional está libre en [hora, hora + duración)"""
+        agenda = DisponibilidadService.get_agenda(profesional_id, fecha, excluir_turno_id)
+        inicio = a_minutos(hora)
+        return agenda.esta_libre(inicio, inicio + duracion)
+
+    @staticmethod
+    def bloquear_agenda(profesional_id, fecha):
+        """Tomar el bloqueo de la agenda (profesional, fecha) hasta el fin de la transacción.
+
+        En SQLite abre la transacción con BEGIN IMMEDIATE (un único escritor a la
+        vez); en PostgreSQL toma un advisory lock por profesional y día; en otros
+        motores bloquea la fila del profesional con SELECT ... FOR UPDATE. Si no se
+        obtiene dentro de TURNO_LOCK_TIMEOUT_MS se lanza ReservaEnConflicto.
+        """
+        espera_ms = int(current_app.config.get('TURNO_LOCK_TIMEOUT_MS', TURNO_LOCK_TIMEOUT_MS))
+        conexion = db.session.connection()
+        dialecto = conexion.dialect.name
+
+        try:
+            if dialecto == 'sqlite':
+                # pysqlite solo abre la transacción al escribir: si ya está abierta,
+                # esta sesión ya tiene el bloqueo de escritura
+                if not conexion.connection.dbapi_connection.in_transaction:
+                    espera_anterior = conexion.exec_driver_sql('PRAGMA busy_timeout').scalar()
+                    conexion.exec_driver_sql(f'PRAGMA busy_timeout = {espera_ms}')
+                    try:
+                        conexion.exec_driver_sql('BEGIN IMMEDIATE')
+                    finally:
+                        conexion.exec_driver_sql(f'PRAGMA busy_timeout = {int(espera_anterior)}')
+
+            elif dialecto == 'postgresql':
+                conexion.exec_driver_sql(f'SET LOCAL lock_timeout = {espera_ms}')
+                conexion.execute(
+                    text('SELECT pg_advisory_xact_lock(:profesional_id, :dia)'),
+                    {'profesional_id': int(profesional_id), 'dia': fecha.toordinal()}
+                )
+
+            else:
+                conexion.execute(
+                    select(Profesional.id).where(Profesional.id == profesional_id).with_for_update()
+                )
+
+        except OperationalError as e:
+            raise ReservaEnConflicto(
+                'Otro usuario está reservando en la agenda de este profesional, intente nuevamente'
+            ) from e
+
+    @staticmethod
+    @contextmanager
+    def reserva_exclusiva(profesional_id, fecha):
+        """Serializar las reservas de una agenda: verificar disponibilidad y guardar
+        dentro del bloque; si el bloque falla se deshace la transacción y se libera
+        el bloqueo"""
+        try:
+            DisponibilidadService.bloquear_agenda(profesional_id, fecha)
+            yield
+        except Exception:
+            db.session.rollback()
+            raise
+
+    @staticmethod
+    def get_horario_trabajo(fecha):
+        """Obtener (inicio, fin) de la jornada para una fecha, o None si no se trabaja"""
+        if isinstance(fecha, datetime):
+            fecha = fecha.date()
+        return HORARIOS_TRABAJO.get(fecha.weekday())
@@ -0,0 +1,282 @@
+import os
+import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, date, timedelta
+from flask import current_app
+from src.models import TrabajoExportacion
+from src.database import db
+from src.utils.exports import escribir_csv, escribir_excel, escribir_pdf
+from src.utils.metrics import observar_exportacion
+from src.services.turno_service import TurnoService
+from src.services.cliente_service import ClienteService
+from src.services.autorizacion_service import AutorizacionService
+from src.services.obra_social_service import ObraSocialService
+from src.services.plan_obra_social_service import PlanObraSocialService
+
+# Valores por defecto si la configuración no los define
+EXPORT_MAX_WORKERS = 2
+EXPORT_MAX_PENDING = 10
+EXPORT_RETENTION_HOURS = 24
+EXPORT_JOB_TIMEOUT_MINUTES = 60
+
+EXTENSIONES = {
+    'csv': 'csv',
+    'excel': 'xlsx',
+    'pdf': 'pdf'
+}
+
+ESTADOS_EN_CURSO = ('pendiente', 'procesando')
+
+
+class ColaExportacionLlena(ValueError):
+    """Se alcanzó el máximo de exportaciones en curso"""
+
+
+def _exportacion_turnos(parametros, formato):
+    consulta = TurnoService.consulta_exportacion(parametros.get('fecha_desde'), parametros.get('fecha_hasta'))
+    filas = TurnoService.iterar_filas_exportacion(consulta, precio_como_moneda=(formato != 'csv'))
+    return TurnoService.COLUMNAS_EXPORTACION, filas, f'turnos_{date.today().strftime("%Y%m%d")}', 'Turnos', False
+
+
+def _exportacion_clientes(parametros, formato):
+    query = ClienteService.query_exportacion(parametros.get('search', ''))
+    filas = ClienteService.iterar_filas_exportacion(query)
+    return ClienteService.COLUMNAS_EXPORTACION, filas, 'clientes', 'Clientes', True
+
+
+def _exportacion_autorizaciones(parametros, formato):
+    query = AutorizacionService.query_exportacion(
+        parametros.get('search', ''), parametros.get('estado'), parametros.get('obra_social_id')
+    )
+    filas = AutorizacionService.iterar_filas_exportacion(query)
+    return AutorizacionService.COLUMNAS_EXPORTACION, filas, 'autorizaciones', 'Autorizaciones', False
+
+
+def _exportacion_obras_sociales(parametros, formato):
+    query = ObraSocialService.query_exportacion(parametros.get('search', ''), parametros.get('tipo'))
+    filas = ObraSocialService.iterar_filas_exportacion(query)
+    return ObraSocialService.COLUMNAS_EXPORTACION, filas, 'obras_sociales', 'Obras Sociales', False
+
+
+def _exportacion_planes(parametros, formato):
+    query = PlanObraSocialService.query_exportacion(parametros.get('search', ''), parametros.get('obra_social_id'))
+    filas = PlanObraSocialService.iterar_filas_exportacion(query)
+    return PlanObraSocialService.COLUMNAS_EXPORTACION, filas, 'planes_obra_social', 'Planes Obra Social', False
+
+
+# Tipo de exportación -> función que arma (columnas, filas, nombre, hoja, bom)
+EXPORTACIONES = {
+    'turnos': _exportacion_turnos,
+    'clientes': _exportacion_clientes,
+    'autorizaciones': _exportacion_autorizaciones,
+    'obras_sociales': _exportacion_obras_sociales,
+    'planes': _exportacion_planes
+}
+
+
+def _ejecutar(app, trabajo_id):
+    """Generar el archivo de un trabajo (se ejecuta en un hilo del pool)"""
+    with app.app_context():
+        trabajo = db.session.get(TrabajoExportacion, trabajo_id)
+        # Ya purgado o dado por interrumpido mientras esperaba en la cola
+        if trabajo is None or trabajo.estado != 'pendiente':
+            return
+        
+        trabajo.estado = 'procesando'
+        trabajo.fecha_inicio = datetime.utcnow()
+        db.session.commit()
+        inicio = time.perf_counter()
+        
+        extension = EXTENSIONES[trabajo.formato]
+        directorio = ExportacionService.get_directorio()
+        ruta = os.path.join(directorio, f'{trabajo.id}.{extension}')
+        temporal = f'{ruta}.tmp'
+        
+        try:
+            columnas, filas, nombre, hoja, bom = EXPORTACIONES[trabajo.tipo](
+                trabajo.parametros_dict, trabajo.formato
+            )
+            
+            if trabajo.formato == 'csv':
+                with open(temporal, 'w', newline='', encoding='utf-8') as archivo:
+                    total = escribir_csv(archivo, columnas, filas, bom=bom)
+            elif trabajo.formato == 'pdf':
+                with open(temporal, 'wb') as archivo:
+                    total = escribir_pdf(archivo, columnas, filas, f'Reporte de {hoja}')
+            else:
+                with open(temporal, 'wb') as archivo:
+                    total = escribir_excel(archivo, columnas, filas, hoja)
+            
+            # El archivo final solo aparece cuando está completo
+            os.replace(temporal, ruta)
+            
+            trabajo.estado = 'completado'
+            trabajo.archivo = os.path.basename(ruta)
+            trabajo.nombre_descarga = f'{nombre}.{extension}'
+            trabajo.filas = total
+        
+        except Exception as e:
+            print(f"❌ Error en la exportación {trabajo_id}: {e}")
+            db.session.rollback()
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            
+            trabajo = db.session.get(TrabajoExportacion, trabajo_id)
+            if trabajo is None:
+                return
+            trabajo.estado = 'error'
+            trabajo.error = str(e)
+        
+        trabajo.fecha_fin = datetime.utcnow()
+        db.session.commit()
+        
+        observar_exportacion(trabajo.tipo, trabajo.formato, trabajo.estado, trabajo.filas, time.perf_counter() - inicio)
+
+
+class ExportacionService:
+    """Cola local de exportaciones en segundo plano.
+    
+    Los trabajos se registran en la tabla trabajos_exportacion y se ejecutan en
+    un ThreadPoolExecutor por aplicación con EXPORT_MAX_WORKERS hilos, de modo
+    que las exportaciones grandes no ocupan los workers que atienden requests.
+    Con EXPORT_MAX_WORKERS = 0 se ejecutan en el mismo request (útil en tests).
+    """
+    
+    @staticmethod
+    def get_directorio():
+        """Directorio donde se guardan los archivos generados (instance/exports por defecto)"""
+        directorio = current_app.config.get('EXPORT_DIR') or os.path.join(current_app.instance_path, 'exports')
+        os.makedirs(directorio, exist_ok=True)
+        return directorio
+    
+    @staticmethod
+    def _get_executor(app):
+        """Pool de hilos de exportación de la aplicación (se crea la primera vez)"""
+        executor = app.extensions.get('exportaciones')
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=app.config.get('EXPORT_MAX_WORKERS', EXPORT_MAX_WORKERS),
+                thread_name_prefix='exportacion'
+            )
+            app.extensions['exportaciones'] = executor
+        return executor
+    
+    @staticmethod
+    def encolar(tipo, formato, parametros=None, usuario_id=None):
+        """Registrar un trabajo de exportación y enviarlo al pool. Devuelve el trabajo"""
+        if tipo not in EXPORTACIONES:
+            raise ValueError(f'Tipo de exportación no soportado: {tipo}')
+        if formato not in EXTENSIONES:
+            raise ValueError(f'Formato de exportación no válido: {formato}')
+        
+        app = current_app._get_current_object()
+        
+        # Aprovechar el alta para descartar archivos vencidos y liberar la cola
+        ExportacionService.purgar()
+        ExportacionService.marcar_interrumpidos()
+        
+        en_curso = TrabajoExportacion.query.filter(
+            TrabajoExportacion.estado.in_(ESTADOS_EN_CURSO)
+        ).count()
+        maximo = app.config.get('EXPORT_MAX_PENDING', EXPORT_MAX_PENDING)
+        if en_curso >= maximo:
+            raise ColaExportacionLlena(
+                f'Hay {en_curso} exportaciones en curso, intente nuevamente en unos minutos'
+            )
+        
+        trabajo = TrabajoExportacion(
+            id=uuid.uuid4().hex,
+            tipo=tipo,
+            formato=formato,
+            parametros=json.dumps({k: v for k, v in (parametros or {}).items() if v}),
+            estado='pendiente',
+            usuario_id=usuario_id
+        )
+        db.session.add(trabajo)
+        db.session.commit()
+        
+        if app.config.get('EXPORT_MAX_WORKERS', EXPORT_MAX_WORKERS) <= 0:
+            _ejecutar(app, trabajo.id)
+            db.session.refresh(trabajo)
+        else:
+            ExportacionService._get_executor(app).submit(_ejecutar, app, trabajo.id)
+        
+        return trabajo
+    
+    @staticmethod
+    def marcar_interrumpidos(minutos=None):
+        """Marcar como error los trabajos en curso más viejos que EXPORT_JOB_TIMEOUT_MINUTES.
+        
+        Un reinicio o deploy mata los hilos del pool sin actualizar sus trabajos,
+        que de otro modo seguirían ocupando lugar en la cola. Devuelve la cantidad
+        de trabajos marcados.
+        """
+        if minutos is None:
+            minutos = current_app.config.get('EXPORT_JOB_TIMEOUT_MINUTES', EXPORT_JOB_TIMEOUT_MINUTES)
+        limite = datetime.utcnow() - timedelta(minutes=minutos)
+        
+        interrumpidos = TrabajoExportacion.query.filter(
+            TrabajoExportacion.estado.in_(ESTADOS_EN_CURSO),
+            db.func.coalesce(TrabajoExportacion.fecha_inicio, TrabajoExportacion.fecha_creacion) < limite
+        ).all()
+        for trabajo in interrumpidos:
+            trabajo.estado = 'error'
+            trabajo.error = f'Trabajo interrumpido: sin terminar después de {minutos} minutos'
+            trabajo.fecha_fin = datetime.utcnow()
+        if interrumpidos:
+            db.session.commit()
+        
+        return len(interrumpidos)
+    
+    @staticmethod
+    def get_trabajo(trabajo_id):
+        """Obtener trabajo por ID"""
+        return db.session.get(TrabajoExportacion, trabajo_id)
+    
+    @staticmethod
+    def get_trabajos_recientes(usuario_id=None, limite=20):
+        """Últimos trabajos (de un usuario, si se indica)"""
+        query = TrabajoExportacion.query
+        if usuario_id:
+            query = query.filter(TrabajoExportacion.usuario_id == usuario_id)
+        return query.order_by(TrabajoExportacion.fecha_creacion.desc()).limit(limite).all()
+    
+    @staticmethod
+    def get_ruta_archivo(trabajo):
+        """Ruta absoluta del archivo de un trabajo completado, o None"""
+        if trabajo.estado != 'completado' or not trabajo.archivo:
+            return None
+        
+        ruta = os.path.join(ExportacionService.get_directorio(), trabajo.archivo)
+        return ruta if os.path.exists(ruta) else None
+    
+    @staticmethod
+    def purgar(horas=None):
+        """Eliminar trabajos terminados y archivos más antiguos que la retención. Devuelve los trabajos eliminados"""
+        if horas is None:
+            horas = current_app.config.get('EXPORT_RETENTION_HOURS', EXPORT_RETENTION_HOURS)
+        limite = datetime.utcnow() - timedelta(hours=horas)
+        limite_archivos = time.time() - horas * 3600
+        directorio = ExportacionService.get_directorio()
+        
+        # Los trabajos en curso se conservan: su hilo todavía los va a actualizar
+        vencidos = TrabajoExportacion.query.filter(
+            TrabajoExportacion.fecha_creacion < limite,
+            TrabajoExportacion.estado.notin_(ESTADOS_EN_CURSO)
+        ).all()
+        for trabajo in vencidos:
+            db.session.delete(trabajo)
+        db.session.commit()
+        
+        # Archivos vencidos, incluidos los que quedaron sin trabajo asociado
+        for nombre in os.listdir(directorio):
+            ruta = os.path.join(directorio, nombre)
+            try:
+                if os.path.isfile(ruta) and os.path.getmtime(ruta) < limite_archivos:
+                    os.remove(ruta)
+            except OSError as e:
+                print(f"⚠️ No se pudo eliminar {ruta}: {e}")
+        
+        return len(vencidos)
@@ -1,18 +1,31 @@
-from flask import make_response
 from src.models import ObraSocial, PlanObraSocial, Cliente
 from src.database import db
 from src.utils.validators import validar_email, validar_telefono
-from src.utils.exports import generar_excel, generar_csv
-import pandas as pd
-from io import BytesIO
+from src.services.busqueda_service import BusquedaService
+from src.utils.paginacion import paginar_keyset
+from src.utils.exports import generar_excel_streaming, generar_csv_streaming, TAMANIO_LOTE_EXPORTACION
 from datetime import datetime, date
+from src.replica import solo_lectura
+from src.services.catalogo_cache import CatalogoCache
+from src.utils.cache import memoizar, invalidar_al_modificar
+
+invalidar_al_modificar('obras_sociales', ObraSocial)
 
 class ObraSocialService:
     
+    # Encabezados de las exportaciones de obras sociales (CSV, Excel)
+    COLUMNAS_EXPORTACION = [
+        'ID', 'Nombre', 'Código', 'Tipo', 'CUIT', 'Dirección', 'Teléfono', 'Email',
+        'Contacto', 'Cobertura', 'Requiere Autorización', 'Días Autorización', 'Fecha Creación'
+    ]
+    
+    # Orden de los listados (el id desempata para la paginación por cursor)
+    ORDEN_LISTADO = (ObraSocial.nombre, ObraSocial.id)
+    
     @staticmethod
     def get_all_obras_sociales():
-        """Obtener todas las obras sociales activas"""
-        return ObraSocial.query.filter_by(activo=True).order_by(ObraSocial.nombre).all()
+        """Obtener todas las obras sociales activas (desde la caché de catálogos, solo lectura)"""
+        return CatalogoCache.obtener('obras_sociales')
     
     @staticmethod
     def get_obra_social_by_id(id):
@@ -25,8 +38,25 @@ class ObraSocialService:
         return ObraSocial.query.filter_by(codigo=codigo, activo=True).first()
     
     @staticmethod
+    @solo_lectura
     def get_paginated_obras_sociales(page=1, per_page=10, search='', tipo=None):
         """Obtener obras sociales con paginación y búsqueda"""
+        return ObraSocialService.query_listado(search, tipo).order_by(*ObraSocialService.ORDEN_LISTADO).paginate(
+            page=page, per_page=per_page, error_out=False
+        )
+    
+    @staticmethod
+    @solo_lectura
+    def get_obras_sociales_por_cursor(cursor=None, per_page=10, search='', tipo=None, contar=None):
+        """Obtener una página de obras sociales por cursor (keyset), sin OFFSET ni COUNT por página"""
+        return paginar_keyset(
+            ObraSocialService.query_listado(search, tipo), 'obras_sociales', ObraSocialService.ORDEN_LISTADO,
+            cursor=cursor, per_page=per_page, contar=contar
+        )
+    
+    @staticmethod
+    def query_listado(search='', tipo=None):
+        """Query de obras sociales activas del listado, con búsqueda y filtros (sin orden)"""
         query = ObraSocial.query.filter_by(activo=True)
         
         if search:
@@ -41,23 +71,27 @@ class ObraSocialService:
         if tipo:
             query = query.filter(ObraSocial.tipo == tipo)
         
-        return query.order_by(ObraSocial.nombre).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        return query
     
     @staticmethod
+    @solo_lectura
     def buscar_obras_sociales(query, limit=10):
         """Buscar obras sociales para autocompletado"""
         if not query:
             return []
         
-        return ObraSocial.query.filter(
-            ObraSocial.activo == True,
-            db.or_(
-                ObraSocial.nombre.contains(query),
-                ObraSocial.codigo.contains(query)
+        # Índice de búsqueda global si está disponible (solo tiene las activas)
+        filtro = BusquedaService.filtro_entidad('obra_social', query)
+        if filtro is None:
+            filtro = db.and_(
+                ObraSocial.activo == True,
+                db.or_(
+                    ObraSocial.nombre.contains(query),
+                    ObraSocial.codigo.contains(query)
+                )
             )
-        ).limit(limit).all()
+        
+        return ObraSocial.query.filter(filtro).limit(limit).all()
     
     @staticmethod
     def crear_obra_social(data):
@@ -99,6 +133,7 @@ class ObraSocialService:
         
         db.session.add(obra_social)
         db.session.commit()
+        CatalogoCache.invalidar('obras_sociales', 'planes')
         
         return obra_social
     
@@ -157,6 +192,7 @@ class ObraSocialService:
             obra_social.notas = data['notas'].strip() or None
         
         db.session.commit()
+        CatalogoCache.invalidar('obras_sociales', 'planes')
         return obra_social
     
     @staticmethod
@@ -176,9 +212,12 @@ class ObraSocialService:
         
         obra_social.activo = False
         db.session.commit()
+        CatalogoCache.invalidar('obras_sociales', 'planes')
         return True
     
     @staticmethod
+    @memoizar('obras_sociales')
+    @solo_lectura
     def get_estadisticas_obras_sociales():
         """Obtener estadísticas generales de obras sociales"""
         total_obras = ObraSocial.query.filter_by(activo=True).count()
@@ -202,8 +241,8 @@ class ObraSocialService:
         return estadisticas
     
     @staticmethod
-    def exportar_excel(search='', tipo=None):
-        """Exportar obras sociales a Excel"""
+    def query_exportacion(search='', tipo=None):
+        """Query ordenada de obras sociales activas a exportar"""
         query = ObraSocial.query.filter_by(activo=True)
         
         if search:
@@ -218,91 +257,58 @@ class ObraSocialService:
         if tipo:
             query = query.filter(ObraSocial.tipo == tipo)
         
-        obras = query.order_by(ObraSocial.nombre).all()
-        
-        # Crear DataFrame
-        data = []
-        for obra in obras:
-            data.append({
-                'ID': obra.id,
-                'Nombre': obra.nombre,
-                'Código': obra.codigo,
-                'Tipo': obra.tipo_display,
-                'CUIT': obra.cuit or '',
-                'Dirección': obra.direccion or '',
-                'Teléfono': obra.telefono or '',
-                'Email': obra.email or '',
-                'Contacto': obra.contacto_nombre or '',
-                'Cobertura': obra.cobertura_display,
-                'Requiere Autorización': 'Sí' if obra.requiere_autorizacion else 'No',
-                'Días Autorización': obra.dias_autorizacion,
-                'Fecha Creación': obra.fecha_creacion.strftime('%Y-%m-%d %H:%M:%S')
-            })
-        
-        df = pd.DataFrame(data)
-        
-        # Crear archivo Excel
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Obras Sociales', index=False)
-        
-        output.seek(0)
-        
-        response = make_response(output.read())
-        response.headers['Content-Type'] = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        response.headers['Content-Disposition'] = 'attachment; filename=obras_sociales.xlsx'
-        
-        return response
+        return query.order_by(ObraSocial.nombre, ObraSocial.id)
+    
+    @staticmethod
+    def fila_exportacion(obra):
+        """Valores de una obra social en el orden de COLUMNAS_EXPORTACION"""
+        return [
+            obra.id,
+            obra.nombre,
+            obra.codigo,
+            obra.tipo_display,
+            obra.cuit or '',
+            obra.direccion or '',
+            obra.telefono or '',
+            obra.email or '',
+            obra.contacto_nombre or '',
+            obra.cobertura_display,
+            'Sí' if obra.requiere_autorizacion else 'No',
+            obra.dias_autorizacion,
+            obra.fecha_creacion.strftime('%Y-%m-%d %H:%M:%S')
+        ]
     
     @staticmethod
+    @solo_lectura
+    def iterar_filas_exportacion(query):
+        """Recorrer la query por lotes devolviendo una fila (lista) por obra social"""
+        for obra in query.yield_per(TAMANIO_LOTE_EXPORTACION):
+            yield ObraSocialService.fila_exportacion(obra)
+    
+    @staticmethod
+    @solo_lectura
+    def exportar_excel(search='', tipo=None):
+        """Exportar obras sociales a Excel con memoria acotada"""
+        query = ObraSocialService.query_exportacion(search, tipo)
+        
+        return generar_excel_streaming(
+            ObraSocialService.COLUMNAS_EXPORTACION,
+            ObraSocialService.iterar_filas_exportacion(query),
+            'obras_sociales',
+            'Obras Sociales'
+        )
+    
+    @staticmethod
+    @solo_lectura
     def exportar_csv(search='', tipo=None):
-        """Exportar obras sociales a CSV"""
-        query = ObraSocial.query.filter_by(activo=True)
-        
-        if search:
-            query = query.filter(
-                db.or_(
-                    ObraSocial.nombre.contains(search),
-                    ObraSocial.codigo.contains(search),
-                    ObraSocial.cuit.contains(search)
-                )
-            )
+        """Exportar obras sociales a CSV en streaming"""
+        query = ObraSocialService.query_exportacion(search, tipo)
         
-        if tipo:
-            query = query.filter(ObraSocial.tipo == tipo)
-        
-        obras = query.order_by(ObraSocial.nombre).all()
-        
-        # Crear CSV
-        output = BytesIO()
-        data = []
-        
-        for obra in obras:
-            data.append({
-                'ID': obra.id,
-                'Nombre': obra.nombre,
-                'Código': obra.codigo,
-                'Tipo': obra.tipo_display,
-                'CUIT': obra.cuit or '',
-                'Dirección': obra.direccion or '',
-                'Teléfono': obra.telefono or '',
-                'Email': obra.email or '',
-                'Contacto': obra.contacto_nombre or '',
-                'Cobertura': obra.cobertura_display,
-                'Requiere Autorización': 'Sí' if obra.requiere_autorizacion else 'No',
-                'Días Autorización': obra.dias_autorizacion,
-                'Fecha Creación': obra.fecha_creacion.strftime('%Y-%m-%d %H:%M:%S')
-            })
-        
-        df = pd.DataFrame(data)
-        df.to_csv(output, index=False, encoding='utf-8')
-        output.seek(0)
-        
-        response = make_response(output.read())
-        response.headers['Content-Type'] = 'text/csv'
-        response.headers['Content-Disposition'] = 'attachment; filename=obras_sociales.csv'
-        
-        return response
+        return generar_csv_streaming(
+            ObraSocialService.COLUMNAS_EXPORTACION,
+            ObraSocialService.iterar_filas_exportacion(query),
+            'obras_sociales'
+        )
     
     @staticmethod
     def validar_datos_obra_social(data, obra_social_id=None):
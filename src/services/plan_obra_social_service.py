@@ -1,16 +1,28 @@
-from flask import make_response
 from src.models import PlanObraSocial, ObraSocial, Cliente
 from src.database import db
-import pandas as pd
-from io import BytesIO
+from src.utils.exports import generar_excel_streaming, generar_csv_streaming, TAMANIO_LOTE_EXPORTACION
+from sqlalchemy.orm import contains_eager
 from datetime import datetime, date
+from src.replica import solo_lectura
+from src.services.catalogo_cache import CatalogoCache
+from src.utils.cache import memoizar, invalidar_al_modificar
+
+# Las estadísticas agrupan por nombre de obra social
+invalidar_al_modificar('planes', PlanObraSocial, ObraSocial)
 
 class PlanObraSocialService:
     
+    # Encabezados de las exportaciones de planes (CSV, Excel)
+    COLUMNAS_EXPORTACION = [
+        'ID', 'Nombre', 'Código', 'Obra Social', 'Cobertura', 'Copago', 'Coseguro',
+        'Límite Anual', 'Límite por Consulta', 'Requiere Autorización', 'Días Autorización',
+        'Fecha Creación'
+    ]
+    
     @staticmethod
     def get_all_planes():
         """Obtener todos los planes activos"""
-        return PlanObraSocial.query.filter_by(activo=True).order_by(PlanObraSocial.nombre).all()
+        return CatalogoCache.obtener('planes')
     
     @staticmethod
     def get_plan_by_id(id):
@@ -19,12 +31,11 @@ class PlanObraSocialService:
     
     @staticmethod
     def get_planes_by_obra_social(obra_social_id):
-        """Obtener planes por obra social"""
-        return PlanObraSocial.query.filter_by(
-            obra_social_id=obra_social_id, activo=True
-        ).order_by(PlanObraSocial.nombre).all()
+        """Obtener planes por obra social (desde la caché de catálogos, solo lectura)"""
+        return [plan for plan in CatalogoCache.obtener('planes') if plan.obra_social_id == int(obra_social_id)]
     
     @staticmethod
+    @solo_lectura
     def get_paginated_planes(page=1, per_page=10, search='', obra_social_id=None):
         """Obtener planes con paginación y búsqueda"""
         query = PlanObraSocial.query.filter_by(activo=True)
@@ -45,6 +56,7 @@ class PlanObraSocialService:
         )
     
     @staticmethod
+    @solo_lectura
     def buscar_planes(query, obra_social_id=None, limit=10):
         """Buscar planes para autocompletado"""
         if not query:
@@ -105,6 +117,7 @@ class PlanObraSocialService:
         
         db.session.add(plan)
         db.session.commit()
+        CatalogoCache.invalidar('planes')
         
         return plan
     
@@ -151,6 +164,7 @@ class PlanObraSocialService:
             plan.notas = data['notas'].strip() or None
         
         db.session.commit()
+        CatalogoCache.invalidar('planes')
         return plan
     
     @staticmethod
@@ -170,9 +184,12 @@ class PlanObraSocialService:
         
         plan.activo = False
         db.session.commit()
+        CatalogoCache.invalidar('planes')
         return True
     
     @staticmethod
+    @memoizar('planes')
+    @solo_lectura
     def get_estadisticas_planes():
         """Obtener estadísticas generales de planes"""
         total_planes = PlanObraSocial.query.filter_by(activo=True).count()
@@ -198,9 +215,11 @@ class PlanObraSocialService:
         return estadisticas
     
     @staticmethod
-    def exportar_excel(search='', obra_social_id=None):
-        """Exportar planes a Excel"""
-        query = PlanObraSocial.query.filter_by(activo=True)
+    def query_exportacion(search='', obra_social_id=None):
+        """Query ordenada de planes activos a exportar, con su obra social"""
+        query = PlanObraSocial.query.join(PlanObraSocial.obra_social).options(
+            contains_eager(PlanObraSocial.obra_social)
+        ).filter(PlanObraSocial.activo == True)
         
         if search:
             query = query.filter(
@@ -213,88 +232,57 @@ class PlanObraSocialService:
         if obra_social_id:
             query = query.filter(PlanObraSocial.obra_social_id == obra_social_id)
         
-        planes = query.join(ObraSocial).order_by(PlanObraSocial.nombre).all()
-        
-        # Crear DataFrame
-        data = []
-        for plan in planes:
-            data.append({
-                'ID': plan.id,
-                'Nombre': plan.nombre,
-                'Código': plan.codigo,
-                'Obra Social': plan.obra_social.nombre,
-                'Cobertura': plan.cobertura_display,
-                'Copago': plan.copago_display,
-                'Coseguro': plan.coseguro_display,
-                'Límite Anual': f'${plan.limite_anual:.2f}' if plan.limite_anual else 'Sin límite',
-                'Límite por Consulta': f'${plan.limite_por_consulta:.2f}' if plan.limite_por_consulta else 'Sin límite',
-                'Requiere Autorización': 'Sí' if plan.requiere_autorizacion else 'No',
-                'Días Autorización': plan.dias_autorizacion,
-                'Fecha Creación': plan.fecha_creacion.strftime('%Y-%m-%d %H:%M:%S')
-            })
-        
-        df = pd.DataFrame(data)
-        
-        # Crear archivo Excel
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Planes Obra Social', index=False)
-        
-        output.seek(0)
-        
-        response = make_response(output.read())
-        response.headers['Content-Type'] = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        response.headers['Content-Disposition'] = 'attachment; filename=planes_obra_social.xlsx'
-        
-        return response
+        return query.order_by(PlanObraSocial.nombre, PlanObraSocial.id)
+    
+    @staticmethod
+    def fila_exportacion(plan):
+        """Valores de un plan en el orden de COLUMNAS_EXPORTACION"""
+        return [
+            plan.id,
+            plan.nombre,
+            plan.codigo,
+            plan.obra_social.nombre,
+            plan.cobertura_display,
+            plan.copago_display,
+            plan.coseguro_display,
+            f'${plan.limite_anual:.2f}' if plan.limite_anual else 'Sin límite',
+            f'${plan.limite_por_consulta:.2f}' if plan.limite_por_consulta else 'Sin límite',
+            'Sí' if plan.requiere_autorizacion else 'No',
+            plan.dias_autorizacion,
+            plan.fecha_creacion.strftime('%Y-%m-%d %H:%M:%S')
+        ]
+    
+    @staticmethod
+    @solo_lectura
+    def iterar_filas_exportacion(query):
+        """Recorrer la query por lotes devolviendo una fila (lista) por plan"""
+        for plan in query.yield_per(TAMANIO_LOTE_EXPORTACION):
+            yield PlanObraSocialService.fila_exportacion(plan)
+    
+    @staticmethod
+    @solo_lectura
+    def exportar_excel(search='', obra_social_id=None):
+        """Exportar planes a Excel con memoria acotada"""
+        query = PlanObraSocialService.query_exportacion(search, obra_social_id)
+        
+        return generar_excel_streaming(
+            PlanObraSocialService.COLUMNAS_EXPORTACION,
+            PlanObraSocialService.iterar_filas_exportacion(query),
+            'planes_obra_social',
+            'Planes Obra Social'
+        )
     
     @staticmethod
+    @solo_lectura
     def exportar_csv(search='', obra_social_id=None):
-        """Exportar planes a CSV"""
-        query = PlanObraSocial.query.filter_by(activo=True)
-        
-        if search:
-            query = query.filter(
-                db.or_(
-                    PlanObraSocial.nombre.contains(search),
-                    PlanObraSocial.codigo.contains(search)
-                )
-            )
+        """Exportar planes a CSV en streaming"""
+        query = PlanObraSocialService.query_exportacion(search, obra_social_id)
         
-        if obra_social_id:
-            query = query.filter(PlanObraSocial.obra_social_id == obra_social_id)
-        
-        planes = query.join(ObraSocial).order_by(PlanObraSocial.nombre).all()
-        
-        # Crear CSV
-        output = BytesIO()
-        data = []
-        
-        for plan in planes:
-            data.append({
-                'ID': plan.id,
-                'Nombre': plan.nombre,
-                'Código': plan.codigo,
-                'Obra Social': plan.obra_social.nombre,
-                'Cobertura': plan.cobertura_display,
-                'Copago': plan.copago_display,
-                'Coseguro': plan.coseguro_display,
-                'Límite Anual': f'${plan.limite_anual:.2f}' if plan.limite_anual else 'Sin límite',
-                'Límite por Consulta': f'${plan.limite_por_consulta:.2f}' if plan.limite_por_consulta else 'Sin límite',
-                'Requiere Autorización': 'Sí' if plan.requiere_autorizacion else 'No',
-                'Días Autorización': plan.dias_autorizacion,
-                'Fecha Creación': plan.fecha_creacion.strftime('%Y-%m-%d %H:%M:%S')
-            })
-        
-        df = pd.DataFrame(data)
-        df.to_csv(output, index=False, encoding='utf-8')
-        output.seek(0)
-        
-        response = make_response(output.read())
-        response.headers['Content-Type'] = 'text/csv'
-        response.headers['Content-Disposition'] = 'attachment; filename=planes_obra_social.csv'
-        
-        return response
+        return generar_csv_streaming(
+            PlanObraSocialService.COLUMNAS_EXPORTACION,
+            PlanObraSocialService.iterar_filas_exportacion(query),
+            'planes_obra_social'
+        )
     
     @staticmethod
     def validar_datos_plan(data, plan_id=None):
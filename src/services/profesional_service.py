@@ -1,14 +1,24 @@
-from src.models import Profesional, Turno
+from src.models import Profesional, Turno, TurnoDiario
 from src.database import db
 from src.utils.validators import validar_email, validar_telefono, validar_nombre
+from src.services.disponibilidad_service import DisponibilidadService
+from src.services.turno_diario_service import TurnoDiarioService
+from src.services.busqueda_service import BusquedaService
 from datetime import datetime, date, time, timedelta
+import calendar
+from src.replica import solo_lectura
+from src.services.catalogo_cache import CatalogoCache
+from src.utils.cache import memoizar, invalidar_al_modificar
+
+# Las estadísticas por profesional se leen del resumen diario de turnos
+invalidar_al_modificar('turnos', TurnoDiario)
 
 class ProfesionalService:
     
     @staticmethod
     def get_all_profesionales():
-        """Obtener todos los profesionales activos"""
-        return Profesional.query.filter_by(activo=True).order_by(Profesional.apellido, Profesional.nombre).all()
+        """Obtener todos los profesionales activos (desde la caché de catálogos, solo lectura)"""
+        return CatalogoCache.obtener('profesionales')
     
     @staticmethod
     def get_profesional_by_id(id):
@@ -16,6 +26,7 @@ class ProfesionalService:
         return Profesional.query.filter_by(id=id, activo=True).first()
     
     @staticmethod
+    @solo_lectura
     def get_paginated_profesionales(page=1, per_page=10, search=''):
         """Obtener profesionales con paginación y búsqueda"""
         query = Profesional.query.filter_by(activo=True)
@@ -36,19 +47,25 @@ class ProfesionalService:
         )
     
     @staticmethod
+    @solo_lectura
     def buscar_profesionales(query, limit=10):
         """Buscar profesionales para autocompletado"""
         if not query:
             return []
         
-        return Profesional.query.filter(
-            Profesional.activo == True,
-            db.or_(
-                Profesional.nombre.contains(query),
-                Profesional.apellido.contains(query),
-                Profesional.especialidad.contains(query)
+        # Índice de búsqueda global si está disponible (solo tiene los activos)
+        filtro = BusquedaService.filtro_entidad('profesional', query)
+        if filtro is None:
+            filtro = db.and_(
+                Profesional.activo == True,
+                db.or_(
+                    Profesional.nombre.contains(query),
+                    Profesional.apellido.contains(query),
+                    Profesional.especialidad.contains(query)
+                )
             )
-        ).limit(limit).all()
+        
+        return Profesional.query.filter(filtro).limit(limit).all()
     
     @staticmethod
     def crear_profesional(data):
@@ -85,6 +102,7 @@ class ProfesionalService:
         
         db.session.add(profesional)
         db.session.commit()
+        CatalogoCache.invalidar('profesionales')
         
         return profesional
     
@@ -131,6 +149,7 @@ class ProfesionalService:
             profesional.especialidad = data['especialidad'].strip() or None
         
         db.session.commit()
+        CatalogoCache.invalidar('profesionales')
         return profesional
     
     @staticmethod
@@ -152,9 +171,11 @@ class ProfesionalService:
         
         profesional.activo = False
         db.session.commit()
+        CatalogoCache.invalidar('profesionales')
         return True
     
     @staticmethod
+    @solo_lectura
     def get_horarios_disponibles(profesional_id, fecha_str, duracion_servicio=60):
         """Obtener horarios disponibles para un profesional en una fecha"""
         if not fecha_str:
@@ -172,44 +193,14 @@ class ProfesionalService:
         # Horario de trabajo (esto podría venir de la configuración del profesional)
         hora_inicio = time(9, 0)  # 9:00 AM
         hora_fin = time(18, 0)    # 6:00 PM
-        intervalo_minutos = 30    # Intervalos de 30 minutos
         
-        # Obtener turnos existentes para esa fecha y profesional
-        turnos_ocupados = Turno.query.filter(
-            Turno.profesional_id == profesional_id,
-            Turno.fecha == fecha,
-            Turno.estado.in_(['pendiente', 'confirmado'])
-        ).all()
-        
-        # Generar horarios disponibles
-        horarios_disponibles = []
-        hora_actual = datetime.combine(fecha, hora_inicio)
-        hora_limite = datetime.combine(fecha, hora_fin)
-        
-        while hora_actual < hora_limite:
-            # Verificar si el horario está libre
-            horario_libre = True
-            
-            for turno in turnos_ocupados:
-                hora_turno = datetime.combine(fecha, turno.hora)
-                # Asumir duración del servicio del turno
-                duracion_turno = turno.servicio.duracion if turno.servicio else 60
-                hora_fin_turno = hora_turno + timedelta(minutes=duracion_turno)
-                
-                # Verificar solapamiento
-                if (hora_actual < hora_fin_turno and 
-                    (hora_actual + timedelta(minutes=duracion_servicio)) > hora_turno):
-                    horario_libre = False
-                    break
-            
-            if horario_libre:
-                horarios_disponibles.append(hora_actual.time().strftime('%H:%M'))
-            
-            hora_actual += timedelta(minutes=intervalo_minutos)
-        
-        return horarios_disponibles
+        return DisponibilidadService.get_horarios_libres(
+            profesional_id, fecha, hora_inicio, hora_fin, duracion_servicio,
+            ajustar_a_fin=False
+        )
     
     @staticmethod
+    @solo_lectura
     def get_turnos_profesional(profesional_id, fecha_desde=None, fecha_hasta=None):
         """Obtener turnos de un profesional en un rango de fechas"""
         query = Turno.query.filter_by(profesional_id=profesional_id)
@@ -231,6 +222,8 @@ class ProfesionalService:
         return query.order_by(Turno.fecha, Turno.hora).all()
     
     @staticmethod
+    @memoizar('turnos')
+    @solo_lectura
     def get_estadisticas_profesional(profesional_id, mes=None, ano=None):
         """Obtener estadísticas de un profesional"""
         if not mes:
@@ -238,28 +231,18 @@ class ProfesionalService:
         if not ano:
             ano = date.today().year
         
-        # Filtrar turnos del mes
-        turnos = Turno.query.filter(
-            Turno.profesional_id == profesional_id,
-            db.extract('month', Turno.fecha) == mes,
-            db.extract('year', Turno.fecha) == ano
-        ).all()
-        
-        # Calcular estadísticas
-        total_turnos = len(turnos)
-        turnos_completados = len([t for t in turnos if t.estado == 'completado'])
-        turnos_cancelados = len([t for t in turnos if t.estado == 'cancelado'])
+        # Rango del mes (comparación directa de fechas para aprovechar índices)
+        fecha_inicio = date(ano, mes, 1)
+        fecha_fin = date(ano, mes, calendar.monthrange(ano, mes)[1])
         
-        ingresos_total = sum([
-            float(t.precio_final or t.servicio.precio or 0) 
-            for t in turnos if t.estado == 'completado'
-        ])
+        # Se lee del resumen diario: no depende de la cantidad de turnos del período
+        estadisticas = TurnoDiarioService.get_estadisticas(fecha_inicio, fecha_fin, profesional_id)
         
         return {
-            'total_turnos': total_turnos,
-            'turnos_completados': turnos_completados,
-            'turnos_cancelados': turnos_cancelados,
-            'tasa_completados': (turnos_completados / total_turnos * 100) if total_turnos > 0 else 0,
-            'ingresos_total': ingresos_total,
-            'promedio_por_turno': (ingresos_total / turnos_completados) if turnos_completados > 0 else 0
+            'total_turnos': estadisticas['total_turnos'],
+            'turnos_completados': estadisticas['completados'],
+            'turnos_cancelados': estadisticas['cancelados'],
+            'tasa_completados': estadisticas['tasa_completados'],
+            'ingresos_total': estadisticas['ingresos_total'],
+            'promedio_por_turno': estadisticas['promedio_por_turno']
         }
\ No newline at end of file
@@ -1,18 +1,21 @@
 from src.models import Servicio, Categoria
 from src.database import db
 from src.utils.validators import validar_nombre, validar_precio, validar_duracion, validar_longitud_texto
+from src.services.busqueda_service import BusquedaService
+from src.replica import solo_lectura
+from src.services.catalogo_cache import CatalogoCache
 
 class ServicioService:
     
     @staticmethod
     def get_all_servicios(categoria_id=None):
-        """Obtener todos los servicios activos"""
-        query = Servicio.query.filter_by(activo=True)
+        """Obtener todos los servicios activos (desde la caché de catálogos, solo lectura)"""
+        servicios = CatalogoCache.obtener('servicios')
         
         if categoria_id:
-            query = query.filter_by(categoria_id=categoria_id)
+            servicios = [servicio for servicio in servicios if servicio.categoria_id == int(categoria_id)]
         
-        return query.order_by(Servicio.nombre).all()
+        return servicios
     
     @staticmethod
     def get_servicio_by_id(id):
@@ -20,6 +23,7 @@ class ServicioService:
         return Servicio.query.filter_by(id=id, activo=True).first()
     
     @staticmethod
+    @solo_lectura
     def get_paginated_servicios(page=1, per_page=10, search='', categoria_id=None):
         """Obtener servicios con paginación y búsqueda"""
         query = Servicio.query.filter_by(activo=True)
@@ -40,18 +44,24 @@ class ServicioService:
         )
     
     @staticmethod
+    @solo_lectura
     def buscar_servicios(query, categoria_id=None, limit=10):
         """Buscar servicios para autocompletado"""
         if not query:
             return []
         
-        search_query = Servicio.query.filter(
-            Servicio.activo == True,
-            db.or_(
-                Servicio.nombre.contains(query),
-                Servicio.descripcion.contains(query)
+        # Índice de búsqueda global si está disponible (solo tiene los activos)
+        filtro = BusquedaService.filtro_entidad('servicio', query)
+        if filtro is None:
+            filtro = db.and_(
+                Servicio.activo == True,
+                db.or_(
+                    Servicio.nombre.contains(query),
+                    Servicio.descripcion.contains(query)
+                )
             )
-        )
+        
+        search_query = Servicio.query.filter(filtro)
         
         if categoria_id:
             search_query = search_query.filter_by(categoria_id=categoria_id)
@@ -102,6 +112,7 @@ class ServicioService:
         
         db.session.add(servicio)
         db.session.commit()
+        CatalogoCache.invalidar('servicios')
         
         return servicio
     
@@ -160,6 +171,7 @@ class ServicioService:
             servicio.categoria_id = data['categoria_id'] if data['categoria_id'] else None
         
         db.session.commit()
+        CatalogoCache.invalidar('servicios')
         return servicio
     
     @staticmethod
@@ -181,9 +193,11 @@ class ServicioService:
         
         servicio.activo = False
         db.session.commit()
+        CatalogoCache.invalidar('servicios')
         return True
     
     @staticmethod
+    @solo_lectura
     def get_servicios_por_categoria():
         """Obtener servicios agrupados por categoría"""
         servicios = Servicio.query.filter_by(activo=True).join(
@@ -206,24 +220,12 @@ class ServicioService:
         return servicios_agrupados
     
     @staticmethod
+    @solo_lectura
     def get_servicios_populares(limite=5):
         """Obtener servicios más solicitados"""
-        from src.models import Turno
-        from sqlalchemy import func
-        
-        servicios_populares = db.session.query(
-            Servicio,
-            func.count(Turno.id).label('cantidad_turnos')
-        ).join(
-            Turno, Servicio.id == Turno.servicio_id
-        ).filter(
-            Servicio.activo == True,
-            Turno.estado == 'completado'
-        ).group_by(
-            Servicio.id
-        ).order_by(
-            func.count(Turno.id).desc()
-        ).limit(limite).all()
+        from src.services.turno_diario_service import TurnoDiarioService
+        
+        servicios_populares = TurnoDiarioService.get_servicios_populares(limite)
         
         return [
             {
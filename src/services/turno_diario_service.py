@@ -0,0 +1,282 @@
+from sqlalchemy import event, func, case, select, insert, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects import sqlite, postgresql
+from src.models import Turno, Servicio, TurnoDiario
+from src.database import db
+from src.services.turno_stats_service import TurnoStatsService
+from src.replica import solo_lectura
+
+# Columna del rollup que cuenta cada estado de turno
+COLUMNA_POR_ESTADO = {
+    'pendiente': 'pendientes',
+    'confirmado': 'confirmados',
+    'completado': 'completados',
+    'cancelado': 'cancelados'
+}
+
+COLUMNAS_ROLLUP = ('pendientes', 'confirmados', 'completados', 'cancelados', 'ingresos')
+CLAVE_ROLLUP = ('fecha', 'profesional_id', 'servicio_id')
+
+# Clave de session.info donde se guardan los cambios entre before_flush y after_flush
+_CLAVE_CAMBIOS = 'rollup_turnos_cambios'
+
+
+def _valores_turno(turno, anteriores=False):
+    """Obtener (fecha, profesional_id, servicio_id, estado, precio_final) de un turno.
+
+    Con anteriores=True devuelve los valores previos a las modificaciones
+    pendientes de la sesión. Las cinco columnas usan active_history en el
+    modelo: el valor anterior está en el historial aunque el turno se haya
+    modificado estando expirado.
+    """
+    estado_obj = inspect(turno)
+    valores = []
+
+    for atributo in ('fecha', 'profesional_id', 'servicio_id', 'estado', 'precio_final'):
+        if anteriores:
+            historial = estado_obj.attrs[atributo].history
+            if historial.deleted:
+                valores.append(historial.deleted[0])
+                continue
+        valores.append(getattr(turno, atributo))
+
+    # El estado por defecto se asigna recién al insertar
+    if valores[3] is None:
+        valores[3] = 'pendiente'
+
+    return tuple(valores)
+
+
+def _registrar_cambios(session, flush_context, instances):
+    """before_flush: anotar los valores previos de los turnos que se van a escribir"""
+    pendientes = []
+
+    for obj in session.new:
+        if isinstance(obj, Turno):
+            pendientes.append((obj, None))
+
+    for obj in session.dirty:
+        if isinstance(obj, Turno) and session.is_modified(obj):
+            pendientes.append((obj, _valores_turno(obj, anteriores=True)))
+
+    for obj in session.deleted:
+        if isinstance(obj, Turno):
+            pendientes.append((None, _valores_turno(obj, anteriores=True)))
+
+    # Se sobrescribe siempre: un flush fallido no deja cambios colgados
+    session.info[_CLAVE_CAMBIOS] = pendientes
+
+
+def _aplicar_cambios(session, flush_context):
+    """after_flush: trasladar los cambios al rollup en la misma transacción"""
+    pendientes = session.info.pop(_CLAVE_CAMBIOS, None)
+    if not pendientes:
+        return
+
+    cambios = []
+    for turno, anteriores in pendientes:
+        # Los valores nuevos se leen después del flush: claves foráneas y
+        # valores por defecto ya están asignados
+        actuales = _valores_turno(turno) if turno is not None else None
+        if actuales == anteriores:
+            continue
+        if anteriores is not None:
+            cambios.append((-1, anteriores))
+        if actuales is not None:
+            cambios.append((1, actuales))
+
+    if cambios:
+        TurnoDiarioService.aplicar_cambios(session.connection(), cambios)
+
+
+class TurnoDiarioService:
+    """Mantenimiento y lectura del rollup diario de turnos (tabla turnos_diarios).
+
+    El rollup se actualiza de forma incremental con eventos de sesión en cada
+    flush que inserta, modifica o elimina turnos. Las escrituras que no pasan
+    por el ORM (inserts masivos con Core) deben llamar a aplicar_cambios o
+    reconstruir explícitamente. Los ingresos se fijan con el precio vigente al
+    momento del cambio; `flask rebuild-rollups` los recalcula desde cero.
+    """
+
+    @staticmethod
+    def registrar_eventos():
+        """Registrar (una sola vez) los eventos de sesión que mantienen el rollup"""
+        if not event.contains(Session, 'before_flush', _registrar_cambios):
+            event.listen(Session, 'before_flush', _registrar_cambios)
+        if not event.contains(Session, 'after_flush', _aplicar_cambios):
+            event.listen(Session, 'after_flush', _aplicar_cambios)
+
+    @staticmethod
+    def aplicar_cambios(conexion, cambios):
+        """Aplicar al rollup una lista de (signo, (fecha, profesional_id, servicio_id, estado, precio_final))"""
+        # Precio de lista de los servicios involucrados (para turnos sin precio_final)
+        servicio_ids = {valores[2] for _, valores in cambios if valores[3] == 'completado'}
+        precios = {}
+        if servicio_ids:
+            precios = dict(conexion.execute(
+                select(Servicio.id, Servicio.precio).where(Servicio.id.in_(servicio_ids))
+            ).all())
+
+        deltas = {}
+        for signo, (fecha, profesional_id, servicio_id, estado, precio_final) in cambios:
+            columna = COLUMNA_POR_ESTADO.get(estado)
+            if columna is None or fecha is None:
+                continue
+
+            fila = deltas.setdefault((fecha, profesional_id, servicio_id), dict.fromkeys(COLUMNAS_ROLLUP, 0))
+            fila[columna] += signo
+
+            if estado == 'completado':
+                precio = precio_final if precio_final is not None else precios.get(servicio_id)
+                fila['ingresos'] += signo * float(precio or 0)
+
+        filas = [
+            dict(zip(CLAVE_ROLLUP, clave), **valores)
+            for clave, valores in deltas.items()
+            if any(valores.values())
+        ]
+        if filas:
+            TurnoDiarioService._upsert(conexion, filas)
+
+    @staticmethod
+    def _upsert(conexion, filas):
+        """Sumar los deltas a las filas del rollup, creándolas si no existen"""
+        tabla = TurnoDiario.__table__
+        dialecto = conexion.dialect.name
+
+        if dialecto in ('sqlite', 'postgresql'):
+            insertar = sqlite.insert if dialecto == 'sqlite' else postgresql.insert
+            sentencia = insertar(tabla)
+            sentencia = sentencia.on_conflict_do_update(
+                index_elements=list(CLAVE_ROLLUP),
+                set_={columna: tabla.c[columna] + sentencia.excluded[columna] for columna in COLUMNAS_ROLLUP}
+            )
+            conexion.execute(sentencia, filas)
+            return
+
+        # Otros motores: actualizar y, si no había fila, insertar
+        for fila in filas:
+            condicion = [tabla.c[columna] == fila[columna] for columna in CLAVE_ROLLUP]
+            resultado = conexion.execute(
+                tabla.update().where(*condicion).values(
+                    {columna: tabla.c[columna] + fila[columna] for columna in COLUMNAS_ROLLUP}
+                )
+            )
+            if resultado.rowcount == 0:
+                conexion.execute(tabla.insert().values(**fila))
+
+    @staticmethod
+    def consulta_agregada(fecha_desde=None, fecha_hasta=None):
+        """SELECT que calcula las filas del rollup directamente desde turnos"""
+        def contar(estado):
+            return func.coalesce(func.sum(case((Turno.estado == estado, 1), else_=0)), 0)
+
+        consulta = select(
+            Turno.fecha,
+            Turno.profesional_id,
+            Turno.servicio_id,
+            contar('pendiente'),
+            contar('confirmado'),
+            contar('completado'),
+            contar('cancelado'),
+            func.coalesce(func.sum(case(
+                (Turno.estado == 'completado', func.coalesce(Turno.precio_final, Servicio.precio)),
+                else_=0
+            )), 0)
+        ).join(
+            Servicio, Turno.servicio_id == Servicio.id
+        ).group_by(
+            Turno.fecha, Turno.profesional_id, Turno.servicio_id
+        )
+
+        if fecha_desde:
+            consulta = consulta.where(Turno.fecha >= fecha_desde)
+        if fecha_hasta:
+            consulta = consulta.where(Turno.fecha <= fecha_hasta)
+
+        return consulta
+
+    @staticmethod
+    def reconstruir(fecha_desde=None, fecha_hasta=None):
+        """Recalcular el rollup desde la tabla turnos (backfill). Devuelve las filas generadas"""
+        borrar = TurnoDiario.__table__.delete()
+        if fecha_desde:
+            borrar = borrar.where(TurnoDiario.fecha >= fecha_desde)
+        if fecha_hasta:
+            borrar = borrar.where(TurnoDiario.fecha <= fecha_hasta)
+
+        try:
+            db.session.execute(borrar)
+            db.session.execute(
+                insert(TurnoDiario.__table__).from_select(
+                    list(CLAVE_ROLLUP) + list(COLUMNAS_ROLLUP),
+                    TurnoDiarioService.consulta_agregada(fecha_desde, fecha_hasta)
+                )
+            )
+
+            total = db.session.query(func.count(TurnoDiario.id))
+            if fecha_desde:
+                total = total.filter(TurnoDiario.fecha >= fecha_desde)
+            if fecha_hasta:
+                total = total.filter(TurnoDiario.fecha <= fecha_hasta)
+            filas = total.scalar()
+
+            db.session.commit()
+            return filas
+        except Exception as e:
+            db.session.rollback()
+            raise ValueError(f'Error al reconstruir el resumen diario: {str(e)}')
+
+    @staticmethod
+    @solo_lectura
+    def contar_por_estado(fecha_inicio=None, fecha_fin=None, profesional_id=None, servicio_id=None):
+        """Mismo resultado que TurnoStatsService.contar_por_estado, leído del rollup"""
+        query = db.session.query(
+            *[func.coalesce(func.sum(getattr(TurnoDiario, columna)), 0) for columna in COLUMNAS_ROLLUP]
+        )
+
+        if fecha_inicio:
+            query = query.filter(TurnoDiario.fecha >= fecha_inicio)
+        if fecha_fin:
+            query = query.filter(TurnoDiario.fecha <= fecha_fin)
+        if profesional_id:
+            query = query.filter(TurnoDiario.profesional_id == profesional_id)
+        if servicio_id:
+            query = query.filter(TurnoDiario.servicio_id == servicio_id)
+
+        pendientes, confirmados, completados, cancelados, ingresos = query.one()
+
+        return {
+            'pendiente': (pendientes, 0.0),
+            'confirmado': (confirmados, 0.0),
+            'completado': (completados, float(ingresos or 0)),
+            'cancelado': (cancelados, 0.0)
+        }
+
+    @staticmethod
+    @solo_lectura
+    def get_estadisticas(fecha_inicio=None, fecha_fin=None, profesional_id=None, servicio_id=None):
+        """Estadísticas de un período leídas del rollup"""
+        return TurnoStatsService.armar_estadisticas(
+            TurnoDiarioService.contar_por_estado(fecha_inicio, fecha_fin, profesional_id, servicio_id)
+        )
+
+    @staticmethod
+    @solo_lectura
+    def get_servicios_populares(limite=5, fecha_inicio=None, fecha_fin=None):
+        """Servicios activos con más turnos completados: lista de (Servicio, cantidad)"""
+        cantidad = func.sum(TurnoDiario.completados)
+
+        query = db.session.query(Servicio, cantidad).join(
+            TurnoDiario, TurnoDiario.servicio_id == Servicio.id
+        ).filter(Servicio.activo == True)
+
+        if fecha_inicio:
+            query = query.filter(TurnoDiario.fecha >= fecha_inicio)
+        if fecha_fin:
+            query = query.filter(TurnoDiario.fecha <= fecha_fin)
+
+        return query.group_by(Servicio.id).having(cantidad > 0).order_by(
+            cantidad.desc()
+        ).limit(limite).all()
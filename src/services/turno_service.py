@@ -1,16 +1,58 @@
-from src.models import Turno, Cliente, Profesional, Servicio
+from src.models import Turno, Cliente, Profesional, Servicio, TurnoDiario
 from src.database import db
+from sqlalchemy import select, func
+from sqlalchemy.orm import joinedload
 from src.utils.validators import validar_fecha, validar_hora, validar_estado_turno, validar_precio
-from src.utils.exports import generar_excel, generar_csv
+from src.utils.exports import generar_excel_streaming, generar_csv_streaming_bloques, generar_pdf_streaming, TAMANIO_LOTE_EXPORTACION
+from src.services.turno_stats_service import TurnoStatsService
+from src.services.disponibilidad_service import DisponibilidadService, AgendaOcupada, a_minutos, minutos_a_texto
+from src.services.turno_diario_service import TurnoDiarioService
 from datetime import datetime, date, time, timedelta
 import pandas as pd
+from src.replica import solo_lectura, en_primaria
+from src.utils.paginacion import paginar_keyset
+from src.services.catalogo_cache import CatalogoCache
+from src.utils.cache import memoizar, invalidar_al_modificar
+
+# Máximo de turnos que se pueden crear en una serie recurrente
+MAX_REPETICIONES = 52
+
+# El calendario muestra nombres de clientes, profesionales y servicios; sus estadísticas salen del resumen diario
+invalidar_al_modificar('turnos', Turno, TurnoDiario, Cliente, Profesional, Servicio)
+
 
 class TurnoService:
     
+    # Relaciones que necesita precargadas cada caso de uso (evita consultas N+1)
+    RELACIONES_POR_CASO = {
+        'listado': ('cliente', 'profesional', 'servicio'),
+        'calendario': ('cliente', 'profesional', 'servicio'),
+        'exportacion': ('cliente', 'profesional', 'servicio'),
+        'detalle': ('cliente', 'profesional', 'servicio')
+    }
+    
+    # Encabezados de las exportaciones de turnos (CSV, Excel)
+    COLUMNAS_EXPORTACION = ['ID', 'Fecha', 'Hora', 'Cliente', 'Profesional', 'Servicio', 'Estado', 'Precio', 'Observaciones']
+    
+    # Orden de los listados (el id desempata para la paginación por cursor)
+    ORDEN_LISTADO = (Turno.fecha.desc(), Turno.hora.desc(), Turno.id.desc())
+    
     @staticmethod
+    def query_con_relaciones(caso='listado'):
+        """Query de turnos con las relaciones del caso de uso precargadas"""
+        relaciones = TurnoService.RELACIONES_POR_CASO.get(caso)
+        if relaciones is None:
+            raise ValueError(f'Caso de uso no soportado: {caso}')
+        
+        return Turno.query.options(
+            *[joinedload(getattr(Turno, relacion)) for relacion in relaciones]
+        )
+    
+    @staticmethod
+    @solo_lectura
     def get_turnos_by_fecha_range(fecha_inicio, fecha_fin, profesional_id=None):
         """Obtener turnos en un rango de fechas"""
-        query = Turno.query.filter(
+        query = TurnoService.query_con_relaciones('calendario').filter(
             Turno.fecha >= fecha_inicio,
             Turno.fecha <= fecha_fin
         )
@@ -21,92 +63,78 @@ class TurnoService:
         return query.order_by(Turno.fecha, Turno.hora).all()
 
     @staticmethod
-    def organizar_turnos_por_fecha(turnos):
-        """Organizar lista de turnos por fecha"""
-        turnos_por_fecha = {}
+    @solo_lectura
+    def get_filas_calendario(fecha_inicio, fecha_fin, profesional_id=None):
+        """Obtener solo las columnas que usa el calendario, sin materializar objetos ORM.
+
+        Devuelve filas livianas (tuplas con nombre) con id, fecha, hora, estado,
+        precio_final, cliente_nombre, cliente_apellido, profesional_nombre,
+        profesional_apellido, servicio_nombre, duracion y servicio_precio.
+        """
+        consulta = select(
+            Turno.id,
+            Turno.fecha,
+            Turno.hora,
+            Turno.estado,
+            Turno.precio_final,
+            Cliente.nombre.label('cliente_nombre'),
+            Cliente.apellido.label('cliente_apellido'),
+            Profesional.nombre.label('profesional_nombre'),
+            Profesional.apellido.label('profesional_apellido'),
+            Servicio.nombre.label('servicio_nombre'),
+            Servicio.duracion,
+            Servicio.precio.label('servicio_precio')
+        ).join(
+            Cliente, Turno.cliente_id == Cliente.id
+        ).join(
+            Profesional, Turno.profesional_id == Profesional.id
+        ).join(
+            Servicio, Turno.servicio_id == Servicio.id
+        ).where(
+            Turno.fecha >= fecha_inicio,
+            Turno.fecha <= fecha_fin
+        )
         
-        for turno in turnos:
-            fecha_str = turno.fecha.isoformat()
-            if fecha_str not in turnos_por_fecha:
-                turnos_por_fecha[fecha_str] = []
-            
-            turnos_por_fecha[fecha_str].append({
-                'id': turno.id,
-                'hora': turno.hora.strftime('%H:%M'),
-                'cliente': turno.cliente.nombre_completo,
-                'profesional': turno.profesional.nombre_completo,
-                'servicio': turno.servicio.nombre,
-                'estado': turno.estado,
-                'duracion': turno.servicio.duracion,
-                'precio': float(turno.precio_final or turno.servicio.precio or 0)
-            })
+        if profesional_id:
+            consulta = consulta.where(Turno.profesional_id == profesional_id)
         
-        return turnos_por_fecha
+        return db.session.execute(consulta.order_by(Turno.fecha, Turno.hora)).all()
 
     @staticmethod
-    def calcular_estadisticas_periodo(turnos):
-        """Calcular estadísticas para un período de turnos"""
-        if not turnos:
-            return {
-                'total_turnos': 0,
-                'pendientes': 0,
-                'confirmados': 0,
-                'completados': 0,
-                'cancelados': 0,
-                'ingresos_total': 0
-            }
-        
-        estadisticas = {
-            'total_turnos': len(turnos),
-            'pendientes': sum(1 for t in turnos if t.estado == 'pendiente'),
-            'confirmados': sum(1 for t in turnos if t.estado == 'confirmado'),
-            'completados': sum(1 for t in turnos if t.estado == 'completado'),
-            'cancelados': sum(1 for t in turnos if t.estado == 'cancelado'),
-            'ingresos_total': sum(
-                float(t.precio_final or t.servicio.precio or 0) 
-                for t in turnos if t.estado == 'completado'
-            )
+    def fila_a_dict(fila):
+        """Convertir una fila del calendario al formato que usan las vistas"""
+        return {
+            'id': fila.id,
+            'hora': fila.hora.strftime('%H:%M'),
+            'cliente': f"{fila.cliente_nombre} {fila.cliente_apellido}",
+            'profesional': f"{fila.profesional_nombre} {fila.profesional_apellido}",
+            'servicio': fila.servicio_nombre,
+            'estado': fila.estado,
+            'duracion': fila.duracion,
+            'precio': float(fila.precio_final or fila.servicio_precio or 0)
         }
+
+    @staticmethod
+    def organizar_filas_por_fecha(filas):
+        """Organizar filas del calendario por fecha"""
+        turnos_por_fecha = {}
         
-        return estadisticas
+        for fila in filas:
+            turnos_por_fecha.setdefault(fila.fecha.isoformat(), []).append(
+                TurnoService.fila_a_dict(fila)
+            )
+        
+        return turnos_por_fecha
 
     @staticmethod
     def verificar_disponibilidad_extendida(profesional_id, fecha, hora, duracion, excluir_turno_id=None):
         """Verificación de disponibilidad más robusta"""
-        from datetime import datetime, timedelta
-        
-        # Buscar turnos que se solapen
-        query = Turno.query.filter(
-            Turno.profesional_id == profesional_id,
-            Turno.fecha == fecha,
-            Turno.estado.in_(['pendiente', 'confirmado'])
+        return DisponibilidadService.esta_disponible(
+            profesional_id, fecha, hora, duracion, excluir_turno_id
         )
-        
-        if excluir_turno_id:
-            query = query.filter(Turno.id != excluir_turno_id)
-        
-        turnos_existentes = query.all()
-        
-        # Convertir hora a datetime para facilitar cálculos
-        if isinstance(hora, str):
-            hora_obj = datetime.strptime(hora, '%H:%M').time()
-        else:
-            hora_obj = hora
-        
-        inicio_nuevo = datetime.combine(fecha, hora_obj)
-        fin_nuevo = inicio_nuevo + timedelta(minutes=duracion)
-        
-        for turno in turnos_existentes:
-            inicio_existente = datetime.combine(fecha, turno.hora)
-            fin_existente = inicio_existente + timedelta(minutes=turno.servicio.duracion)
-            
-            # Verificar solapamiento
-            if inicio_nuevo < fin_existente and fin_nuevo > inicio_existente:
-                return False
-        
-        return True
 
     @staticmethod
+    @solo_lectura
     def get_horarios_disponibles_mejorado(profesional_id, fecha, servicio_id=None):
         """Obtener horarios disponibles mejorado para el calendario"""
         from datetime import datetime, time, timedelta
@@ -126,73 +154,98 @@ class TurnoService:
         # Obtener duración del servicio
         duracion = 60  # Por defecto 60 minutos
         if servicio_id:
-            servicio = Servicio.query.get(servicio_id)
+            servicio = CatalogoCache.por_id('servicios', servicio_id)
             if servicio:
                 duracion = servicio.duracion
         
         # Verificar que el profesional existe
-        profesional = Profesional.query.get(profesional_id)
+        profesional = CatalogoCache.por_id('profesionales', profesional_id)
         if not profesional:
             return []
         
-        # Configuración de horarios (esto podría venir de configuración del profesional)
-        # Horarios típicos de consultorio médico
-        horarios_trabajo = {
-            'lunes': {'inicio': time(8, 0), 'fin': time(18, 0)},
-            'martes': {'inicio': time(8, 0), 'fin': time(18, 0)},
-            'miercoles': {'inicio': time(8, 0), 'fin': time(18, 0)},
-            'jueves': {'inicio': time(8, 0), 'fin': time(18, 0)},
-            'viernes': {'inicio': time(8, 0), 'fin': time(18, 0)},
-            'sabado': {'inicio': time(9, 0), 'fin': time(13, 0)},
-            'domingo': None  # No trabaja domingos
-        }
+        # Horarios de trabajo (esto podría venir de configuración del profesional)
+        horario_dia = DisponibilidadService.get_horario_trabajo(fecha_obj)
+        if not horario_dia:
+            return []
         
-        dias_semana = ['lunes', 'martes', 'miercoles', 'jueves', 'viernes', 'sabado', 'domingo']
-        dia_actual = dias_semana[fecha_obj.weekday()]
+        hora_inicio, hora_fin = horario_dia
         
-        # Verificar si trabaja ese día
-        horario_dia = horarios_trabajo.get(dia_actual)
-        if not horario_dia:
+        return DisponibilidadService.get_horarios_libres(
+            profesional_id, fecha_obj, hora_inicio, hora_fin, duracion
+        )
+
+    @staticmethod
+    @solo_lectura
+    def buscar_primeros_horarios(servicio_id, profesional_ids=None, fecha_desde=None, dias=30, cantidad=5):
+        """Buscar los primeros horarios libres para un servicio entre varios profesionales"""
+        servicio = CatalogoCache.por_id('servicios', servicio_id)
+        if not servicio:
+            raise ValueError('Servicio no encontrado')
+        
+        if cantidad < 1 or dias < 1:
+            raise ValueError('La cantidad y los días deben ser mayores a cero')
+        
+        profesionales = CatalogoCache.obtener('profesionales')
+        if profesional_ids:
+            profesional_ids = set(profesional_ids)
+            profesionales = [p for p in profesionales if p.id in profesional_ids]
+        
+        if not profesionales:
             return []
         
-        hora_inicio = horario_dia['inicio']
-        hora_fin = horario_dia['fin']
-        intervalo = 30  # Intervalos de 30 minutos
+        ahora = datetime.now()
+        hoy = ahora.date()
+        fecha_desde = max(fecha_desde or hoy, hoy)
+        fecha_hasta = fecha_desde + timedelta(days=dias - 1)
+        duracion = servicio.duracion or 60
         
-        # Obtener turnos ocupados para esa fecha y profesional
-        turnos_ocupados = Turno.query.filter(
-            Turno.profesional_id == profesional_id,
-            Turno.fecha == fecha_obj,
-            Turno.estado.in_(['pendiente', 'confirmado'])
-        ).all()
+        # Una sola consulta para todos los profesionales y todo el rango
+        agendas = DisponibilidadService.cargar_agendas(
+            [p.id for p in profesionales], fecha_desde, fecha_hasta
+        )
+        agenda_vacia = AgendaOcupada()
         
-        # Generar horarios disponibles
-        horarios_disponibles = []
-        hora_actual = datetime.combine(fecha_obj, hora_inicio)
-        hora_limite = datetime.combine(fecha_obj, hora_fin)
+        resultados = []
+        fecha = fecha_desde
         
-        while hora_actual + timedelta(minutes=duracion) <= hora_limite:
-            # Verificar si hay conflicto con algún turno existente
-            disponible = True
+        while fecha <= fecha_hasta and len(resultados) < cantidad:
+            horario_dia = DisponibilidadService.get_horario_trabajo(fecha)
             
-            for turno in turnos_ocupados:
-                inicio_turno = datetime.combine(fecha_obj, turno.hora)
-                fin_turno = inicio_turno + timedelta(minutes=turno.servicio.duracion)
-                fin_nuevo_turno = hora_actual + timedelta(minutes=duracion)
+            if horario_dia:
+                candidatos = DisponibilidadService.generar_candidatos(
+                    horario_dia[0], horario_dia[1], duracion
+                )
                 
-                # Verificar solapamiento
-                if hora_actual < fin_turno and fin_nuevo_turno > inicio_turno:
-                    disponible = False
-                    break
-            
-            if disponible:
-                horarios_disponibles.append(hora_actual.time().strftime('%H:%M'))
+                # Hoy solo se ofrecen horarios que todavía no pasaron
+                if fecha == hoy:
+                    minutos_ahora = a_minutos(ahora.time())
+                    candidatos = [m for m in candidatos if m > minutos_ahora]
+                
+                libres_dia = []
+                for profesional in profesionales:
+                    agenda = agendas.get((profesional.id, fecha), agenda_vacia)
+                    for inicio in agenda.filtrar_libres(candidatos, duracion):
+                        libres_dia.append((inicio, profesional))
+                
+                # Orden estable: a igual horario se respeta el orden de profesionales
+                libres_dia.sort(key=lambda libre: libre[0])
+                
+                for inicio, profesional in libres_dia[:cantidad - len(resultados)]:
+                    resultados.append({
+                        'fecha': fecha.isoformat(),
+                        'hora': minutos_a_texto(inicio),
+                        'profesional_id': profesional.id,
+                        'profesional': profesional.nombre_completo,
+                        'servicio_id': servicio.id,
+                        'duracion': duracion
+                    })
             
-            hora_actual += timedelta(minutes=intervalo)
+            fecha += timedelta(days=1)
         
-        return horarios_disponibles
+        return resultados
 
     @staticmethod
+    @en_primaria
     def crear_turno_validado(data):
         """Crear turno con validaciones extendidas"""
         # Validaciones básicas
@@ -237,12 +290,6 @@ class TurnoService:
         if not servicio:
             raise ValueError('Servicio no encontrado o inactivo')
         
-        # Verificar disponibilidad del profesional
-        if not TurnoService.verificar_disponibilidad_extendida(
-            data['profesional_id'], fecha_turno, hora_turno, servicio.duracion
-        ):
-            raise ValueError('El profesional no está disponible en ese horario')
-        
         # Validar estado
         estado = data.get('estado', 'pendiente')
         estados_validos = ['pendiente', 'confirmado', 'completado', 'cancelado']
@@ -259,27 +306,36 @@ class TurnoService:
             except (ValueError, TypeError):
                 raise ValueError('Precio final debe ser un número válido')
         
-        # Crear turno
-        turno = Turno(
-            fecha=fecha_turno,
-            hora=hora_turno,
-            estado=estado,
-            observaciones=data.get('observaciones', '').strip() or None,
-            precio_final=precio_final,
-            cliente_id=data['cliente_id'],
-            profesional_id=data['profesional_id'],
-            servicio_id=data['servicio_id']
-        )
-        
-        try:
-            db.session.add(turno)
-            db.session.commit()
-            return turno
-        except Exception as e:
-            db.session.rollback()
-            raise ValueError(f'Error al guardar el turno: {str(e)}')
+        # Verificar disponibilidad y guardar con la agenda del profesional
+        # bloqueada: dos reservas simultáneas no pueden tomar el mismo horario
+        with DisponibilidadService.reserva_exclusiva(data['profesional_id'], fecha_turno):
+            if not TurnoService.verificar_disponibilidad_extendida(
+                data['profesional_id'], fecha_turno, hora_turno, servicio.duracion
+            ):
+                raise ValueError('El profesional no está disponible en ese horario')
+            
+            turno = Turno(
+                fecha=fecha_turno,
+                hora=hora_turno,
+                estado=estado,
+                observaciones=data.get('observaciones', '').strip() or None,
+                precio_final=precio_final,
+                cliente_id=data['cliente_id'],
+                profesional_id=data['profesional_id'],
+                servicio_id=data['servicio_id']
+            )
+            
+            try:
+                db.session.add(turno)
+                db.session.commit()
+                return turno
+            except Exception as e:
+                db.session.rollback()
+                raise ValueError(f'Error al guardar el turno: {str(e)}')
 
     @staticmethod
+    @memoizar('turnos')
+    @solo_lectura
     def get_calendario_data(vista, fecha_base, profesional_id=None):
         """Obtener datos estructurados para el calendario"""
         from datetime import timedelta
@@ -304,10 +360,10 @@ class TurnoService:
             fecha_fin = siguiente_mes - timedelta(days=1)
             titulo = fecha_base.strftime('%B %Y')
         
-        # Obtener turnos
-        turnos = TurnoService.get_turnos_by_fecha_range(fecha_inicio, fecha_fin, profesional_id)
-        turnos_por_fecha = TurnoService.organizar_turnos_por_fecha(turnos)
-        estadisticas = TurnoService.calcular_estadisticas_periodo(turnos)
+        # Obtener turnos (solo las columnas necesarias)
+        filas = TurnoService.get_filas_calendario(fecha_inicio, fecha_fin, profesional_id)
+        turnos_por_fecha = TurnoService.organizar_filas_por_fecha(filas)
+        estadisticas = TurnoStatsService.get_estadisticas(fecha_inicio, fecha_fin, profesional_id)
         
         # Generar estructura específica según la vista
         fechas = []
@@ -358,18 +414,37 @@ class TurnoService:
     @staticmethod
     def get_all_turnos():
         """Obtener todos los turnos"""
-        return Turno.query.order_by(Turno.fecha.desc(), Turno.hora.desc()).all()
+        return TurnoService.query_con_relaciones('listado').order_by(Turno.fecha.desc(), Turno.hora.desc()).all()
     
     @staticmethod
     def get_turno_by_id(id):
         """Obtener turno por ID"""
-        return Turno.query.get(id)
+        return TurnoService.query_con_relaciones('detalle').filter(Turno.id == id).first()
     
     @staticmethod
+    @solo_lectura
     def get_paginated_turnos(page=1, per_page=10, fecha_desde=None, fecha_hasta=None, 
                            estado=None, profesional_id=None):
         """Obtener turnos con paginación y filtros"""
-        query = Turno.query
+        query = TurnoService.query_listado(fecha_desde, fecha_hasta, estado, profesional_id)
+        return query.order_by(*TurnoService.ORDEN_LISTADO).paginate(
+            page=page, per_page=per_page, error_out=False
+        )
+    
+    @staticmethod
+    @solo_lectura
+    def get_turnos_por_cursor(cursor=None, per_page=15, fecha_desde=None, fecha_hasta=None,
+                              estado=None, profesional_id=None, contar=None):
+        """Obtener una página de turnos por cursor (keyset), sin OFFSET ni COUNT por página"""
+        return paginar_keyset(
+            TurnoService.query_listado(fecha_desde, fecha_hasta, estado, profesional_id), 'turnos',
+            TurnoService.ORDEN_LISTADO, cursor=cursor, per_page=per_page, contar=contar
+        )
+    
+    @staticmethod
+    def query_listado(fecha_desde=None, fecha_hasta=None, estado=None, profesional_id=None):
+        """Query de turnos del listado con los filtros aplicados (sin orden)"""
+        query = TurnoService.query_con_relaciones('listado')
         
         # Filtros
         if fecha_desde:
@@ -392,11 +467,10 @@ class TurnoService:
         if profesional_id:
             query = query.filter(Turno.profesional_id == profesional_id)
         
-        return query.order_by(Turno.fecha.desc(), Turno.hora.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        return query
     
     @staticmethod
+    @solo_lectura
     def get_turnos_by_fecha(fecha_str, profesional_id=None):
         """Obtener turnos por fecha"""
         try:
@@ -404,14 +478,15 @@ class TurnoService:
         except ValueError:
             return []
         
-        query = Turno.query.filter_by(fecha=fecha)
+        query = TurnoService.query_con_relaciones('listado').filter(Turno.fecha == fecha)
         
         if profesional_id:
-            query = query.filter_by(profesional_id=profesional_id)
+            query = query.filter(Turno.profesional_id == profesional_id)
         
         return query.order_by(Turno.hora).all()
     
     @staticmethod
+    @en_primaria
     def crear_turno(data):
         """Crear nuevo turno"""
         # Validaciones básicas
@@ -448,12 +523,6 @@ class TurnoService:
         if not servicio:
             raise ValueError('Servicio no encontrado')
         
-        # Verificar disponibilidad del profesional
-        if not TurnoService._verificar_disponibilidad(
-            data['profesional_id'], fecha_turno, hora_turno, servicio.duracion
-        ):
-            raise ValueError('El profesional no está disponible en ese horario')
-        
         # Validar estado si se proporciona
         estado = data.get('estado', 'pendiente')
         if not validar_estado_turno(estado):
@@ -464,24 +533,151 @@ class TurnoService:
         if precio_final and not validar_precio(precio_final):
             raise ValueError('Precio final no válido')
         
-        # Crear turno
-        turno = Turno(
-            fecha=fecha_turno,
-            hora=hora_turno,
-            estado=estado,
-            observaciones=data.get('observaciones', '').strip() or None,
-            precio_final=float(precio_final) if precio_final else None,
-            cliente_id=data['cliente_id'],
-            profesional_id=data['profesional_id'],
-            servicio_id=data['servicio_id']
-        )
-        
-        db.session.add(turno)
-        db.session.commit()
+        # Verificar disponibilidad y guardar con la agenda del profesional
+        # bloqueada: dos reservas simultáneas no pueden tomar el mismo horario
+        with DisponibilidadService.reserva_exclusiva(data['profesional_id'], fecha_turno):
+            if not TurnoService._verificar_disponibilidad(
+                data['profesional_id'], fecha_turno, hora_turno, servicio.duracion
+            ):
+                raise ValueError('El profesional no está disponible en ese horario')
+            
+            turno = Turno(
+                fecha=fecha_turno,
+                hora=hora_turno,
+                estado=estado,
+                observaciones=data.get('observaciones', '').strip() or None,
+                precio_final=float(precio_final) if precio_final else None,
+                cliente_id=data['cliente_id'],
+                profesional_id=data['profesional_id'],
+                servicio_id=data['servicio_id']
+            )
+            
+            db.session.add(turno)
+            db.session.commit()
         
         return turno
     
     @staticmethod
+    @en_primaria
+    def crear_turnos_recurrentes(data):
+        """Crear una serie de turnos, por ejemplo todos los martes a las 10:00 durante 12 semanas.
+        
+        Valida cliente, profesional y servicio una sola vez, verifica la
+        disponibilidad de todas las fechas con una única consulta por rango e
+        inserta los turnos libres con un solo executemany en una transacción.
+        Devuelve (creados, conflictos): listas de dicts con la fecha de cada
+        turno. Con todo_o_nada no se crea ninguno si alguna fecha está ocupada.
+        """
+        required_fields = ['fecha_inicio', 'hora', 'repeticiones', 'cliente_id', 'profesional_id', 'servicio_id']
+        for field in required_fields:
+            if not data.get(field):
+                raise ValueError(f'{field} es obligatorio')
+        
+        if not validar_fecha(data['fecha_inicio']):
+            raise ValueError('Fecha de inicio no válida')
+        
+        if not validar_hora(data['hora']):
+            raise ValueError('Hora no válida')
+        
+        try:
+            repeticiones = int(data['repeticiones'])
+            cada_semanas = int(data.get('cada_semanas') or 1)
+        except (ValueError, TypeError):
+            raise ValueError('Repeticiones y frecuencia deben ser números enteros')
+        
+        if not 1 <= repeticiones <= MAX_REPETICIONES:
+            raise ValueError(f'Repeticiones debe estar entre 1 y {MAX_REPETICIONES}')
+        if cada_semanas < 1:
+            raise ValueError('La frecuencia debe ser de al menos una semana')
+        
+        fecha_inicio = datetime.strptime(data['fecha_inicio'], '%Y-%m-%d').date()
+        hora_turno = datetime.strptime(data['hora'], '%H:%M').time()
+        
+        if datetime.combine(fecha_inicio, hora_turno) < datetime.now():
+            raise ValueError('No se pueden crear turnos en el pasado')
+        
+        estado = data.get('estado', 'pendiente')
+        if not validar_estado_turno(estado):
+            raise ValueError('Estado no válido')
+        
+        precio_final = data.get('precio_final')
+        if precio_final and not validar_precio(precio_final):
+            raise ValueError('Precio final no válido')
+        
+        # Referencias validadas una sola vez para toda la serie
+        cliente = Cliente.query.filter_by(id=data['cliente_id'], activo=True).first()
+        if not cliente:
+            raise ValueError('Cliente no encontrado')
+        
+        profesional = Profesional.query.filter_by(id=data['profesional_id'], activo=True).first()
+        if not profesional:
+            raise ValueError('Profesional no encontrado')
+        
+        servicio = Servicio.query.filter_by(id=data['servicio_id'], activo=True).first()
+        if not servicio:
+            raise ValueError('Servicio no encontrado')
+        
+        fechas = [fecha_inicio + timedelta(weeks=cada_semanas * i) for i in range(repeticiones)]
+        inicio = a_minutos(hora_turno)
+        fin = inicio + (servicio.duracion or 60)
+        todo_o_nada = str(data.get('todo_o_nada', '')).lower() in ('1', 'true', 'on')
+        
+        try:
+            # Bloquear las agendas de la serie (en orden, para no cruzarse con otra serie)
+            for fecha in fechas:
+                DisponibilidadService.bloquear_agenda(profesional.id, fecha)
+            
+            agendas = DisponibilidadService.cargar_agendas([profesional.id], fechas[0], fechas[-1])
+            
+            libres = []
+            conflictos = []
+            for fecha in fechas:
+                agenda = agendas.get((profesional.id, fecha))
+                if agenda is not None and not agenda.esta_libre(inicio, fin):
+                    conflictos.append({
+                        'fecha': fecha.isoformat(),
+                        'motivo': 'El profesional no está disponible en ese horario'
+                    })
+                else:
+                    libres.append(fecha)
+            
+            if not libres or (todo_o_nada and conflictos):
+                db.session.rollback()
+                return [], conflictos
+            
+            precio = float(precio_final) if precio_final else None
+            observaciones = (data.get('observaciones') or '').strip() or None
+            filas = [{
+                'fecha': fecha,
+                'hora': hora_turno,
+                'estado': estado,
+                'observaciones': observaciones,
+                'precio_final': precio,
+                'cliente_id': cliente.id,
+                'profesional_id': profesional.id,
+                'servicio_id': servicio.id
+            } for fecha in libres]
+            
+            resultado = db.session.execute(
+                Turno.__table__.insert().returning(Turno.id, Turno.fecha),
+                filas
+            )
+            creados = [{'id': id, 'fecha': fecha.isoformat()} for id, fecha in resultado]
+            
+            # El insert con Core no pasa por los eventos del ORM: actualizar el rollup
+            TurnoDiarioService.aplicar_cambios(db.session.connection(), [
+                (1, (fecha, profesional.id, servicio.id, estado, precio)) for fecha in libres
+            ])
+            
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        
+        return creados, conflictos
+    
+    @staticmethod
+    @en_primaria
     def actualizar_turno(id, data):
         """Actualizar turno existente"""
         turno = TurnoService.get_turno_by_id(id)
@@ -506,7 +702,18 @@ class TurnoService:
             if fecha_hora_nueva < datetime.now():
                 raise ValueError('No se pueden programar turnos en el pasado')
         
-        # Verificar disponibilidad si se cambia fecha, hora o profesional
+        # Validar estado si se actualiza
+        if 'estado' in data and data['estado']:
+            if not validar_estado_turno(data['estado']):
+                raise ValueError('Estado no válido')
+        
+        # Validar precio final si se actualiza
+        if 'precio_final' in data and data['precio_final']:
+            if not validar_precio(data['precio_final']):
+                raise ValueError('Precio final no válido')
+        
+        # Verificar disponibilidad si se cambia fecha, hora o profesional. La
+        # agenda queda bloqueada hasta el commit para que nadie tome el horario
         if any(key in data for key in ['fecha', 'hora', 'profesional_id']):
             fecha_check = data.get('fecha', turno.fecha.isoformat())
             hora_check = data.get('hora', turno.hora.strftime('%H:%M'))
@@ -515,22 +722,14 @@ class TurnoService:
             fecha_obj = datetime.strptime(fecha_check, '%Y-%m-%d').date()
             hora_obj = datetime.strptime(hora_check, '%H:%M').time()
             
+            DisponibilidadService.bloquear_agenda(profesional_check, fecha_obj)
             if not TurnoService._verificar_disponibilidad(
                 profesional_check, fecha_obj, hora_obj, 
                 turno.servicio.duracion, turno.id
             ):
+                db.session.rollback()
                 raise ValueError('El profesional no está disponible en ese horario')
         
-        # Validar estado si se actualiza
-        if 'estado' in data and data['estado']:
-            if not validar_estado_turno(data['estado']):
-                raise ValueError('Estado no válido')
-        
-        # Validar precio final si se actualiza
-        if 'precio_final' in data and data['precio_final']:
-            if not validar_precio(data['precio_final']):
-                raise ValueError('Precio final no válido')
-        
         # Actualizar campos
         if 'fecha' in data and data['fecha']:
             turno.fecha = datetime.strptime(data['fecha'], '%Y-%m-%d').date()
@@ -569,6 +768,7 @@ class TurnoService:
         return turno
     
     @staticmethod
+    @en_primaria
     def cambiar_estado_turno(id, nuevo_estado):
         """Cambiar estado de un turno"""
         turno = TurnoService.get_turno_by_id(id)
@@ -584,6 +784,7 @@ class TurnoService:
         return turno
     
     @staticmethod
+    @en_primaria
     def cancelar_turno(id, motivo=''):
         """Cancelar un turno"""
         turno = TurnoService.get_turno_by_id(id)
@@ -598,6 +799,7 @@ class TurnoService:
         return turno
     
     @staticmethod
+    @solo_lectura
     def get_horarios_disponibles(fecha_str, profesional_id, servicio_id=None):
         """Obtener horarios disponibles para un profesional en una fecha"""
         try:
@@ -612,47 +814,20 @@ class TurnoService:
         # Obtener duración del servicio
         duracion = 60  # Por defecto 60 minutos
         if servicio_id:
-            servicio = Servicio.query.get(servicio_id)
+            servicio = CatalogoCache.por_id('servicios', servicio_id)
             if servicio:
                 duracion = servicio.duracion
         
         # Horario de trabajo (configuración básica)
         hora_inicio = time(9, 0)
         hora_fin = time(18, 0)
-        intervalo = 30  # minutos
         
-        # Obtener turnos ocupados
-        turnos_ocupados = Turno.query.filter(
-            Turno.profesional_id == profesional_id,
-            Turno.fecha == fecha,
-            Turno.estado.in_(['pendiente', 'confirmado'])
-        ).all()
-        
-        horarios_disponibles = []
-        hora_actual = datetime.combine(fecha, hora_inicio)
-        hora_limite = datetime.combine(fecha, hora_fin)
-        
-        while hora_actual + timedelta(minutes=duracion) <= hora_limite:
-            # Verificar solapamiento con turnos existentes
-            disponible = True
-            
-            for turno in turnos_ocupados:
-                inicio_turno = datetime.combine(fecha, turno.hora)
-                fin_turno = inicio_turno + timedelta(minutes=turno.servicio.duracion)
-                fin_nuevo = hora_actual + timedelta(minutes=duracion)
-                
-                if hora_actual < fin_turno and fin_nuevo > inicio_turno:
-                    disponible = False
-                    break
-            
-            if disponible:
-                horarios_disponibles.append(hora_actual.time().strftime('%H:%M'))
-            
-            hora_actual += timedelta(minutes=intervalo)
-        
-        return horarios_disponibles
+        return DisponibilidadService.get_horarios_libres(
+            profesional_id, fecha, hora_inicio, hora_fin, duracion
+        )
     
     @staticmethod
+    @solo_lectura
     def get_resumen_dia(fecha_str, profesional_id=None):
         """Obtener resumen de turnos del día"""
         try:
@@ -660,201 +835,143 @@ class TurnoService:
         except ValueError:
             return {}
         
-        query = Turno.query.filter_by(fecha=fecha)
-        if profesional_id:
-            query = query.filter_by(profesional_id=profesional_id)
-        
-        turnos = query.all()
+        estadisticas = TurnoStatsService.get_estadisticas(fecha, fecha, profesional_id)
         
         return {
             'fecha': fecha.isoformat(),
-            'total_turnos': len(turnos),
-            'pendientes': len([t for t in turnos if t.estado == 'pendiente']),
-            'confirmados': len([t for t in turnos if t.estado == 'confirmado']),
-            'completados': len([t for t in turnos if t.estado == 'completado']),
-            'cancelados': len([t for t in turnos if t.estado == 'cancelado']),
-            'ingresos': sum([
-                float(t.precio_final or t.servicio.precio or 0) 
-                for t in turnos if t.estado == 'completado'
-            ])
+            'total_turnos': estadisticas['total_turnos'],
+            'pendientes': estadisticas['pendientes'],
+            'confirmados': estadisticas['confirmados'],
+            'completados': estadisticas['completados'],
+            'cancelados': estadisticas['cancelados'],
+            'ingresos': estadisticas['ingresos_total']
         }
     
     @staticmethod
+    @solo_lectura
     def get_proximos_turnos(limite=5, profesional_id=None):
         """Obtener próximos turnos"""
-        query = Turno.query.filter(
+        query = TurnoService.query_con_relaciones('listado').filter(
             Turno.fecha >= date.today(),
             Turno.estado.in_(['pendiente', 'confirmado'])
         )
         
         if profesional_id:
-            query = query.filter_by(profesional_id=profesional_id)
+            query = query.filter(Turno.profesional_id == profesional_id)
         
         return query.order_by(Turno.fecha, Turno.hora).limit(limite).all()
     
     @staticmethod
     def _verificar_disponibilidad(profesional_id, fecha, hora, duracion, excluir_turno_id=None):
         """Verificar si un profesional está disponible en un horario"""
-        # Buscar turnos que se solapen
-        query = Turno.query.filter(
-            Turno.profesional_id == profesional_id,
-            Turno.fecha == fecha,
-            Turno.estado.in_(['pendiente', 'confirmado'])
+        return DisponibilidadService.esta_disponible(
+            profesional_id, fecha, hora, duracion, excluir_turno_id
         )
-        
-        if excluir_turno_id:
-            query = query.filter(Turno.id != excluir_turno_id)
-        
-        turnos_existentes = query.all()
-        
-        inicio_nuevo = datetime.combine(fecha, hora)
-        fin_nuevo = inicio_nuevo + timedelta(minutes=duracion)
-        
-        for turno in turnos_existentes:
-            inicio_existente = datetime.combine(fecha, turno.hora)
-            fin_existente = inicio_existente + timedelta(minutes=turno.servicio.duracion)
-            
-            # Verificar solapamiento
-            if inicio_nuevo < fin_existente and fin_nuevo > inicio_existente:
-                return False
-        
-        return True
     
     @staticmethod
-    def exportar_excel(fecha_desde=None, fecha_hasta=None):
-        """Exportar turnos a Excel"""
-        query = Turno.query
+    def consulta_exportacion(fecha_desde=None, fecha_hasta=None):
+        """SELECT con las columnas crudas de la exportación (fechas en formato YYYY-MM-DD)"""
+        consulta = select(
+            Turno.id,
+            Turno.fecha,
+            Turno.hora,
+            Cliente.nombre.label('cliente_nombre'),
+            Cliente.apellido.label('cliente_apellido'),
+            Profesional.nombre.label('profesional_nombre'),
+            Profesional.apellido.label('profesional_apellido'),
+            Servicio.nombre.label('servicio_nombre'),
+            Turno.estado,
+            func.coalesce(Turno.precio_final, Servicio.precio).label('precio'),
+            Turno.observaciones
+        ).join(
+            Cliente, Turno.cliente_id == Cliente.id
+        ).join(
+            Profesional, Turno.profesional_id == Profesional.id
+        ).join(
+            Servicio, Turno.servicio_id == Servicio.id
+        )
         
         if fecha_desde:
             try:
                 fecha_desde = datetime.strptime(fecha_desde, '%Y-%m-%d').date()
-                query = query.filter(Turno.fecha >= fecha_desde)
+                consulta = consulta.where(Turno.fecha >= fecha_desde)
             except ValueError:
                 pass
         
         if fecha_hasta:
             try:
                 fecha_hasta = datetime.strptime(fecha_hasta, '%Y-%m-%d').date()
-                query = query.filter(Turno.fecha <= fecha_hasta)
+                consulta = consulta.where(Turno.fecha <= fecha_hasta)
             except ValueError:
                 pass
         
-        turnos = query.order_by(Turno.fecha, Turno.hora).all()
-        
-        data = []
-        for turno in turnos:
-            data.append({
-                'ID': turno.id,
-                'Fecha': turno.fecha.strftime('%d/%m/%Y'),
-                'Hora': turno.hora.strftime('%H:%M'),
-                'Cliente': turno.cliente.nombre_completo,
-                'Profesional': turno.profesional.nombre_completo,
-                'Servicio': turno.servicio.nombre,
-                'Estado': turno.estado.title(),
-                'Precio': f'${float(turno.precio_final or turno.servicio.precio):,.2f}',
-                'Observaciones': turno.observaciones or ''
-            })
-        
-        filename = f'turnos_{date.today().strftime("%Y%m%d")}'
-        return generar_excel(data, filename, 'Turnos')
+        return consulta.order_by(Turno.fecha, Turno.hora, Turno.id)
     
     @staticmethod
-    def exportar_csv(fecha_desde=None, fecha_hasta=None):
-        """Exportar turnos a CSV"""
-        query = Turno.query
-        
-        if fecha_desde:
-            try:
-                fecha_desde = datetime.strptime(fecha_desde, '%Y-%m-%d').date()
-                query = query.filter(Turno.fecha >= fecha_desde)
-            except ValueError:
-                pass
-        
-        if fecha_hasta:
-            try:
-                fecha_hasta = datetime.strptime(fecha_hasta, '%Y-%m-%d').date()
-                query = query.filter(Turno.fecha <= fecha_hasta)
-            except ValueError:
-                pass
-        
-        turnos = query.order_by(Turno.fecha, Turno.hora).all()
-        
-        data = []
-        for turno in turnos:
-            data.append({
-                'ID': turno.id,
-                'Fecha': turno.fecha.strftime('%d/%m/%Y'),
-                'Hora': turno.hora.strftime('%H:%M'),
-                'Cliente': turno.cliente.nombre_completo,
-                'Profesional': turno.profesional.nombre_completo,
-                'Servicio': turno.servicio.nombre,
-                'Estado': turno.estado.title(),
-                'Precio': float(turno.precio_final or turno.servicio.precio),
-                'Observaciones': turno.observaciones or ''
-            })
-        
-        filename = f'turnos_{date.today().strftime("%Y%m%d")}'
-        return generar_csv(data, filename)
+    def formatear_bloque_exportacion(df, precio_como_moneda=False):
+        """Dar formato a un bloque de la exportación con operaciones por columna"""
+        # Fechas y horas llegan como date/time o como texto ISO según el motor
+        fecha = df['fecha'].astype(str)
+        precio = df['precio'].astype(float).fillna(0.0)
+        
+        return pd.DataFrame({
+            'ID': df['id'],
+            'Fecha': fecha.str[8:10] + '/' + fecha.str[5:7] + '/' + fecha.str[0:4],
+            'Hora': df['hora'].astype(str).str[0:5],
+            'Cliente': df['cliente_nombre'] + ' ' + df['cliente_apellido'],
+            'Profesional': df['profesional_nombre'] + ' ' + df['profesional_apellido'],
+            'Servicio': df['servicio_nombre'],
+            'Estado': df['estado'].fillna('').str.title(),
+            'Precio': '$' + precio.map('{:,.2f}'.format) if precio_como_moneda else precio,
+            'Observaciones': df['observaciones'].fillna('')
+        }, columns=TurnoService.COLUMNAS_EXPORTACION)
     
     @staticmethod
-    def get_turnos_by_fecha_range(fecha_inicio, fecha_fin, profesional_id=None):
-        """Obtener turnos en un rango de fechas"""
-        query = Turno.query.filter(
-            Turno.fecha >= fecha_inicio,
-            Turno.fecha <= fecha_fin
-        )
+    @solo_lectura
+    def iterar_bloques_exportacion(consulta, precio_como_moneda=False):
+        """Leer la consulta con pandas por bloques y devolver cada bloque ya formateado"""
+        bloques = pd.read_sql(consulta, db.session.connection(), chunksize=TAMANIO_LOTE_EXPORTACION)
+        for bloque in bloques:
+            if not bloque.empty:
+                yield TurnoService.formatear_bloque_exportacion(bloque, precio_como_moneda)
+    
+    @staticmethod
+    def iterar_filas_exportacion(consulta, precio_como_moneda=False):
+        """Recorrer la exportación devolviendo una fila (tupla) por turno"""
+        for bloque in TurnoService.iterar_bloques_exportacion(consulta, precio_como_moneda):
+            yield from bloque.itertuples(index=False, name=None)
+    
+    @staticmethod
+    @solo_lectura
+    def exportar_excel(fecha_desde=None, fecha_hasta=None):
+        """Exportar turnos a Excel con memoria acotada"""
+        consulta = TurnoService.consulta_exportacion(fecha_desde, fecha_hasta)
         
-        if profesional_id:
-            query = query.filter(Turno.profesional_id == profesional_id)
+        # En el Excel el precio se muestra con formato de moneda
+        filas = TurnoService.iterar_filas_exportacion(consulta, precio_como_moneda=True)
         
-        return query.order_by(Turno.fecha, Turno.hora).all()
-
+        filename = f'turnos_{date.today().strftime("%Y%m%d")}'
+        return generar_excel_streaming(TurnoService.COLUMNAS_EXPORTACION, filas, filename, 'Turnos')
+    
     @staticmethod
-    def organizar_turnos_por_fecha(turnos):
-        """Organizar lista de turnos por fecha"""
-        turnos_por_fecha = {}
-        
-        for turno in turnos:
-            fecha_str = turno.fecha.isoformat()
-            if fecha_str not in turnos_por_fecha:
-                turnos_por_fecha[fecha_str] = []
-            
-            turnos_por_fecha[fecha_str].append({
-                'id': turno.id,
-                'hora': turno.hora.strftime('%H:%M'),
-                'cliente': turno.cliente.nombre_completo,
-                'profesional': turno.profesional.nombre_completo,
-                'servicio': turno.servicio.nombre,
-                'estado': turno.estado,
-                'duracion': turno.servicio.duracion,
-                'precio': float(turno.precio_final or turno.servicio.precio or 0)
-            })
+    @solo_lectura
+    def exportar_csv(fecha_desde=None, fecha_hasta=None):
+        """Exportar turnos a CSV en streaming"""
+        consulta = TurnoService.consulta_exportacion(fecha_desde, fecha_hasta)
         
-        return turnos_por_fecha
-
+        filename = f'turnos_{date.today().strftime("%Y%m%d")}'
+        return generar_csv_streaming_bloques(
+            TurnoService.COLUMNAS_EXPORTACION,
+            TurnoService.iterar_bloques_exportacion(consulta),
+            filename
+        )
+    
     @staticmethod
-    def calcular_estadisticas_periodo(turnos):
-        """Calcular estadísticas para un período de turnos"""
-        if not turnos:
-            return {
-                'total_turnos': 0,
-                'pendientes': 0,
-                'confirmados': 0,
-                'completados': 0,
-                'cancelados': 0,
-                'ingresos_total': 0
-            }
-        
-        estadisticas = {
-            'total_turnos': len(turnos),
-            'pendientes': sum(1 for t in turnos if t.estado == 'pendiente'),
-            'confirmados': sum(1 for t in turnos if t.estado == 'confirmado'),
-            'completados': sum(1 for t in turnos if t.estado == 'completado'),
-            'cancelados': sum(1 for t in turnos if t.estado == 'cancelado'),
-            'ingresos_total': sum(
-                float(t.precio_final or t.servicio.precio or 0) 
-                for t in turnos if t.estado == 'completado'
-            )
-        }
+    @solo_lectura
+    def exportar_pdf(fecha_desde=None, fecha_hasta=None):
+        """Exportar turnos a un reporte PDF paginado"""
+        consulta = TurnoService.consulta_exportacion(fecha_desde, fecha_hasta)
+        filas = TurnoService.iterar_filas_exportacion(consulta, precio_como_moneda=True)
         
-        return estadisticas
\ No newline at end of file
+        filename = f'turnos_{date.today().strftime("%Y%m%d")}'
+        return generar_pdf_streaming(TurnoService.COLUMNAS_EXPORTACION, filas, filename, 'Reporte de Turnos')
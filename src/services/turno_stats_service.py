@@ -0,0 +1,65 @@
+from sqlalchemy import func
+from src.models import Turno, Servicio
+from src.database import db
+from src.replica import solo_lectura
+
+ESTADOS_TURNO = ('pendiente', 'confirmado', 'completado', 'cancelado')
+
+
+class TurnoStatsService:
+
+    @staticmethod
+    @solo_lectura
+    def contar_por_estado(fecha_inicio=None, fecha_fin=None, profesional_id=None, servicio_id=None):
+        """Cantidad de turnos e importe por estado en una sola consulta agrupada.
+
+        Devuelve {estado: (cantidad, importe)}, donde el importe es la suma de
+        COALESCE(precio_final, servicios.precio).
+        """
+        query = db.session.query(
+            Turno.estado,
+            func.count(Turno.id),
+            func.sum(func.coalesce(Turno.precio_final, Servicio.precio))
+        ).join(Servicio, Turno.servicio_id == Servicio.id)
+
+        if fecha_inicio:
+            query = query.filter(Turno.fecha >= fecha_inicio)
+        if fecha_fin:
+            query = query.filter(Turno.fecha <= fecha_fin)
+        if profesional_id:
+            query = query.filter(Turno.profesional_id == profesional_id)
+        if servicio_id:
+            query = query.filter(Turno.servicio_id == servicio_id)
+
+        return {
+            estado: (cantidad, float(importe or 0))
+            for estado, cantidad, importe in query.group_by(Turno.estado)
+        }
+
+    @staticmethod
+    @solo_lectura
+    def get_estadisticas(fecha_inicio=None, fecha_fin=None, profesional_id=None, servicio_id=None):
+        """Estadísticas de turnos de un período (totales por estado e ingresos)"""
+        por_estado = TurnoStatsService.contar_por_estado(
+            fecha_inicio, fecha_fin, profesional_id, servicio_id
+        )
+        return TurnoStatsService.armar_estadisticas(por_estado)
+
+    @staticmethod
+    def armar_estadisticas(por_estado):
+        """Armar el diccionario de estadísticas a partir de {estado: (cantidad, importe)}"""
+        cantidades = {estado: por_estado.get(estado, (0, 0))[0] for estado in ESTADOS_TURNO}
+        total_turnos = sum(cantidad for cantidad, _ in por_estado.values())
+        completados = cantidades['completado']
+        ingresos_total = por_estado.get('completado', (0, 0.0))[1]
+
+        return {
+            'total_turnos': total_turnos,
+            'pendientes': cantidades['pendiente'],
+            'confirmados': cantidades['confirmado'],
+            'completados': completados,
+            'cancelados': cantidades['cancelado'],
+            'ingresos_total': ingresos_total,
+            'tasa_completados': (completados / total_turnos * 100) if total_turnos > 0 else 0,
+            'promedio_por_turno': (ingresos_total / completados) if completados > 0 else 0
+        }
@@ -0,0 +1,97 @@
+import os
+from contextlib import contextmanager
+from datetime import date, time, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from src.app import create_app
+from src.database import db
+
+# Base de los tests: SQLite en memoria, o la que indique TEST_DATABASE_URL
+TEST_DATABASE_URL = os.environ.get('TEST_DATABASE_URL', 'sqlite://')
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'postgres: requiere PostgreSQL en TEST_DATABASE_URL (si no, se saltea)')
+
+
+def pytest_collection_modifyitems(config, items):
+    if TEST_DATABASE_URL.startswith(('postgres://', 'postgresql')):
+        return
+
+    saltear = pytest.mark.skip(reason='Requiere TEST_DATABASE_URL=postgresql://...')
+    for item in items:
+        if 'postgres' in item.keywords:
+            item.add_marker(saltear)
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Aplicación de prueba sobre la base de TEST_DATABASE_URL (SQLite en memoria por defecto)"""
+    app = create_app({
+        'TESTING': True,
+        'SECRET_KEY': 'test',
+        'LOGIN_DISABLED': True,
+        'SQLALCHEMY_DATABASE_URI': TEST_DATABASE_URL,
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+        'CACHE_SQLITE_PATH': str(tmp_path / 'cache.sqlite'),
+    })
+
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def contar_consultas(app):
+    """Context manager que cuenta las sentencias SQL ejecutadas dentro del bloque"""
+
+    @contextmanager
+    def _contar():
+        sentencias = []
+
+        def registrar(conn, cursor, statement, parameters, context, executemany):
+            sentencias.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', registrar)
+        try:
+            yield sentencias
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', registrar)
+
+    return _contar
+
+
+@pytest.fixture
+def crear_turnos(app):
+    """Crear catálogo básico y `cantidad` turnos a partir de una fecha"""
+    from src.models import Cliente, Profesional, Servicio, Turno
+
+    def _crear(cantidad, fecha_inicio=None, dias=7):
+        fecha_inicio = fecha_inicio or date.today()
+        profesionales = [Profesional(nombre=f'Prof{i}', apellido='Test', activo=True) for i in range(3)]
+        servicios = [Servicio(nombre=f'Servicio{i}', precio=1000, duracion=30, activo=True) for i in range(3)]
+        clientes = [Cliente(nombre=f'Cliente{i}', apellido='Test', activo=True) for i in range(10)]
+        db.session.add_all(profesionales + servicios + clientes)
+        db.session.flush()
+
+        for i in range(cantidad):
+            db.session.add(Turno(
+                fecha=fecha_inicio + timedelta(days=i % dias),
+                hora=time(8 + (i // dias) % 10, 0),
+                estado='pendiente',
+                cliente_id=clientes[i % len(clientes)].id,
+                profesional_id=profesionales[i % len(profesionales)].id,
+                servicio_id=servicios[i % len(servicios)].id
+            ))
+        db.session.commit()
+        db.session.expire_all()
+
+    return _crear
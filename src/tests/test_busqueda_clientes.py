@@ -0,0 +1,94 @@
+import sqlite3
+
+import pytest
+
+from src.app import create_app
+from src.database import db
+from src.models import Cliente
+from src.services.busqueda_service import BusquedaService
+from src.services.cliente_service import ClienteService
+from src.services.profesional_service import ProfesionalService
+
+
+@pytest.fixture
+def clientes(app):
+    if not BusquedaService.indice_disponible():
+        pytest.skip('El índice de búsqueda requiere SQLite con FTS5')
+
+    clientes = [
+        Cliente(nombre='José', apellido='Núñez', email='jose@example.com', telefono='1155554444', activo=True),
+        Cliente(nombre='María', apellido='García', email='maria@example.com', activo=True),
+        Cliente(nombre='Mario', apellido='Garcés', activo=True),
+        Cliente(nombre='Ana', apellido='Gómez', activo=True),
+    ]
+    db.session.add_all(clientes)
+    db.session.commit()
+    return clientes
+
+
+def _apellidos(resultado):
+    return sorted(cliente.apellido for cliente in resultado)
+
+
+def test_busqueda_parcial_sin_tildes_ni_mayusculas(clientes):
+    assert _apellidos(ClienteService.buscar_clientes('nunez')) == ['Núñez']
+    assert _apellidos(ClienteService.buscar_clientes('GARC')) == ['Garcés', 'García']
+    assert _apellidos(ClienteService.buscar_clientes('arci')) == ['García']
+    assert _apellidos(ClienteService.buscar_clientes('maria garc')) == ['García']
+    assert _apellidos(ClienteService.get_paginated_clientes(search='5555').items) == ['Núñez']
+
+
+def test_busqueda_corta_por_prefijo_de_apellido(clientes):
+    assert _apellidos(ClienteService.buscar_clientes('ga')) == ['Garcés', 'García']
+    assert _apellidos(ClienteService.get_paginated_clientes(search='Gó').items) == ['Gómez']
+
+
+def test_indice_sincronizado_con_altas_cambios_y_bajas(clientes):
+    jose = clientes[0]
+
+    jose.apellido = 'Pérez'
+    db.session.commit()
+    assert ClienteService.buscar_clientes('nunez') == []
+    assert _apellidos(ClienteService.buscar_clientes('perez')) == ['Pérez']
+
+    ClienteService.eliminar_cliente(jose.id)
+    assert ClienteService.buscar_clientes('perez') == []
+
+    # Los inserts con Core (importación masiva) también se indexan
+    db.session.execute(Cliente.__table__.insert(), [{'nombre': 'Lucía', 'apellido': 'Ibáñez', 'activo': True}])
+    db.session.commit()
+    assert _apellidos(ClienteService.buscar_clientes('ibanez')) == ['Ibáñez']
+
+    assert BusquedaService.reconstruir_indice_clientes() == 4
+
+
+def test_triggers_funcionan_desde_conexiones_sin_la_aplicacion(tmp_path):
+    ruta = tmp_path / 'consultorio.db'
+    app = create_app({
+        'TESTING': True,
+        'SECRET_KEY': 'test',
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{ruta}',
+        'CACHE_SQLITE_PATH': str(tmp_path / 'cache.sqlite'),
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+    })
+    with app.app_context():
+        db.create_all()
+        if not BusquedaService.indice_disponible():
+            pytest.skip('El índice de búsqueda requiere SQLite con FTS5')
+        db.session.remove()
+        db.engine.dispose()
+
+    # sqlite3 sin las funciones que registra la aplicación (como el shell de sqlite3)
+    with sqlite3.connect(ruta) as conexion:
+        conexion.execute("INSERT INTO clientes (nombre, apellido, activo) VALUES ('Íñigo', 'Echeverría', 1)")
+        conexion.execute("UPDATE clientes SET apellido = 'ÁLVAREZ' WHERE nombre = 'Íñigo'")
+        conexion.execute(
+            "INSERT INTO profesionales (nombre, apellido, especialidad, activo) VALUES ('Sofía', 'Peña', 'Cardiología', 1)"
+        )
+    conexion.close()
+
+    with app.app_context():
+        assert _apellidos(ClienteService.buscar_clientes('inigo alvarez')) == ['ÁLVAREZ']
+        assert ClienteService.buscar_clientes('echeverria') == []
+        assert [p.apellido for p in ProfesionalService.buscar_profesionales('pena cardiologia')] == ['Peña']
+        db.drop_all()
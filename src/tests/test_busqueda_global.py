@@ -0,0 +1,77 @@
+import pytest
+
+from src.database import db
+from src.models import Autorizacion, Cliente, ObraSocial, Profesional, Servicio
+from src.services.busqueda_service import BusquedaService
+from src.services.profesional_service import ProfesionalService
+from src.services.servicio_service import ServicioService
+
+
+@pytest.fixture
+def catalogo(app):
+    if not BusquedaService.indice_disponible('busqueda_fts'):
+        pytest.skip('El índice de búsqueda global requiere SQLite con FTS5')
+
+    cliente = Cliente(nombre='Marta', apellido='Cardozo', email='marta@example.com', activo=True)
+    obra_social = ObraSocial(nombre='Cardio Salud', codigo='CS01', tipo='prepaga', activo=True)
+    db.session.add_all([
+        cliente,
+        obra_social,
+        Profesional(nombre='Lucía', apellido='Fernández', especialidad='Cardiología', activo=True),
+        Profesional(nombre='Pedro', apellido='Ríos', especialidad='Cardiología', activo=False),
+        Servicio(nombre='Electrocardiograma', descripcion='Estudio cardiológico', precio=1000, duracion=30, activo=True),
+        Servicio(nombre='Consulta clínica', precio=500, duracion=30, activo=True),
+    ])
+    db.session.flush()
+    db.session.add(Autorizacion(
+        numero_autorizacion='AUT-CARD-0001', cliente_id=cliente.id, obra_social_id=obra_social.id, activo=True
+    ))
+    db.session.commit()
+
+
+def _tipos_y_titulos(resultados):
+    return [(resultado['tipo'], resultado['titulo']) for resultado in resultados]
+
+
+def test_una_consulta_con_resultados_de_todas_las_entidades(client, catalogo, contar_consultas):
+    with contar_consultas() as sentencias:
+        respuesta = client.get('/api/buscar?q=card')
+
+    assert respuesta.status_code == 200
+    datos = respuesta.get_json()
+    assert sorted(_tipos_y_titulos(datos['resultados'])) == [
+        ('autorizacion', 'AUT-CARD-0001'),
+        ('cliente', 'Cardozo, Marta'),
+        ('obra_social', 'Cardio Salud'),
+        ('profesional', 'Fernández, Lucía'),
+        ('servicio', 'Electrocardiograma'),
+    ]
+    assert datos['total'] == 5
+    assert all(resultado['url'].endswith(f"/{resultado['id']}") for resultado in datos['resultados'])
+    assert len([sentencia for sentencia in sentencias if 'MATCH' in sentencia]) == 1
+
+
+def test_ranking_tipos_y_limite(catalogo):
+    # El nombre pesa más que el detalle: el servicio con "cardio" en el nombre va primero
+    resultados = BusquedaService.busqueda_global('cardio', tipos=['servicio', 'profesional'])
+    assert _tipos_y_titulos(resultados) == [('servicio', 'Electrocardiograma'), ('profesional', 'Fernández, Lucía')]
+
+    assert len(BusquedaService.busqueda_global('card', limite=2)) == 2
+    assert BusquedaService.busqueda_global('ca', tipos=['servicio']) == []
+
+
+def test_indice_sincronizado_y_busquedas_por_entidad(catalogo):
+    assert [p.apellido for p in ProfesionalService.buscar_profesionales('cardiologia')] == ['Fernández']
+
+    servicio = Servicio.query.filter_by(nombre='Consulta clínica').one()
+    servicio.nombre = 'Consulta cardiológica'
+    db.session.commit()
+    assert sorted(s.nombre for s in ServicioService.buscar_servicios('cardiolog')) == [
+        'Consulta cardiológica', 'Electrocardiograma'
+    ]
+
+    servicio.activo = False
+    db.session.commit()
+    assert [s.nombre for s in ServicioService.buscar_servicios('cardiolog')] == ['Electrocardiograma']
+
+    assert BusquedaService.reconstruir_indice_global() == 4
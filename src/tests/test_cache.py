@@ -0,0 +1,122 @@
+import multiprocessing
+import time
+from datetime import date
+
+import pytest
+
+from src.database import db
+from src.models import Cliente
+from src.services.cliente_service import ClienteService
+from src.services.turno_service import TurnoService
+from src.utils.cache import FALTA, CacheMemoria, CacheSQLite, get_cache, memoizar
+
+
+@pytest.fixture(params=['memoria', 'sqlite'])
+def backend(request, tmp_path):
+    if request.param == 'memoria':
+        return CacheMemoria(max_entradas=3, ttl=60)
+    return CacheSQLite(str(tmp_path / 'cache.sqlite'), max_entradas=3, ttl=60)
+
+
+def test_backend_namespaces_ttl_y_tope(backend):
+    backend.guardar('turnos', 'a', {'total': 1})
+    backend.guardar('clientes', 'a', None)
+
+    # Cada lectura devuelve una copia; None es un valor válido
+    valor = backend.obtener('turnos', 'a')
+    valor['total'] = 99
+    assert backend.obtener('turnos', 'a') == {'total': 1}
+    assert backend.obtener('clientes', 'a') is None
+    assert backend.obtener('turnos', 'b') is FALTA
+
+    backend.invalidar('turnos')
+    assert backend.obtener('turnos', 'a') is FALTA
+    assert backend.obtener('clientes', 'a') is None
+
+    backend.guardar('turnos', 'vence', 1, ttl=0.05)
+    time.sleep(0.1)
+    assert backend.obtener('turnos', 'vence') is FALTA
+
+    for clave in 'wxyz':
+        backend.guardar('turnos', clave, clave)
+    assert backend.cantidad() == 3
+    assert backend.obtener('turnos', 'z') == 'z'
+
+    estadisticas = backend.estadisticas()
+    assert estadisticas['namespaces']['turnos'] == {'aciertos': 3, 'fallos': 3}
+    assert estadisticas['desalojos'] >= 1
+
+
+def test_backend_no_guarda_con_generacion_vieja(backend):
+    generacion = backend.generacion('turnos')
+    backend.invalidar('turnos')
+
+    assert backend.generacion('turnos') == generacion + 1
+    assert backend.generacion('clientes') == 0
+    assert backend.guardar('turnos', 'a', 1, generacion=generacion) is False
+    assert backend.obtener('turnos', 'a') is FALTA
+    assert backend.guardar('turnos', 'a', 1, generacion=generacion + 1) is True
+    assert backend.obtener('turnos', 'a') == 1
+
+
+def test_no_se_guarda_un_resultado_leido_antes_de_una_escritura(app, backend):
+    app.extensions['cache'] = backend
+
+    @memoizar('clientes')
+    def contar_clientes():
+        total = Cliente.query.count()
+        if total == 0:
+            # Otra petición confirma un alta entre la lectura y el guardado
+            db.session.add(Cliente(nombre='Nuevo', apellido='Test', activo=True))
+            db.session.commit()
+        return total
+
+    assert contar_clientes() == 0
+    assert backend.cantidad() == 0
+    assert contar_clientes() == 1
+    assert contar_clientes() == 1
+    assert backend.estadisticas()['namespaces']['clientes'] == {'aciertos': 1, 'fallos': 2}
+
+
+def _escribir_en_otro_proceso(ruta):
+    CacheSQLite(ruta).guardar('turnos', 'compartida', [1, 2, 3])
+
+
+def test_sqlite_compartida_entre_procesos(tmp_path):
+    ruta = str(tmp_path / 'cache.sqlite')
+    proceso = multiprocessing.get_context('spawn').Process(target=_escribir_en_otro_proceso, args=(ruta,))
+    proceso.start()
+    proceso.join(30)
+
+    cache = CacheSQLite(ruta)
+    assert cache.obtener('turnos', 'compartida') == [1, 2, 3]
+
+    CacheSQLite(ruta).invalidar('turnos')
+    assert cache.obtener('turnos', 'compartida') is FALTA
+
+
+def test_memoizar_e_invalidar_al_confirmar(app, crear_turnos, contar_consultas):
+    crear_turnos(6, fecha_inicio=date.today(), dias=1)
+    TurnoService.get_calendario_data('dia', date.today())
+    ClienteService.get_estadisticas_clientes()
+
+    with contar_consultas() as sentencias:
+        calendario = TurnoService.get_calendario_data('dia', date.today())
+        assert ClienteService.get_estadisticas_clientes()['total_clientes'] == 10
+    assert sentencias == []
+    assert calendario['estadisticas']['total_turnos'] == 6
+
+    # Un cambio confirmado en turnos invalida el calendario, no las estadísticas de clientes
+    turno = TurnoService.get_turnos_by_fecha(date.today().isoformat())[0]
+    TurnoService.cambiar_estado_turno(turno.id, 'cancelado')
+    assert TurnoService.get_calendario_data('dia', date.today())['estadisticas']['cancelados'] == 1
+
+    # Con cambios sin confirmar se lee de la base sin guardar el resultado
+    db.session.add(Cliente(nombre='Nuevo', apellido='Test', activo=True))
+    db.session.flush()
+    assert ClienteService.get_estadisticas_clientes()['total_clientes'] == 11
+    db.session.rollback()
+    assert ClienteService.get_estadisticas_clientes()['total_clientes'] == 10
+
+    estadisticas = get_cache().estadisticas()['namespaces']
+    assert estadisticas['turnos'] == {'aciertos': 1, 'fallos': 2}
@@ -0,0 +1,70 @@
+from datetime import date, timedelta
+
+from src.database import db
+from src.models import Categoria, Profesional, Servicio, VersionCatalogo
+from src.services.catalogo_cache import CatalogoCache
+from src.services.profesional_service import ProfesionalService
+from src.services.servicio_service import ServicioService
+
+
+def _catalogo():
+    categoria = Categoria(nombre='Clínica', activo=True)
+    db.session.add(categoria)
+    db.session.flush()
+    db.session.add_all([
+        Profesional(nombre='Ana', apellido='Zeta', activo=True),
+        Profesional(nombre='Luis', apellido='Alfa', activo=True),
+        Profesional(nombre='Baja', apellido='Beta', activo=False),
+        Servicio(nombre='Consulta', precio=1000, duracion=45, categoria_id=categoria.id, activo=True),
+    ])
+    db.session.commit()
+
+
+def test_lecturas_repetidas_no_consultan_la_base(client, contar_consultas):
+    _catalogo()
+    assert [p.apellido for p in ProfesionalService.get_all_profesionales()] == ['Alfa', 'Zeta']
+    servicio = ServicioService.get_all_servicios()[0]
+    lunes = date.today() + timedelta(days=7 - date.today().weekday())
+
+    with contar_consultas() as sentencias:
+        assert [p.apellido for p in ProfesionalService.get_all_profesionales()] == ['Alfa', 'Zeta']
+        assert CatalogoCache.por_id('servicios', servicio.id).duracion == 45
+
+    assert sentencias == []
+
+    # La búsqueda de horarios toma la duración y el profesional de la caché
+    with contar_consultas() as sentencias:
+        respuesta = client.get(
+            f'/turnos/horarios-disponibles?fecha={lunes.isoformat()}'
+            f'&profesional_id={ProfesionalService.get_all_profesionales()[0].id}&servicio_id={servicio.id}'
+        )
+    assert respuesta.status_code == 200
+    assert not any('FROM servicios' in sentencia or 'FROM profesionales' in sentencia for sentencia in sentencias)
+
+
+def test_objetos_cacheados_sobreviven_a_la_sesion(app):
+    _catalogo()
+    ServicioService.get_all_servicios()
+    db.session.remove()
+
+    # Relaciones que usa to_dict() precargadas; sin DetachedInstanceError
+    assert ServicioService.get_all_servicios()[0].to_dict()['categoria'] == 'Clínica'
+
+
+def test_invalidacion_local_y_entre_procesos(app):
+    _catalogo()
+    assert len(ProfesionalService.get_all_profesionales()) == 2
+
+    # El proceso que modifica ve el cambio al instante
+    ProfesionalService.crear_profesional({'nombre': 'Eva', 'apellido': 'Gama'})
+    assert [p.apellido for p in ProfesionalService.get_all_profesionales()] == ['Alfa', 'Gama', 'Zeta']
+    assert db.session.get(VersionCatalogo, 'profesionales').version == 1
+
+    # Cambio hecho por otro proceso: se ve cuando vence el TTL y la versión no coincide
+    db.session.add(Profesional(nombre='Otro', apellido='Delta', activo=True))
+    db.session.get(VersionCatalogo, 'profesionales').version += 1
+    db.session.commit()
+    assert len(ProfesionalService.get_all_profesionales()) == 3
+
+    app.config['CATALOG_CACHE_TTL'] = 0
+    assert len(ProfesionalService.get_all_profesionales()) == 4
@@ -0,0 +1,75 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool
+
+from src.app import create_app
+from src.config_db import DB_POOL_SIZE, get_engine_options, normalize_database_uri
+from src.database import db
+
+
+def _pragma(nombre):
+    return db.session.execute(text(f'PRAGMA {nombre}')).scalar()
+
+
+def test_perfil_sqlite_en_cada_conexion(tmp_path):
+    app = create_app({
+        'TESTING': True,
+        'SECRET_KEY': 'test',
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'consultorio.db'}",
+        'CACHE_SQLITE_PATH': str(tmp_path / 'cache.sqlite'),
+        'SQLITE_BUSY_TIMEOUT': 2500,
+    })
+
+    with app.app_context():
+        assert _pragma('journal_mode') == 'wal'
+        assert _pragma('synchronous') == 1  # NORMAL
+        assert _pragma('foreign_keys') == 1
+        assert _pragma('temp_store') == 2  # MEMORY
+        assert _pragma('busy_timeout') == 2500
+        assert _pragma('cache_size') == -64000
+        db.session.remove()
+
+
+def test_perfil_sqlite_desactivado(tmp_path):
+    app = create_app({
+        'TESTING': True,
+        'SECRET_KEY': 'test',
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'consultorio.db'}",
+        'CACHE_SQLITE_PATH': str(tmp_path / 'cache.sqlite'),
+        'SQLITE_TUNING_ENABLED': False,
+    })
+
+    with app.app_context():
+        assert _pragma('journal_mode') == 'delete'
+        assert _pragma('foreign_keys') == 0
+        db.session.remove()
+
+
+def test_uri_postgres_usa_psycopg():
+    assert normalize_database_uri('postgres://u:p@db/consultorio') == 'postgresql+psycopg://u:p@db/consultorio'
+    assert normalize_database_uri('postgresql://u:p@db/consultorio') == 'postgresql+psycopg://u:p@db/consultorio'
+    assert normalize_database_uri('postgresql+psycopg2://u@db/c') == 'postgresql+psycopg2://u@db/c'
+    assert normalize_database_uri('sqlite:///consultorio.db') == 'sqlite:///consultorio.db'
+
+
+def test_opciones_de_motor_segun_esquema():
+    config = {'DB_POOL_SIZE': 4, 'DB_STATEMENT_TIMEOUT_MS': 5000}
+
+    postgres = get_engine_options('postgresql+psycopg://u:p@db/consultorio', config)
+    assert postgres['pool_size'] == 4
+    assert postgres['max_overflow'] == 20
+    assert postgres['connect_args']['options'] == '-c statement_timeout=5000'
+    assert 'check_same_thread' not in postgres['connect_args']
+
+    sqlite = get_engine_options('sqlite:///consultorio.db', config)
+    assert sqlite == {'connect_args': {'check_same_thread': False}}
+
+
+
+@pytest.mark.postgres
+def test_motor_postgres_con_pool_y_timeouts(app):
+    assert db.engine.dialect.driver == 'psycopg'
+    assert isinstance(db.engine.pool, QueuePool)
+    assert db.engine.pool.size() == DB_POOL_SIZE
+    assert db.session.execute(text('SHOW statement_timeout')).scalar() == '30s'
+    assert db.session.execute(text('SHOW application_name')).scalar() == 'consultorio'
@@ -0,0 +1,72 @@
+from datetime import date, timedelta
+
+import pytest
+
+from src.services.turno_service import TurnoService
+from src.services.autorizacion_service import AutorizacionService
+
+# Consultas máximas por request, independientes de la cantidad de turnos
+MAX_CONSULTAS = 6
+
+
+def _lunes():
+    hoy = date.today()
+    return hoy - timedelta(days=hoy.weekday())
+
+
+@pytest.mark.parametrize('cantidad', [10, 120])
+def test_api_calendario_consultas_acotadas(client, crear_turnos, contar_consultas, cantidad):
+    inicio = _lunes()
+    crear_turnos(cantidad, fecha_inicio=inicio)
+
+    with contar_consultas() as sentencias:
+        respuesta = client.get('/turnos/api/turnos-calendario', query_string={
+            'fecha_inicio': inicio.isoformat(),
+            'fecha_fin': (inicio + timedelta(days=6)).isoformat()
+        })
+
+    assert respuesta.status_code == 200
+    assert len(respuesta.get_json()['turnos']) == cantidad
+    assert len(sentencias) <= MAX_CONSULTAS
+
+
+@pytest.mark.parametrize('vista', ['dia', 'semana', 'mes'])
+def test_calendario_consultas_acotadas(client, crear_turnos, contar_consultas, vista):
+    inicio = _lunes()
+    crear_turnos(120, fecha_inicio=inicio)
+
+    with contar_consultas() as sentencias:
+        respuesta = client.get('/turnos/calendario', query_string={
+            'fecha': inicio.isoformat(), 'vista': vista
+        })
+
+    assert respuesta.status_code == 200
+    assert len(sentencias) <= MAX_CONSULTAS
+
+
+def test_listado_turnos_consultas_acotadas(client, crear_turnos, contar_consultas):
+    crear_turnos(60)
+
+    with contar_consultas() as sentencias:
+        respuesta = client.get('/turnos/', query_string={'per_page': 50})
+
+    assert respuesta.status_code == 200
+    assert len(sentencias) <= MAX_CONSULTAS
+
+
+def test_exportacion_turnos_sin_n_mas_1(app, crear_turnos, contar_consultas):
+    crear_turnos(90)
+
+    with contar_consultas() as sentencias:
+        turnos = TurnoService.query_con_relaciones('exportacion').all()
+        filas = [turno.to_dict() for turno in turnos]
+
+    assert len(filas) == 90
+    assert len(sentencias) == 1
+
+
+def test_caso_de_uso_desconocido(app):
+    with pytest.raises(ValueError):
+        TurnoService.query_con_relaciones('inexistente')
+    with pytest.raises(ValueError):
+        AutorizacionService.query_con_relaciones('inexistente')
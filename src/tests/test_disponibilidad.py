@@ -0,0 +1,120 @@
+import random
+from datetime import date, time, timedelta
+
+import pytest
+
+from src.database import db
+from src.models import Cliente, Profesional, Servicio, Turno
+from src.services.disponibilidad_service import AgendaOcupada, DisponibilidadService
+from src.services.turno_service import TurnoService
+
+
+def test_agenda_fusiona_intervalos_solapados_y_contiguos():
+    agenda = AgendaOcupada([(600, 630), (540, 600), (560, 570), (700, 760), (720, 730)])
+
+    # 9:00-10:00 y 10:00-10:30 se tocan: quedan en un solo intervalo
+    assert (agenda.inicios, agenda.fines) == ([540, 700], [630, 760])
+    assert len(agenda) == 2
+
+    agenda.agregar(630, 700)
+    assert (agenda.inicios, agenda.fines) == ([540], [760])
+
+
+def test_agenda_limites_de_los_intervalos():
+    agenda = AgendaOcupada([(600, 660)])
+
+    # Termina justo cuando empieza el ocupado, o empieza justo cuando termina: libre
+    assert agenda.esta_libre(570, 600)
+    assert agenda.esta_libre(660, 690)
+    # Un minuto de solapamiento alcanza para ocupar
+    assert not agenda.esta_libre(571, 601)
+    assert not agenda.esta_libre(659, 689)
+    assert not agenda.esta_libre(610, 620)
+    assert not agenda.esta_libre(540, 720)
+
+    assert AgendaOcupada().esta_libre(0, 1440)
+
+
+def test_filtrar_libres_coincide_con_esta_libre():
+    generador = random.Random(20261018)
+    for _ in range(200):
+        intervalos = []
+        for _ in range(generador.randint(0, 8)):
+            inicio = generador.randrange(480, 1080, 5)
+            intervalos.append((inicio, inicio + generador.choice([15, 30, 45, 60, 90])))
+        agenda = AgendaOcupada(intervalos)
+        duracion = generador.choice([15, 30, 45, 60])
+        candidatos = list(range(480, 1080, generador.choice([10, 15, 30])))
+
+        esperado = [inicio for inicio in candidatos if agenda.esta_libre(inicio, inicio + duracion)]
+        assert agenda.filtrar_libres(candidatos, duracion) == esperado, (intervalos, duracion)
+
+
+@pytest.fixture
+def agenda_db(app):
+    profesional = Profesional(nombre='Ana', apellido='Test', activo=True)
+    otro = Profesional(nombre='Luis', apellido='Test', activo=True)
+    servicio = Servicio(nombre='Consulta', precio=1000, duracion=30, activo=True)
+    largo = Servicio(nombre='Estudio', precio=3000, duracion=60, activo=True)
+    cliente = Cliente(nombre='Juan', apellido='Test', activo=True)
+    db.session.add_all([profesional, otro, servicio, largo, cliente])
+    db.session.flush()
+
+    fecha = date.today() + timedelta(days=7)
+    turnos = {
+        'confirmado': Turno(fecha=fecha, hora=time(10, 0), estado='confirmado', cliente_id=cliente.id,
+                            profesional_id=profesional.id, servicio_id=servicio.id),
+        'pendiente': Turno(fecha=fecha, hora=time(10, 30), estado='pendiente', cliente_id=cliente.id,
+                           profesional_id=profesional.id, servicio_id=largo.id),
+        'cancelado': Turno(fecha=fecha, hora=time(14, 0), estado='cancelado', cliente_id=cliente.id,
+                           profesional_id=profesional.id, servicio_id=servicio.id),
+        'completado': Turno(fecha=fecha, hora=time(15, 0), estado='completado', cliente_id=cliente.id,
+                            profesional_id=profesional.id, servicio_id=servicio.id),
+        'otro': Turno(fecha=fecha, hora=time(9, 0), estado='confirmado', cliente_id=cliente.id,
+                      profesional_id=otro.id, servicio_id=servicio.id),
+    }
+    db.session.add_all(turnos.values())
+    db.session.commit()
+    return profesional, otro, fecha, turnos
+
+
+def test_cargar_agendas_por_profesional_y_estado(agenda_db):
+    profesional, otro, fecha, turnos = agenda_db
+
+    agendas = DisponibilidadService.cargar_agendas([profesional.id, otro.id], fecha, fecha + timedelta(days=1))
+
+    assert set(agendas) == {(profesional.id, fecha), (otro.id, fecha)}
+    # Confirmado y pendiente (con su duración) fusionados; cancelado y completado no bloquean
+    agenda = agendas[(profesional.id, fecha)]
+    assert (agenda.inicios, agenda.fines) == ([600], [690])
+    assert (agendas[(otro.id, fecha)].inicios, agendas[(otro.id, fecha)].fines) == ([540], [570])
+
+
+def test_esta_disponible(agenda_db):
+    profesional, otro, fecha, turnos = agenda_db
+
+    assert DisponibilidadService.esta_disponible(profesional.id, fecha, '09:30', 30)
+    assert not DisponibilidadService.esta_disponible(profesional.id, fecha, '09:31', 30)
+    assert not DisponibilidadService.esta_disponible(profesional.id, fecha, time(11, 0), 30)
+    assert DisponibilidadService.esta_disponible(profesional.id, fecha, time(11, 30), 30)
+    assert DisponibilidadService.esta_disponible(profesional.id, fecha, '14:00', 30)
+    assert DisponibilidadService.esta_disponible(profesional.id, fecha, '15:00', 30)
+    assert DisponibilidadService.esta_disponible(otro.id, fecha, '10:00', 30)
+
+
+def test_excluir_el_turno_que_se_edita(agenda_db):
+    profesional, otro, fecha, turnos = agenda_db
+    turno = turnos['confirmado']
+
+    # El turno no choca consigo mismo, pero sí con el siguiente
+    assert not DisponibilidadService.esta_disponible(profesional.id, fecha, '10:00', 30)
+    assert DisponibilidadService.esta_disponible(profesional.id, fecha, '10:00', 30, excluir_turno_id=turno.id)
+    assert DisponibilidadService.esta_disponible(profesional.id, fecha, '09:45', 30, excluir_turno_id=turno.id)
+    assert not DisponibilidadService.esta_disponible(profesional.id, fecha, '10:15', 30, excluir_turno_id=turno.id)
+
+    # Moverlo 15 minutos antes pisa su propio horario: se permite
+    TurnoService.actualizar_turno(turno.id, {'fecha': fecha.isoformat(), 'hora': '09:45'})
+    assert db.session.get(Turno, turno.id).hora == time(9, 45)
+
+    with pytest.raises(ValueError, match='no está disponible'):
+        TurnoService.actualizar_turno(turno.id, {'fecha': fecha.isoformat(), 'hora': '10:15'})
@@ -0,0 +1,161 @@
+import csv
+from datetime import date
+from io import BytesIO, StringIO
+
+from openpyxl import load_workbook
+
+from src.services.turno_service import TurnoService
+
+
+def _leer_csv(respuesta):
+    return list(csv.reader(StringIO(respuesta.get_data(as_text=True).lstrip('﻿'))))
+
+
+def test_csv_turnos_en_streaming(client, crear_turnos, contar_consultas):
+    crear_turnos(1200, fecha_inicio=date(2024, 1, 1), dias=30)
+
+    with contar_consultas() as sentencias:
+        respuesta = client.get('/turnos/reporte', query_string={'formato': 'csv'}, buffered=False)
+        # El cuerpo todavía no se generó: se escribe mientras se lee
+        assert respuesta.is_streamed
+        filas = _leer_csv(respuesta)
+
+    assert respuesta.status_code == 200
+    assert respuesta.headers['Content-Type'] == 'text/csv; charset=utf-8'
+    assert filas[0] == TurnoService.COLUMNAS_EXPORTACION
+    assert len(filas) == 1201
+    # Una sola consulta con las relaciones unidas, sin N+1
+    assert len([s for s in sentencias if s.lstrip().upper().startswith('SELECT')]) == 1
+
+
+def test_csv_clientes_con_bom_y_sin_datos(client):
+    respuesta = client.get('/clientes/exportar', query_string={'formato': 'csv'})
+
+    assert respuesta.status_code == 200
+    assert respuesta.get_data().startswith('﻿'.encode('utf-8'))
+    assert len(_leer_csv(respuesta)) == 1
+
+
+def test_excel_turnos_write_only(client, crear_turnos):
+    crear_turnos(300, fecha_inicio=date(2024, 1, 1), dias=30)
+
+    respuesta = client.get('/turnos/reporte', query_string={'formato': 'excel'})
+
+    assert respuesta.status_code == 200
+    hoja = load_workbook(BytesIO(respuesta.get_data()), read_only=True)['Turnos']
+    filas = list(hoja.values)
+    assert list(filas[0]) == TurnoService.COLUMNAS_EXPORTACION
+    assert len(filas) == 301
+    assert filas[1][7] == '$1,000.00'
+
+
+def test_exportacion_en_segundo_plano(app, client, crear_turnos, tmp_path):
+    app.config.update(EXPORT_DIR=str(tmp_path), EXPORT_MAX_WORKERS=1)
+    crear_turnos(200, fecha_inicio=date(2024, 1, 1), dias=30)
+
+    respuesta = client.get('/turnos/reporte', query_string={'formato': 'csv', 'modo': 'background'})
+    assert respuesta.status_code == 202
+    trabajo_id = respuesta.get_json()['trabajo']['id']
+
+    # Esperar a que el pool termine el trabajo
+    app.extensions.pop('exportaciones').shutdown(wait=True)
+
+    estado = client.get(respuesta.headers['Location']).get_json()
+    assert estado['estado'] == 'completado'
+    assert estado['filas'] == 200
+
+    descarga = client.get(estado['url_descarga'])
+    assert descarga.status_code == 200
+    assert len(_leer_csv(descarga)) == 201
+    assert (tmp_path / f'{trabajo_id}.csv').exists()
+
+
+def test_exportacion_cola_llena(app, client, tmp_path):
+    app.config.update(EXPORT_DIR=str(tmp_path), EXPORT_MAX_PENDING=0)
+
+    respuesta = client.get('/clientes/exportar', query_string={'formato': 'csv', 'modo': 'background'})
+
+    assert respuesta.status_code == 429
+    assert 'Retry-After' in respuesta.headers
+
+
+def test_pdf_turnos_paginado(client, crear_turnos):
+    from src.utils.exports import FILAS_POR_PAGINA_PDF
+
+    crear_turnos(FILAS_POR_PAGINA_PDF * 2 + 1, fecha_inicio=date(2024, 1, 1), dias=30)
+
+    respuesta = client.get('/turnos/reporte', query_string={'formato': 'pdf'})
+
+    assert respuesta.status_code == 200
+    assert respuesta.headers['Content-Type'] == 'application/pdf'
+    contenido = respuesta.get_data()
+    assert contenido.startswith(b'%PDF')
+    assert contenido.count(b'/Type /Page\n') == 3
+
+
+def test_trabajos_interrumpidos_liberan_la_cola(app, client, tmp_path):
+    from datetime import datetime, timedelta
+    from src.database import db
+    from src.models import TrabajoExportacion
+
+    app.config.update(EXPORT_DIR=str(tmp_path), EXPORT_MAX_PENDING=2, EXPORT_MAX_WORKERS=0)
+
+    # Trabajos que quedaron a medias por un reinicio del servidor
+    hace_dos_horas = datetime.utcnow() - timedelta(hours=2)
+    db.session.add_all([
+        TrabajoExportacion(id='a' * 32, tipo='clientes', formato='csv', estado='procesando',
+                           fecha_creacion=hace_dos_horas, fecha_inicio=hace_dos_horas),
+        TrabajoExportacion(id='b' * 32, tipo='clientes', formato='csv', estado='pendiente',
+                           fecha_creacion=hace_dos_horas),
+    ])
+    db.session.commit()
+
+    respuesta = client.get('/clientes/exportar', query_string={'formato': 'csv', 'modo': 'background'})
+    assert respuesta.status_code == 202
+
+    for trabajo_id in ('a' * 32, 'b' * 32):
+        trabajo = db.session.get(TrabajoExportacion, trabajo_id)
+        assert trabajo.estado == 'error'
+        assert 'interrumpido' in trabajo.error
+
+
+def test_purgar_conserva_trabajos_en_curso(app, tmp_path):
+    from datetime import datetime, timedelta
+    from src.database import db
+    from src.models import TrabajoExportacion
+    from src.services.exportacion_service import ExportacionService
+
+    app.config.update(EXPORT_DIR=str(tmp_path))
+    hace_dos_dias = datetime.utcnow() - timedelta(days=2)
+    db.session.add_all([
+        TrabajoExportacion(id='c' * 32, tipo='clientes', formato='csv', estado='completado', fecha_creacion=hace_dos_dias),
+        TrabajoExportacion(id='p' * 32, tipo='clientes', formato='csv', estado='procesando', fecha_creacion=hace_dos_dias),
+    ])
+    db.session.commit()
+
+    assert ExportacionService.purgar() == 1
+    assert db.session.get(TrabajoExportacion, 'c' * 32) is None
+    assert db.session.get(TrabajoExportacion, 'p' * 32).estado == 'procesando'
+
+
+def test_trabajos_visibles_solo_para_su_usuario(app):
+    from flask_login import login_user
+    from src.database import db
+    from src.models import TrabajoExportacion, Usuario
+    from src.routes.exportaciones import _trabajo_visible
+
+    usuario = Usuario(username='ana', email='ana@example.com', nombre='Ana', apellido='Test')
+    usuario.set_password('secreto')
+    db.session.add(usuario)
+    db.session.flush()
+    db.session.add_all([
+        TrabajoExportacion(id='u' * 32, tipo='clientes', formato='csv', usuario_id=usuario.id),
+        TrabajoExportacion(id='n' * 32, tipo='clientes', formato='csv', usuario_id=None),
+    ])
+    db.session.commit()
+
+    with app.test_request_context():
+        login_user(usuario)
+        assert _trabajo_visible('u' * 32) is not None
+        # Un trabajo sin usuario no es de nadie logueado
+        assert _trabajo_visible('n' * 32) is None
@@ -0,0 +1,110 @@
+import io
+
+from openpyxl import Workbook
+
+from src.database import db
+from src.models import Cliente, ObraSocial, PlanObraSocial
+from src.services.cliente_import_service import ClienteImportService
+
+CSV_CLIENTES = (
+    'Nombre;Apellido;Teléfono;Email;Obra Social;Plan;Nro Afiliado\n'
+    'Ana;García;1155554444;ana@example.com;OSDE;210;123\n'
+    'Juan;Pérez;;juan@example.com;;;\n'
+    'Sin;Email;;;particular;;\n'
+    ';Falta nombre;;x@example.com;;;\n'
+    'Luis;Mail Malo;;no-es-un-mail;;;\n'
+    'Otra;Obra;;otra@example.com;NOEXISTE;;\n'
+    'Ana;Repetida;;ANA@example.com;;;\n'
+    'Carla;Existente;1144443333;carla@example.com;;;\n'
+)
+
+
+def _catalogo():
+    obra_social = ObraSocial(nombre='OSDE', codigo='OSDE', tipo='prepaga', activo=True)
+    db.session.add(obra_social)
+    db.session.flush()
+    plan = PlanObraSocial(nombre='Plan 210', codigo='210', obra_social_id=obra_social.id, activo=True)
+    existente = Cliente(nombre='Carla', apellido='Vieja', email='carla@example.com', activo=True)
+    db.session.add_all([plan, existente])
+    db.session.commit()
+    return obra_social, plan, existente
+
+
+def test_importar_csv_con_rechazos_y_actualizacion(app, contar_consultas):
+    obra_social, plan, existente = _catalogo()
+
+    with contar_consultas() as sentencias:
+        resultado = ClienteImportService.importar(io.BytesIO(CSV_CLIENTES.encode('utf-8')), 'csv', tamanio_lote=3)
+
+    assert (resultado.leidas, resultado.insertados, resultado.actualizados) == (8, 3, 1)
+    assert {rechazo['fila']: rechazo['motivo'] for rechazo in resultado.rechazos} == {
+        5: 'Nombre y apellido son obligatorios',
+        6: 'Email no válido',
+        7: 'Obra social desconocida: NOEXISTE',
+        8: 'Email repetido en el archivo (fila 2)',
+    }
+
+    # Una consulta IN por lote con emails válidos (el segundo lote se rechaza completo)
+    consultas_email = [sentencia for sentencia in sentencias if 'lower(clientes.email) IN' in sentencia]
+    assert len(consultas_email) == 2
+
+    ana = Cliente.query.filter_by(email='ana@example.com').one()
+    assert (ana.obra_social_id, ana.plan_id, ana.numero_afiliado) == (obra_social.id, plan.id, '123')
+
+    db.session.refresh(existente)
+    assert (existente.apellido, existente.telefono) == ('Existente', '1144443333')
+    assert Cliente.query.count() == 4
+
+
+def test_importar_xlsx_sin_actualizar(app):
+    _catalogo()
+    libro = Workbook()
+    hoja = libro.active
+    hoja.append(['nombre', 'apellido', 'email', 'telefono'])
+    hoja.append(['Pedro', 'Gómez', 'pedro@example.com', 1133332222])
+    hoja.append(['Carla', 'Nueva', 'carla@example.com', None])
+    archivo = io.BytesIO()
+    libro.save(archivo)
+    archivo.seek(0)
+
+    resultado = ClienteImportService.importar(archivo, 'xlsx', actualizar=False)
+
+    assert (resultado.insertados, resultado.actualizados, resultado.rechazados) == (1, 0, 1)
+    assert resultado.rechazos[0]['motivo'] == 'Ya existe un cliente con este email'
+    assert Cliente.query.filter_by(email='pedro@example.com').one().telefono == '1133332222'
+
+
+def test_email_existente_con_mayusculas(app):
+    from src.services.cliente_service import ClienteService
+
+    existente = Cliente(nombre='Bruno', apellido='Viejo', email='Bruno.Diaz@Example.com', activo=True)
+    db.session.add(existente)
+    db.session.commit()
+
+    archivo = io.BytesIO('nombre;apellido;email;telefono\nBruno;Díaz;bruno.diaz@example.com;1122221111\n'.encode('utf-8'))
+    resultado = ClienteImportService.importar(archivo, 'csv')
+
+    assert (resultado.insertados, resultado.actualizados) == (0, 1)
+    db.session.refresh(existente)
+    assert (existente.apellido, existente.telefono) == ('Díaz', '1122221111')
+    assert ClienteService.validar_datos_cliente({
+        'nombre': 'Otro', 'apellido': 'Cliente', 'email': 'BRUNO.DIAZ@example.com'
+    }) == ['Ya existe un cliente con este email']
+
+
+def test_importar_desde_formulario(client):
+    respuesta = client.post(
+        '/clientes/importar',
+        data={'archivo': (io.BytesIO(b'nombre,apellido\nAna,Test\n'), 'clientes.csv')},
+        headers={'Accept': 'application/json'}
+    )
+
+    assert respuesta.status_code == 200
+    assert respuesta.get_json()['insertados'] == 1
+
+    respuesta = client.post(
+        '/clientes/importar',
+        data={'archivo': (io.BytesIO(b'email\nx@example.com\n'), 'clientes.csv')},
+        headers={'Accept': 'application/json'}
+    )
+    assert respuesta.status_code == 400
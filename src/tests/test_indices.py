@@ -0,0 +1,104 @@
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from src.database import db
+from src.services.disponibilidad_service import DisponibilidadService
+from src.services.turno_service import TurnoService
+from src.services.autorizacion_service import AutorizacionService
+from src.services.cliente_service import ClienteService
+
+TABLAS_CALIENTES = ('turnos', 'autorizaciones', 'clientes')
+
+
+def _planes(funcion):
+    """Ejecutar la función y devolver el EXPLAIN QUERY PLAN de cada sentencia emitida"""
+    sentencias = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        sentencias.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', registrar)
+    try:
+        funcion()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', registrar)
+
+    conexion = db.session.connection()
+    return [
+        [fila[-1] for fila in conexion.exec_driver_sql('EXPLAIN QUERY PLAN ' + sql, parametros)]
+        for sql, parametros in sentencias
+    ]
+
+
+def _assert_sin_scan_completo(planes, indice):
+    lineas = [linea for plan in planes for linea in plan]
+    for tabla in TABLAS_CALIENTES:
+        assert not any(linea.startswith(f'SCAN {tabla}') for linea in lineas), lineas
+    assert any(indice in linea for linea in lineas), lineas
+
+
+@pytest.fixture
+def db_sqlite(app):
+    if db.engine.dialect.name != 'sqlite':
+        pytest.skip('EXPLAIN QUERY PLAN es específico de SQLite')
+
+
+def test_disponibilidad_usa_indice_profesional_fecha(db_sqlite):
+    planes = _planes(lambda: DisponibilidadService.cargar_agendas([1], date.today()))
+    _assert_sin_scan_completo(planes, 'ix_turnos_profesional_fecha_estado')
+
+
+def test_calendario_general_usa_indice_fecha_hora(db_sqlite):
+    hoy = date.today()
+    planes = _planes(lambda: TurnoService.get_turnos_by_fecha_range(hoy, hoy + timedelta(days=6)))
+    _assert_sin_scan_completo(planes, 'ix_turnos_fecha_hora')
+
+
+def test_resumen_dia_usa_indice_profesional_fecha(db_sqlite):
+    planes = _planes(lambda: TurnoService.get_resumen_dia(date.today().isoformat(), 1))
+    _assert_sin_scan_completo(planes, 'ix_turnos_profesional_fecha_estado')
+
+
+def test_listado_autorizaciones_filtrado_usa_indice(db_sqlite):
+    planes = _planes(lambda: AutorizacionService.get_paginated_autorizaciones(
+        estado='pendiente', obra_social_id=1
+    ))
+    _assert_sin_scan_completo(planes, 'ix_autorizaciones_activo_estado_os_fecha')
+
+
+def test_listado_autorizaciones_usa_indice_fecha(db_sqlite):
+    planes = _planes(lambda: AutorizacionService.get_paginated_autorizaciones())
+    _assert_sin_scan_completo(planes, 'ix_autorizaciones_activo_fecha')
+
+
+def test_listado_clientes_usa_indice(db_sqlite):
+    planes = _planes(lambda: ClienteService.get_paginated_clientes())
+    _assert_sin_scan_completo(planes, 'ix_clientes_activo_apellido_nombre')
+
+
+def test_duplicados_de_importacion_usan_indice_email(db_sqlite):
+    from src.services.cliente_import_service import ClienteImportService
+
+    planes = _planes(lambda: ClienteImportService._clientes_por_email(['a@example.com', 'B@example.com']))
+    _assert_sin_scan_completo(planes, 'ix_clientes_email_lower_activo')
+
+
+def test_listados_por_cursor_buscan_en_el_indice_sin_ordenar(db_sqlite):
+    from datetime import time
+    from src.services.obra_social_service import ObraSocialService
+    from src.utils.paginacion import codificar_cursor
+
+    casos = [
+        (lambda: TurnoService.get_turnos_por_cursor(codificar_cursor('turnos', [date.today(), time(10), 5], 'sig')),
+         'ix_turnos_fecha_hora'),
+        (lambda: ClienteService.get_clientes_por_cursor(codificar_cursor('clientes', ['Pérez', 'Ana', 5], 'ant')),
+         'ix_clientes_activo_apellido_nombre'),
+        (lambda: ObraSocialService.get_obras_sociales_por_cursor(codificar_cursor('obras_sociales', ['OSDE', 5], 'sig')),
+         'ix_obras_sociales_activo_nombre'),
+    ]
+    for funcion, indice in casos:
+        planes = _planes(funcion)
+        _assert_sin_scan_completo(planes, indice)
+        assert not any('TEMP B-TREE' in linea for plan in planes for linea in plan), planes
@@ -0,0 +1,78 @@
+import threading
+
+import pytest
+
+from src.app import create_app
+from src.database import db
+from src.utils.metrics import RegistroMetricas, BUCKETS_LATENCIA
+
+
+@pytest.fixture
+def app_metricas(tmp_path):
+    """Aplicación con el endpoint /metrics activado"""
+    app = create_app({
+        'TESTING': True,
+        'SECRET_KEY': 'test',
+        'LOGIN_DISABLED': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+        'METRICS_ENABLED': True,
+        'CACHE_SQLITE_PATH': str(tmp_path / 'cache.sqlite'),
+    })
+
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_metricas_por_endpoint(app_metricas):
+    client = app_metricas.test_client()
+    client.get('/clientes/')
+    client.get('/clientes/')
+    client.get('/no-existe')
+
+    texto = client.get('/metrics').get_data(as_text=True)
+
+    assert 'consultorio_http_requests_total{blueprint="clientes",endpoint="clientes.listar",method="GET",status="200"} 2' in texto
+    assert 'endpoint="sin_ruta",method="GET",status="404"} 1' in texto
+    assert 'consultorio_http_request_duration_seconds_bucket{blueprint="clientes",endpoint="clientes.listar",method="GET",le="+Inf"} 2' in texto
+    assert 'consultorio_db_queries_per_request_count{blueprint="clientes",endpoint="clientes.listar"} 2' in texto
+    assert 'consultorio_db_pool_checkouts_total{bind="default"}' in texto
+
+
+def test_metricas_con_token(app_metricas):
+    app_metricas.config.update(METRICS_TOKEN='secreto')
+    client = app_metricas.test_client()
+
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer secreto'}).status_code == 200
+
+
+def test_metricas_desactivadas_por_defecto(client):
+    assert client.get('/metrics').status_code == 404
+
+
+def test_registro_suma_los_hilos():
+    registro = RegistroMetricas()
+    registro.contador('eventos_total', 'Eventos', ('tipo',))
+    registro.histograma('latencia_seconds', 'Latencia', BUCKETS_LATENCIA)
+
+    def trabajar():
+        for _ in range(1000):
+            registro.incrementar('eventos_total', ('a',))
+            registro.observar('latencia_seconds', 0.02)
+
+    hilos = [threading.Thread(target=trabajar) for _ in range(8)]
+    for hilo in hilos:
+        hilo.start()
+    # Lectura concurrente con las escrituras
+    registro.exponer()
+    for hilo in hilos:
+        hilo.join()
+
+    texto = registro.exponer()
+    assert 'consultorio_eventos_total{tipo="a"} 8000' in texto
+    assert 'consultorio_latencia_seconds_bucket{le="0.01"} 0' in texto
+    assert 'consultorio_latencia_seconds_bucket{le="0.025"} 8000' in texto
+    assert 'consultorio_latencia_seconds_count 8000' in texto
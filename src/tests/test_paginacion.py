@@ -0,0 +1,80 @@
+import base64
+import json
+from datetime import date, timedelta
+
+from src.database import db
+from src.models import Cliente
+from src.services.cliente_service import ClienteService
+from src.services.turno_service import TurnoService
+from src.utils.paginacion import codificar_cursor
+
+
+def _recorrer(obtener_pagina):
+    """Recorrer un listado por cursor hasta el final y devolver las páginas"""
+    paginas = [obtener_pagina(None)]
+    while paginas[-1].siguiente:
+        paginas.append(obtener_pagina(paginas[-1].siguiente))
+    return paginas
+
+
+def test_cursor_recorre_clientes_sin_saltos_ni_repetidos(app):
+    # Apellidos y nombres repetidos: el id desempata
+    db.session.add_all([
+        Cliente(nombre=nombre, apellido=apellido, activo=True)
+        for apellido in ('García', 'López', 'Pérez') for nombre in ('Ana', 'Ana', 'Juan', 'Luis')
+    ])
+    db.session.add(Cliente(nombre='Baja', apellido='García', activo=False))
+    db.session.commit()
+
+    esperado = [cliente.id for cliente in ClienteService.query_listado().order_by(*ClienteService.ORDEN_LISTADO)]
+    paginas = _recorrer(lambda cursor: ClienteService.get_clientes_por_cursor(cursor, per_page=5, contar='exacto'))
+
+    assert [len(pagina.items) for pagina in paginas] == [5, 5, 2]
+    assert [cliente.id for pagina in paginas for cliente in pagina.items] == esperado
+    # El total se cuenta en la primera página y viaja en el cursor
+    assert all(pagina.total == 12 for pagina in paginas)
+
+    # Volver hacia atrás desde la última página
+    anterior = ClienteService.get_clientes_por_cursor(paginas[2].anterior, per_page=5)
+    assert [cliente.id for cliente in anterior.items] == [cliente.id for cliente in paginas[1].items]
+    assert anterior.has_prev and anterior.has_next
+    primera = ClienteService.get_clientes_por_cursor(anterior.anterior, per_page=5)
+    assert [cliente.id for cliente in primera.items] == esperado[:5]
+    assert not primera.has_prev
+
+
+def test_cursor_turnos_en_orden_descendente(app, crear_turnos, contar_consultas):
+    crear_turnos(25, fecha_inicio=date.today() - timedelta(days=10), dias=5)
+    esperado = [turno.id for turno in TurnoService.query_listado().order_by(*TurnoService.ORDEN_LISTADO)]
+
+    with contar_consultas() as sentencias:
+        paginas = _recorrer(lambda cursor: TurnoService.get_turnos_por_cursor(cursor, per_page=10))
+
+    assert [turno.id for pagina in paginas for turno in pagina.items] == esperado
+    # Una consulta por página, sin COUNT
+    assert len(sentencias) == len(paginas) == 3
+    assert not any('count(' in sentencia.lower() for sentencia in sentencias)
+
+
+def test_api_listado_por_cursor(client):
+    db.session.add_all([Cliente(nombre=f'Cliente {i}', apellido='Test', activo=True) for i in range(3)])
+    db.session.commit()
+
+    datos = client.get('/clientes/api/listado?per_page=2&total=aproximado').get_json()
+    assert len(datos['items']) == 2
+    assert (datos['total'], datos['total_aproximado']) == (3, False)
+
+    datos = client.get(f"/clientes/api/listado?per_page=2&cursor={datos['siguiente']}").get_json()
+    assert [cliente['nombre'] for cliente in datos['items']] == ['Cliente 2']
+    assert datos['siguiente'] is None
+
+    # Cursor alterado o de otro listado
+    assert client.get('/clientes/api/listado?cursor=no-es-un-cursor').status_code == 400
+    cursor_turnos = codificar_cursor('turnos', [date.today().isoformat(), '10:00', 1], 'sig')
+    assert client.get(f'/clientes/api/listado?cursor={cursor_turnos}').status_code == 400
+
+    # Total incompleto o con tipos que no corresponden
+    for total in ({'t': 5}, {'a': True}, {'t': '5', 'a': False}, {'t': True, 'a': False}, {'t': 5, 'a': 1}):
+        datos = {'l': 'clientes', 'v': ['a', 'b', 1], 'd': 'sig', **total}
+        cursor = base64.urlsafe_b64encode(json.dumps(datos).encode('utf-8')).decode('ascii').rstrip('=')
+        assert client.get(f'/clientes/api/listado?cursor={cursor}').status_code == 400, total
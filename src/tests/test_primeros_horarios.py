@@ -0,0 +1,117 @@
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from src.database import db
+from src.models import Cliente, Profesional, Servicio, Turno
+from src.services.turno_service import TurnoService
+
+# Sábado (jornada de 9 a 13) a las 12:10; el domingo no se trabaja
+SABADO = date(2030, 1, 5)
+LUNES = SABADO + timedelta(days=2)
+
+
+class _Ahora(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return cls.combine(SABADO, time(12, 10))
+
+
+@pytest.fixture
+def agenda(app, monkeypatch):
+    monkeypatch.setattr('src.services.turno_service.datetime', _Ahora)
+
+    # Se crean en distinto orden que el alfabético (apellido, nombre)
+    zeta = Profesional(nombre='Ana', apellido='Zeta', activo=True)
+    alvarez = Profesional(nombre='Luis', apellido='Alvarez', activo=True)
+    servicio = Servicio(nombre='Consulta', precio=1000, duracion=30, activo=True)
+    cliente = Cliente(nombre='Juan', apellido='Test', activo=True)
+    db.session.add_all([zeta, alvarez, servicio, cliente])
+    db.session.flush()
+
+    # El lunes a las 8:00 Alvarez está ocupado; el turno cancelado de Zeta no bloquea
+    db.session.add_all([
+        Turno(fecha=LUNES, hora=time(8, 0), estado='confirmado',
+              cliente_id=cliente.id, profesional_id=alvarez.id, servicio_id=servicio.id),
+        Turno(fecha=LUNES, hora=time(8, 0), estado='cancelado',
+              cliente_id=cliente.id, profesional_id=zeta.id, servicio_id=servicio.id),
+    ])
+    db.session.commit()
+    return zeta, alvarez, servicio
+
+
+def _horarios(resultados):
+    return [(r['fecha'], r['hora'], r['profesional_id']) for r in resultados]
+
+
+def test_primeros_horarios_entre_profesionales(agenda):
+    zeta, alvarez, servicio = agenda
+    sabado, lunes = SABADO.isoformat(), LUNES.isoformat()
+
+    resultados = TurnoService.buscar_primeros_horarios(servicio.id, cantidad=5)
+
+    # Hoy solo después de las 12:10, el domingo se saltea y a igual horario va
+    # primero Alvarez (orden por apellido)
+    assert _horarios(resultados) == [
+        (sabado, '12:30', alvarez.id),
+        (sabado, '12:30', zeta.id),
+        (lunes, '08:00', zeta.id),
+        (lunes, '08:30', alvarez.id),
+        (lunes, '08:30', zeta.id),
+    ]
+    assert resultados[0]['duracion'] == 30
+
+
+def test_primeros_horarios_con_fecha_pasada_y_un_profesional(agenda):
+    zeta, alvarez, servicio = agenda
+
+    # Una fecha anterior a hoy se toma como hoy
+    resultados = TurnoService.buscar_primeros_horarios(
+        servicio.id, profesional_ids=[alvarez.id], fecha_desde=SABADO - timedelta(days=3), cantidad=2
+    )
+    assert _horarios(resultados) == [
+        (SABADO.isoformat(), '12:30', alvarez.id),
+        (LUNES.isoformat(), '08:30', alvarez.id),
+    ]
+
+    # Solo el domingo: no hay horarios
+    assert TurnoService.buscar_primeros_horarios(servicio.id, fecha_desde=SABADO + timedelta(days=1), dias=1) == []
+
+
+def test_api_primeros_disponibles(client, agenda):
+    zeta, alvarez, servicio = agenda
+
+    respuesta = client.get('/turnos/primeros-disponibles', query_string={
+        'servicio_id': servicio.id, 'profesional_id': f'{zeta.id},{alvarez.id}',
+        'fecha_desde': LUNES.isoformat(), 'cantidad': 3,
+    })
+    assert respuesta.status_code == 200
+    assert _horarios(respuesta.get_json()['horarios']) == [
+        (LUNES.isoformat(), '08:00', zeta.id),
+        (LUNES.isoformat(), '08:30', alvarez.id),
+        (LUNES.isoformat(), '08:30', zeta.id),
+    ]
+
+    respuesta = client.get('/turnos/primeros-disponibles', query_string={
+        'servicio_id': servicio.id, 'profesional_id': str(zeta.id), 'cantidad': 1,
+    })
+    assert _horarios(respuesta.get_json()['horarios']) == [(SABADO.isoformat(), '12:30', zeta.id)]
+
+
+@pytest.mark.parametrize('parametros', [
+    {},
+    {'fecha_desde': '05/01/2030'},
+    {'dias': 0},
+    {'dias': -3},
+    {'cantidad': 0},
+    {'cantidad': -1},
+])
+def test_api_primeros_disponibles_parametros_invalidos(client, agenda, parametros):
+    zeta, alvarez, servicio = agenda
+    if parametros:
+        parametros = {'servicio_id': servicio.id, **parametros}
+
+    respuesta = client.get('/turnos/primeros-disponibles', query_string=parametros)
+
+    assert respuesta.status_code == 400
+    assert 'error' in respuesta.get_json()
@@ -0,0 +1,92 @@
+import pytest
+
+from src.app import create_app
+from src.database import db
+from src.models import Cliente
+from src.replica import en_primaria, get_estado_replica
+from src.services.cliente_service import ClienteService
+from src.utils.cache import get_cache, memoizar
+
+
+def _crear_app(tmp_path, uri_replica):
+    app = create_app({
+        'TESTING': True,
+        'SECRET_KEY': 'test',
+        'LOGIN_DISABLED': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'primaria.db'}",
+        'SQLALCHEMY_BINDS': {'replica': uri_replica},
+        'CACHE_SQLITE_PATH': str(tmp_path / 'cache.sqlite'),
+    })
+    return app
+
+
+@pytest.fixture
+def app_replica(tmp_path):
+    """Primaria y réplica en dos archivos SQLite con un cliente distinto en cada una"""
+    app = _crear_app(tmp_path, f"sqlite:///{tmp_path / 'replica.db'}")
+
+    with app.app_context():
+        db.metadata.create_all(db.engines['replica'])
+        with db.engines['replica'].begin() as conexion:
+            conexion.execute(Cliente.__table__.insert(), {'nombre': 'En', 'apellido': 'Replica', 'activo': True})
+        db.session.add(Cliente(nombre='En', apellido='Primaria', activo=True))
+        db.session.commit()
+        yield app
+        db.session.remove()
+
+
+def _apellidos_listado():
+    return [cliente.apellido for cliente in ClienteService.get_paginated_clientes().items]
+
+
+def test_lecturas_marcadas_van_a_la_replica(app_replica):
+    with app_replica.test_request_context():
+        assert _apellidos_listado() == ['Replica']
+        # Las consultas sin marcar siguen en la primaria
+        assert [c.apellido for c in Cliente.query.all()] == ['Primaria']
+
+
+def test_flujos_en_primaria_y_escrituras_recientes(app_replica):
+    with app_replica.test_request_context():
+        assert en_primaria(_apellidos_listado)() == ['Primaria']
+
+        db.session.add(Cliente(nombre='Nuevo', apellido='Alta', activo=True))
+        db.session.commit()
+        # El usuario que acaba de escribir lee de la primaria
+        assert _apellidos_listado() == ['Alta', 'Primaria']
+
+    with app_replica.test_request_context():
+        assert _apellidos_listado() == ['Replica']
+
+
+def test_replica_caida_usa_la_primaria(tmp_path):
+    app = _crear_app(tmp_path, f"sqlite:///{tmp_path / 'no-existe' / 'replica.db'}")
+
+    with app.app_context():
+        db.session.add(Cliente(nombre='En', apellido='Primaria', activo=True))
+        db.session.commit()
+
+        with app.test_request_context():
+            assert _apellidos_listado() == ['Primaria']
+        assert get_estado_replica(app).disponible is False
+        db.session.remove()
+
+
+def test_cache_sin_lecturas_de_la_replica_ni_escrituras_recientes(app_replica):
+    @memoizar('clientes')
+    def apellidos():
+        return _apellidos_listado()
+
+    with app_replica.test_request_context():
+        # Lo leído de la réplica puede estar atrasado: no se guarda
+        assert apellidos() == ['Replica']
+        assert get_cache().cantidad() == 0
+        assert en_primaria(apellidos)() == ['Primaria']
+        assert get_cache().cantidad() == 1
+
+    with app_replica.test_request_context():
+        db.session.add(Cliente(nombre='Nuevo', apellido='Alta', activo=True))
+        db.session.commit()
+        # Quien acaba de escribir lee de la primaria sin pasar por la caché
+        assert apellidos() == ['Alta', 'Primaria']
+        assert get_cache().cantidad() == 0
@@ -0,0 +1,88 @@
+import os
+import threading
+from datetime import date, timedelta
+
+import pytest
+
+from src.app import create_app
+from src.database import db
+from src.models import Cliente, Profesional, Servicio, Turno
+from src.services.disponibilidad_service import a_minutos, ReservaEnConflicto
+from src.services.turno_service import TurnoService
+
+INTENTOS = 50
+
+
+@pytest.fixture(params=['sqlite', pytest.param('postgres', marks=pytest.mark.postgres)])
+def app_concurrente(request, tmp_path):
+    # Base en archivo o servidor: cada hilo usa su propia conexión, como puestos distintos
+    uri = f"sqlite:///{tmp_path / 'consultorio.db'}" if request.param == 'sqlite' else os.environ['TEST_DATABASE_URL']
+    app = create_app({
+        'TESTING': True,
+        'SECRET_KEY': 'test',
+        'SQLALCHEMY_DATABASE_URI': uri,
+        'TURNO_LOCK_TIMEOUT_MS': 20000,
+        'DB_MAX_OVERFLOW': INTENTOS,
+        'CACHE_SQLITE_PATH': str(tmp_path / 'cache.sqlite'),
+    })
+
+    yield app
+
+    with app.app_context():
+        db.drop_all()
+
+
+def test_reservas_concurrentes_sin_solapamientos(app_concurrente):
+    app = app_concurrente
+    with app.app_context():
+        profesional = Profesional(nombre='Ana', apellido='Test', activo=True)
+        servicio = Servicio(nombre='Consulta', precio=1000, duracion=30, activo=True)
+        clientes = [Cliente(nombre=f'Cliente{i}', apellido='Test', activo=True) for i in range(INTENTOS)]
+        db.session.add_all([profesional, servicio] + clientes)
+        db.session.commit()
+        datos = {
+            'profesional_id': profesional.id,
+            'servicio_id': servicio.id,
+            'cliente_ids': [cliente.id for cliente in clientes],
+        }
+
+    fecha = (date.today() + timedelta(days=7)).isoformat()
+    # Horarios cada 10 minutos entre 10:00 y 11:00: turnos de 30 minutos que se pisan
+    horas = [f'10:{(i % 6) * 10:02d}' for i in range(INTENTOS)]
+    barrera = threading.Barrier(INTENTOS)
+    resultados = []
+
+    def reservar(i):
+        with app.app_context():
+            barrera.wait()
+            try:
+                TurnoService.crear_turno({
+                    'fecha': fecha,
+                    'hora': horas[i],
+                    'cliente_id': datos['cliente_ids'][i],
+                    'profesional_id': datos['profesional_id'],
+                    'servicio_id': datos['servicio_id'],
+                })
+                resultados.append('ok')
+            except ReservaEnConflicto:
+                resultados.append('conflicto')
+            except ValueError:
+                resultados.append('ocupado')
+            finally:
+                db.session.remove()
+
+    hilos = [threading.Thread(target=reservar, args=(i,)) for i in range(INTENTOS)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert len(resultados) == INTENTOS
+    with app.app_context():
+        turnos = Turno.query.order_by(Turno.hora).all()
+        intervalos = [(a_minutos(t.hora), a_minutos(t.hora) + 30) for t in turnos]
+        db.session.remove()
+
+    assert resultados.count('ok') == len(turnos) >= 1
+    for (inicio_a, fin_a), (inicio_b, _) in zip(intervalos, intervalos[1:]):
+        assert fin_a <= inicio_b, f'Turnos solapados: {intervalos}'
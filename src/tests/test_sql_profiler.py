@@ -0,0 +1,67 @@
+import logging
+from datetime import date, timedelta
+
+from src.utils.sql_profiler import logger
+
+
+def test_server_timing_en_calendario(client, crear_turnos):
+    crear_turnos(20)
+
+    respuesta = client.get('/turnos/calendario', query_string={'fecha': date.today().isoformat(), 'vista': 'semana'})
+
+    assert respuesta.status_code == 200
+    timing = respuesta.headers['Server-Timing']
+    assert timing.startswith('db;dur=')
+    assert 'consultas' in timing and 'app;dur=' in timing
+
+
+def test_consultas_lentas_y_exceso_de_consultas_se_registran(app, client, crear_turnos, caplog):
+    app.config.update(SQL_MAX_QUERIES_PER_REQUEST=0)
+    crear_turnos(5)
+
+    with caplog.at_level(logging.WARNING, logger=logger.name):
+        # Con umbral 0 toda consulta del request se registra como lenta
+        app.config.update(SQL_SLOW_QUERY_MS=0)
+        client.get('/turnos/api/turnos-calendario', query_string={
+            'fecha_inicio': date.today().isoformat(),
+            'fecha_fin': (date.today() + timedelta(days=6)).isoformat()
+        })
+
+    mensajes = [registro.getMessage() for registro in caplog.records]
+    assert any(m.startswith('Consulta lenta') and 'turnos.api_turnos_calendario' in m for m in mensajes)
+    assert any(m.startswith('Request con') for m in mensajes)
+
+
+def test_parametros_no_se_registran_por_defecto(app, client, caplog):
+    from src.database import db
+    from src.models import Cliente
+
+    db.session.add(Cliente(nombre='Marta', apellido='Confidencial', email='marta@example.com', activo=True))
+    db.session.commit()
+    app.config.update(SQL_SLOW_QUERY_MS=0)
+
+    with caplog.at_level(logging.WARNING, logger=logger.name):
+        client.get('/clientes/', query_string={'search': 'Confidencial'})
+    lentas = [registro.getMessage() for registro in caplog.records if registro.getMessage().startswith('Consulta lenta')]
+    assert lentas
+    assert not any('confidencial' in mensaje.lower() or 'parámetros' in mensaje for mensaje in lentas)
+
+    caplog.clear()
+    app.config.update(SQL_SLOW_QUERY_LOG_PARAMS=True)
+    with caplog.at_level(logging.WARNING, logger=logger.name):
+        client.get('/clientes/', query_string={'search': 'Confidencial'})
+    assert any('confidencial' in registro.getMessage().lower() for registro in caplog.records)
+
+
+def test_sentencia_fallida_no_deja_inicios_en_la_conexion(app):
+    import pytest
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+    from src.database import db
+    from src.utils.sql_profiler import _CLAVE_INICIOS
+
+    conexion = db.session.connection()
+    for _ in range(3):
+        with pytest.raises(OperationalError):
+            conexion.execute(text('SELECT * FROM tabla_inexistente'))
+    assert not conexion.info.get(_CLAVE_INICIOS)
@@ -0,0 +1,93 @@
+from collections import defaultdict
+from datetime import date, time, timedelta
+
+import pytest
+
+from src.database import db
+from src.models import Cliente, Profesional, Servicio, Turno, TurnoDiario
+from src.services.turno_diario_service import COLUMNA_POR_ESTADO, COLUMNAS_ROLLUP
+
+
+def _agregado_turnos():
+    """Rollup esperado, calculado en Python a partir de la tabla turnos"""
+    precios = {servicio.id: float(servicio.precio) for servicio in Servicio.query.all()}
+    esperado = defaultdict(lambda: dict.fromkeys(COLUMNAS_ROLLUP, 0))
+    for turno in Turno.query.all():
+        fila = esperado[(turno.fecha, turno.profesional_id, turno.servicio_id)]
+        fila[COLUMNA_POR_ESTADO[turno.estado]] += 1
+        if turno.estado == 'completado':
+            precio = turno.precio_final if turno.precio_final is not None else precios[turno.servicio_id]
+            fila['ingresos'] += float(precio)
+    return dict(esperado)
+
+
+def _rollup():
+    actual = {}
+    for fila in TurnoDiario.query.all():
+        valores = {columna: getattr(fila, columna) for columna in COLUMNAS_ROLLUP}
+        valores['ingresos'] = float(valores['ingresos'])
+        if any(valores.values()):
+            actual[(fila.fecha, fila.profesional_id, fila.servicio_id)] = valores
+    return actual
+
+
+@pytest.fixture
+def turnos(app):
+    profesionales = [Profesional(nombre=f'Prof{i}', apellido='Test', activo=True) for i in range(2)]
+    servicios = [Servicio(nombre=f'Servicio{i}', precio=1000 * (i + 1), duracion=30, activo=True) for i in range(2)]
+    cliente = Cliente(nombre='Cliente', apellido='Test', activo=True)
+    db.session.add_all(profesionales + servicios + [cliente])
+    db.session.flush()
+
+    estados = ['pendiente', 'confirmado', 'completado', 'cancelado', 'completado']
+    turnos = [
+        Turno(
+            fecha=date.today() + timedelta(days=i % 3), hora=time(8 + i), estado=estados[i % len(estados)],
+            cliente_id=cliente.id, profesional_id=profesionales[i % 2].id, servicio_id=servicios[i % 2].id,
+            precio_final=1500 if i == 4 else None
+        )
+        for i in range(8)
+    ]
+    db.session.add_all(turnos)
+    db.session.commit()
+    return turnos, profesionales, servicios
+
+
+@pytest.mark.parametrize('atributo', ['estado', 'fecha', 'profesional_id', 'servicio_id', 'precio_final'])
+def test_rollup_sigue_cada_columna_de_un_turno_expirado(turnos, atributo):
+    lista, profesionales, servicios = turnos
+    assert _rollup() == _agregado_turnos()
+
+    turno = lista[2]
+    nuevos = {
+        'estado': 'cancelado',
+        'fecha': turno.fecha + timedelta(days=10),
+        'profesional_id': profesionales[1].id,
+        'servicio_id': servicios[1].id,
+        'precio_final': 2500,
+    }
+
+    # Turno expirado, como después de un commit: el valor anterior se carga al modificarlo
+    db.session.expire_all()
+    setattr(turno, atributo, nuevos[atributo])
+    db.session.commit()
+
+    assert _rollup() == _agregado_turnos()
+
+
+def test_rollup_con_bajas_y_reconstruccion(app, turnos):
+    lista, _, _ = turnos
+    db.session.expire_all()
+    db.session.delete(lista[4])
+    db.session.commit()
+    assert _rollup() == _agregado_turnos()
+
+    # Rollup desincronizado (escritura fuera del ORM): el comando lo recalcula
+    db.session.execute(TurnoDiario.__table__.delete())
+    db.session.commit()
+    assert _rollup() == {}
+
+    resultado = app.test_cli_runner().invoke(args=['rebuild-rollups'])
+    assert 'Resumen diario reconstruido' in resultado.output
+    db.session.expire_all()
+    assert _rollup() == _agregado_turnos()
@@ -0,0 +1,85 @@
+from datetime import date, time, timedelta
+
+import pytest
+
+from src.database import db
+from src.models import Cliente, Profesional, Servicio, Turno
+from src.services.turno_diario_service import TurnoDiarioService
+from src.services.turno_stats_service import TurnoStatsService
+
+INICIO = date(2030, 3, 4)
+FIN = INICIO + timedelta(days=1)
+
+
+@pytest.fixture
+def periodo(app):
+    profesional = Profesional(nombre='Ana', apellido='Test', activo=True)
+    consulta = Servicio(nombre='Consulta', precio=1000, duracion=30, activo=True)
+    estudio = Servicio(nombre='Estudio', precio=2500, duracion=60, activo=True)
+    cliente = Cliente(nombre='Juan', apellido='Test', activo=True)
+    db.session.add_all([profesional, consulta, estudio, cliente])
+    db.session.flush()
+
+    # (fecha, estado, servicio, precio_final)
+    datos = [
+        (INICIO, 'completado', consulta, None),  # 1000 del servicio
+        (INICIO, 'completado', consulta, 1500),
+        (FIN, 'completado', estudio, None),  # 2500 del servicio
+        (INICIO, 'cancelado', consulta, 900),  # No suma ingresos
+        (FIN, 'pendiente', estudio, None),
+        (INICIO, 'confirmado', consulta, None),
+        (FIN, 'confirmado', estudio, 3000),
+        (INICIO - timedelta(days=1), 'completado', consulta, 700),  # Fuera del período
+    ]
+    db.session.add_all([
+        Turno(fecha=fecha, hora=time(8 + i), estado=estado, precio_final=precio_final,
+              cliente_id=cliente.id, profesional_id=profesional.id, servicio_id=servicio.id)
+        for i, (fecha, estado, servicio, precio_final) in enumerate(datos)
+    ])
+    db.session.commit()
+    return profesional, consulta, estudio
+
+
+def test_estadisticas_del_periodo(periodo):
+    estadisticas = TurnoStatsService.get_estadisticas(INICIO, FIN)
+
+    assert estadisticas == {
+        'total_turnos': 7,
+        'pendientes': 1,
+        'confirmados': 2,
+        'completados': 3,
+        'cancelados': 1,
+        'ingresos_total': 5000.0,
+        'tasa_completados': pytest.approx(3 / 7 * 100),
+        'promedio_por_turno': pytest.approx(5000 / 3),
+    }
+    # El resumen diario da los mismos números
+    assert TurnoDiarioService.get_estadisticas(INICIO, FIN) == estadisticas
+
+
+def test_estadisticas_por_servicio_y_profesional(periodo):
+    profesional, consulta, estudio = periodo
+
+    estadisticas = TurnoStatsService.get_estadisticas(INICIO, FIN, servicio_id=estudio.id)
+    assert (estadisticas['total_turnos'], estadisticas['completados'], estadisticas['ingresos_total']) == (3, 1, 2500.0)
+    assert estadisticas['tasa_completados'] == pytest.approx(100 / 3)
+
+    # Sin fechas: también el completado del día anterior
+    estadisticas = TurnoStatsService.get_estadisticas(profesional_id=profesional.id)
+    assert (estadisticas['total_turnos'], estadisticas['completados'], estadisticas['ingresos_total']) == (8, 4, 5700.0)
+
+
+def test_estadisticas_de_un_periodo_vacio(periodo):
+    estadisticas = TurnoStatsService.get_estadisticas(FIN + timedelta(days=30), FIN + timedelta(days=60))
+
+    assert estadisticas == {
+        'total_turnos': 0,
+        'pendientes': 0,
+        'confirmados': 0,
+        'completados': 0,
+        'cancelados': 0,
+        'ingresos_total': 0,
+        'tasa_completados': 0,
+        'promedio_por_turno': 0,
+    }
+    assert TurnoStatsService.contar_por_estado(FIN + timedelta(days=30)) == {}
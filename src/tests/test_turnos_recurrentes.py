@@ -0,0 +1,81 @@
+from datetime import date, time, timedelta
+
+from src.database import db
+from src.models import Cliente, Profesional, Servicio, Turno, TurnoDiario
+
+
+def _catalogo():
+    profesional = Profesional(nombre='Ana', apellido='Test', activo=True)
+    servicio = Servicio(nombre='Consulta', precio=1000, duracion=30, activo=True)
+    cliente = Cliente(nombre='Juan', apellido='Test', activo=True)
+    db.session.add_all([profesional, servicio, cliente])
+    db.session.commit()
+    return profesional, servicio, cliente
+
+
+def _proximo_martes():
+    hoy = date.today()
+    return hoy + timedelta(days=(1 - hoy.weekday()) % 7 or 7)
+
+
+def test_serie_semanal_con_un_conflicto(client, contar_consultas):
+    profesional, servicio, cliente = _catalogo()
+    inicio = _proximo_martes()
+    ocupada = inicio + timedelta(weeks=3)
+    db.session.add(Turno(
+        fecha=ocupada, hora=time(10, 15), estado='confirmado',
+        cliente_id=cliente.id, profesional_id=profesional.id, servicio_id=servicio.id
+    ))
+    db.session.commit()
+
+    with contar_consultas() as sentencias:
+        respuesta = client.post('/turnos/crear-recurrente', json={
+            'fecha_inicio': inicio.isoformat(),
+            'hora': '10:00',
+            'repeticiones': 12,
+            'cliente_id': cliente.id,
+            'profesional_id': profesional.id,
+            'servicio_id': servicio.id,
+            'precio_final': 1500,
+        })
+
+    assert respuesta.status_code == 201
+    datos = respuesta.get_json()
+    assert len(datos['creados']) == 11
+    assert [conflicto['fecha'] for conflicto in datos['conflictos']] == [ocupada.isoformat()]
+
+    # Un único INSERT (executemany) para toda la serie
+    inserts = [sentencia for sentencia in sentencias if sentencia.lstrip().upper().startswith('INSERT INTO TURNOS ')]
+    assert len(inserts) == 1
+
+    fechas = {turno.fecha for turno in Turno.query.filter_by(hora=time(10, 0)).all()}
+    assert fechas == {inicio + timedelta(weeks=i) for i in range(12)} - {ocupada}
+
+    # El resumen diario refleja los turnos insertados sin pasar por el ORM
+    resumenes = TurnoDiario.query.filter(TurnoDiario.fecha != ocupada).all()
+    assert len(resumenes) == 11
+    assert all(resumen.pendientes == 1 and float(resumen.ingresos) == 0 for resumen in resumenes)
+
+
+def test_serie_todo_o_nada(client):
+    profesional, servicio, cliente = _catalogo()
+    inicio = _proximo_martes()
+    db.session.add(Turno(
+        fecha=inicio + timedelta(weeks=2), hora=time(10, 0), estado='pendiente',
+        cliente_id=cliente.id, profesional_id=profesional.id, servicio_id=servicio.id
+    ))
+    db.session.commit()
+
+    respuesta = client.post('/turnos/crear-recurrente', json={
+        'fecha_inicio': inicio.isoformat(),
+        'hora': '10:00',
+        'repeticiones': 4,
+        'cliente_id': cliente.id,
+        'profesional_id': profesional.id,
+        'servicio_id': servicio.id,
+        'todo_o_nada': True,
+    })
+
+    assert respuesta.status_code == 409
+    assert respuesta.get_json()['creados'] == []
+    assert Turno.query.count() == 1
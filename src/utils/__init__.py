@@ -1,12 +1,14 @@
 from .validators import validar_email, validar_telefono
-from .exports import generar_excel, generar_csv
+from .exports import generar_excel, generar_excel_streaming, generar_csv, generar_csv_streaming
 from .helpers import formatear_telefono, formatear_precio
 
 __all__ = [
     'validar_email',
     'validar_telefono', 
     'generar_excel',
+    'generar_excel_streaming',
     'generar_csv',
+    'generar_csv_streaming',
     'formatear_telefono',
     'formatear_precio'
 ]
\ No newline at end of file
@@ -0,0 +1,471 @@
+"""
+Caché de resultados con backend intercambiable.
+
+- CacheMemoria: LRU en memoria del proceso; cada worker de gunicorn tiene la suya.
+- CacheSQLite: archivo SQLite local compartido por todos los workers de la
+  máquina, sin servicios externos. Un cambio invalidado en un worker deja de
+  verse en todos.
+
+Las claves se agrupan en namespaces ('turnos', 'clientes'...) que se invalidan
+juntos; cada invalidación aumenta la generación del namespace, que forma parte
+de la clave de memoizar y se verifica al guardar: un resultado calculado antes
+de una invalidación no se guarda. Cada entrada tiene un TTL y la cantidad de entradas está acotada por
+CACHE_MAX_ENTRIES (al superarla se descartan las menos usadas en memoria y las
+más antiguas en SQLite). Los valores se guardan serializados con pickle, así
+que cada lectura devuelve una copia que se puede modificar sin afectar la caché.
+
+Los servicios memoizan con el decorador `memoizar(namespace)` (que no guarda lo
+leído de la réplica ni atiende desde la caché a un usuario que acaba de
+escribir, ver src/replica.py) y declaran con
+`invalidar_al_modificar(namespace, *modelos)` qué tablas invalidan el
+namespace: cualquier INSERT, UPDATE o DELETE sobre ellas hecho con la sesión
+de SQLAlchemy lo invalida al confirmar la transacción. Las escrituras que no
+pasan por la sesión deben llamar a `get_cache().invalidar(namespace)`; si no,
+el resultado viejo se ve hasta que vence el TTL.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from functools import wraps
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.replica import _escritura_reciente, lecturas_en_replica
+
+# Valores por defecto si la configuración no los define
+CACHE_BACKEND = 'sqlite'
+CACHE_DEFAULT_TTL = 60
+CACHE_MAX_ENTRIES = 1000
+
+BACKENDS_CACHE = ('memoria', 'sqlite', 'ninguno')
+
+# Valor devuelto por obtener() cuando la clave no está (None es un valor válido)
+FALTA = object()
+
+# Clave de session.info con los namespaces a invalidar al confirmar
+_CLAVE_NAMESPACES = 'cache_namespaces_modificados'
+
+# Tabla -> namespaces que se invalidan cuando cambia
+_namespaces_por_tabla = defaultdict(set)
+
+logger = logging.getLogger('consultorio.cache')
+
+
+class BackendCache:
+    """Interfaz común de los backends, con contadores de aciertos y fallos por namespace"""
+    
+    nombre = None
+    
+    def __init__(self, max_entradas=CACHE_MAX_ENTRIES, ttl=CACHE_DEFAULT_TTL):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._contadores = defaultdict(lambda: [0, 0])  # namespace -> [aciertos, fallos]
+        self._desalojos = 0
+        self._lock_contadores = threading.Lock()
+    
+    # ===== A implementar por cada backend =====
+    
+    def _leer(self, namespace, clave):
+        """Bytes guardados o None si la clave no está o venció"""
+        raise NotImplementedError
+    
+    def _escribir(self, namespace, clave, datos, expira, generacion=None):
+        """Guardar y devolver cuántas entradas se desalojaron para respetar el tope.
+        
+        Con `generacion`, no guarda (y devuelve None) si la del namespace cambió.
+        """
+        raise NotImplementedError
+    
+    def generacion(self, namespace):
+        """Generación actual del namespace (None si no se pudo consultar)"""
+        raise NotImplementedError
+    
+    def borrar(self, namespace, clave):
+        raise NotImplementedError
+    
+    def invalidar(self, *namespaces):
+        """Descartar todas las entradas de los namespaces y aumentar su generación"""
+        raise NotImplementedError
+    
+    def limpiar(self):
+        """Descartar todas las entradas"""
+        raise NotImplementedError
+    
+    def cantidad(self):
+        raise NotImplementedError
+    
+    # ===== Operaciones =====
+    
+    def obtener(self, namespace, clave):
+        """Valor guardado o FALTA"""
+        datos = self._leer(namespace, clave)
+        with self._lock_contadores:
+            self._contadores[namespace][0 if datos is not None else 1] += 1
+        if datos is None:
+            return FALTA
+        return pickle.loads(datos)
+    
+    def guardar(self, namespace, clave, valor, ttl=None, generacion=None):
+        """Guardar un valor por `ttl` segundos (None: el TTL por defecto; 0: sin vencimiento).
+        
+        Con `generacion` solo se guarda si el namespace no se invalidó desde que
+        se leyó esa generación. Devuelve True si se guardó.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expira = time.time() + ttl if ttl else None
+        desalojadas = self._escribir(
+            namespace, clave, pickle.dumps(valor, pickle.HIGHEST_PROTOCOL), expira, generacion
+        )
+        if desalojadas is None:
+            return False
+        if desalojadas:
+            with self._lock_contadores:
+                self._desalojos += desalojadas
+        return True
+    
+    def estadisticas(self):
+        """Aciertos y fallos por namespace de este proceso, entradas y desalojos"""
+        with self._lock_contadores:
+            namespaces = {
+                namespace: {'aciertos': aciertos, 'fallos': fallos}
+                for namespace, (aciertos, fallos) in self._contadores.items()
+            }
+            desalojos = self._desalojos
+        return {
+            'backend': self.nombre,
+            'entradas': self.cantidad(),
+            'max_entradas': self.max_entradas,
+            'desalojos': desalojos,
+            'namespaces': namespaces,
+        }
+
+
+class CacheMemoria(BackendCache):
+    """LRU en memoria del proceso"""
+    
+    nombre = 'memoria'
+    
+    def __init__(self, max_entradas=CACHE_MAX_ENTRIES, ttl=CACHE_DEFAULT_TTL):
+        super().__init__(max_entradas, ttl)
+        self._entradas = OrderedDict()  # (namespace, clave) -> (datos, expira)
+        self._generaciones = defaultdict(int)
+        self._lock = threading.Lock()
+    
+    def _leer(self, namespace, clave):
+        with self._lock:
+            entrada = self._entradas.get((namespace, clave))
+            if entrada is None:
+                return None
+            datos, expira = entrada
+            if expira is not None and expira <= time.time():
+                del self._entradas[(namespace, clave)]
+                return None
+            self._entradas.move_to_end((namespace, clave))
+            return datos
+    
+    def _escribir(self, namespace, clave, datos, expira, generacion=None):
+        with self._lock:
+            if generacion is not None and generacion != self._generaciones[namespace]:
+                return None
+            self._entradas[(namespace, clave)] = (datos, expira)
+            self._entradas.move_to_end((namespace, clave))
+            desalojadas = 0
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+                desalojadas += 1
+            return desalojadas
+    
+    def generacion(self, namespace):
+        with self._lock:
+            return self._generaciones[namespace]
+    
+    def borrar(self, namespace, clave):
+        with self._lock:
+            self._entradas.pop((namespace, clave), None)
+    
+    def invalidar(self, *namespaces):
+        with self._lock:
+            for namespace in namespaces:
+                self._generaciones[namespace] += 1
+            for clave in [clave for clave in self._entradas if clave[0] in namespaces]:
+                del self._entradas[clave]
+    
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+    
+    def cantidad(self):
+        return len(self._entradas)
+
+
+class CacheSQLite(BackendCache):
+    """Caché compartida entre procesos en un archivo SQLite local.
+    
+    Cada hilo usa su propia conexión (y se reconecta después de un fork). Los
+    errores del archivo no interrumpen al llamador: se registran y la lectura
+    cuenta como fallo.
+    """
+    
+    nombre = 'sqlite'
+    
+    def __init__(self, ruta, max_entradas=CACHE_MAX_ENTRIES, ttl=CACHE_DEFAULT_TTL, timeout=5):
+        super().__init__(max_entradas, ttl)
+        self.ruta = ruta
+        self.timeout = timeout
+        self._local = threading.local()
+        
+        directorio = os.path.dirname(ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        self._ejecutar(lambda conexion: None)
+    
+    def _conexion(self):
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is not None and self._local.pid == os.getpid():
+            return conexion
+        
+        conexion = sqlite3.connect(self.ruta, timeout=self.timeout, isolation_level=None)
+        conexion.execute('PRAGMA journal_mode=WAL')
+        conexion.execute('PRAGMA synchronous=OFF')  # Perder la caché en un corte de luz no importa
+        conexion.execute(
+            'CREATE TABLE IF NOT EXISTS cache_entradas ('
+            'namespace TEXT NOT NULL, clave TEXT NOT NULL, valor BLOB NOT NULL, '
+            'expira REAL, creada REAL NOT NULL, PRIMARY KEY (namespace, clave))'
+        )
+        conexion.execute('CREATE INDEX IF NOT EXISTS ix_cache_entradas_creada ON cache_entradas (creada)')
+        conexion.execute(
+            'CREATE TABLE IF NOT EXISTS cache_generaciones ('
+            'namespace TEXT PRIMARY KEY, generacion INTEGER NOT NULL)'
+        )
+        self._local.conexion = conexion
+        self._local.pid = os.getpid()
+        return conexion
+    
+    def _ejecutar(self, operacion, por_defecto=None):
+        try:
+            return operacion(self._conexion())
+        except sqlite3.Error as e:
+            logger.warning('Error en la caché %s: %s', self.ruta, e)
+            self._local.conexion = None
+            return por_defecto
+    
+    def _leer(self, namespace, clave):
+        def leer(conexion):
+            fila = conexion.execute(
+                'SELECT valor FROM cache_entradas WHERE namespace = ? AND clave = ? '
+                'AND (expira IS NULL OR expira > ?)',
+                (namespace, clave, time.time())
+            ).fetchone()
+            return fila[0] if fila else None
+        
+        return self._ejecutar(leer)
+    
+    def _leer_generacion(self, conexion, namespace):
+        fila = conexion.execute(
+            'SELECT generacion FROM cache_generaciones WHERE namespace = ?', (namespace,)
+        ).fetchone()
+        return fila[0] if fila else 0
+    
+    def _escribir(self, namespace, clave, datos, expira, generacion=None):
+        def escribir(conexion):
+            ahora = time.time()
+            with conexion:
+                conexion.execute('BEGIN IMMEDIATE')
+                if generacion is not None and generacion != self._leer_generacion(conexion, namespace):
+                    return None
+                conexion.execute(
+                    'INSERT OR REPLACE INTO cache_entradas (namespace, clave, valor, expira, creada) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (namespace, clave, datos, expira, ahora)
+                )
+                sobrantes = conexion.execute('SELECT count(*) FROM cache_entradas').fetchone()[0] - self.max_entradas
+                if sobrantes <= 0:
+                    return 0
+                
+                # Primero las vencidas; después las más antiguas
+                desalojadas = conexion.execute(
+                    'DELETE FROM cache_entradas WHERE expira IS NOT NULL AND expira <= ?', (ahora,)
+                ).rowcount
+                if desalojadas < sobrantes:
+                    desalojadas += conexion.execute(
+                        'DELETE FROM cache_entradas WHERE rowid IN '
+                        '(SELECT rowid FROM cache_entradas ORDER BY creada LIMIT ?)',
+                        (sobrantes - desalojadas,)
+                    ).rowcount
+                return desalojadas
+        
+        return self._ejecutar(escribir)
+    
+    def generacion(self, namespace):
+        return self._ejecutar(lambda conexion: self._leer_generacion(conexion, namespace))
+    
+    def borrar(self, namespace, clave):
+        self._ejecutar(lambda conexion: conexion.execute(
+            'DELETE FROM cache_entradas WHERE namespace = ? AND clave = ?', (namespace, clave)
+        ))
+    
+    def invalidar(self, *namespaces):
+        if not namespaces:
+            return
+        marcadores = ', '.join('?' for _ in namespaces)
+        
+        def invalidar(conexion):
+            with conexion:
+                conexion.execute('BEGIN IMMEDIATE')
+                conexion.executemany(
+                    'INSERT INTO cache_generaciones (namespace, generacion) VALUES (?, 1) '
+                    'ON CONFLICT (namespace) DO UPDATE SET generacion = generacion + 1',
+                    [(namespace,) for namespace in namespaces]
+                )
+                conexion.execute(f'DELETE FROM cache_entradas WHERE namespace IN ({marcadores})', namespaces)
+        
+        self._ejecutar(invalidar)
+    
+    def limpiar(self):
+        self._ejecutar(lambda conexion: conexion.execute('DELETE FROM cache_entradas'))
+    
+    def cantidad(self):
+        return self._ejecutar(
+            lambda conexion: conexion.execute('SELECT count(*) FROM cache_entradas').fetchone()[0], 0
+        )
+
+
+def crear_backend(config, instance_path):
+    """Backend configurado en CACHE_BACKEND (None con 'ninguno')"""
+    backend = config.get('CACHE_BACKEND', CACHE_BACKEND)
+    if backend not in BACKENDS_CACHE:
+        raise ValueError(f'Backend de caché no soportado: {backend}')
+    
+    max_entradas = config.get('CACHE_MAX_ENTRIES', CACHE_MAX_ENTRIES)
+    ttl = config.get('CACHE_DEFAULT_TTL', CACHE_DEFAULT_TTL)
+    if backend == 'memoria':
+        return CacheMemoria(max_entradas, ttl)
+    if backend == 'sqlite':
+        ruta = config.get('CACHE_SQLITE_PATH') or os.path.join(instance_path, 'cache', 'cache.sqlite')
+        return CacheSQLite(ruta, max_entradas, ttl)
+    return None
+
+
+def get_cache():
+    """Backend de la aplicación actual (None fuera de un contexto de aplicación o sin caché)"""
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('cache')
+
+
+def clave_llamada(nombre, args, kwargs):
+    """Clave estable de una llamada a partir de la función y sus argumentos"""
+    texto = repr((args, sorted(kwargs.items())))
+    return f'{nombre}:{hashlib.blake2b(texto.encode("utf-8"), digest_size=16).hexdigest()}'
+
+
+def _pendiente_de_confirmar(namespace):
+    """¿La transacción actual modificó tablas del namespace? (su resultado todavía no es definitivo)"""
+    from src.database import db
+    
+    return namespace in db.session.info.get(_CLAVE_NAMESPACES, ())
+
+
+def memoizar(namespace, ttl=None):
+    """Decorador que guarda el resultado en la caché según los argumentos de la llamada.
+    
+    Sin caché configurada, fuera de un contexto de aplicación, con cambios del
+    namespace sin confirmar en la sesión o para un usuario que escribió hace
+    menos de REPLICA_MAX_LAG_SECONDS, llama a la función directamente. La clave
+    incluye la generación del namespace y el resultado no se guarda si el
+    namespace se invalidó mientras se calculaba o si se leyó de la réplica
+    (puede estar atrasada). La función original queda en `.sin_cache`.
+    """
+    def decorador(funcion):
+        nombre = f'{funcion.__module__}.{funcion.__qualname__}'
+        
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            cache = get_cache()
+            if cache is None or _pendiente_de_confirmar(namespace) or _escritura_reciente(current_app):
+                return funcion(*args, **kwargs)
+            
+            generacion = cache.generacion(namespace)
+            if generacion is None:
+                return funcion(*args, **kwargs)
+            
+            clave = f'{clave_llamada(nombre, args, kwargs)}:{generacion}'
+            valor = cache.obtener(namespace, clave)
+            if valor is FALTA:
+                with lecturas_en_replica() as replica:
+                    valor = funcion(*args, **kwargs)
+                if not replica:
+                    cache.guardar(namespace, clave, valor, ttl, generacion)
+            return valor
+        
+        envoltura.sin_cache = funcion
+        return envoltura
+    
+    return decorador
+
+
+def invalidar_al_modificar(namespace, *modelos):
+    """Invalidar `namespace` cuando se confirma una transacción que escribió en las tablas de `modelos`"""
+    for modelo in modelos:
+        _namespaces_por_tabla[modelo.__table__.name].add(namespace)
+
+
+def _marcar(sesion, tabla):
+    namespaces = _namespaces_por_tabla.get(tabla)
+    if namespaces:
+        sesion.info.setdefault(_CLAVE_NAMESPACES, set()).update(namespaces)
+
+
+def _registrar_flush(sesion, flush_context, instances):
+    for obj in (*sesion.new, *sesion.dirty, *sesion.deleted):
+        tabla = getattr(obj, '__table__', None)
+        if tabla is not None:
+            _marcar(sesion, tabla.name)
+
+
+def _registrar_ejecucion(estado):
+    # INSERT/UPDATE/DELETE ejecutados con session.execute (sin flush)
+    if estado.is_insert or estado.is_update or estado.is_delete:
+        tabla = getattr(estado.statement, 'table', None)
+        if tabla is not None:
+            _marcar(estado.session, tabla.name)
+
+
+def _invalidar_confirmados(sesion):
+    namespaces = sesion.info.pop(_CLAVE_NAMESPACES, None)
+    cache = get_cache()
+    if namespaces and cache is not None:
+        cache.invalidar(*namespaces)
+
+
+def _descartar_pendientes(sesion):
+    sesion.info.pop(_CLAVE_NAMESPACES, None)
+
+
+def registrar_eventos():
+    """Registrar (una sola vez) los eventos de sesión que invalidan la caché"""
+    for nombre, funcion in (
+        ('before_flush', _registrar_flush),
+        ('do_orm_execute', _registrar_ejecucion),
+        ('after_commit', _invalidar_confirmados),
+        ('after_rollback', _descartar_pendientes),
+    ):
+        if not event.contains(Session, nombre, funcion):
+            event.listen(Session, nombre, funcion)
+
+
+def init_cache(app):
+    """Crear el backend configurado (CACHE_BACKEND) y activar la invalidación por tabla"""
+    cache = crear_backend(app.config, app.instance_path)
+    app.extensions['cache'] = cache
+    if cache is not None:
+        registrar_eventos()
+    return cache
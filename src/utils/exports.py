@@ -1,29 +1,38 @@
+import csv
 import pandas as pd
-from io import BytesIO
-from flask import make_response
+from io import BytesIO, StringIO
+from itertools import chain, islice
+from tempfile import SpooledTemporaryFile
+from flask import make_response, Response, stream_with_context, send_file
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from openpyxl.utils import get_column_letter
+
+# Filas que se leen de la base por lote en las exportaciones en streaming
+TAMANIO_LOTE_EXPORTACION = 1000
+
+# Filas que se acumulan antes de enviar un bloque de CSV al cliente
+FILAS_POR_BLOQUE_CSV = 500
+
+# Filas que se usan para estimar el ancho de las columnas de un Excel
+FILAS_MUESTRA_ANCHOS = 200
+ANCHO_MAXIMO_COLUMNA = 50
+
+# Bytes que un Excel o PDF generado puede ocupar en memoria antes de pasar a disco
+MAX_MEMORIA_EXCEL = 5 * 1024 * 1024
+
+# Reportes PDF: filas por página (tabla de tamaño fijo) y tamaño de letra
+FILAS_POR_PAGINA_PDF = 30
+TAMANIO_FUENTE_PDF = 8
+_ESTILO_TABLA_PDF = None
 
 def generar_excel(data, filename, sheet_name='Datos'):
-    """Generar archivo Excel desde datos"""
-    df = pd.DataFrame(data)
-    
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, sheet_name=sheet_name, index=False)
-        
-        # Ajustar ancho de columnas
-        worksheet = writer.sheets[sheet_name]
-        for column in df:
-            column_length = max(df[column].astype(str).map(len).max(), len(column))
-            col_letter = worksheet[f'{df.columns.get_loc(column) + 1}1'].column_letter
-            worksheet.column_dimensions[col_letter].width = min(column_length + 2, 50)
-    
-    output.seek(0)
-    
-    response = make_response(output.read())
-    response.headers['Content-Type'] = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    response.headers['Content-Disposition'] = f'attachment; filename={filename}.xlsx'
+    """Generar archivo Excel desde datos (lista de diccionarios)"""
+    columnas = list(data[0].keys()) if data else []
+    filas = (list(fila.values()) for fila in data)
     
-    return response
+    return generar_excel_streaming(columnas, filas, filename, sheet_name)
 
 def generar_csv(data, filename):
     """Generar archivo CSV desde datos"""
@@ -39,58 +48,248 @@ def generar_csv(data, filename):
     
     return response
 
-def exportar_a_pdf(data, filename, titulo='Reporte'):
-    """Generar reporte PDF (requiere reportlab)"""
-    from reportlab.lib.pagesizes import letter, A4
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
-    from reportlab.lib.styles import getSampleStyleSheet
-    from reportlab.lib import colors
+def escribir_csv(destino, columnas, filas, bom=False):
+    """Escribir encabezados y filas en un archivo de texto abierto, fila por fila"""
+    if bom:
+        destino.write('\ufeff')
     
-    output = BytesIO()
-    doc = SimpleDocTemplate(output, pagesize=A4)
+    writer = csv.writer(destino)
+    writer.writerow(columnas)
     
-    # Estilos
-    styles = getSampleStyleSheet()
-    title_style = styles['Title']
+    total = 0
+    for fila in filas:
+        writer.writerow(fila)
+        total += 1
     
-    # Contenido
-    story = []
+    return total
+
+def iterar_csv(columnas, filas, bom=False, filas_por_bloque=FILAS_POR_BLOQUE_CSV):
+    """Generar el CSV en bloques de texto a medida que se consumen las filas"""
+    buffer = StringIO()
+    writer = csv.writer(buffer)
     
-    # Título
-    title = Paragraph(titulo, title_style)
-    story.append(title)
+    if bom:
+        buffer.write('\ufeff')
+    writer.writerow(columnas)
     
-    # Tabla
-    if data:
-        # Encabezados
-        headers = list(data[0].keys())
-        table_data = [headers]
-        
-        # Datos
-        for row in data:
-            table_data.append([str(row[col]) for col in headers])
+    for i, fila in enumerate(filas, 1):
+        writer.writerow(fila)
+        if i % filas_por_bloque == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+    
+    yield buffer.getvalue()
+
+def iterar_csv_bloques(columnas, bloques, bom=False):
+    """Generar el CSV a partir de DataFrames: un bloque de texto por DataFrame"""
+    buffer = StringIO()
+    if bom:
+        buffer.write('\ufeff')
+    csv.writer(buffer).writerow(columnas)
+    yield buffer.getvalue()
+    
+    for df in bloques:
+        yield df.to_csv(header=False, index=False, lineterminator='\r\n')
+
+def _respuesta_csv_streaming(contenido, filename):
+    """Respuesta HTTP que envía el CSV a medida que el generador lo produce"""
+    response = Response(stream_with_context(contenido), mimetype='text/csv')
+    response.headers['Content-Type'] = 'text/csv; charset=utf-8'
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}.csv'
+    
+    return response
+
+def generar_csv_streaming(columnas, filas, filename, bom=False):
+    """Respuesta CSV en streaming: el archivo se genera mientras se envía.
+    
+    `filas` debe ser un iterable perezoso (por ejemplo un generador sobre una
+    consulta con yield_per) para que la memoria se mantenga constante.
+    """
+    return _respuesta_csv_streaming(iterar_csv(columnas, filas, bom=bom), filename)
+
+def generar_csv_streaming_bloques(columnas, bloques, filename, bom=False):
+    """Respuesta CSV en streaming a partir de un iterable de DataFrames"""
+    return _respuesta_csv_streaming(iterar_csv_bloques(columnas, bloques, bom=bom), filename)
+
+def estimar_anchos_columnas(columnas, filas_muestra, ancho_maximo=ANCHO_MAXIMO_COLUMNA):
+    """Estimar el ancho de cada columna a partir de los encabezados y una muestra de filas"""
+    anchos = [len(str(columna)) for columna in columnas]
+    
+    for fila in filas_muestra:
+        for i, valor in enumerate(fila[:len(anchos)]):
+            if valor is not None:
+                anchos[i] = max(anchos[i], len(str(valor)))
+    
+    return [min(ancho + 2, ancho_maximo) for ancho in anchos]
+
+def escribir_excel(destino, columnas, filas, sheet_name='Datos', filas_muestra=FILAS_MUESTRA_ANCHOS):
+    """Escribir un XLSX con openpyxl en modo write-only, fila por fila.
+    
+    Solo se retienen en memoria las primeras `filas_muestra` filas (para
+    estimar el ancho de las columnas); el resto se escribe a medida que el
+    iterable las produce. Devuelve la cantidad de filas escritas.
+    """
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet(title=sheet_name[:31])
+    
+    filas = iter(filas)
+    muestra = [list(fila) for fila in islice(filas, filas_muestra)]
+    
+    # En modo write-only los anchos deben fijarse antes de escribir filas
+    for i, ancho in enumerate(estimar_anchos_columnas(columnas, muestra), 1):
+        worksheet.column_dimensions[get_column_letter(i)].width = ancho
+    
+    encabezados = []
+    for columna in columnas:
+        celda = WriteOnlyCell(worksheet, value=columna)
+        celda.font = Font(bold=True)
+        encabezados.append(celda)
+    worksheet.append(encabezados)
+    
+    total = 0
+    for fila in chain(muestra, filas):
+        worksheet.append(fila)
+        total += 1
+    
+    workbook.save(destino)
+    return total
+
+def generar_excel_streaming(columnas, filas, filename, sheet_name='Datos'):
+    """Respuesta XLSX generada con memoria acotada.
+    
+    El libro se escribe sobre un archivo temporal que pasa a disco al superar
+    MAX_MEMORIA_EXCEL bytes, y se envía desde ahí con send_file.
+    """
+    archivo = SpooledTemporaryFile(max_size=MAX_MEMORIA_EXCEL)
+    try:
+        escribir_excel(archivo, columnas, filas, sheet_name)
+        archivo.seek(0)
+    except Exception:
+        archivo.close()
+        raise
+    
+    # send_file cierra el archivo cuando termina de enviarse la respuesta
+    return send_file(
+        archivo,
+        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        as_attachment=True,
+        download_name=f'{filename}.xlsx'
+    )
+
+def exportar_a_pdf(data, filename, titulo='Reporte'):
+    """Generar reporte PDF desde datos (lista de diccionarios, requiere reportlab)"""
+    columnas = list(data[0].keys()) if data else []
+    filas = (list(fila.values()) for fila in data)
+    
+    return generar_pdf_streaming(columnas, filas, filename, titulo)
+
+def _importar_reportlab():
+    """Importar reportlab bajo demanda con un mensaje claro si no está instalado"""
+    try:
+        import reportlab  # noqa: F401
+    except ImportError:
+        raise ImportError('La exportación a PDF requiere reportlab. Instalar las dependencias con: pip install -r requirements.txt')
+
+def _estilo_tabla_pdf():
+    """TableStyle compartido por todas las páginas (se arma una sola vez)"""
+    global _ESTILO_TABLA_PDF
+    if _ESTILO_TABLA_PDF is None:
+        from reportlab.lib import colors
+        from reportlab.platypus import TableStyle
         
-        # Crear tabla
-        table = Table(table_data)
-        table.setStyle(TableStyle([
+        _ESTILO_TABLA_PDF = TableStyle([
             ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
             ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 14),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        
-        story.append(table)
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 0), (-1, -1), TAMANIO_FUENTE_PDF),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f2f2f2')]),
+            ('GRID', (0, 0), (-1, -1), 0.25, colors.black)
+        ])
+    return _ESTILO_TABLA_PDF
+
+def _recortar_texto(valor, max_caracteres):
+    """Convertir a texto y recortar para que entre en el ancho de la columna"""
+    texto = '' if valor is None else str(valor)
+    if len(texto) > max_caracteres:
+        return texto[:max(max_caracteres - 1, 1)] + '…'
+    return texto
+
+def escribir_pdf(destino, columnas, filas, titulo='Reporte', filas_por_pagina=FILAS_POR_PAGINA_PDF):
+    """Escribir un reporte PDF apaisado con una tabla de tamaño fijo por página.
     
-    # Generar PDF
-    doc.build(story)
-    output.seek(0)
+    Las filas se consumen de a una página: solo la página en curso existe
+    como Table de reportlab, todas comparten el mismo TableStyle y el alto de
+    fila es fijo, por lo que el tiempo y la memoria crecen linealmente con la
+    cantidad de filas. Devuelve la cantidad de filas escritas.
+    """
+    _importar_reportlab()
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.pdfgen import canvas
+    from reportlab.platypus import Table
     
-    response = make_response(output.read())
-    response.headers['Content-Type'] = 'application/pdf'
-    response.headers['Content-Disposition'] = f'attachment; filename={filename}.pdf'
+    ancho_pagina, alto_pagina = landscape(A4)
+    margen = 30
+    ancho_util = ancho_pagina - 2 * margen
+    alto_fila = TAMANIO_FUENTE_PDF * 1.8
+    
+    filas = iter(filas)
+    pagina = [list(fila) for fila in islice(filas, filas_por_pagina)]
+    
+    # Anchos proporcionales a los estimados con la primera página
+    estimados = estimar_anchos_columnas(columnas, pagina) if columnas else []
+    total_estimado = sum(estimados) or 1
+    anchos = [ancho_util * ancho / total_estimado for ancho in estimados]
+    max_caracteres = [int(ancho / (TAMANIO_FUENTE_PDF * 0.55)) for ancho in anchos]
+    encabezado = [_recortar_texto(columna, maximo) for columna, maximo in zip(columnas, max_caracteres)]
+    estilo = _estilo_tabla_pdf()
+    
+    pdf = canvas.Canvas(destino, pagesize=(ancho_pagina, alto_pagina))
+    pdf.setTitle(titulo)
+    
+    total = 0
+    numero_pagina = 1
+    while True:
+        pdf.setFont('Helvetica-Bold', 14)
+        pdf.drawString(margen, alto_pagina - margen - 10, titulo)
+        pdf.setFont('Helvetica', 8)
+        pdf.drawRightString(ancho_pagina - margen, margen / 2, f'Página {numero_pagina}')
+        
+        if columnas:
+            datos = [encabezado] + [
+                [_recortar_texto(valor, maximo) for valor, maximo in zip(fila, max_caracteres)]
+                for fila in pagina
+            ]
+            tabla = Table(datos, colWidths=anchos, rowHeights=alto_fila, style=estilo)
+            _, alto_tabla = tabla.wrapOn(pdf, ancho_util, alto_pagina)
+            tabla.drawOn(pdf, margen, alto_pagina - margen - 25 - alto_tabla)
+        
+        total += len(pagina)
+        pagina = [list(fila) for fila in islice(filas, filas_por_pagina)]
+        if not pagina:
+            break
+        
+        pdf.showPage()
+        numero_pagina += 1
+    
+    pdf.save()
+    return total
+
+def generar_pdf_streaming(columnas, filas, filename, titulo='Reporte'):
+    """Respuesta PDF paginada generada con memoria acotada (requiere reportlab)"""
+    archivo = SpooledTemporaryFile(max_size=MAX_MEMORIA_EXCEL)
+    try:
+        escribir_pdf(archivo, columnas, filas, titulo)
+        archivo.seek(0)
+    except Exception:
+        archivo.close()
+        raise
     
-    return response
\ No newline at end of file
+    return send_file(
+        archivo,
+        mimetype='application/pdf',
+        as_attachment=True,
+        download_name=f'{filename}.pdf'
+    )
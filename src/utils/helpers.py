@@ -204,6 +204,43 @@ def convertir_a_slug(texto):
     
     return slug
 
+# Vocales acentuadas y ñ -> letra base (búsquedas sin distinguir tildes)
+_CON_TILDE = 'áàäâéèëêíìïîóòöôúùüûñç'
+_SIN_TILDE = 'aaaaeeeeiiiioooouuuunc'
+_TABLA_PLEGADO = str.maketrans(_CON_TILDE, _SIN_TILDE)
+
+# replace() anidados por subconsulta en plegar_sql (la pila del parser de SQLite admite ~30)
+_REEMPLAZOS_POR_TRAMO = 15
+
+def plegar_texto(texto):
+    """Texto en minúsculas y sin tildes para comparar en búsquedas (None se mantiene)"""
+    if texto is None:
+        return None
+    
+    return str(texto).lower().translate(_TABLA_PLEGADO)
+
+def plegar_sql(expresion):
+    """Expresión SQL equivalente a plegar_texto que solo usa funciones integradas de SQLite.
+    
+    Sirve en triggers: funciona desde cualquier cliente (sqlite3, DB Browser,
+    scripts), no solo desde las conexiones de la aplicación. lower() de SQLite
+    solo convierte ASCII, por eso también se reemplazan las mayúsculas acentuadas.
+    Los replace() se encadenan en tramos de subconsultas: anidados todos juntos
+    superan la pila del parser de SQLite.
+    """
+    pares = list(zip(_CON_TILDE + _CON_TILDE.upper(), _SIN_TILDE * 2))
+    tramos = [pares[i:i + _REEMPLAZOS_POR_TRAMO] for i in range(0, len(pares), _REEMPLAZOS_POR_TRAMO)]
+    
+    def encadenar(base, tramo):
+        for con_tilde, sin_tilde in tramo:
+            base = f"replace({base}, '{con_tilde}', '{sin_tilde}')"
+        return base
+    
+    consulta = f'SELECT {encadenar(f"lower({expresion})", tramos[0])} AS t'
+    for tramo in tramos[1:]:
+        consulta = f'SELECT {encadenar("t", tramo)} AS t FROM ({consulta})'
+    return f'({consulta})'
+
 # NUEVO: Filtros para Jinja2
 def fecha_hoy_iso():
     """Obtener la fecha de hoy en formato ISO (YYYY-MM-DD)"""
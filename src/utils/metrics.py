@@ -0,0 +1,326 @@
+"""
+Métricas de la aplicación en formato de texto de Prometheus.
+
+Los valores se acumulan en memoria del proceso, en un fragmento por hilo: cada
+hilo escribe solo en el suyo, sin locks en el camino caliente (el lock del
+fragmento se toma únicamente al dar de alta una serie nueva). El endpoint
+/metrics suma los fragmentos al momento de la lectura. Se activa con
+METRICS_ENABLED; si METRICS_TOKEN está definido se exige como Bearer token.
+"""
+
+import hmac
+import threading
+import time
+from bisect import bisect_left
+
+from flask import current_app, g, request, Response
+
+# Límites superiores de los buckets de cada histograma
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BUCKETS_CONSULTAS = (1, 2, 5, 10, 20, 50, 100, 200)
+BUCKETS_FILAS = (100, 1000, 10000, 50000, 100000, 500000, 1000000)
+BUCKETS_DURACION_EXPORTACION = (0.5, 1, 5, 15, 30, 60, 120, 300, 600)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Etiqueta de los requests que no coinciden con ninguna ruta (evita una serie por URL)
+SIN_RUTA = 'sin_ruta'
+
+
+class _Fragmento:
+    """Valores acumulados por un hilo"""
+    
+    __slots__ = ('hilo', 'valores', 'lock')
+    
+    def __init__(self, hilo):
+        self.hilo = hilo
+        self.valores = {}  # (nombre, etiquetas) -> lista mutable
+        self.lock = threading.Lock()
+
+
+class RegistroMetricas:
+    """Contadores, histogramas y gauges del proceso"""
+    
+    def __init__(self, prefijo='consultorio'):
+        self.prefijo = prefijo
+        self._definiciones = {}
+        self._gauges = {}
+        self._local = threading.local()
+        self._fragmentos = []
+        self._acumulado = _Fragmento(None)  # valores de hilos que ya terminaron
+        self._lock = threading.Lock()
+    
+    # ===== DEFINICIÓN =====
+    
+    def contador(self, nombre, ayuda, etiquetas=()):
+        """Definir un contador"""
+        self._definiciones[nombre] = ('counter', ayuda, tuple(etiquetas), None)
+    
+    def histograma(self, nombre, ayuda, buckets, etiquetas=()):
+        """Definir un histograma con los límites superiores `buckets`"""
+        self._definiciones[nombre] = ('histogram', ayuda, tuple(etiquetas), tuple(buckets))
+    
+    def gauge(self, nombre, ayuda, funcion, etiquetas=()):
+        """Definir un gauge calculado al leer las métricas: funcion() -> [(valores_etiquetas, valor)]"""
+        self._gauges[nombre] = (ayuda, tuple(etiquetas), funcion)
+    
+    # ===== REGISTRO (camino caliente) =====
+    
+    def _fragmento(self):
+        """Fragmento del hilo actual (se crea la primera vez)"""
+        fragmento = getattr(self._local, 'fragmento', None)
+        if fragmento is None:
+            fragmento = _Fragmento(threading.current_thread())
+            with self._lock:
+                self._compactar()
+                self._fragmentos.append(fragmento)
+            self._local.fragmento = fragmento
+        return fragmento
+    
+    def _serie(self, fragmento, clave, largo):
+        valores = fragmento.valores.get(clave)
+        if valores is None:
+            valores = [0] * largo
+            with fragmento.lock:
+                fragmento.valores[clave] = valores
+        return valores
+    
+    def incrementar(self, nombre, etiquetas=(), valor=1):
+        """Sumar `valor` a un contador"""
+        self._serie(self._fragmento(), (nombre, etiquetas), 1)[0] += valor
+    
+    def observar(self, nombre, valor, etiquetas=()):
+        """Registrar una observación en un histograma"""
+        buckets = self._definiciones[nombre][3]
+        # Un contador por bucket (no acumulado), +Inf, suma y cantidad
+        serie = self._serie(self._fragmento(), (nombre, etiquetas), len(buckets) + 3)
+        serie[bisect_left(buckets, valor)] += 1
+        serie[-2] += valor
+        serie[-1] += 1
+    
+    # ===== LECTURA =====
+    
+    @staticmethod
+    def _sumar(destino, valores):
+        for clave, serie in valores.items():
+            actual = destino.get(clave)
+            if actual is None:
+                destino[clave] = list(serie)
+            else:
+                for i, valor in enumerate(serie):
+                    actual[i] += valor
+    
+    def _compactar(self):
+        """Pasar al acumulado los fragmentos de hilos terminados (con self._lock tomado)"""
+        vivos = []
+        for fragmento in self._fragmentos:
+            if fragmento.hilo.is_alive():
+                vivos.append(fragmento)
+            else:
+                with fragmento.lock:
+                    self._sumar(self._acumulado.valores, fragmento.valores)
+        self._fragmentos = vivos
+    
+    def valores(self):
+        """Suma de todos los fragmentos: {(nombre, etiquetas): serie}"""
+        with self._lock:
+            self._compactar()
+            total = {clave: list(serie) for clave, serie in self._acumulado.valores.items()}
+            fragmentos = list(self._fragmentos)
+        
+        for fragmento in fragmentos:
+            with fragmento.lock:
+                copia = fragmento.valores.copy()
+            self._sumar(total, copia)
+        return total
+    
+    def exponer(self):
+        """Texto en el formato de exposición de Prometheus"""
+        valores = self.valores()
+        lineas = []
+        
+        for nombre, (tipo, ayuda, nombres_etiquetas, buckets) in self._definiciones.items():
+            completo = f'{self.prefijo}_{nombre}'
+            lineas.append(f'# HELP {completo} {ayuda}')
+            lineas.append(f'# TYPE {completo} {tipo}')
+            
+            series = sorted((etiquetas, serie) for (n, etiquetas), serie in valores.items() if n == nombre)
+            for etiquetas, serie in series:
+                pares = list(zip(nombres_etiquetas, etiquetas))
+                if tipo == 'counter':
+                    lineas.append(f'{completo}{_etiquetas(pares)} {_numero(serie[0])}')
+                    continue
+                
+                acumulado = 0
+                for limite, cantidad in zip(buckets + ('+Inf',), serie):
+                    acumulado += cantidad
+                    le = limite if limite == '+Inf' else _numero(limite)
+                    lineas.append(f'{completo}_bucket{_etiquetas(pares + [("le", le)])} {acumulado}')
+                lineas.append(f'{completo}_sum{_etiquetas(pares)} {_numero(serie[-2])}')
+                lineas.append(f'{completo}_count{_etiquetas(pares)} {serie[-1]}')
+        
+        for nombre, (ayuda, nombres_etiquetas, funcion) in self._gauges.items():
+            completo = f'{self.prefijo}_{nombre}'
+            lineas.append(f'# HELP {completo} {ayuda}')
+            lineas.append(f'# TYPE {completo} gauge')
+            try:
+                for etiquetas, valor in funcion():
+                    lineas.append(f'{completo}{_etiquetas(list(zip(nombres_etiquetas, etiquetas)))} {_numero(valor)}')
+            except Exception as e:
+                print(f"⚠️ No se pudo calcular la métrica {completo}: {e}")
+        
+        return '\n'.join(lineas) + '\n'
+
+
+def _numero(valor):
+    """Número en formato Prometheus (enteros sin decimales)"""
+    if isinstance(valor, float) and not valor.is_integer():
+        return repr(valor)
+    return str(int(valor))
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _etiquetas(pares):
+    if not pares:
+        return ''
+    return '{' + ','.join(f'{nombre}="{_escapar(valor)}"' for nombre, valor in pares) + '}'
+
+
+def get_registro():
+    """Registro de métricas de la aplicación actual (None si están desactivadas)"""
+    return current_app.extensions.get('metricas')
+
+
+def observar_exportacion(tipo, formato, estado, filas, duracion):
+    """Registrar el resultado de un trabajo de exportación (sin efecto si las métricas están desactivadas)"""
+    registro = get_registro()
+    if registro is None:
+        return
+    
+    registro.incrementar('exportaciones_total', (tipo, formato, estado))
+    if estado == 'completado':
+        registro.observar('exportacion_filas', filas or 0, (tipo, formato))
+    registro.observar('exportacion_duracion_seconds', duracion, (tipo, formato))
+
+
+def _crear_registro():
+    registro = RegistroMetricas()
+    registro.contador('http_requests_total', 'Requests atendidos', ('blueprint', 'endpoint', 'method', 'status'))
+    registro.histograma(
+        'http_request_duration_seconds', 'Latencia de los requests en segundos',
+        BUCKETS_LATENCIA, ('blueprint', 'endpoint', 'method')
+    )
+    registro.histograma(
+        'db_queries_per_request', 'Consultas SQL por request',
+        BUCKETS_CONSULTAS, ('blueprint', 'endpoint')
+    )
+    registro.contador('db_time_seconds_total', 'Tiempo en la base de datos por endpoint', ('blueprint', 'endpoint'))
+    registro.contador('db_pool_checkouts_total', 'Conexiones tomadas del pool', ('bind',))
+    registro.contador('exportaciones_total', 'Trabajos de exportación terminados', ('tipo', 'formato', 'estado'))
+    registro.histograma('exportacion_filas', 'Filas por exportación', BUCKETS_FILAS, ('tipo', 'formato'))
+    registro.histograma(
+        'exportacion_duracion_seconds', 'Duración de los trabajos de exportación en segundos',
+        BUCKETS_DURACION_EXPORTACION, ('tipo', 'formato')
+    )
+    return registro
+
+
+def _registrar_pool(app, registro):
+    """Contar los checkouts y exponer las conexiones en uso de cada motor"""
+    from sqlalchemy import event
+    from src.database import db
+    
+    with app.app_context():
+        motores = {bind or 'default': engine for bind, engine in db.engines.items()}
+    
+    for bind, engine in motores.items():
+        etiquetas = (bind,)
+        
+        def checkout(dbapi_conn, connection_record, connection_proxy, etiquetas=etiquetas):
+            registro.incrementar('db_pool_checkouts_total', etiquetas)
+        
+        event.listen(engine, 'checkout', checkout)
+    
+    def conexiones_en_uso():
+        # Solo los pools con tamaño fijo (QueuePool) informan las conexiones en uso
+        return [
+            ((bind,), engine.pool.checkedout())
+            for bind, engine in motores.items()
+            if hasattr(engine.pool, 'checkedout')
+        ]
+    
+    registro.gauge('db_pool_checked_out', 'Conexiones del pool en uso', conexiones_en_uso, ('bind',))
+
+
+def _registrar_cache(app, registro):
+    """Exponer los aciertos y fallos de la caché de resultados de este proceso"""
+    cache = app.extensions.get('cache')
+    if cache is None:
+        return
+    
+    def contadores(clave):
+        def funcion():
+            return [
+                ((namespace,), valores[clave])
+                for namespace, valores in cache.estadisticas()['namespaces'].items()
+            ]
+        return funcion
+    
+    registro.gauge('cache_hits', 'Lecturas de la caché de resultados encontradas', contadores('aciertos'), ('namespace',))
+    registro.gauge('cache_misses', 'Lecturas de la caché de resultados no encontradas', contadores('fallos'), ('namespace',))
+    registro.gauge('cache_entries', 'Entradas en la caché de resultados', lambda: [((), cache.cantidad())])
+
+
+def init_metrics(app):
+    """Activar la recolección de métricas y el endpoint /metrics (METRICS_ENABLED)"""
+    if not app.config.get('METRICS_ENABLED', False):
+        return
+    
+    registro = _crear_registro()
+    app.extensions['metricas'] = registro
+    _registrar_pool(app, registro)
+    _registrar_cache(app, registro)
+    
+    @app.before_request
+    def iniciar_metricas():
+        g.metricas_inicio = time.perf_counter()
+    
+    # Se registra después del perfilador de SQL: los after_request corren en
+    # orden inverso, así que el perfil del request todavía está disponible
+    @app.after_request
+    def registrar_metricas(response):
+        inicio = g.pop('metricas_inicio', None)
+        if inicio is None:
+            return response
+        
+        endpoint = request.endpoint or SIN_RUTA
+        blueprint = request.blueprint or ''
+        registro.incrementar(
+            'http_requests_total', (blueprint, endpoint, request.method, str(response.status_code))
+        )
+        registro.observar(
+            'http_request_duration_seconds', time.perf_counter() - inicio, (blueprint, endpoint, request.method)
+        )
+        
+        perfil = g.get('perfil_sql')
+        if perfil is not None:
+            registro.observar('db_queries_per_request', perfil.cantidad, (blueprint, endpoint))
+            registro.incrementar('db_time_seconds_total', (blueprint, endpoint), perfil.tiempo_total)
+        
+        return response
+    
+    def metricas():
+        """Métricas en formato Prometheus"""
+        token = app.config.get('METRICS_TOKEN')
+        if token:
+            autorizacion = request.headers.get('Authorization', '')
+            if not hmac.compare_digest(autorizacion, f'Bearer {token}'):
+                return Response('No autorizado\n', status=401, mimetype='text/plain')
+        
+        return Response(registro.exponer(), content_type=CONTENT_TYPE)
+    
+    app.add_url_rule('/metrics', 'metricas', metricas)
+    print("✅ Endpoint /metrics activado")
@@ -0,0 +1,212 @@
+"""
+Paginación por cursor (keyset) para los listados.
+
+En lugar de OFFSET, cada página continúa desde los valores de orden de la
+última fila de la anterior: `WHERE (apellido, nombre, id) > (?, ?, ?) ORDER BY
+apellido, nombre, id LIMIT n`. Con un índice sobre las columnas de orden el
+costo de una página no depende de su profundidad, y no hace falta el COUNT(*)
+que `.paginate()` ejecuta en cada request.
+
+El orden debe terminar en una columna única (el id) y sus columnas no pueden
+ser NULL. El cursor es opaco para el cliente: JSON en base64 con los valores
+de la fila, la dirección y el total ya calculado (el total se cuenta solo en
+la primera página).
+"""
+
+import base64
+import binascii
+import json
+from datetime import date, datetime, time
+
+from sqlalchemy import and_, bindparam, func, or_, select, tuple_
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import UnaryExpression
+
+from src.database import db
+
+# Filas máximas por página en los listados por cursor
+MAX_POR_PAGINA = 100
+
+# El total aproximado cuenta hasta este número de filas ("más de 10.000")
+TOPE_CONTEO_APROXIMADO = 10000
+
+MODOS_CONTEO = ('exacto', 'aproximado')
+
+
+class CursorInvalido(ValueError):
+    """El cursor no es válido para este listado (alterado o de otro listado)"""
+
+
+class PaginaKeyset:
+    """Página de un listado por cursor"""
+    
+    def __init__(self, items, per_page, siguiente=None, anterior=None, total=None, total_aproximado=False):
+        self.items = items
+        self.per_page = per_page
+        self.siguiente = siguiente
+        self.anterior = anterior
+        self.total = total
+        self.total_aproximado = total_aproximado
+    
+    @property
+    def has_next(self):
+        return self.siguiente is not None
+    
+    @property
+    def has_prev(self):
+        return self.anterior is not None
+    
+    def to_dict(self):
+        return {
+            'items': [item.to_dict() for item in self.items],
+            'siguiente': self.siguiente,
+            'anterior': self.anterior,
+            'total': self.total,
+            'total_aproximado': self.total_aproximado,
+        }
+
+
+def _columnas_orden(orden):
+    """(columna, descendente) de cada criterio de orden (Turno.fecha.desc(), Cliente.apellido...)"""
+    columnas = []
+    for criterio in orden:
+        if isinstance(criterio, UnaryExpression) and criterio.modifier in (operators.desc_op, operators.asc_op):
+            columnas.append((criterio.element, criterio.modifier is operators.desc_op))
+        else:
+            columnas.append((criterio, False))
+    return columnas
+
+
+def _serializar_valor(valor):
+    if isinstance(valor, datetime):
+        return ['dt', valor.isoformat()]
+    if isinstance(valor, date):
+        return ['d', valor.isoformat()]
+    if isinstance(valor, time):
+        return ['t', valor.isoformat()]
+    return valor
+
+
+def _deserializar_valor(valor):
+    if isinstance(valor, list):
+        tipo, texto = valor
+        return {'dt': datetime.fromisoformat, 'd': date.fromisoformat, 't': time.fromisoformat}[tipo](texto)
+    return valor
+
+
+def codificar_cursor(listado, valores, direccion, total=None, total_aproximado=False):
+    """Cursor opaco con los valores de orden de una fila"""
+    datos = {'l': listado, 'v': [_serializar_valor(valor) for valor in valores], 'd': direccion}
+    if total is not None:
+        datos['t'] = total
+        datos['a'] = total_aproximado
+    texto = json.dumps(datos, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(texto).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(cursor, listado, cantidad_columnas):
+    """Datos de un cursor generado por codificar_cursor; CursorInvalido si no corresponde al listado"""
+    try:
+        texto = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        datos = json.loads(texto)
+        valores = [_deserializar_valor(valor) for valor in datos['v']]
+    except (binascii.Error, ValueError, TypeError, KeyError) as e:
+        raise CursorInvalido('Cursor de paginación no válido') from e
+    
+    if datos.get('l') != listado or len(valores) != cantidad_columnas or datos.get('d') not in ('sig', 'ant'):
+        raise CursorInvalido('Cursor de paginación no válido')
+    
+    # El total guardado va completo (cantidad entera y si es aproximado) o no va
+    if ('t' in datos) != ('a' in datos):
+        raise CursorInvalido('Cursor de paginación no válido')
+    if 't' in datos and (type(datos['t']) is not int or type(datos['a']) is not bool):
+        raise CursorInvalido('Cursor de paginación no válido')
+    
+    datos['v'] = valores
+    return datos
+
+
+def _condicion_despues_de(columnas, valores, hacia_atras):
+    """Filas posteriores (o anteriores) a `valores` en el orden de `columnas`"""
+    parametros = [bindparam(None, valor, type_=columna.type) for (columna, _), valor in zip(columnas, valores)]
+    
+    direcciones = {descendente for _, descendente in columnas}
+    if len(direcciones) == 1:
+        # Todas en el mismo sentido: comparación de tuplas, que SQLite resuelve con el índice
+        mayor = direcciones.pop() == hacia_atras
+        izquierda = tuple_(*[columna for columna, _ in columnas])
+        return izquierda > tuple_(*parametros) if mayor else izquierda < tuple_(*parametros)
+    
+    # Sentidos mezclados: (a > x) OR (a = x AND b < y) OR ...
+    alternativas = []
+    for i, (columna, descendente) in enumerate(columnas):
+        iguales = [columnas[j][0] == parametros[j] for j in range(i)]
+        mayor = descendente == hacia_atras
+        alternativas.append(and_(*iguales, columna > parametros[i] if mayor else columna < parametros[i]))
+    return or_(*alternativas)
+
+
+def contar_filas(query, modo):
+    """Total de filas del listado: (total, aproximado)"""
+    consulta = query.order_by(None)
+    if modo == 'exacto':
+        return consulta.count(), False
+    
+    # Aproximado: contar como mucho TOPE_CONTEO_APROXIMADO + 1 filas
+    subconsulta = consulta.with_entities(query.column_descriptions[0]['entity'].id).limit(
+        TOPE_CONTEO_APROXIMADO + 1
+    ).subquery()
+    total = db.session.execute(select(func.count()).select_from(subconsulta)).scalar()
+    if total > TOPE_CONTEO_APROXIMADO:
+        return TOPE_CONTEO_APROXIMADO, True
+    return total, False
+
+
+def paginar_keyset(query, listado, orden, cursor=None, per_page=10, contar=None):
+    """Página de `query` ordenada por `orden` a partir de `cursor` (None: primera página).
+    
+    `listado` identifica el listado dentro del cursor; `contar` puede ser
+    'exacto', 'aproximado' o None (sin total).
+    """
+    per_page = max(1, min(int(per_page), MAX_POR_PAGINA))
+    if contar is not None and contar not in MODOS_CONTEO:
+        raise ValueError(f'Modo de conteo no soportado: {contar}')
+    
+    columnas = _columnas_orden(orden)
+    datos = decodificar_cursor(cursor, listado, len(columnas)) if cursor else None
+    hacia_atras = bool(datos) and datos['d'] == 'ant'
+    
+    total, total_aproximado = None, False
+    if datos and 't' in datos:
+        total, total_aproximado = datos['t'], datos['a']
+    elif contar and not datos:
+        total, total_aproximado = contar_filas(query, contar)
+    
+    consulta = query
+    if datos:
+        consulta = consulta.filter(_condicion_despues_de(columnas, datos['v'], hacia_atras))
+    
+    if hacia_atras:
+        orden_consulta = [columna.asc() if descendente else columna.desc() for columna, descendente in columnas]
+    else:
+        orden_consulta = [columna.desc() if descendente else columna.asc() for columna, descendente in columnas]
+    
+    filas = consulta.order_by(None).order_by(*orden_consulta).limit(per_page + 1).all()
+    hay_mas = len(filas) > per_page
+    filas = filas[:per_page]
+    if hacia_atras:
+        filas.reverse()
+    
+    def _cursor(fila, direccion):
+        valores = [getattr(fila, columna.key) for columna, _ in columnas]
+        return codificar_cursor(listado, valores, direccion, total, total_aproximado)
+    
+    siguiente = anterior = None
+    if filas:
+        # Hacia adelante hay más si sobró una fila; si se volvió atrás, siempre
+        if hay_mas or hacia_atras:
+            siguiente = _cursor(filas[-1], 'sig')
+        if (hay_mas and hacia_atras) or (datos and not hacia_atras):
+            anterior = _cursor(filas[0], 'ant')
+    
+    return PaginaKeyset(filas, per_page, siguiente, anterior, total, total_aproximado)
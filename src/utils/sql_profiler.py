@@ -0,0 +1,191 @@
+"""
+Perfilado de SQL por request y registro de consultas lentas.
+
+Se engancha a los eventos before/after_cursor_execute de SQLAlchemy y a los
+hooks de request de Flask. En cada request registra la cantidad de consultas,
+el tiempo total en la base y las sentencias más lentas; agrega un header
+Server-Timing a la respuesta y escribe en un log rotativo las consultas que
+superan SQL_SLOW_QUERY_MS y los requests con más de SQL_MAX_QUERIES_PER_REQUEST
+consultas (típico de un N+1). Los valores de los parámetros se registran solo
+con SQL_SLOW_QUERY_LOG_PARAMS.
+"""
+
+import os
+import heapq
+import logging
+import time
+from logging.handlers import RotatingFileHandler
+
+from flask import g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Valores por defecto si la configuración no los define
+SQL_SLOW_QUERY_MS = 200
+SQL_MAX_QUERIES_PER_REQUEST = 50
+SQL_PROFILER_TOP = 5
+SQL_SLOW_QUERY_LOG_MAX_BYTES = 1024 * 1024
+SQL_SLOW_QUERY_LOG_BACKUPS = 5
+
+# Largo máximo de las sentencias y parámetros que se guardan
+MAX_LARGO_SENTENCIA = 1000
+
+_CLAVE_INICIOS = 'perfil_sql_inicios'
+
+logger = logging.getLogger('consultorio.sql')
+
+
+class PerfilSQL:
+    """Consultas ejecutadas durante un request"""
+    
+    def __init__(self, endpoint, top=SQL_PROFILER_TOP):
+        self.endpoint = endpoint
+        self.top = top
+        self.inicio = time.perf_counter()
+        self.cantidad = 0
+        self.tiempo_total = 0.0
+        self.mas_lentas = []  # heap de (duracion, orden, sentencia)
+    
+    def registrar(self, sentencia, duracion):
+        """Sumar una consulta y conservar solo las `top` más lentas"""
+        self.cantidad += 1
+        self.tiempo_total += duracion
+        
+        item = (duracion, self.cantidad, sentencia[:MAX_LARGO_SENTENCIA])
+        if len(self.mas_lentas) < self.top:
+            heapq.heappush(self.mas_lentas, item)
+        elif duracion > self.mas_lentas[0][0]:
+            heapq.heapreplace(self.mas_lentas, item)
+    
+    @property
+    def tiempo_total_ms(self):
+        return self.tiempo_total * 1000
+    
+    def get_mas_lentas(self):
+        """Lista de (duracion_ms, sentencia) de mayor a menor"""
+        return [(duracion * 1000, sentencia) for duracion, _, sentencia in sorted(self.mas_lentas, reverse=True)]
+    
+    def server_timing(self):
+        """Valor del header Server-Timing"""
+        total_ms = (time.perf_counter() - self.inicio) * 1000
+        return (
+            f'db;dur={self.tiempo_total_ms:.1f};desc="{self.cantidad} consultas", '
+            f'app;dur={total_ms:.1f}'
+        )
+
+
+def get_perfil_actual():
+    """Perfil SQL del request en curso (None fuera de un request perfilado)"""
+    if not has_app_context():
+        return None
+    return g.get('perfil_sql')
+
+
+def _antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_CLAVE_INICIOS, []).append(time.perf_counter())
+
+
+def _despues_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    inicios = conn.info.get(_CLAVE_INICIOS)
+    if not inicios:
+        return
+    duracion = time.perf_counter() - inicios.pop()
+    
+    perfil = get_perfil_actual()
+    if perfil is None:
+        return
+    perfil.registrar(statement, duracion)
+    
+    umbral_ms = g.get('perfil_sql_umbral_ms', SQL_SLOW_QUERY_MS)
+    if duracion * 1000 < umbral_ms:
+        return
+    
+    # Los parámetros contienen datos de pacientes: solo se registran si se pide explícitamente
+    if g.get('perfil_sql_parametros', False):
+        logger.warning(
+            'Consulta lenta %.1f ms en %s: %s | parámetros: %s',
+            duracion * 1000, perfil.endpoint,
+            statement[:MAX_LARGO_SENTENCIA], str(parameters)[:MAX_LARGO_SENTENCIA]
+        )
+    else:
+        logger.warning(
+            'Consulta lenta %.1f ms en %s: %s',
+            duracion * 1000, perfil.endpoint, statement[:MAX_LARGO_SENTENCIA]
+        )
+
+
+def _al_fallar(contexto):
+    # La sentencia falló: after_cursor_execute no corre y el inicio quedaría en la conexión del pool
+    conexion = contexto.connection
+    if conexion is None or conexion.closed:
+        return
+    inicios = conexion.info.get(_CLAVE_INICIOS)
+    if inicios:
+        inicios.pop()
+
+
+def _configurar_log(app):
+    """Agregar (una sola vez por archivo) el handler rotativo del log de consultas lentas"""
+    ruta = app.config.get('SQL_SLOW_QUERY_LOG') or os.path.join(app.instance_path, 'logs', 'sql_lento.log')
+    ruta = os.path.abspath(ruta)
+    
+    for handler in logger.handlers:
+        if getattr(handler, 'baseFilename', None) == ruta:
+            return
+    
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    handler = RotatingFileHandler(
+        ruta,
+        maxBytes=app.config.get('SQL_SLOW_QUERY_LOG_MAX_BYTES', SQL_SLOW_QUERY_LOG_MAX_BYTES),
+        backupCount=app.config.get('SQL_SLOW_QUERY_LOG_BACKUPS', SQL_SLOW_QUERY_LOG_BACKUPS),
+        encoding='utf-8',
+        delay=True
+    )
+    handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+
+def init_sql_profiler(app):
+    """Activar el perfilado de SQL en la aplicación (SQL_PROFILER_ENABLED)"""
+    if not app.config.get('SQL_PROFILER_ENABLED', True):
+        return
+    
+    _configurar_log(app)
+    
+    # Los eventos se registran sobre la clase Engine: cubren todos los motores
+    if not event.contains(Engine, 'before_cursor_execute', _antes_de_ejecutar):
+        event.listen(Engine, 'before_cursor_execute', _antes_de_ejecutar)
+        event.listen(Engine, 'after_cursor_execute', _despues_de_ejecutar)
+    if not event.contains(Engine, 'handle_error', _al_fallar):
+        event.listen(Engine, 'handle_error', _al_fallar)
+    
+    @app.before_request
+    def iniciar_perfil_sql():
+        g.perfil_sql = PerfilSQL(
+            request.endpoint or request.path,
+            top=app.config.get('SQL_PROFILER_TOP', SQL_PROFILER_TOP)
+        )
+        g.perfil_sql_umbral_ms = app.config.get('SQL_SLOW_QUERY_MS', SQL_SLOW_QUERY_MS)
+        g.perfil_sql_parametros = app.config.get('SQL_SLOW_QUERY_LOG_PARAMS', False)
+    
+    @app.after_request
+    def cerrar_perfil_sql(response):
+        perfil = g.pop('perfil_sql', None)
+        if perfil is None:
+            return response
+        
+        if app.config.get('SQL_SERVER_TIMING', True):
+            response.headers.add('Server-Timing', perfil.server_timing())
+        
+        maximo = app.config.get('SQL_MAX_QUERIES_PER_REQUEST', SQL_MAX_QUERIES_PER_REQUEST)
+        if perfil.cantidad > maximo:
+            detalle = '; '.join(f'{duracion:.1f} ms {sentencia[:200]}' for duracion, sentencia in perfil.get_mas_lentas())
+            logger.warning(
+                'Request con %d consultas (%.1f ms en la base) en %s. Más lentas: %s',
+                perfil.cantidad, perfil.tiempo_total_ms, perfil.endpoint, detalle
+            )
+        
+        return response
+    
+    print("✅ Perfilado de SQL activado")